@@ -0,0 +1,5 @@
+"""
+qSyscall ABI
+
+Wire-level definitions shared by the kernel and its clients.
+"""
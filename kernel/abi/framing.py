@@ -0,0 +1,84 @@
+"""
+qSyscall Wire Framing
+
+The framed (persistent) transport shared by the kernel RPC servers and
+the qSyscall clients: a connection opens with ``FRAME_MAGIC``, echoed by
+the server, and every message is then a 4-byte big-endian length
+followed by that many bytes of UTF-8 JSON.
+
+Also holds the socket helper both sides use to read unframed (legacy
+one-shot) messages.
+"""
+
+import socket
+import struct
+from typing import Optional
+
+
+# Connection preamble selecting the framed transport
+FRAME_MAGIC = b"QMK1"
+
+# Frame header: payload length, unsigned 32-bit big-endian
+FRAME_HEADER = struct.Struct(">I")
+
+# Largest accepted frame payload
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_frame(message: str) -> bytes:
+    """
+    Encode a JSON message as a length-prefixed frame.
+    
+    Args:
+        message: JSON text
+    
+    Returns:
+        Header plus UTF-8 payload
+    """
+    payload = message.encode('utf-8')
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def frame_length(header: bytes) -> int:
+    """
+    Payload length announced by a frame header.
+    
+    Raises:
+        ValueError: If the frame exceeds MAX_FRAME_SIZE
+    """
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+    return length
+
+
+def read_frame(reader) -> Optional[bytes]:
+    """
+    Read one frame payload from a buffered binary reader.
+    
+    Args:
+        reader: File-like object from ``socket.makefile("rb")``
+    
+    Returns:
+        Payload bytes, or None if the stream ended
+    
+    Raises:
+        ValueError: If the frame exceeds MAX_FRAME_SIZE
+    """
+    header = reader.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    
+    length = frame_length(header)
+    payload = reader.read(length)
+    if len(payload) < length:
+        return None
+    return payload
+
+
+def socket_has_pending_data(sock: socket.socket) -> bool:
+    """Check, without blocking, whether more bytes are already readable."""
+    try:
+        return bool(sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT))
+    except (BlockingIOError, InterruptedError):
+        return False
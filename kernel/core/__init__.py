@@ -8,10 +8,11 @@ Components:
 - session_manager: Session management
 - job_manager: Job scheduling
 - rpc_server: RPC interface
+- async_rpc_server: asyncio RPC interface
 """
 
-from .qmk_server import QMKServer
+from .qmk_server import QMKServer, AsyncQMKServer
 from .session_manager import SessionManager
 from .job_manager import JobManager
 
-__all__ = ['QMKServer', 'SessionManager', 'JobManager']
+__all__ = ['QMKServer', 'AsyncQMKServer', 'SessionManager', 'JobManager']
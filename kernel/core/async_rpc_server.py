@@ -0,0 +1,357 @@
+"""
+asyncio JSON-RPC 2.0 Server for qSyscall ABI
+
+Serves the same wire protocol as ``RPCServer`` (framed persistent and
+legacy one-shot connections) from a single event loop instead of one OS
+thread per connection. Synchronous handlers are offloaded to a bounded
+thread pool (those registered as ``blocking`` to threads of their own,
+so they cannot exhaust it); coroutine handlers registered with
+``register_async_handler`` run on the loop itself, so a thousand clients
+blocked in ``q_wait`` cost a thousand futures rather than a thousand
+parked threads.
+
+Framed connections can also receive server-pushed JSON-RPC
+notifications (requests without an ``id``), e.g. job completion.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Set
+
+from kernel.abi.framing import FRAME_MAGIC, FRAME_HEADER, encode_frame, frame_length
+from kernel.core.rpc_server import RPCServer, JSONRPCError, legacy_message_complete
+
+
+class RPCConnection:
+    """
+    One client connection on the event loop.
+
+    Handlers registered with ``register_async_handler`` receive it to push
+    notifications back to the client.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop):
+        self.writer = writer
+        self.loop = loop
+        self.framed = False
+        self.closed = False
+        self._write_lock = asyncio.Lock()
+        self._close_callbacks: List[Callable[[], None]] = []
+
+    async def send(self, message: str):
+        """Write one message (framed if the connection is framed)."""
+        if self.closed:
+            return
+        data = encode_frame(message) if self.framed else message.encode('utf-8')
+        try:
+            async with self._write_lock:
+                self.writer.write(data)
+                await self.writer.drain()
+        except (ConnectionError, OSError):
+            self.closed = True
+
+    def notify_threadsafe(self, method: str, params: Dict[str, Any]):
+        """
+        Push a JSON-RPC notification from any thread.
+
+        Ignored on legacy connections, which carry a single response.
+        """
+        if self.closed or not self.framed:
+            return
+        message = json.dumps({"jsonrpc": "2.0", "method": method, "params": params})
+        try:
+            self.loop.call_soon_threadsafe(self._schedule_send, message)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+    def _schedule_send(self, message: str):
+        self.loop.create_task(self.send(message))
+
+    def add_close_callback(self, callback: Callable[[], None]):
+        """Run ``callback()`` once when the connection closes (now if closed)."""
+        if self.closed:
+            callback()
+            return
+        self._close_callbacks.append(callback)
+
+    def close(self):
+        """Close the underlying stream and run close callbacks."""
+        self.closed = True
+        self.writer.close()
+        callbacks, self._close_callbacks = self._close_callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class AsyncRPCServer(RPCServer):
+    """
+    JSON-RPC 2.0 server over Unix domain sockets on an asyncio event loop.
+
+    ``start``/``stop`` run the loop on a background thread for drop-in use
+    by ``QMKServer``; ``start_async``/``stop_async`` serve from a loop the
+    caller already runs.
+    """
+
+    DEFAULT_BACKLOG = 1024
+
+    def __init__(self, socket_path: str = "/tmp/qmk.sock",
+                 max_in_flight: int = RPCServer.DEFAULT_MAX_IN_FLIGHT,
+                 max_workers: Optional[int] = None,
+                 backlog: int = DEFAULT_BACKLOG):
+        """
+        Initialize asyncio RPC server.
+
+        Args:
+            socket_path: Path to Unix domain socket
+            max_in_flight: Maximum concurrently processed requests per
+                           framed connection
+            max_workers: Thread pool size for synchronous handlers
+            backlog: Listen backlog
+        """
+        super().__init__(socket_path, max_in_flight, max_workers)
+        self.async_handlers: Dict[str, Callable] = {}
+        self.backlog = backlog
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[RPCConnection] = set()
+        self._owns_loop = False
+
+    def register_async_handler(self, method: str, handler: Callable):
+        """
+        Register a handler that runs on the event loop.
+
+        Takes precedence over a synchronous handler of the same name on
+        the socket; ``call_local`` still uses the synchronous one.
+
+        Args:
+            method: Method name (e.g., "q_wait")
+            handler: ``handler(params, connection)`` returning a result dict
+                     or an awaitable of one; must not block
+        """
+        self.async_handlers[method] = handler
+
+    async def start_async(self):
+        """Start serving on the running event loop."""
+        if self.running:
+            return
+
+        # Remove existing socket file
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._loop = asyncio.get_running_loop()
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="qmk-rpc")
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection,
+            path=self.socket_path,
+            backlog=self.backlog
+        )
+        self.running = True
+
+    async def stop_async(self):
+        """Stop serving and close all connections."""
+        if not self.running:
+            return
+
+        self.running = False
+        self._server.close()
+        for connection in list(self._connections):
+            connection.close()
+        await self._server.wait_closed()
+        self._pool.shutdown(wait=False)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def start(self):
+        """Start the server on a background event loop thread."""
+        if self.running:
+            return
+
+        loop = asyncio.new_event_loop()
+        self.server_thread = threading.Thread(
+            target=loop.run_forever,
+            name="qmk-rpc-loop",
+            daemon=True
+        )
+        self.server_thread.start()
+        self._owns_loop = True
+        asyncio.run_coroutine_threadsafe(self.start_async(), loop).result()
+
+    def stop(self):
+        """Stop the server and its background event loop."""
+        if not self.running:
+            return
+
+        loop = self._loop
+        asyncio.run_coroutine_threadsafe(self.stop_async(), loop).result()
+        if self._owns_loop:
+            loop.call_soon_threadsafe(loop.stop)
+            self.server_thread.join()
+            loop.close()
+            self._owns_loop = False
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        """Serve one client connection."""
+        connection = RPCConnection(writer, self._loop)
+        self._connections.add(connection)
+
+        try:
+            prefix = b""
+            while len(prefix) < len(FRAME_MAGIC) and FRAME_MAGIC.startswith(prefix):
+                chunk = await reader.read(len(FRAME_MAGIC) - len(prefix))
+                if not chunk:
+                    break
+                prefix += chunk
+
+            if prefix == FRAME_MAGIC:
+                await self._serve_framed(reader, connection)
+            else:
+                await self._serve_legacy(reader, connection, prefix)
+
+        except (ConnectionError, OSError):
+            pass
+
+        finally:
+            self._connections.discard(connection)
+            connection.close()
+
+    async def _serve_legacy(self, reader: asyncio.StreamReader,
+                            connection: RPCConnection, prefix: bytes):
+        """Answer a single unframed request."""
+        data = bytearray(prefix)
+        if not legacy_message_complete(data, prefix):
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                data += chunk
+                if legacy_message_complete(data, chunk):
+                    break
+
+        if not data:
+            return
+
+        response = await self._dispatch(data.decode('utf-8'), connection)
+        await connection.send(response)
+
+    async def _serve_framed(self, reader: asyncio.StreamReader, connection: RPCConnection):
+        """Serve a persistent framed connection with concurrent requests."""
+        connection.framed = True
+        connection.writer.write(FRAME_MAGIC)
+        await connection.writer.drain()
+
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        tasks: Set[asyncio.Task] = set()
+
+        try:
+            while self.running:
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                    try:
+                        length = frame_length(header)
+                    except ValueError as e:
+                        await connection.send(self._format_error(
+                            None, JSONRPCError.INVALID_REQUEST, str(e)
+                        ))
+                        break
+                    payload = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+
+                await in_flight.acquire()
+                task = self._loop.create_task(self._serve_frame(payload, connection, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            # Let outstanding requests answer before the connection closes
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _serve_frame(self, payload: bytes, connection: RPCConnection,
+                           in_flight: asyncio.Semaphore):
+        """Process one framed request and send its response."""
+        try:
+            try:
+                request_data = payload.decode('utf-8')
+            except UnicodeDecodeError:
+                response = self._format_error(None, JSONRPCError.PARSE_ERROR, "Parse error")
+            else:
+                response = await self._dispatch(request_data, connection)
+            await connection.send(response)
+        finally:
+            in_flight.release()
+
+    async def _dispatch(self, request_data: str, connection: RPCConnection) -> str:
+        """
+        Route a request to its handler.
+
+        Args:
+            request_data: JSON-RPC request string
+            connection: Connection the request arrived on
+
+        Returns:
+            JSON-RPC response string
+        """
+        method, params, request_id, error = self._parse_request(request_data)
+        if error is not None:
+            return error
+
+        try:
+            if method in self.async_handlers:
+                result = self.async_handlers[method](params, connection)
+                if inspect.isawaitable(result):
+                    result = await result
+            elif method in self.blocking_methods:
+                result = await self._run_on_own_thread(self.handlers[method], params)
+            elif method in self.handlers:
+                result = await self._loop.run_in_executor(
+                    self._pool, self.handlers[method], params
+                )
+            else:
+                return self._format_error(
+                    request_id,
+                    JSONRPCError.METHOD_NOT_FOUND,
+                    f"Method '{method}' not found"
+                )
+
+            return self._format_success(request_id, result)
+
+        except Exception as e:
+            return self._format_exception(request_id, e)
+
+    def _run_on_own_thread(self, handler: Callable, params: Dict) -> asyncio.Future:
+        """Run a blocking synchronous handler on a dedicated thread."""
+        future = self._loop.create_future()
+
+        def resolve(result, error):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        def run():
+            try:
+                result, error = handler(params), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                self._loop.call_soon_threadsafe(resolve, result, error)
+            except RuntimeError:
+                # Loop closed by stop()
+                pass
+
+        threading.Thread(target=run, name="qmk-rpc-blocking", daemon=True).start()
+        return future
@@ -2,16 +2,37 @@
 Job Manager for QMK Kernel
 
 Manages asynchronous job submission, execution, and tracking.
+
+Jobs wait in a heap ordered by priority, then deadline, then submission
+order, and a fixed pool of worker threads drains it. Each worker owns its
+own executor so concurrent jobs never share resource managers or event
+tables. Submissions beyond ``max_queue_size`` are rejected with
+``QueueFullError`` instead of spawning unbounded work.
+
+With a ``ProcessPoolJobRunner`` each worker thread instead dispatches to
+a pre-started worker process, so jobs run in parallel across cores, and
+cancelling a running job interrupts its process.
+
+Subscribers (``subscribe``) receive a stream of small messages per job:
+state transitions, per-epoch progress and measurement events as they
+are produced, instead of polling the full status.
 """
 
+import heapq
+import itertools
 import secrets
 import time
 import threading
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Set
 from dataclasses import dataclass, field
 
 
+class QueueFullError(RuntimeError):
+    """Raised when a submission is rejected by admission control."""
+    pass
+
+
 class JobState(Enum):
     """Job execution states."""
     QUEUED = "QUEUED"              # Waiting for resources
@@ -22,6 +43,10 @@ class JobState(Enum):
     CANCELLED = "CANCELLED"        # Cancelled by user
 
 
+# States a job never leaves
+TERMINAL_STATES = (JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED)
+
+
 @dataclass
 class JobPolicy:
     """Job execution policy."""
@@ -84,6 +109,12 @@ class Job:
     # Cancellation tracking
     cancelled_at_epoch: Optional[int] = None
     
+    # Scheduling: absolute scheduler epoch by which the job must start
+    deadline_epoch: Optional[int] = None
+    
+    # Batch the job was submitted in (see JobManager.submit_batch)
+    batch_id: Optional[str] = None
+    
     def to_dict(self) -> Dict:
         """Convert job to dictionary representation."""
         result = {
@@ -118,31 +149,89 @@ class Job:
         if self.cancelled_at_epoch is not None:
             result["cancelled_at_epoch"] = self.cancelled_at_epoch
         
+        if self.batch_id is not None:
+            result["batch_id"] = self.batch_id
+        
         return result
 
 
+@dataclass
+class JobBatch:
+    """Jobs submitted together, with their completion order."""
+    batch_id: str
+    session_id: str
+    job_ids: List[str]
+    completed: List[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    _completed_ids: Set[str] = field(default_factory=set, repr=False)
+    
+    def record(self, job_id: str) -> bool:
+        """Append a finished job once; returns whether it was new."""
+        if job_id in self._completed_ids:
+            return False
+        self._completed_ids.add(job_id)
+        self.completed.append(job_id)
+        return True
+    
+    @property
+    def done(self) -> bool:
+        """Whether every job in the batch has finished."""
+        return len(self.completed) == len(self.job_ids)
+
+
 class JobManager:
     """
     Manages job lifecycle and execution.
     
     Responsibilities:
-    - Job submission and validation
-    - Asynchronous execution
+    - Job submission and admission control
+    - Priority/deadline scheduling onto a bounded worker pool
     - State tracking and progress updates
     - Job cancellation
     - Result collection
+    
+    The scheduler epoch advances by one each time a job is dispatched;
+    ``deadline_epochs`` counts dispatches from submission. Jobs still
+    queued when their deadline passes fail with ``DeadlineExceeded``.
     """
     
-    def __init__(self, executor=None, session_manager=None):
+    DEFAULT_NUM_WORKERS = 4
+    DEFAULT_MAX_QUEUE_SIZE = 1024
+    
+    def __init__(self, executor=None, session_manager=None,
+                 executor_factory: Optional[Callable[[], Any]] = None,
+                 num_workers: int = DEFAULT_NUM_WORKERS,
+                 max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+                 runner=None):
         """
         Initialize job manager.
         
         Args:
-            executor: Optional executor instance for running jobs
+            executor: Optional shared executor instance. A single executor
+                      cannot run jobs concurrently, so it is served by one
+                      worker; use executor_factory for parallelism
             session_manager: Optional session manager for quota cleanup
+            executor_factory: Optional callable creating one executor per worker
+            num_workers: Worker threads when executor_factory is given
+            max_queue_size: Maximum number of QUEUED jobs before submissions
+                            are rejected
+            runner: Optional ProcessPoolJobRunner; jobs then run in its worker
+                    processes and num_workers follows the runner's pool size
         """
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be positive, got {num_workers}")
+        
         self.executor = executor
         self.session_manager = session_manager
+        self.executor_factory = executor_factory
+        self.runner = runner
+        if runner is not None:
+            self.num_workers = runner.num_workers
+        elif executor_factory is not None:
+            self.num_workers = num_workers
+        else:
+            self.num_workers = 1
+        self.max_queue_size = max_queue_size
         
         # Job tracking
         self.jobs: Dict[str, Job] = {}
@@ -155,6 +244,39 @@ class JobManager:
         
         # Condition variable for waiting on job completion
         self._job_conditions: Dict[str, threading.Condition] = {}
+        
+        # One-shot completion callbacks (see add_done_callback)
+        self._done_callbacks: Dict[str, List[Callable[[Dict], None]]] = {}
+        
+        # Job event streams: job -> subscription -> listener (see subscribe)
+        self._subscribers: Dict[str, Dict[str, Callable[[Dict], None]]] = {}
+        self._subscriptions: Dict[str, str] = {}
+        
+        # Batches and their result-stream conditions
+        self.batches: Dict[str, JobBatch] = {}
+        self._batch_conditions: Dict[str, threading.Condition] = {}
+        
+        # Ready queue: (-priority, deadline_epoch, sequence, job_id)
+        self._queue: List[tuple] = []
+        self._queued: Set[str] = set()
+        self._sequence = itertools.count()
+        self._epoch = 0
+        self._work_available = threading.Condition(self._lock)
+        
+        # Worker pool (started on first submission)
+        self._workers: List[threading.Thread] = []
+        self._running = 0
+        self._shutdown = False
+        
+        # Statistics
+        self.jobs_rejected = 0
+        self.jobs_expired = 0
+    
+    @property
+    def can_execute(self) -> bool:
+        """Whether jobs are dispatched to workers."""
+        return (self.executor is not None or self.executor_factory is not None
+                or self.runner is not None)
     
     def submit_job(
         self,
@@ -175,59 +297,159 @@ class JobManager:
             - job_id: New job identifier
             - state: Initial job state
             - estimated_epochs: Estimated execution time
+        
+        Raises:
+            QueueFullError: If the queue already holds max_queue_size jobs
         """
         with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Job manager is shut down")
+            
+            # Admission control: QUEUED means waiting in a bounded queue
+            if len(self._queued) >= self.max_queue_size:
+                self.jobs_rejected += 1
+                raise QueueFullError(
+                    f"Job queue full ({self.max_queue_size} jobs queued); retry later"
+                )
+            
             # Generate job ID
             job_id = self._generate_job_id()
             
-            # Parse policy
-            job_policy = JobPolicy()
-            if policy:
-                if "priority" in policy:
-                    job_policy.priority = policy["priority"]
-                if "deadline_epochs" in policy:
-                    job_policy.deadline_epochs = policy["deadline_epochs"]
-                if "seed" in policy:
-                    job_policy.seed = policy["seed"]
-                if "debug" in policy:
-                    job_policy.debug = policy["debug"]
-                if "timeout_ms" in policy:
-                    job_policy.timeout_ms = policy["timeout_ms"]
-            
-            # Create job
-            job = Job(
-                job_id=job_id,
-                session_id=session_id,
-                graph=graph,
-                policy=job_policy,
-                state=JobState.QUEUED
-            )
+            # Charge the session quota before the job can start, so a fast
+            # worker can never release it before it is taken
+            if self.session_manager:
+                self.session_manager.register_job(session_id, job_id)
             
-            # Register job
-            self.jobs[job_id] = job
+            job = self._create_job_locked(job_id, session_id, graph, self._parse_policy(policy))
             
-            if session_id not in self.session_jobs:
-                self.session_jobs[session_id] = set()
-            self.session_jobs[session_id].add(job_id)
+            if self.can_execute:
+                self._ensure_workers()
+                self._work_available.notify()
             
-            # Create condition variable for waiting
-            self._job_conditions[job_id] = threading.Condition(self._lock)
+            return {
+                "job_id": job_id,
+                "state": job.state.value,
+                "estimated_epochs": len(graph.get("nodes", []))
+            }
+    
+    def submit_batch(
+        self,
+        session_id: str,
+        graphs: List[Dict],
+        policy: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Submit several jobs under one batch handle.
+        
+        Admission control and the session quota are checked once for the
+        whole batch; either every job is queued or none is.
+        
+        Args:
+            session_id: Session identifier
+            graphs: QVM graphs, one per job
+            policy: Optional execution policy shared by all jobs
+        
+        Returns:
+            Dictionary with:
+            - batch_id: Batch handle for wait_for_batch
+            - job_ids: Job identifiers in input order
+            - state: Initial job state
+        
+        Raises:
+            QueueFullError: If the batch does not fit in the queue
+            RuntimeError: If the session quota cannot hold the batch
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Job manager is shut down")
+            
+            if len(self._queued) + len(graphs) > self.max_queue_size:
+                self.jobs_rejected += 1
+                raise QueueFullError(
+                    f"Job queue cannot take {len(graphs)} more jobs "
+                    f"({len(self._queued)}/{self.max_queue_size} queued); retry later"
+                )
+            
+            job_ids = [self._generate_job_id() for _ in graphs]
+            if self.session_manager:
+                self.session_manager.register_jobs(session_id, job_ids)
             
-            # Estimate epochs (simple heuristic: count nodes)
-            estimated_epochs = len(graph.get("nodes", []))
+            batch_id = f"batch_{secrets.token_hex(8)}"
+            batch = JobBatch(batch_id=batch_id, session_id=session_id, job_ids=job_ids)
+            self.batches[batch_id] = batch
+            self._batch_conditions[batch_id] = threading.Condition(self._lock)
             
-            # Start execution asynchronously
-            if self.executor:
-                threading.Thread(
-                    target=self._execute_job,
-                    args=(job_id,),
-                    daemon=True
-                ).start()
+            job_policy = self._parse_policy(policy)
+            for job_id, graph in zip(job_ids, graphs):
+                self._create_job_locked(job_id, session_id, graph, job_policy, batch_id)
+            
+            if self.can_execute and job_ids:
+                self._ensure_workers()
+                self._work_available.notify_all()
             
             return {
-                "job_id": job_id,
-                "state": job.state.value,
-                "estimated_epochs": estimated_epochs
+                "batch_id": batch_id,
+                "job_ids": job_ids,
+                "state": JobState.QUEUED.value
+            }
+    
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        session_id: str,
+        cursor: int = 0,
+        timeout_ms: Optional[int] = None
+    ) -> Dict:
+        """
+        Wait for the next results of a batch.
+        
+        Jobs are reported in completion order. Pass the returned cursor
+        back to receive only results finished since the previous call.
+        
+        Args:
+            batch_id: Batch identifier
+            session_id: Session identifier
+            cursor: Number of results already received
+            timeout_ms: Maximum wait for a new result (0 polls, None waits
+                        indefinitely); on timeout no new results are returned
+        
+        Returns:
+            Dictionary with:
+            - results: Final status of each job completed after cursor
+            - cursor: Cursor for the next call
+            - completed / total: Progress counts
+            - done: Whether every job has finished
+        
+        Raises:
+            KeyError: If batch not found
+            PermissionError: If batch belongs to different session
+        """
+        with self._lock:
+            if batch_id not in self.batches:
+                raise KeyError(f"Batch '{batch_id}' not found")
+            
+            batch = self.batches[batch_id]
+            
+            if batch.session_id != session_id:
+                raise PermissionError(
+                    f"Batch '{batch_id}' belongs to different session"
+                )
+            
+            if len(batch.completed) <= cursor and not batch.done:
+                timeout_sec = timeout_ms / 1000.0 if timeout_ms is not None else None
+                self._batch_conditions[batch_id].wait_for(
+                    lambda: len(batch.completed) > cursor,
+                    timeout=timeout_sec
+                )
+            
+            new_ids = batch.completed[cursor:]
+            return {
+                "batch_id": batch_id,
+                "results": [self.jobs[j].to_dict() for j in new_ids if j in self.jobs],
+                "cursor": max(cursor, len(batch.completed)),
+                "completed": len(batch.completed),
+                "total": len(batch.job_ids),
+                "done": batch.done
             }
     
     def get_job_status(self, job_id: str, session_id: str) -> Dict:
@@ -294,7 +516,7 @@ class JobManager:
                 )
             
             # If already in terminal state, return immediately
-            if job.state in [JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED]:
+            if job.state in TERMINAL_STATES:
                 return job.to_dict()
             
             # Wait for completion
@@ -306,6 +528,177 @@ class JobManager:
             
             return job.to_dict()
     
+    def add_done_callback(
+        self,
+        job_id: str,
+        session_id: str,
+        callback: Callable[[Dict], None]
+    ):
+        """
+        Call ``callback(status)`` once the job reaches a terminal state.
+        
+        Runs immediately if the job has already finished. Callbacks are
+        invoked with the manager lock held, so they must be quick and must
+        not call back into the JobManager (e.g. hand off with
+        ``loop.call_soon_threadsafe``). This lets event-loop servers await
+        completion without parking a thread in ``wait_for_job``.
+        
+        Args:
+            job_id: Job identifier
+            session_id: Session identifier
+            callback: Receives the final job status dictionary
+        
+        Raises:
+            KeyError: If job not found
+            PermissionError: If job belongs to different session
+        """
+        with self._lock:
+            if job_id not in self.jobs:
+                raise KeyError(f"Job '{job_id}' not found")
+            
+            job = self.jobs[job_id]
+            
+            if job.session_id != session_id:
+                raise PermissionError(
+                    f"Job '{job_id}' belongs to different session"
+                )
+            
+            if job.state in TERMINAL_STATES:
+                callback(job.to_dict())
+                return
+            
+            self._done_callbacks.setdefault(job_id, []).append(callback)
+    
+    def remove_done_callback(self, job_id: str, callback: Callable[[Dict], None]) -> bool:
+        """
+        Unregister a callback added with ``add_done_callback``.
+        
+        Waiters that give up (e.g. on timeout) call this so their callback
+        does not linger until the job finishes.
+        
+        Args:
+            job_id: Job identifier
+            callback: The callback object that was registered
+        
+        Returns:
+            True if the callback was still pending
+        """
+        with self._lock:
+            callbacks = self._done_callbacks.get(job_id)
+            if not callbacks:
+                return False
+            
+            for index, registered in enumerate(callbacks):
+                if registered == callback:
+                    del callbacks[index]
+                    break
+            else:
+                return False
+            
+            if not callbacks:
+                del self._done_callbacks[job_id]
+            return True
+    
+    def subscribe(
+        self,
+        job_id: str,
+        session_id: str,
+        listener: Callable[[Dict], None]
+    ) -> str:
+        """
+        Stream a job's state transitions, progress and measurement events.
+        
+        ``listener(message)`` first receives the job's current state (and
+        its progress and events so far), then one message per change:
+        
+        - ``{"type": "state", "state": ...}`` on every transition; the
+          terminal one is marked ``"final": true``, also carries
+          ``completed_at``, ``progress`` and ``error`` (if failed) and
+          ends the subscription
+        - ``{"type": "progress", "progress": {...}}`` after each epoch
+          fence and measurement, when the executor reports progress
+        - ``{"type": "events", "events": {...}}`` with newly produced
+          measurement outcomes only
+        
+        Every message also carries ``job_id``. Listeners run with the
+        manager lock held, under the same rules as ``add_done_callback``.
+        Jobs run in worker processes report their events on completion.
+        
+        Args:
+            job_id: Job identifier
+            session_id: Session identifier
+            listener: Receives each message dictionary
+        
+        Returns:
+            Subscription identifier for unsubscribe
+        
+        Raises:
+            KeyError: If job not found
+            PermissionError: If job belongs to different session
+        """
+        with self._lock:
+            if job_id not in self.jobs:
+                raise KeyError(f"Job '{job_id}' not found")
+            
+            job = self.jobs[job_id]
+            
+            if job.session_id != session_id:
+                raise PermissionError(
+                    f"Job '{job_id}' belongs to different session"
+                )
+            
+            subscription_id = f"sub_{secrets.token_hex(8)}"
+            
+            # Snapshot first, so the stream never misses what happened so far
+            terminal = job.state in TERMINAL_STATES
+            snapshot = [] if terminal else [self._state_message(job)]
+            if job.progress.nodes_executed:
+                snapshot.append(self._message(job, "progress", progress=job.progress.to_dict()))
+            if job.events:
+                snapshot.append(self._message(job, "events", events=dict(job.events)))
+            if terminal:
+                snapshot.append(self._state_message(job))
+            for message in snapshot:
+                listener(message)
+            
+            if not terminal:
+                self._subscribers.setdefault(job_id, {})[subscription_id] = listener
+                self._subscriptions[subscription_id] = job_id
+            
+            return subscription_id
+    
+    def unsubscribe(self, subscription_id: str, session_id: str) -> bool:
+        """
+        Stop a job event stream.
+        
+        Args:
+            subscription_id: Identifier returned by subscribe
+            session_id: Session identifier
+        
+        Returns:
+            True if the subscription was still active
+        
+        Raises:
+            PermissionError: If the subscription belongs to different session
+        """
+        with self._lock:
+            job_id = self._subscriptions.get(subscription_id)
+            if job_id is None:
+                return False
+            
+            if self.jobs[job_id].session_id != session_id:
+                raise PermissionError(
+                    f"Subscription '{subscription_id}' belongs to different session"
+                )
+            
+            del self._subscriptions[subscription_id]
+            listeners = self._subscribers.get(job_id)
+            if listeners is not None:
+                listeners.pop(subscription_id, None)
+                if not listeners:
+                    del self._subscribers[job_id]
+            return True
+    
     def cancel_job(self, job_id: str, session_id: str) -> Dict:
         """
         Cancel a job.
@@ -340,14 +733,20 @@ class JobManager:
                 # Already cancelled
                 return job.to_dict()
             
-            # Mark as cancelled
+            # Mark as cancelled (a queued job's heap entry is skipped on pop)
+            self._queued.discard(job_id)
+            was_running = job.state == JobState.RUNNING
             job.state = JobState.CANCELLED
             job.completed_at = time.time()
             job.cancelled_at_epoch = job.progress.current_epoch
             
-            # Notify waiters
-            if job_id in self._job_conditions:
-                self._job_conditions[job_id].notify_all()
+            # Stop a running job's worker process, or keep it from
+            # starting if it is still waiting for one
+            if self.runner is not None and was_running:
+                self.runner.cancel(job_id)
+            
+            # Release quota and notify waiters
+            self._finish_locked(job)
             
             return job.to_dict()
     
@@ -382,9 +781,13 @@ class JobManager:
                     job = self.jobs[job_id]
                     
                     # Cancel running jobs
+                    self._queued.discard(job_id)
+                    if job.state == JobState.RUNNING and self.runner is not None:
+                        self.runner.cancel(job_id)
                     if job.state in [JobState.QUEUED, JobState.VALIDATING, JobState.RUNNING]:
                         job.state = JobState.CANCELLED
                         job.completed_at = time.time()
+                    self._notify_locked(job_id)
                     
                     # Clean up condition variable
                     if job_id in self._job_conditions:
@@ -393,14 +796,272 @@ class JobManager:
                     del self.jobs[job_id]
             
             del self.session_jobs[session_id]
+            
+            for batch_id in [b for b, batch in self.batches.items() if batch.session_id == session_id]:
+                del self.batches[batch_id]
+                self._batch_conditions.pop(batch_id).notify_all()
+    
+    def get_queue_stats(self) -> Dict:
+        """
+        Get scheduler statistics.
+        
+        Returns:
+            Dictionary with queue depth, running jobs and worker counts
+        """
+        with self._lock:
+            return {
+                "queued": len(self._queued),
+                "running": self._running,
+                "workers": len(self._workers),
+                "max_workers": self.num_workers,
+                "max_queue_size": self.max_queue_size,
+                "scheduler_epoch": self._epoch,
+                "jobs_rejected": self.jobs_rejected,
+                "jobs_expired": self.jobs_expired,
+            }
     
-    def _execute_job(self, job_id: str):
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None):
         """
-        Execute a job asynchronously.
+        Stop accepting jobs and stop the worker pool.
+        
+        Workers finish their current job; queued jobs are left QUEUED.
+        
+        Args:
+            wait: Join worker threads before returning
+            timeout: Per-worker join timeout in seconds
+        """
+        with self._lock:
+            self._shutdown = True
+            self._work_available.notify_all()
+            workers = list(self._workers)
+        
+        if wait:
+            for worker in workers:
+                worker.join(timeout)
+    
+    @staticmethod
+    def _parse_policy(policy: Optional[Dict]) -> JobPolicy:
+        """Build a JobPolicy from a submitted policy dictionary."""
+        job_policy = JobPolicy()
+        if policy:
+            if "priority" in policy:
+                job_policy.priority = policy["priority"]
+            if "deadline_epochs" in policy:
+                job_policy.deadline_epochs = policy["deadline_epochs"]
+            if "seed" in policy:
+                job_policy.seed = policy["seed"]
+            if "debug" in policy:
+                job_policy.debug = policy["debug"]
+            if "timeout_ms" in policy:
+                job_policy.timeout_ms = policy["timeout_ms"]
+        return job_policy
+    
+    def _create_job_locked(
+        self,
+        job_id: str,
+        session_id: str,
+        graph: Dict,
+        job_policy: JobPolicy,
+        batch_id: Optional[str] = None
+    ) -> Job:
+        """Create, register and enqueue a job (caller holds the lock)."""
+        job = Job(
+            job_id=job_id,
+            session_id=session_id,
+            graph=graph,
+            policy=job_policy,
+            state=JobState.QUEUED,
+            batch_id=batch_id
+        )
+        
+        # Register job
+        self.jobs[job_id] = job
+        
+        if session_id not in self.session_jobs:
+            self.session_jobs[session_id] = set()
+        self.session_jobs[session_id].add(job_id)
+        
+        # Create condition variable for waiting
+        self._job_conditions[job_id] = threading.Condition(self._lock)
+        
+        # Enqueue for the worker pool
+        if job_policy.deadline_epochs is not None:
+            job.deadline_epoch = self._epoch + job_policy.deadline_epochs
+        self._enqueue(job)
+        
+        return job
+    
+    def _enqueue(self, job: Job):
+        """Push a job onto the ready queue (caller holds the lock)."""
+        deadline = job.deadline_epoch if job.deadline_epoch is not None else float("inf")
+        heapq.heappush(
+            self._queue,
+            (-job.policy.priority, deadline, next(self._sequence), job.job_id)
+        )
+        self._queued.add(job.job_id)
+    
+    def _ensure_workers(self):
+        """Start worker threads up to the pool size (caller holds the lock)."""
+        while len(self._workers) < self.num_workers:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"qmk-job-worker-{len(self._workers)}",
+                daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+    
+    def _next_job(self) -> Optional[Job]:
+        """
+        Block until a runnable job is available and claim it.
+        
+        Returns:
+            The claimed job (already VALIDATING), or None on shutdown
+        """
+        with self._lock:
+            while True:
+                while not self._queue and not self._shutdown:
+                    self._work_available.wait()
+                if self._shutdown:
+                    return None
+                
+                _, _, _, job_id = heapq.heappop(self._queue)
+                if job_id not in self._queued:
+                    # Cancelled or cleaned up while queued
+                    continue
+                self._queued.discard(job_id)
+                job = self.jobs[job_id]
+                
+                if job.deadline_epoch is not None and self._epoch > job.deadline_epoch:
+                    self.jobs_expired += 1
+                    job.state = JobState.FAILED
+                    job.completed_at = time.time()
+                    job.error = {
+                        "message": (
+                            f"Deadline of {job.policy.deadline_epochs} epochs passed "
+                            f"before the job was scheduled"
+                        ),
+                        "type": "DeadlineExceeded"
+                    }
+                    self._finish_locked(job)
+                    continue
+                
+                self._epoch += 1
+                self._running += 1
+                self._set_state_locked(job, JobState.VALIDATING)
+                return job
+    
+    def _worker_loop(self):
+        """Worker thread: drain the queue with a private executor."""
+        if self.runner is not None:
+            executor = None
+        elif self.executor_factory is not None:
+            executor = self.executor_factory()
+        else:
+            executor = self.executor
+        
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._execute_job(job.job_id, executor)
+            finally:
+                with self._lock:
+                    self._running -= 1
+    
+    def _finish_locked(self, job: Job):
+        """Release quota and wake waiters for a finished job (caller holds the lock)."""
+        if self.session_manager:
+            self.session_manager.unregister_job(job.session_id, job.job_id)
+        self._notify_locked(job.job_id)
+    
+    def _notify_locked(self, job_id: str):
+        """Wake waiters and run completion callbacks (caller holds the lock)."""
+        if job_id in self._job_conditions:
+            self._job_conditions[job_id].notify_all()
+        
+        job = self.jobs.get(job_id)
+        if job is not None and job.state in TERMINAL_STATES:
+            batch = self.batches.get(job.batch_id) if job.batch_id else None
+            if batch is not None and batch.record(job_id):
+                self._batch_conditions[batch.batch_id].notify_all()
+            
+            callbacks = self._done_callbacks.pop(job_id, None)
+            if callbacks:
+                status = job.to_dict()
+                for callback in callbacks:
+                    try:
+                        callback(status)
+                    except Exception:
+                        # A broken listener must not take down a worker
+                        pass
+            
+            # Final state message ends every stream
+            self._publish_locked(job, self._state_message(job))
+            for subscription_id in self._subscribers.pop(job_id, {}):
+                self._subscriptions.pop(subscription_id, None)
+    
+    @staticmethod
+    def _message(job: Job, message_type: str, **payload) -> Dict:
+        """Build one job event stream message."""
+        message = {"job_id": job.job_id, "type": message_type}
+        message.update(payload)
+        return message
+    
+    def _state_message(self, job: Job) -> Dict:
+        """State message; terminal states include the final summary."""
+        message = self._message(job, "state", state=job.state.value)
+        if job.state in TERMINAL_STATES:
+            message["final"] = True
+            message["completed_at"] = job.completed_at
+            message["progress"] = job.progress.to_dict()
+            if job.error:
+                message["error"] = job.error
+        return message
+    
+    def _publish_locked(self, job: Job, message: Dict):
+        """Send a message to the job's subscribers (caller holds the lock)."""
+        for listener in list(self._subscribers.get(job.job_id, {}).values()):
+            try:
+                listener(message)
+            except Exception:
+                # A broken listener must not take down a worker
+                pass
+    
+    def _set_state_locked(self, job: Job, state: JobState):
+        """Move a job to a non-terminal state and publish it (caller holds the lock)."""
+        if job.state != state:
+            job.state = state
+            self._publish_locked(job, self._state_message(job))
+    
+    def _record_progress(self, job: Job, progress: Dict[str, int], new_events: Dict[str, Any]):
+        """Executor progress callback: update the job and stream the change."""
+        with self._lock:
+            if job.state != JobState.RUNNING:
+                return
+            job.progress.current_epoch = progress["current_epoch"]
+            job.progress.total_epochs = progress["total_epochs"]
+            job.progress.nodes_executed = progress["nodes_executed"]
+            job.progress.nodes_total = progress["nodes_total"]
+            job.events.update(new_events)
+            
+            if job.job_id in self._subscribers:
+                if new_events:
+                    self._publish_locked(job, self._message(job, "events", events=new_events))
+                self._publish_locked(job, self._message(job, "progress", progress=job.progress.to_dict()))
+    
+    def _execute_job(self, job_id: str, executor=None):
+        """
+        Execute a claimed job on a worker.
         
         Args:
             job_id: Job identifier
+            executor: Executor owned by the calling worker
         """
+        if executor is None:
+            executor = self.executor
+        
         try:
             with self._lock:
                 if job_id not in self.jobs:
@@ -413,7 +1074,7 @@ class JobManager:
                     return
                 
                 # Move to validating state
-                job.state = JobState.VALIDATING
+                self._set_state_locked(job, JobState.VALIDATING)
             
             # Validate graph (outside lock)
             # In production, this would call the validator
@@ -422,27 +1083,56 @@ class JobManager:
                 if job.state == JobState.CANCELLED:
                     return
                 
-                # Move to running state
-                job.state = JobState.RUNNING
+                # Move to running state; from here cancel_job() forwards
+                # to the runner, which must already know the job
                 job.started_at = time.time()
+                if self.runner is not None:
+                    self.runner.reserve(job_id)
+                self._set_state_locked(job, JobState.RUNNING)
             
             # Execute graph
-            if self.executor:
-                result = self.executor.execute(job.graph)
+            if self.runner is not None or executor:
+                if self.runner is not None:
+                    result = self.runner.execute(job.graph, job_id=job_id)
+                elif hasattr(executor, "progress_callback"):
+                    executor.progress_callback = (
+                        lambda progress, new_events: self._record_progress(job, progress, new_events)
+                    )
+                    try:
+                        result = executor.execute(job.graph)
+                    finally:
+                        executor.progress_callback = None
+                else:
+                    result = executor.execute(job.graph)
                 
                 with self._lock:
                     if job.state == JobState.CANCELLED:
                         return
                     
+                    # Stream events the executor did not report while running
+                    events = result.get("events", {})
+                    unreported = {
+                        name: value for name, value in events.items()
+                        if name not in job.events or job.events[name] != value
+                    }
+                    if unreported:
+                        self._publish_locked(job, self._message(job, "events", events=unreported))
+                    
                     # Update job with results
                     job.state = JobState.COMPLETED
                     job.completed_at = time.time()
-                    job.events = result.get("events", {})
+                    job.events = events
                     job.telemetry = result.get("telemetry", {})
                     job.peak_resources = result.get("peak_resources", {})
                     job.execution_context = result.get("execution_context", {})
-                    job.progress.nodes_executed = len(job.graph.get("nodes", []))
-                    job.progress.nodes_total = len(job.graph.get("nodes", []))
+                    if job.progress.nodes_total == 0:
+                        # Nothing was streamed; report the whole graph as done
+                        if "program" in job.graph:
+                            nodes_total = len(job.graph["program"].get("nodes", []))
+                        else:
+                            nodes_total = len(job.graph.get("nodes", []))
+                        job.progress.nodes_executed = nodes_total
+                        job.progress.nodes_total = nodes_total
                     
                     # Clean up quota
                     if self.session_manager:
@@ -460,13 +1150,15 @@ class JobManager:
         except Exception as e:
             # Handle execution errors
             with self._lock:
-                if job_id in self.jobs:
+                if job_id in self.jobs and self.jobs[job_id].state != JobState.CANCELLED:
                     job = self.jobs[job_id]
                     job.state = JobState.FAILED
                     job.completed_at = time.time()
                     job.error = {
                         "message": str(e),
-                        "type": type(e).__name__
+                        # Worker-side exceptions that could not be rebuilt
+                        # keep their original class name
+                        "type": getattr(e, "remote_type", type(e).__name__)
                     }
                     
                     # Clean up quota even on failure
@@ -476,8 +1168,7 @@ class JobManager:
         finally:
             # Notify waiters
             with self._lock:
-                if job_id in self._job_conditions:
-                    self._job_conditions[job_id].notify_all()
+                self._notify_locked(job_id)
     
     def _generate_job_id(self) -> str:
         """Generate a unique job ID."""
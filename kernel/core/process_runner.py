@@ -0,0 +1,430 @@
+"""
+Process-Pool Job Runner for QMK Kernel
+
+Simulation is CPU-bound Python, so worker threads share a single core
+under the GIL. ``ProcessPoolJobRunner`` starts a fixed set of worker
+processes, each holding a warm executor, and runs one job at a time on
+each. Graphs travel as compressed canonical JSON blobs; events and
+telemetry come back over the worker's pipe.
+
+Cancelling a running job terminates the process executing it and starts
+a fresh replacement, so a cancelled simulation stops consuming CPU.
+
+Workers are started with ``forkserver`` (or ``spawn`` where that is not
+available), never ``fork``: replacements are created from the
+multi-threaded server, and a forked child could inherit locks held by
+other threads.
+"""
+
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import zlib
+from typing import Dict, List, Optional, Any, Callable
+
+
+class JobCancelledError(RuntimeError):
+    """Raised when a job is cancelled while running in a worker process."""
+    pass
+
+
+class RemoteExecutionError(RuntimeError):
+    """
+    Stands in for an executor exception that cannot be rebuilt in the parent.
+
+    Attributes:
+        remote_type: Class name of the original exception
+        details: The original exception's ``details`` attribute, if it was
+                 JSON-serializable
+    """
+
+    def __init__(self, remote_type: str, message: str, details: Optional[Any] = None):
+        super().__init__(message)
+        self.remote_type = remote_type
+        self.details = details
+
+
+def encode_graph(graph: Dict[str, Any]) -> bytes:
+    """
+    Serialize a QVM graph into a compact blob.
+
+    Args:
+        graph: QVM graph
+
+    Returns:
+        zlib-compressed compact JSON
+    """
+    payload = json.dumps(graph, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def decode_graph(blob: bytes) -> Dict[str, Any]:
+    """Inverse of ``encode_graph``."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _default_executor_factory():
+    """Create the default executor inside a worker process."""
+    from kernel.executor.enhanced_executor import EnhancedExecutor
+    return EnhancedExecutor()
+
+
+def _pack_error(error: Exception) -> Dict[str, Any]:
+    """
+    Describe an executor exception with plain, always-picklable values.
+
+    The exception itself is included as a pickle blob only if it survives a
+    round trip; classes whose ``__init__`` takes extra arguments do not.
+    """
+    details = getattr(error, "details", None)
+    try:
+        json.dumps(details)
+    except (TypeError, ValueError):
+        details = None
+
+    try:
+        blob = pickle.dumps(error)
+        pickle.loads(blob)
+    except Exception:
+        blob = None
+
+    return {
+        "type": type(error).__name__,
+        "message": str(error),
+        "details": details,
+        "exception": blob,
+    }
+
+
+def _unpack_error(packed: Dict[str, Any]) -> Exception:
+    """Rebuild the exception described by ``_pack_error``."""
+    if packed["exception"] is not None:
+        try:
+            return pickle.loads(packed["exception"])
+        except Exception:
+            pass
+    return RemoteExecutionError(packed["type"], packed["message"], packed["details"])
+
+
+def _worker_main(conn, executor_factory: Callable[[], Any]):
+    """
+    Worker process loop.
+
+    Receives graph blobs and replies with ``("ok", result)`` or
+    ``("error", packed_error)`` (see ``_pack_error``). An empty blob or a
+    closed pipe stops the worker.
+    """
+    executor = executor_factory()
+
+    while True:
+        try:
+            blob = conn.recv_bytes()
+        except (EOFError, OSError):
+            return
+        if not blob:
+            return
+
+        try:
+            result = executor.execute(decode_graph(blob))
+            reply = ("ok", result)
+        except Exception as e:
+            reply = ("error", _pack_error(e))
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result
+            conn.send(("error", _pack_error(e)))
+
+
+class _WorkerProcess:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, index: int, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.jobs_run = 0
+
+
+class ProcessPoolJobRunner:
+    """
+    Runs jobs on a pool of pre-started worker processes.
+
+    ``execute`` blocks the calling thread until a worker is free and the
+    job finishes, so ``JobManager`` drives one dispatch thread per worker
+    process. ``cancel`` may be called from any thread.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None,
+                 executor_factory: Optional[Callable[[], Any]] = None,
+                 start_method: Optional[str] = None):
+        """
+        Initialize runner and start its workers.
+
+        Args:
+            num_workers: Worker processes (default: CPU count)
+            executor_factory: Picklable, importable callable creating one
+                              executor per process (default: EnhancedExecutor)
+            start_method: "forkserver" or "spawn" (default: forkserver
+                          where available)
+
+        Raises:
+            ValueError: If num_workers is not positive or start_method is "fork"
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be positive, got {num_workers}")
+        if start_method is None:
+            start_method = ("forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                            else "spawn")
+        if start_method == "fork":
+            raise ValueError("start_method 'fork' can deadlock workers started from "
+                             "server threads; use 'forkserver' or 'spawn'")
+
+        self.num_workers = num_workers
+        self.executor_factory = executor_factory or _default_executor_factory
+        self._context = multiprocessing.get_context(start_method)
+
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[Optional[_WorkerProcess]]" = queue.Queue()
+        self._workers: List[_WorkerProcess] = []
+        self._active: Dict[str, _WorkerProcess] = {}
+        self._pending: set = set()
+        self._cancelled: set = set()
+        self._shutdown = False
+
+        # Statistics
+        self.jobs_completed = 0
+        self.jobs_cancelled = 0
+        self.workers_restarted = 0
+
+        for index in range(num_workers):
+            worker = self._spawn(index)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+    def execute(self, graph: Dict[str, Any], job_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a graph on the next free worker process.
+
+        Args:
+            graph: QVM graph
+            job_id: Job identifier used for cancellation
+
+        Returns:
+            Executor result (events, telemetry, ...)
+
+        Raises:
+            JobCancelledError: If the job was cancelled while running
+            RuntimeError: If the runner is shut down or the worker died
+            RemoteExecutionError: If the executor raised an exception that
+                                  cannot be rebuilt in this process
+            Exception: Whatever the executor raised in the worker
+        """
+        if job_id is not None:
+            self.reserve(job_id)
+        try:
+            if self._shutdown:
+                raise RuntimeError("Process runner is shut down")
+            blob = encode_graph(graph)
+
+            worker = self._idle.get()
+            if worker is None:
+                # Shutdown sentinel; pass it on to other waiting threads
+                self._idle.put(None)
+                raise RuntimeError("Process runner is shut down")
+        except BaseException:
+            self._forget(job_id)
+            raise
+
+        with self._lock:
+            self._pending.discard(job_id)
+            # A cancel that arrived while this call waited for a worker
+            cancelled = job_id is not None and job_id in self._cancelled
+            if cancelled:
+                self._cancelled.discard(job_id)
+            elif job_id is not None:
+                self._active[job_id] = worker
+        if cancelled:
+            with self._lock:
+                self.jobs_cancelled += 1
+            self._release(worker)
+            raise JobCancelledError(f"Job '{job_id}' cancelled")
+
+        failure = None
+        try:
+            worker.conn.send_bytes(blob)
+            reply = worker.conn.recv()
+        except (EOFError, OSError):
+            reply = None
+        except Exception as e:
+            # The reply could not be unpickled; the worker's state is
+            # unknown, so it is replaced like a dead one
+            reply = None
+            failure = e
+        finally:
+            with self._lock:
+                if job_id is not None:
+                    self._active.pop(job_id, None)
+                cancelled = job_id in self._cancelled
+                self._cancelled.discard(job_id)
+
+        if cancelled:
+            # cancel() terminated the worker, possibly after the reply was
+            # sent; never hand it out again
+            self._release(self._restart(worker))
+            raise JobCancelledError(f"Job '{job_id}' cancelled")
+
+        if reply is None:
+            if failure is not None:
+                worker.process.terminate()
+            exitcode = worker.process.exitcode
+            self._release(self._restart(worker))
+            if failure is not None:
+                raise RuntimeError(
+                    f"Unreadable reply from worker process {worker.index}: "
+                    f"{type(failure).__name__}: {failure}"
+                )
+            raise RuntimeError(
+                f"Worker process {worker.index} exited during job (exit code {exitcode})"
+            )
+
+        worker.jobs_run += 1
+        self._release(worker)
+
+        status, payload = reply
+        if status == "error":
+            raise _unpack_error(payload)
+
+        with self._lock:
+            self.jobs_completed += 1
+        return payload
+
+    def reserve(self, job_id: str):
+        """
+        Announce a job that is about to be passed to ``execute``.
+
+        Cancels are only recorded for jobs the runner knows about; reserving
+        lets a cancel that arrives before ``execute`` is entered still stop
+        the job. ``execute`` reserves its job itself.
+
+        Args:
+            job_id: Job identifier
+        """
+        with self._lock:
+            self._pending.add(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job by terminating its worker process.
+
+        A job that has not reached a worker yet (it was reserved, or
+        ``execute`` is still waiting for a free process) is recorded and
+        never sent: its ``execute`` call raises JobCancelledError once it
+        takes a worker. Unknown and finished jobs are ignored.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if the job was running and has been interrupted
+        """
+        with self._lock:
+            # Terminate while the job still owns the worker; once execute()
+            # has taken it off _active the reply is in and the worker is
+            # about to be reused
+            worker = self._active.get(job_id)
+            if worker is None:
+                if job_id in self._pending:
+                    self._cancelled.add(job_id)
+                return False
+            self._cancelled.add(job_id)
+            self.jobs_cancelled += 1
+            worker.process.terminate()
+        return True
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop all worker processes.
+
+        Idle workers exit cleanly; workers still running a job are terminated.
+
+        Args:
+            timeout: Per-process join timeout in seconds
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            workers = list(self._workers)
+
+        for worker in workers:
+            try:
+                worker.conn.send_bytes(b"")
+            except (OSError, ValueError):
+                pass
+
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(timeout)
+            worker.conn.close()
+
+        self._idle.put(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get runner statistics."""
+        with self._lock:
+            return {
+                "num_workers": self.num_workers,
+                "busy_workers": len(self._active),
+                "worker_pids": [w.process.pid for w in self._workers],
+                "jobs_completed": self.jobs_completed,
+                "jobs_cancelled": self.jobs_cancelled,
+                "workers_restarted": self.workers_restarted,
+            }
+
+    def _spawn(self, index: int) -> _WorkerProcess:
+        """Start one worker process."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.executor_factory),
+            name=f"qmk-job-process-{index}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _WorkerProcess(index, process, parent_conn)
+
+    def _restart(self, worker: _WorkerProcess) -> Optional[_WorkerProcess]:
+        """Replace a dead or terminated worker; None after shutdown."""
+        worker.process.join()
+        worker.conn.close()
+
+        with self._lock:
+            if self._shutdown:
+                return None
+            replacement = self._spawn(worker.index)
+            self._workers[worker.index] = replacement
+            self.workers_restarted += 1
+        return replacement
+
+    def _forget(self, job_id: Optional[str]):
+        """Drop a job that will never reach a worker."""
+        if job_id is None:
+            return
+        with self._lock:
+            self._pending.discard(job_id)
+            self._cancelled.discard(job_id)
+
+    def _release(self, worker: Optional[_WorkerProcess]):
+        """Return a worker to the idle pool."""
+        if worker is not None and not self._shutdown:
+            self._idle.put(worker)
@@ -6,14 +6,22 @@ Integrates all components and starts the RPC server.
 
 from kernel.core.session_manager import SessionManager
 from kernel.core.job_manager import JobManager
+from kernel.core.process_runner import ProcessPoolJobRunner
 from kernel.core.rpc_server import RPCServer
+from kernel.core.async_rpc_server import AsyncRPCServer
 from kernel.simulator.enhanced_resource_manager import EnhancedResourceManager
 from kernel.executor.enhanced_executor import EnhancedExecutor
 from kernel.syscalls import (
     handle_negotiate_caps,
     handle_submit,
+    handle_submit_batch,
     handle_status,
     handle_wait,
+    handle_wait_async,
+    handle_watch,
+    handle_subscribe,
+    handle_unsubscribe,
+    handle_wait_batch,
     handle_cancel,
     handle_open_chan,
     handle_get_telemetry,
@@ -25,25 +33,47 @@ class QMKServer:
     Main QMK server that integrates all components.
     """
     
-    def __init__(self, socket_path: str = "/tmp/qmk.sock"):
+    def __init__(self, socket_path: str = "/tmp/qmk.sock",
+                 num_workers: int = JobManager.DEFAULT_NUM_WORKERS,
+                 max_queue_size: int = JobManager.DEFAULT_MAX_QUEUE_SIZE,
+                 use_processes: bool = False):
         """
         Initialize QMK server.
         
         Args:
             socket_path: Path to Unix domain socket
+            num_workers: Job worker threads (each with its own executor)
+            max_queue_size: Maximum queued jobs before q_submit is rejected
+            use_processes: Run jobs in num_workers pre-started processes
+                           instead of threads, using every core
         """
         # Initialize core components
         self.session_manager = SessionManager()
         self.resource_manager = EnhancedResourceManager()
         self.executor = EnhancedExecutor(self.resource_manager)
-        self.job_manager = JobManager(executor=self.executor, session_manager=self.session_manager)
+        
+        # Start worker processes (forkserver/spawn) before the server runs
+        self.runner = ProcessPoolJobRunner(num_workers) if use_processes else None
+        
+        self.job_manager = JobManager(
+            executor=self.executor,
+            session_manager=self.session_manager,
+            executor_factory=EnhancedExecutor,
+            num_workers=num_workers,
+            max_queue_size=max_queue_size,
+            runner=self.runner
+        )
         
         # Initialize RPC server
-        self.rpc_server = RPCServer(socket_path)
+        self.rpc_server = self._create_rpc_server(socket_path)
         
         # Register syscall handlers
         self._register_handlers()
     
+    def _create_rpc_server(self, socket_path: str) -> RPCServer:
+        """Create the RPC transport (one thread per connection)."""
+        return RPCServer(socket_path)
+    
     def _register_handlers(self):
         """Register all syscall handlers with the RPC server."""
         
@@ -61,6 +91,23 @@ class QMKServer:
             )
         )
         
+        # q_submit_batch
+        self.rpc_server.register_handler(
+            "q_submit_batch",
+            lambda params: handle_submit_batch(
+                params, self.session_manager, self.job_manager
+            )
+        )
+        
+        # q_wait_batch
+        self.rpc_server.register_handler(
+            "q_wait_batch",
+            lambda params: handle_wait_batch(
+                params, self.session_manager, self.job_manager
+            ),
+            blocking=True
+        )
+        
         # q_status
         self.rpc_server.register_handler(
             "q_status",
@@ -74,7 +121,8 @@ class QMKServer:
             "q_wait",
             lambda params: handle_wait(
                 params, self.session_manager, self.job_manager
-            )
+            ),
+            blocking=True
         )
         
         # q_cancel
@@ -111,6 +159,9 @@ class QMKServer:
         """Stop the QMK server."""
         print("Stopping QMK server")
         self.rpc_server.stop()
+        self.job_manager.shutdown(wait=False)
+        if self.runner is not None:
+            self.runner.shutdown()
         print("QMK server stopped")
     
     def run(self):
@@ -126,6 +177,59 @@ class QMKServer:
             self.stop()
 
 
+class AsyncQMKServer(QMKServer):
+    """
+    QMK server on an asyncio event loop.
+    
+    Serves the same syscalls through ``AsyncRPCServer``: synchronous
+    handlers run on its thread pool, while q_wait awaits job completion on
+    the loop and q_watch pushes a ``q_job_done`` notification, so waiting
+    clients do not hold threads. q_subscribe streams a job's state,
+    progress and measurement events as ``q_job_event`` notifications.
+    """
+    
+    def _create_rpc_server(self, socket_path: str) -> AsyncRPCServer:
+        """Create the event-loop RPC transport."""
+        return AsyncRPCServer(socket_path)
+    
+    def _register_handlers(self):
+        """Register syscall handlers, with event-loop q_wait, q_watch and q_subscribe."""
+        super()._register_handlers()
+        
+        # q_wait without parking a thread
+        self.rpc_server.register_async_handler(
+            "q_wait",
+            lambda params, connection: handle_wait_async(
+                params, self.session_manager, self.job_manager
+            )
+        )
+        
+        # q_watch: completion pushed to the calling connection, dropped
+        # when the connection closes
+        self.rpc_server.register_async_handler(
+            "q_watch",
+            lambda params, connection: handle_watch(
+                params, self.session_manager, self.job_manager,
+                connection.notify_threadsafe, connection.add_close_callback
+            )
+        )
+        
+        # q_subscribe: job event stream, dropped when the connection closes
+        self.rpc_server.register_async_handler(
+            "q_subscribe",
+            lambda params, connection: handle_subscribe(
+                params, self.session_manager, self.job_manager,
+                connection.notify_threadsafe, connection.add_close_callback
+            )
+        )
+        
+        # q_unsubscribe
+        self.rpc_server.register_handler(
+            "q_unsubscribe",
+            lambda params: handle_unsubscribe(params, self.session_manager, self.job_manager)
+        )
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -136,10 +240,31 @@ def main():
         default="/tmp/qmk.sock",
         help="Unix domain socket path"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=JobManager.DEFAULT_NUM_WORKERS,
+        help="Number of job workers"
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="Run jobs in worker processes instead of threads"
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Serve connections from an asyncio event loop"
+    )
     
     args = parser.parse_args()
     
-    server = QMKServer(socket_path=args.socket)
+    server_class = AsyncQMKServer if args.asyncio else QMKServer
+    server = server_class(
+        socket_path=args.socket,
+        num_workers=args.workers,
+        use_processes=args.processes
+    )
     server.run()
 
 
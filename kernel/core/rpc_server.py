@@ -2,15 +2,32 @@
 JSON-RPC 2.0 Server for qSyscall ABI
 
 Implements the RPC server over Unix domain sockets.
+
+Two transports share the socket:
+
+- Framed (persistent): the client opens with ``FRAME_MAGIC`` and the server
+  echoes it. Every message is then a 4-byte big-endian length followed by
+  that many bytes of UTF-8 JSON. A connection carries any number of
+  requests; requests are processed concurrently and responses are written
+  as they complete, matched to requests by their JSON-RPC ``id``.
+  Handlers run on a thread pool shared by all connections, except
+  handlers registered as ``blocking`` (e.g. q_wait), which get a thread
+  of their own so they cannot starve other clients of pool threads.
+- Legacy (one-shot): a bare JSON request, one response, then close.
+
+The frame format lives in ``kernel.abi.framing``, shared with the clients.
 """
 
 import json
 import socket
 import threading
 import os
-from typing import Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, Set
 from pathlib import Path
 
+from kernel.abi.framing import FRAME_MAGIC, encode_frame, read_frame, socket_has_pending_data
+
 
 class JSONRPCError:
     """JSON-RPC 2.0 error codes."""
@@ -33,6 +50,26 @@ class JSONRPCError:
     ALREADY_COMPLETED = -32303
 
 
+def legacy_message_complete(data: bytearray, chunk: bytes,
+                            sock: Optional[socket.socket] = None) -> bool:
+    """
+    Check whether an unframed buffer holds a complete JSON message.
+    
+    Parsing is only attempted when the latest chunk ends with a closing
+    brace and no further data is already waiting on ``sock``, so large
+    messages are not re-parsed after every chunk.
+    """
+    if not chunk.rstrip().endswith(b"}"):
+        return False
+    if sock is not None and socket_has_pending_data(sock):
+        return False
+    try:
+        json.loads(data.decode('utf-8'))
+        return True
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return False
+
+
 class RPCServer:
     """
     JSON-RPC 2.0 server over Unix domain sockets.
@@ -41,31 +78,51 @@ class RPCServer:
     - Request parsing and validation
     - Method routing
     - Error response formatting
-    - Connection management
+    - Connection management (framed persistent and legacy one-shot)
     """
     
-    def __init__(self, socket_path: str = "/tmp/qmk.sock"):
+    DEFAULT_MAX_IN_FLIGHT = 64
+    
+    def __init__(self, socket_path: str = "/tmp/qmk.sock",
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 max_workers: Optional[int] = None):
         """
         Initialize RPC server.
         
         Args:
             socket_path: Path to Unix domain socket
+            max_in_flight: Maximum concurrently processed requests per
+                           framed connection; further frames are not read
+                           until one completes
+            max_workers: Thread pool size for non-blocking framed requests,
+                         shared by all connections
         """
         self.socket_path = socket_path
+        self.max_in_flight = max_in_flight
+        self.max_workers = max_workers
         self.handlers: Dict[str, Callable] = {}
+        self.blocking_methods: Set[str] = set()
         self.running = False
         self.server_socket: Optional[socket.socket] = None
         self.server_thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
     
-    def register_handler(self, method: str, handler: Callable):
+    def register_handler(self, method: str, handler: Callable, blocking: bool = False):
         """
         Register a handler for a specific method.
         
         Args:
             method: Method name (e.g., "q_submit")
             handler: Handler function that takes params dict and returns result dict
+            blocking: The handler may wait for a long time (e.g. for a job
+                      to finish); framed requests for it then run on their
+                      own thread instead of the shared pool
         """
         self.handlers[method] = handler
+        if blocking:
+            self.blocking_methods.add(method)
+        else:
+            self.blocking_methods.discard(method)
     
     def start(self):
         """Start the RPC server."""
@@ -82,6 +139,7 @@ class RPCServer:
         self.server_socket.listen(5)
         
         self.running = True
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="qmk-rpc")
         
         # Start server thread
         self.server_thread = threading.Thread(target=self._serve, daemon=True)
@@ -95,7 +153,13 @@ class RPCServer:
         self.running = False
         
         if self.server_socket:
+            # close() alone does not wake a thread blocked in accept()
+            try:
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.server_socket.close()
+        self._pool.shutdown(wait=False)
         
         if os.path.exists(self.socket_path):
             os.unlink(self.socket_path)
@@ -127,20 +191,23 @@ class RPCServer:
             client_socket: Client socket
         """
         try:
-            # Read request
-            data = b""
-            while True:
-                chunk = client_socket.recv(4096)
-                if not chunk:
-                    break
-                data += chunk
-                
-                # Check if we have a complete JSON message
-                try:
-                    json.loads(data.decode('utf-8'))
-                    break
-                except json.JSONDecodeError:
-                    continue
+            prefix = self._read_prefix(client_socket)
+            if prefix == FRAME_MAGIC:
+                self._handle_framed(client_socket)
+                return
+            
+            # Legacy one-shot request
+            data = bytearray(prefix)
+            if not legacy_message_complete(data, prefix):
+                while True:
+                    chunk = client_socket.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+                    
+                    # Check if we have a complete JSON message
+                    if legacy_message_complete(data, chunk, client_socket):
+                        break
             
             if not data:
                 return
@@ -157,11 +224,101 @@ class RPCServer:
                 JSONRPCError.INTERNAL_ERROR,
                 f"Internal error: {str(e)}"
             )
-            client_socket.sendall(error_response.encode('utf-8'))
+            try:
+                client_socket.sendall(error_response.encode('utf-8'))
+            except OSError:
+                pass
         
         finally:
             client_socket.close()
     
+    def _read_prefix(self, client_socket: socket.socket) -> bytes:
+        """
+        Read enough bytes to tell a framed connection from a legacy one.
+        
+        Stops as soon as the data can no longer be ``FRAME_MAGIC``.
+        """
+        prefix = b""
+        while len(prefix) < len(FRAME_MAGIC) and FRAME_MAGIC.startswith(prefix):
+            chunk = client_socket.recv(len(FRAME_MAGIC) - len(prefix))
+            if not chunk:
+                break
+            prefix += chunk
+        return prefix
+    
+    def _handle_framed(self, client_socket: socket.socket):
+        """
+        Serve a persistent framed connection.
+        
+        Requests run on the server's bounded thread pool, and blocking
+        methods on threads of their own, so a call such as q_wait holds up
+        neither later requests on this connection nor other clients;
+        responses are written as they complete.
+        
+        Args:
+            client_socket: Client socket (magic already consumed)
+        """
+        client_socket.sendall(FRAME_MAGIC)
+        reader = client_socket.makefile("rb")
+        send_lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        
+        try:
+            while self.running:
+                try:
+                    payload = read_frame(reader)
+                except ValueError as e:
+                    response = self._format_error(None, JSONRPCError.INVALID_REQUEST, str(e))
+                    with send_lock:
+                        client_socket.sendall(encode_frame(response))
+                    break
+                
+                if payload is None:
+                    break
+                
+                try:
+                    request = self._parse_request(payload.decode('utf-8'))
+                except UnicodeDecodeError:
+                    request = (None, None, None,
+                               self._format_error(None, JSONRPCError.PARSE_ERROR, "Parse error"))
+                
+                in_flight.acquire()
+                args = (client_socket, send_lock, in_flight, request)
+                if request[0] in self.blocking_methods:
+                    threading.Thread(target=self._dispatch_frame, args=args, daemon=True).start()
+                    continue
+                try:
+                    self._pool.submit(self._dispatch_frame, *args)
+                except RuntimeError:
+                    # Pool shut down by stop()
+                    in_flight.release()
+                    break
+        finally:
+            # Let outstanding requests answer before the socket is closed
+            for _ in range(self.max_in_flight):
+                in_flight.acquire()
+            reader.close()
+    
+    def _dispatch_frame(
+        self,
+        client_socket: socket.socket,
+        send_lock: threading.Lock,
+        in_flight: threading.BoundedSemaphore,
+        request: tuple
+    ):
+        """Process one parsed framed request and write its response frame."""
+        try:
+            method, params, request_id, error = request
+            response = error if error is not None else self._invoke(method, params, request_id)
+            
+            with send_lock:
+                client_socket.sendall(encode_frame(response))
+        except OSError:
+            # Client went away
+            pass
+        finally:
+            in_flight.release()
+    
     def _process_request(self, request_data: str) -> str:
         """
         Process a JSON-RPC request.
@@ -172,71 +329,103 @@ class RPCServer:
         Returns:
             JSON-RPC response string
         """
+        method, params, request_id, error = self._parse_request(request_data)
+        if error is not None:
+            return error
+        return self._invoke(method, params, request_id)
+    
+    def _invoke(self, method: str, params: Dict, request_id: Any) -> str:
+        """
+        Call the handler of a validated request.
+        
+        Args:
+            method: Method name
+            params: Parameters
+            request_id: Request ID
+        
+        Returns:
+            JSON-RPC response string
+        """
+        # Check if method exists
+        if method not in self.handlers:
+            return self._format_error(
+                request_id,
+                JSONRPCError.METHOD_NOT_FOUND,
+                f"Method '{method}' not found"
+            )
+        
+        # Call handler
+        try:
+            handler = self.handlers[method]
+            result = handler(params)
+            
+            return self._format_success(request_id, result)
+        
+        except Exception as e:
+            return self._format_exception(request_id, e)
+    
+    def _parse_request(self, request_data: str) -> tuple:
+        """
+        Parse and validate a JSON-RPC request.
+        
+        Args:
+            request_data: JSON-RPC request string
+        
+        Returns:
+            Tuple of (method, params, request_id, error_response); the
+            error response is None for a valid request
+        """
         try:
             request = json.loads(request_data)
         except json.JSONDecodeError:
-            return self._format_error(None, JSONRPCError.PARSE_ERROR, "Parse error")
+            return None, None, None, self._format_error(
+                None, JSONRPCError.PARSE_ERROR, "Parse error"
+            )
         
         # Validate request
         if not isinstance(request, dict):
-            return self._format_error(None, JSONRPCError.INVALID_REQUEST, "Invalid request")
+            return None, None, None, self._format_error(
+                None, JSONRPCError.INVALID_REQUEST, "Invalid request"
+            )
         
         if "jsonrpc" not in request or request["jsonrpc"] != "2.0":
-            return self._format_error(
+            return None, None, None, self._format_error(
                 request.get("id"),
                 JSONRPCError.INVALID_REQUEST,
                 "Invalid JSON-RPC version"
             )
         
         if "method" not in request:
-            return self._format_error(
+            return None, None, None, self._format_error(
                 request.get("id"),
                 JSONRPCError.INVALID_REQUEST,
                 "Missing method"
             )
         
-        method = request["method"]
-        params = request.get("params", {})
-        request_id = request.get("id")
-        
-        # Check if method exists
-        if method not in self.handlers:
-            return self._format_error(
-                request_id,
-                JSONRPCError.METHOD_NOT_FOUND,
-                f"Method '{method}' not found"
-            )
+        return request["method"], request.get("params", {}), request.get("id"), None
+    
+    def _format_exception(self, request_id: Any, error: Exception) -> str:
+        """
+        Map a handler exception to a JSON-RPC error response.
         
-        # Call handler
-        try:
-            handler = self.handlers[method]
-            result = handler(params)
-            
-            return self._format_success(request_id, result)
+        Args:
+            request_id: Request ID
+            error: Exception raised by the handler
         
-        except ValueError as e:
-            return self._format_error(
-                request_id,
-                JSONRPCError.INVALID_PARAMS,
-                str(e)
-            )
+        Returns:
+            JSON-RPC error response string
+        """
+        if isinstance(error, ValueError):
+            return self._format_error(request_id, JSONRPCError.INVALID_PARAMS, str(error))
         
-        except KeyError as e:
-            return self._format_error(
-                request_id,
-                JSONRPCError.JOB_NOT_FOUND,
-                str(e)
-            )
+        if isinstance(error, KeyError):
+            return self._format_error(request_id, JSONRPCError.JOB_NOT_FOUND, str(error))
         
-        except PermissionError as e:
-            return self._format_error(
-                request_id,
-                JSONRPCError.ACCESS_DENIED,
-                str(e)
-            )
+        if isinstance(error, PermissionError):
+            return self._format_error(request_id, JSONRPCError.ACCESS_DENIED, str(error))
         
-        except RuntimeError as e:
-            error_msg = str(e).lower()
+        if isinstance(error, RuntimeError):
+            error_msg = str(error).lower()
             
             if "quota" in error_msg:
                 code = JSONRPCError.QUOTA_EXCEEDED
@@ -247,21 +436,16 @@ class RPCServer:
             else:
                 code = JSONRPCError.INTERNAL_ERROR
             
-            return self._format_error(request_id, code, str(e))
+            return self._format_error(request_id, code, str(error))
         
-        except TimeoutError as e:
-            return self._format_error(
-                request_id,
-                JSONRPCError.TIMEOUT,
-                str(e)
-            )
+        if isinstance(error, TimeoutError):
+            return self._format_error(request_id, JSONRPCError.TIMEOUT, str(error))
         
-        except Exception as e:
-            return self._format_error(
-                request_id,
-                JSONRPCError.INTERNAL_ERROR,
-                f"Internal error: {str(e)}"
-            )
+        return self._format_error(
+            request_id,
+            JSONRPCError.INTERNAL_ERROR,
+            f"Internal error: {str(error)}"
+        )
     
     def _format_success(self, request_id: Any, result: Dict) -> str:
         """
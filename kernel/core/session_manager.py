@@ -46,9 +46,9 @@ class Session:
         """Check if session can allocate more qubits."""
         return len(self.allocated_qubits) + count <= self.quota.max_logical_qubits
     
-    def can_create_job(self) -> bool:
+    def can_create_job(self, count: int = 1) -> bool:
         """Check if session can create more jobs."""
-        return len(self.active_jobs) < self.quota.max_jobs
+        return len(self.active_jobs) + count <= self.quota.max_jobs
     
     def can_open_channel(self) -> bool:
         """Check if session can open more channels."""
@@ -247,6 +247,30 @@ class SessionManager:
         
         session.active_jobs.add(job_id)
     
+    def register_jobs(self, session_id: str, job_ids: List[str]):
+        """
+        Register a batch of jobs with a single quota check.
+        
+        Either all jobs are registered or none.
+        
+        Args:
+            session_id: Session identifier
+            job_ids: Job identifiers
+        
+        Raises:
+            KeyError: If session not found
+            RuntimeError: If quota exceeded
+        """
+        session = self.get_session(session_id)
+        
+        if not session.can_create_job(len(job_ids)):
+            raise RuntimeError(
+                f"Job quota exceeded: {len(session.active_jobs)} active + "
+                f"{len(job_ids)} requested > {session.quota.max_jobs}"
+            )
+        
+        session.active_jobs.update(job_ids)
+    
     def unregister_job(self, session_id: str, job_id: str):
         """
         Unregister a job from a session.
@@ -13,6 +13,8 @@ from enum import Enum
 class BackendType(Enum):
     """Supported backend types."""
     LOGICAL_QUBIT = "logical_qubit"  # Simplified simulator (default)
+    STATEVECTOR = "statevector"       # Native NumPy statevector simulator
+    STABILIZER = "stabilizer"         # Bit-packed stabilizer tableau for Clifford-only graphs
     QISKIT_AER = "qiskit_aer"        # Qiskit Aer simulator
     CIRQ = "cirq"                     # Google Cirq simulator
     AZURE_QUANTUM = "azure_quantum"   # Microsoft Azure Quantum
@@ -4,14 +4,37 @@ Enhanced QVM Graph Executor with Logical Qubit Simulation
 Executes QVM graphs using the logical qubit simulator with full error modeling.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 import json
+import time
+
+import numpy as np
 
 from kernel.simulator.enhanced_resource_manager import EnhancedResourceManager
+from kernel.simulator.batched_engine import (
+    BatchedShotEngine,
+    DEFAULT_MAX_AMPLITUDES,
+    EVENT_NOT_PRODUCED,
+    collect_events,
+    normalize_node
+)
+from kernel.simulator.stabilizer import is_clifford_graph
+from kernel.executor.stabilizer_backend import StabilizerBackend
+from kernel.executor.statevector_backend import StatevectorBackend
+from kernel.executor.graph_template import template_structure
+from kernel.executor.execution_plan import (
+    ExecutionPlan,
+    ExecutionPlanCache,
+    PlanStep,
+    compile_plan,
+    plan_cache_key,
+    OP_ALLOC,
+    OP_FENCE,
+    OP_GATE
+)
 from kernel.simulator.qec_profiles import parse_profile_string
 from kernel.simulator.logical_qubit import TwoQubitGate
 from kernel.simulator.capabilities import DEFAULT_CAPS, has_caps
-from kernel.simulator.scheduler import topo_schedule
 from kernel.security.entanglement_firewall import (
     EntanglementGraph,
     EntanglementFirewallViolation
@@ -43,6 +66,32 @@ CAP_REQUIRED = {
 IRREVERSIBLE = {"MEASURE_Z", "MEASURE_X", "RESET", "CLOSE_CHAN"}
 
 
+def _histogram(values: np.ndarray) -> Dict[int, int]:
+    """Count occurrences of each outcome in a per-shot event array."""
+    outcomes, counts = np.unique(values, return_counts=True)
+    return {int(o): int(c) for o, c in zip(outcomes, counts)}
+
+
+def _joint_counts(events: Dict[str, np.ndarray], event_order: List[str],
+                  shots: int) -> Dict[str, int]:
+    """
+    Count joint outcomes across events.
+
+    Keys concatenate event values in ``event_order``; shots that skipped
+    an event show 'x' in its position.
+    """
+    if not event_order:
+        return {"": shots}
+
+    table = np.stack([events[ev] for ev in event_order], axis=1)
+    rows, counts = np.unique(table, axis=0, return_counts=True)
+
+    return {
+        "".join("x" if v == EVENT_NOT_PRODUCED else str(int(v)) for v in row): int(c)
+        for row, c in zip(rows, counts)
+    }
+
+
 class EnhancedExecutor:
     """
     Enhanced QVM graph executor with logical qubit simulation.
@@ -64,7 +113,8 @@ class EnhancedExecutor:
                  capability_token: Optional[CapabilityToken] = None,
                  require_certification: bool = True,
                  strict_verification: bool = True,
-                 backend: Optional[Any] = None):
+                 backend: Optional[Any] = None,
+                 plan_cache_size: int = 128):
         """
         Initialize executor.
         
@@ -78,10 +128,15 @@ class EnhancedExecutor:
             capability_token: Optional capability token for this execution
             require_certification: If True, graphs must be certified before execution (RECOMMENDED)
             strict_verification: If True, warnings are treated as errors in verification
-            backend: Optional quantum backend (QiskitAerBackend, CirqBackend, etc.)
+            backend: Optional quantum backend (StatevectorBackend, QiskitAerBackend, etc.)
                     If None, uses simplified logical qubit simulator (default, has limitations)
+                    If "auto", each graph runs on StabilizerBackend when it is
+                    Clifford-only and on StatevectorBackend otherwise
+            plan_cache_size: Number of compiled execution plans kept in the
+                    LRU cache (0 disables caching)
         """
         self.backend = backend
+        self._auto_backends: Dict[str, Any] = {}
         self.resource_manager = EnhancedResourceManager(
             max_physical_qubits=max_physical_qubits,
             seed=seed
@@ -120,6 +175,31 @@ class EnhancedExecutor:
         self.max_physical_qubits = max_physical_qubits
         self.seed = seed
         self.strict_verification = strict_verification
+        
+        # Compiled plans of previously verified graphs
+        self.plan_cache = ExecutionPlanCache(plan_cache_size)
+        
+        # Optional progress listener, called on the executing thread as
+        # progress_callback(progress, new_events) after each epoch fence,
+        # each step producing measurement events and the final step
+        self.progress_callback: Optional[Callable[[Dict[str, int], Dict[str, Any]], None]] = None
+        
+        # Handlers indexed by plan opcode (OP_GATE is dispatched separately)
+        self._handlers = [
+            self._exec_alloc,
+            self._exec_free,
+            self._exec_fence,
+            self._exec_barrier,
+            self._exec_gate,
+            self._exec_measurement,
+            self._exec_reset,
+            self._exec_cond_pauli,
+            self._exec_open_chan,
+            self._exec_close_chan,
+            self._exec_teleport_cnot,
+            self._exec_inject_t,
+            self._exec_set_policy,
+        ]
     
     def get_execution_context(self) -> Dict[str, Any]:
         """
@@ -171,11 +251,11 @@ class EnhancedExecutor:
         """
         # If backend is provided, use it for execution
         if self.backend is not None:
-            # Verify graph first
-            self._load_graph(qvm_graph)
+            # Verify graph first (skipped for cached plans)
+            self._load_plan(qvm_graph)
             
             # Execute on backend
-            result = self.backend.execute_graph(qvm_graph)
+            result = self._select_backend(qvm_graph).execute_graph(qvm_graph)
             
             # Add status if not present
             if "status" not in result:
@@ -189,29 +269,27 @@ class EnhancedExecutor:
         
         try:
             # === PHASE 1: LOAD ===
-            # Verify and prepare execution context
-            self._load_graph(qvm_graph)
-            
-            # Parse graph
-            if isinstance(qvm_graph, str):
-                graph = json.loads(qvm_graph)
-            else:
-                graph = qvm_graph
-            
-            nodes = graph["program"]["nodes"]
-            global_caps = graph.get("caps", [])
-            
-            # Topological sort for execution order
-            execution_order = topo_schedule(nodes)
+            # Verify, schedule and compile (or reuse the cached plan)
+            plan = self._load_plan(qvm_graph)
             
             # === PHASE 2: EXECUTE ===
-            # Execute nodes in order
-            for node in execution_order:
-                self._execute_node(node, global_caps)
+            # Execute plan steps in order
+            callback = self.progress_callback
+            progress = {
+                "current_epoch": 0,
+                "total_epochs": plan.num_epochs,
+                "nodes_executed": 0,
+                "nodes_total": len(plan.steps),
+            }
+            for step in plan.steps:
+                self._execute_step(step)
                 
                 # Track allocations for cleanup
-                if node.get("op") == "ALLOC_LQ":
-                    allocated_qubits.extend(node.get("vqs", []))
+                if step.opcode == OP_ALLOC:
+                    allocated_qubits.extend(step.node.get("vqs", []))
+                
+                if callback is not None:
+                    self._report_progress(callback, progress, step)
             
             # === PHASE 3: UNLOAD (Success) ===
             # Capture telemetry BEFORE cleanup to show peak resource usage
@@ -244,19 +322,336 @@ class EnhancedExecutor:
         finally:
             # ALWAYS clean up resources, success or failure
             self._unload_graph(allocated_qubits)
-    
-    def _load_graph(self, qvm_graph: Dict[str, Any]):
+
+    def execute_shots(self, qvm_graph: Dict[str, Any], shots: int = 1024,
+                      max_amplitudes: int = DEFAULT_MAX_AMPLITUDES) -> Dict[str, Any]:
+        """
+        Execute a QVM graph for many shots in a single batched run.
+
+        Verification, scheduling, capability checks and resource accounting
+        run exactly once. All shots are then simulated together by the
+        NumPy-backed BatchedShotEngine, with guards and COND_PAULI evaluated
+        per shot. Clifford-only graphs (no T, rotations or MEASURE_ANGLE)
+        run on the bit-packed stabilizer tableau, everything else on the
+        statevector. Measurement outcomes are flipped with each qubit's QEC
+        profile logical error rate.
+
+        Args:
+            qvm_graph: QVM graph in JSON format
+            shots: Number of shots to run
+            max_amplitudes: Amplitude budget per simulation chunk
+
+        Returns:
+            Execution result with:
+            - events: Dict[str, np.ndarray] - per-shot outcomes (int8,
+              EVENT_NOT_PRODUCED where a shot skipped the measurement)
+            - histograms: Dict[str, Dict[int, int]] - per-event outcome counts
+            - counts: Dict[str, int] - joint outcome counts over event_order
+            - event_order: List[str] - event ordering used for counts keys
+
+        Raises:
+            VerificationError: If graph fails static verification
+        """
+        if shots < 1:
+            raise ValueError(f"shots must be positive, got {shots}")
+
+        allocated_qubits = []
+        start_time = time.time()
+
+        try:
+            # === PHASE 1: LOAD (once for all shots) ===
+            plan = self._load_plan(qvm_graph)
+            execution_order = plan.execution_order
+            global_caps = plan.global_caps
+
+            # Capabilities, resources and security checks are shot-independent
+            readout_error, peak_usage = self._prepare_shots(
+                execution_order, global_caps, allocated_qubits
+            )
+
+            # === PHASE 2: EXECUTE (batched) ===
+            if self.backend is not None and self.backend != "auto":
+                method = "backend"
+                graph = json.loads(qvm_graph) if isinstance(qvm_graph, str) else qvm_graph
+                events = self._run_backend_shots(graph, shots)
+            else:
+                method = "stabilizer" if is_clifford_graph(execution_order) else "statevector"
+                engine = BatchedShotEngine(
+                    shots,
+                    seed=self.seed,
+                    max_amplitudes=max_amplitudes,
+                    readout_error=readout_error,
+                    method=method
+                )
+                events = engine.run(execution_order)
+
+            event_order = list(events)
+            elapsed = time.time() - start_time
+
+            self.execution_log.append(("EXECUTE_SHOTS", shots))
+
+            return {
+                "status": "COMPLETED",
+                "shots": shots,
+                "events": events,
+                "event_order": event_order,
+                "histograms": {ev: _histogram(values) for ev, values in events.items()},
+                "counts": _joint_counts(events, event_order, shots),
+                "telemetry": {
+                    "shots": shots,
+                    "execution_time_s": elapsed,
+                    "shots_per_second": shots / elapsed if elapsed > 0 else float("inf"),
+                    "nodes_scheduled": len(execution_order),
+                    "simulation_method": method,
+                    "resource_usage": peak_usage,
+                },
+                "peak_resources": {
+                    "logical_qubits": peak_usage["logical_qubits_allocated"],
+                    "physical_qubits": peak_usage["physical_qubits_used"],
+                    "channels": peak_usage["channels_open"]
+                },
+                "execution_context": self.get_execution_context(),
+                "execution_log": self.execution_log,
+            }
+
+        except Exception as e:
+            self.execution_log.append(("ERROR", str(e)))
+            raise
+
+        finally:
+            self._unload_graph(allocated_qubits)
+
+    def _prepare_shots(self, execution_order: List[Dict[str, Any]],
+                       global_caps: List[str],
+                       allocated_qubits: List[str]):
+        """
+        Run the shot-independent part of a graph once.
+
+        Checks capabilities, allocates resources (so budget violations are
+        reported exactly as in execute()), and registers qubits with the
+        entanglement firewall and linear type system.
+
+        Args:
+            execution_order: Scheduled nodes
+            global_caps: Graph-level capabilities
+            allocated_qubits: Output list of qubits allocated for cleanup
+
+        Returns:
+            Tuple of (per-qubit logical readout error probability,
+            resource usage snapshot at peak physical qubit usage)
+        """
+        readout_error = {}
+        peak_usage = self.resource_manager.get_resource_usage()
+
+        for node in execution_order:
+            self._check_capabilities(node, global_caps)
+            op = node["op"]
+            vq_ids = node.get("vqs", [])
+
+            if op == "ALLOC_LQ":
+                self._exec_alloc(node)
+                allocated_qubits.extend(vq_ids)
+                for vq_id in vq_ids:
+                    qubit = self.resource_manager.get_logical_qubit(vq_id)
+                    readout_error[vq_id] = qubit.get_logical_error_probability()
+                usage = self.resource_manager.get_resource_usage()
+                if usage["physical_qubits_used"] > peak_usage["physical_qubits_used"]:
+                    peak_usage = usage
+            elif op == "FREE_LQ":
+                self._exec_free(node)
+            elif op == "OPEN_CHAN":
+                self._exec_open_chan(node)
+            elif op == "CLOSE_CHAN":
+                self._exec_close_chan(node)
+            elif op.startswith("APPLY_") and len(vq_ids) == 2:
+                if self.entanglement_firewall is not None:
+                    channel = node.get("args", {}).get("channel")
+                    try:
+                        self.entanglement_firewall.add_entanglement(
+                            vq_ids[0], vq_ids[1], op.replace("APPLY_", ""), channel
+                        )
+                    except EntanglementFirewallViolation as e:
+                        self.execution_log.append(("FIREWALL_VIOLATION", node["id"], str(e)))
+                        raise
+            elif op.startswith("MEASURE_") and self.linear_type_system is not None:
+                for vq_id in vq_ids:
+                    if vq_id in self.qubit_handles:
+                        try:
+                            self.linear_type_system.consume_handle(self.qubit_handles[vq_id], op)
+                        except LinearityViolation as e:
+                            self.execution_log.append(("LINEARITY_VIOLATION", node["id"], str(e)))
+                            raise
+                        del self.qubit_handles[vq_id]
+
+        return readout_error, peak_usage
+
+    def _select_backend(self, qvm_graph: Dict[str, Any]):
+        """Resolve the backend for a graph, choosing one per graph in auto mode."""
+        if self.backend != "auto":
+            return self.backend
+
+        if isinstance(qvm_graph, str):
+            qvm_graph = json.loads(qvm_graph)
+        if 'program' in qvm_graph:
+            nodes = qvm_graph['program'].get('nodes', [])
+        else:
+            nodes = qvm_graph.get('nodes', [])
+
+        kind = "stabilizer" if is_clifford_graph([normalize_node(n) for n in nodes]) else "statevector"
+        if kind not in self._auto_backends:
+            backend_class = StabilizerBackend if kind == "stabilizer" else StatevectorBackend
+            self._auto_backends[kind] = backend_class(seed=self.seed)
+        return self._auto_backends[kind]
+
+    def _run_backend_shots(self, graph: Dict[str, Any], shots: int) -> Dict[str, np.ndarray]:
+        """Collect per-shot events from a backend, batched when supported."""
+        if hasattr(self.backend, "run_shots"):
+            return self.backend.run_shots(graph, shots)
+
+        event_ids = collect_events(graph["program"]["nodes"])
+        events = {
+            ev: np.full(shots, EVENT_NOT_PRODUCED, dtype=np.int8)
+            for ev in event_ids
+        }
+
+        for shot in range(shots):
+            shot_events = self.backend.execute_graph(graph).get("events", {})
+            for ev, value in shot_events.items():
+                if ev not in events:
+                    events[ev] = np.full(shots, EVENT_NOT_PRODUCED, dtype=np.int8)
+                events[ev][shot] = value
+
+        return events
+
+    def _capability_fingerprint(self) -> tuple:
+        """
+        Fingerprint of everything verification and capability checks depend on.
+
+        Plans compiled under one fingerprint are never reused under another.
+        """
+        token = self.capability_token
+        token_key = None
+        if token is not None:
+            token_key = (
+                token.token_id,
+                token.tenant_id,
+                token.signature,
+                tuple(sorted(cap.value for cap in token.capabilities)),
+            )
+        return (
+            token_key,
+            self.capability_system is not None,
+            tuple(sorted(c for c, v in self.caps.items() if v)),
+            self.require_certification,
+            self.strict_verification,
+        )
+
+    def _load_plan(self, qvm_graph: Dict[str, Any]) -> ExecutionPlan:
+        """
+        LOAD phase with plan caching.
+
+        A cache hit skips static verification, scheduling and compilation;
+        a miss runs the full LOAD phase and caches the compiled plan. A
+        bound template whose structure was already certified skips
+        verification but is still compiled.
+
+        Args:
+            qvm_graph: QVM graph to load
+
+        Returns:
+            Compiled execution plan
+
+        Raises:
+            VerificationError: If graph fails verification
+        """
+        graph = json.loads(qvm_graph) if isinstance(qvm_graph, str) else qvm_graph
+        fingerprint = self._capability_fingerprint()
+        key = plan_cache_key(graph, fingerprint)
+
+        plan = self.plan_cache.get(key)
+        verify = plan is None
+
+        structure_key = None
+        if verify and self.require_certification:
+            structure = template_structure(graph)
+            if structure is not None:
+                structure_key = plan_cache_key(structure, fingerprint)
+                if self.plan_cache.is_certified(structure_key):
+                    verify = False
+                    self.execution_log.append(("TEMPLATE_CERTIFIED", structure_key[:16]))
+
+        self._load_graph(qvm_graph, verify=verify)
+        if verify and structure_key is not None:
+            self.plan_cache.mark_certified(structure_key)
+
+        if plan is None:
+            plan = self._compile_plan(graph, key)
+            self.plan_cache.put(plan)
+        else:
+            self.execution_log.append(("PLAN_CACHE_HIT", key[:16]))
+
+        return plan
+
+    def _compile_plan(self, graph: Dict[str, Any], key: str) -> ExecutionPlan:
+        """Compile a graph and pre-evaluate its static capability checks."""
+        plan = compile_plan(graph, key)
+
+        # Token checks stay live (tokens can expire or be revoked); the
+        # declaration-based fallback only depends on the fingerprint
+        if not (self.capability_system and self.capability_token):
+            enabled = {c for c, v in self.caps.items() if v}
+            for step in plan.steps:
+                step.cap_error = self._missing_caps_error(step.op, step.declared_caps | enabled)
+
+        return plan
+
+    def _report_progress(self, callback: Callable, progress: Dict[str, int], step: PlanStep):
+        """Advance progress past a step and report epoch ends and new events."""
+        progress["nodes_executed"] += 1
+        new_events = {
+            event_id: self.events[event_id]
+            for event_id in step.node.get("produces", [])
+            if event_id in self.events
+        }
+        if progress["nodes_executed"] == progress["nodes_total"]:
+            # The last step closes the last epoch
+            progress["current_epoch"] = progress["total_epochs"]
+        elif step.opcode == OP_FENCE:
+            progress["current_epoch"] += 1
+        elif not new_events:
+            return
+        callback(dict(progress), new_events)
+
+    def _execute_step(self, step: PlanStep):
+        """Execute one compiled plan step."""
+        if step.cap_error:
+            raise RuntimeError(step.cap_error)
+        if self.capability_system and self.capability_token:
+            self._check_token_capabilities(step.op)
+
+        if step.guard is not None and not step.guard(self.events):
+            self.execution_log.append(("SKIP", step.node_id, step.op, "guard_failed"))
+            return
+
+        if step.opcode == OP_GATE:
+            self._exec_gate(step.node, step.gate)
+        else:
+            self._handlers[step.opcode](step.node)
+
+    def _load_graph(self, qvm_graph: Dict[str, Any], verify: bool = True):
         """
         LOAD phase: Verify graph and prepare execution context.
         
         Args:
             qvm_graph: QVM graph to load
+            verify: Run static verification (False only for graphs whose
+                    compiled plan was already certified)
         
         Raises:
             VerificationError: If graph fails verification
         """
         # GATE KEEPER: Static verification BEFORE execution
-        if self.require_certification:
+        if self.require_certification and verify:
             # Get available capabilities
             available_caps = None
             if self.capability_token:
@@ -331,49 +726,6 @@ class EnhancedExecutor:
         
         self.execution_log.append(("UNLOAD", "resources_released"))
     
-    def _execute_node(self, node: Dict[str, Any], global_caps: List[str]):
-        """Execute a single node in the graph."""
-        node_id = node["id"]
-        op = node["op"]
-        
-        # Check capabilities
-        self._check_capabilities(node, global_caps)
-        
-        # Check guard condition
-        if not self._check_guard(node):
-            self.execution_log.append(("SKIP", node_id, op, "guard_failed"))
-            return
-        
-        # Execute operation
-        if op == "ALLOC_LQ":
-            self._exec_alloc(node)
-        elif op == "FREE_LQ":
-            self._exec_free(node)
-        elif op == "FENCE_EPOCH":
-            self._exec_fence(node)
-        elif op == "BAR_REGION":
-            self._exec_barrier(node)
-        elif op.startswith("APPLY_"):
-            self._exec_gate(node)
-        elif op.startswith("MEASURE_"):
-            self._exec_measurement(node)
-        elif op == "RESET":
-            self._exec_reset(node)
-        elif op == "COND_PAULI":
-            self._exec_cond_pauli(node)
-        elif op == "OPEN_CHAN":
-            self._exec_open_chan(node)
-        elif op == "CLOSE_CHAN":
-            self._exec_close_chan(node)
-        elif op == "TELEPORT_CNOT":
-            self._exec_teleport_cnot(node)
-        elif op == "INJECT_T_STATE":
-            self._exec_inject_t(node)
-        elif op == "SET_POLICY":
-            self._exec_set_policy(node)
-        else:
-            raise RuntimeError(f"Unknown operation: {op}")
-    
     def _check_capabilities(self, node: Dict[str, Any], global_caps: List[str]):
         """Check if required capabilities are available."""
         op = node["op"]
@@ -384,67 +736,38 @@ class EnhancedExecutor:
         
         # If capability system is enabled, use cryptographic tokens
         if self.capability_system and self.capability_token:
-            for cap in required:
-                if not self.capability_system.check_capability(
-                    self.capability_token, cap, use_token=False
-                ):
-                    raise RuntimeError(
-                        f"Capability {cap.value} required for {op} but not granted"
-                    )
+            self._check_token_capabilities(op)
         else:
             # Fallback to old system (deprecated)
             node_caps = set(node.get("caps", []))
             available = node_caps | set(global_caps) | {c for c, v in self.caps.items() if v}
             
-            # Convert required CapabilityType to strings for comparison
-            required_str = {cap.value if hasattr(cap, 'value') else str(cap) for cap in required}
-            
-            if not required_str.issubset(available):
-                missing = required_str - available
-                missing_str = ', '.join(sorted(missing))
+            error = self._missing_caps_error(op, available)
+            if error:
+                raise RuntimeError(error)
+    
+    def _check_token_capabilities(self, op: str):
+        """Check the capability token grants everything ``op`` requires."""
+        for cap in CAP_REQUIRED.get(op, ()):
+            if not self.capability_system.check_capability(
+                self.capability_token, cap, use_token=False
+            ):
                 raise RuntimeError(
-                    f"Missing capabilities for {op}: {missing_str}"
+                    f"Capability {cap.value} required for {op} but not granted"
                 )
     
-    def _check_guard(self, node: Dict[str, Any]) -> bool:
-        """Check if guard condition is satisfied."""
-        guard = node.get("guard")
-        if not guard:
-            return True
-        
-        # Handle complex guards (AND/OR)
-        guard_type = guard.get("type")
-        
-        if guard_type == "and":
-            # All conditions must be true
-            conditions = guard.get("conditions", [])
-            for cond in conditions:
-                if not self._check_single_condition(cond):
-                    return False
-            return True
-        
-        elif guard_type == "or":
-            # At least one condition must be true
-            conditions = guard.get("conditions", [])
-            for cond in conditions:
-                if self._check_single_condition(cond):
-                    return True
-            return False
-        
-        else:
-            # Simple guard
-            return self._check_single_condition(guard)
-    
-    def _check_single_condition(self, condition: Dict[str, Any]) -> bool:
-        """Check a single guard condition."""
-        event_id = condition["event"]
-        expected = condition.get("equals", condition.get("value", 0))
+    @staticmethod
+    def _missing_caps_error(op: str, available) -> Optional[str]:
+        """Error message if declared capabilities miss any ``op`` requires."""
+        required = CAP_REQUIRED.get(op, set())
         
-        if event_id not in self.events:
-            # Event not yet produced - this shouldn't happen in valid graphs
-            return False
+        # Convert required CapabilityType to strings for comparison
+        required_str = {cap.value if hasattr(cap, 'value') else str(cap) for cap in required}
         
-        return self.events[event_id] == expected
+        if required_str.issubset(available):
+            return None
+        missing_str = ', '.join(sorted(required_str - available))
+        return f"Missing capabilities for {op}: {missing_str}"
     
     def _exec_alloc(self, node: Dict[str, Any]):
         """Execute ALLOC_LQ operation."""
@@ -516,10 +839,11 @@ class EnhancedExecutor:
         tag = args.get("tag", "")
         self.execution_log.append(("BARRIER", node["id"], tag))
     
-    def _exec_gate(self, node: Dict[str, Any]):
+    def _exec_gate(self, node: Dict[str, Any], gate_type: Optional[str] = None):
         """Execute gate operation (APPLY_H, APPLY_X, etc.)."""
         op = node["op"]
-        gate_type = op.replace("APPLY_", "")
+        if gate_type is None:
+            gate_type = op.replace("APPLY_", "")
         vq_ids = node.get("vqs", [])
         
         if len(vq_ids) == 1:
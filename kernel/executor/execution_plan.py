@@ -0,0 +1,280 @@
+"""
+Compiled Execution Plans
+
+A QVM graph is compiled once into a flat list of ``PlanStep`` records:
+integer opcodes, gate names, capability requirements and
+compiled guard predicates, in topological order. ``ExecutionPlanCache``
+keeps recent plans in an LRU keyed by a canonical content hash of the
+graph plus a fingerprint of the caller's capabilities, so resubmitting the
+same circuit skips verification and scheduling entirely. The cache also
+remembers certified template structures (see ``graph_template``), so
+every binding of a verified parameterized graph skips verification too.
+"""
+
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable
+
+from kernel.simulator.scheduler import topo_schedule
+
+
+# Integer opcodes, in the order of EnhancedExecutor's dispatch table
+OP_ALLOC = 0
+OP_FREE = 1
+OP_FENCE = 2
+OP_BARRIER = 3
+OP_GATE = 4
+OP_MEASURE = 5
+OP_RESET = 6
+OP_COND_PAULI = 7
+OP_OPEN_CHAN = 8
+OP_CLOSE_CHAN = 9
+OP_TELEPORT_CNOT = 10
+OP_INJECT_T = 11
+OP_SET_POLICY = 12
+
+OPCODES = {
+    "ALLOC_LQ": OP_ALLOC,
+    "FREE_LQ": OP_FREE,
+    "FENCE_EPOCH": OP_FENCE,
+    "BAR_REGION": OP_BARRIER,
+    "RESET": OP_RESET,
+    "COND_PAULI": OP_COND_PAULI,
+    "OPEN_CHAN": OP_OPEN_CHAN,
+    "CLOSE_CHAN": OP_CLOSE_CHAN,
+    "TELEPORT_CNOT": OP_TELEPORT_CNOT,
+    "INJECT_T_STATE": OP_INJECT_T,
+    "SET_POLICY": OP_SET_POLICY,
+}
+
+# Guard predicate: takes the event table, returns whether the node runs
+GuardPredicate = Callable[[Dict[str, int]], bool]
+
+
+def opcode_for(op: str) -> int:
+    """
+    Resolve the integer opcode of a QVM operation.
+
+    Raises:
+        RuntimeError: If the operation is unknown
+    """
+    if op.startswith("APPLY_"):
+        return OP_GATE
+    if op.startswith("MEASURE_"):
+        return OP_MEASURE
+    try:
+        return OPCODES[op]
+    except KeyError:
+        raise RuntimeError(f"Unknown operation: {op}") from None
+
+
+def _compile_condition(condition: Dict[str, Any]) -> GuardPredicate:
+    """Compile a single ``{"event", "equals"}`` condition."""
+    event_id = condition["event"]
+    expected = condition.get("equals", condition.get("value", 0))
+    # Events not yet produced never satisfy a condition
+    return lambda events: event_id in events and events[event_id] == expected
+
+
+def compile_guard(guard: Optional[Dict[str, Any]]) -> Optional[GuardPredicate]:
+    """
+    Compile a node guard into a predicate over the event table.
+
+    Args:
+        guard: Guard dictionary (simple condition or ``and``/``or`` group)
+
+    Returns:
+        Predicate, or None for unguarded nodes
+    """
+    if not guard:
+        return None
+
+    guard_type = guard.get("type")
+    if guard_type in ("and", "or"):
+        predicates = [_compile_condition(c) for c in guard.get("conditions", [])]
+        if guard_type == "and":
+            return lambda events: all(p(events) for p in predicates)
+        return lambda events: any(p(events) for p in predicates)
+
+    return _compile_condition(guard)
+
+
+@dataclass
+class PlanStep:
+    """One scheduled node of a compiled plan."""
+    opcode: int
+    node: Dict[str, Any]
+    node_id: str
+    op: str
+    gate: Optional[str] = None
+    guard: Optional[GuardPredicate] = None
+    declared_caps: frozenset = frozenset()
+    cap_error: Optional[str] = None
+
+
+@dataclass
+class ExecutionPlan:
+    """
+    Compiled, scheduled form of a QVM graph.
+
+    Attributes:
+        key: Cache key the plan was stored under
+        steps: Steps in execution order
+        execution_order: Scheduled node dictionaries (same order as steps)
+        global_caps: Graph-level capability declarations
+        num_epochs: Epochs delimited by FENCE_EPOCH steps
+        hits: Number of times the plan was reused from cache
+    """
+    key: str
+    steps: List[PlanStep]
+    execution_order: List[Dict[str, Any]]
+    global_caps: List[str] = field(default_factory=list)
+    num_epochs: int = 1
+    hits: int = 0
+
+
+def graph_content_hash(graph: Dict[str, Any]) -> str:
+    """
+    Canonical SHA-256 of a graph's content.
+
+    Key order and whitespace do not affect the hash.
+    """
+    canonical = json.dumps(graph, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def plan_cache_key(graph: Dict[str, Any], fingerprint: Any) -> str:
+    """Cache key combining graph content and a capability fingerprint."""
+    digest = hashlib.sha256(graph_content_hash(graph).encode())
+    digest.update(repr(fingerprint).encode())
+    return digest.hexdigest()
+
+
+def compile_plan(graph: Dict[str, Any], key: str = "") -> ExecutionPlan:
+    """
+    Compile a QVM graph into an execution plan.
+
+    Nodes are deep-copied so later mutation of the submitted graph cannot
+    alter a cached plan.
+
+    Args:
+        graph: Parsed QVM graph
+        key: Cache key to record on the plan
+
+    Returns:
+        ExecutionPlan in topological order
+
+    Raises:
+        RuntimeError: If the graph contains an unknown operation
+    """
+    nodes = copy.deepcopy(graph["program"]["nodes"])
+    global_caps = list(graph.get("caps", []))
+    execution_order = topo_schedule(nodes)
+
+    steps = []
+    for node in execution_order:
+        op = node["op"]
+        steps.append(PlanStep(
+            opcode=opcode_for(op),
+            node=node,
+            node_id=node["id"],
+            op=op,
+            gate=op[len("APPLY_"):] if op.startswith("APPLY_") else None,
+            guard=compile_guard(node.get("guard")),
+            declared_caps=frozenset(node.get("caps", [])) | frozenset(global_caps),
+        ))
+
+    return ExecutionPlan(
+        key=key,
+        steps=steps,
+        execution_order=execution_order,
+        global_caps=global_caps,
+        num_epochs=1 + sum(step.opcode == OP_FENCE for step in steps),
+    )
+
+
+class ExecutionPlanCache:
+    """
+    LRU cache of compiled execution plans.
+
+    Also keeps an LRU set of certified template structure keys of the same
+    capacity. A ``max_entries`` of 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of plans retained
+        """
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+        self._certified: "OrderedDict[str, bool]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.template_hits = 0
+
+    def get(self, key: str) -> Optional[ExecutionPlan]:
+        """Look up a plan, marking it most recently used."""
+        plan = self._plans.get(key)
+        if plan is None:
+            self.misses += 1
+            return None
+        self._plans.move_to_end(key)
+        self.hits += 1
+        plan.hits += 1
+        return plan
+
+    def put(self, plan: ExecutionPlan):
+        """Store a plan, evicting the least recently used beyond capacity."""
+        if self.max_entries <= 0:
+            return
+        self._plans[plan.key] = plan
+        self._plans.move_to_end(plan.key)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    def is_certified(self, structure_key: str) -> bool:
+        """Check whether a template structure was certified, marking it recently used."""
+        if structure_key not in self._certified:
+            return False
+        self._certified.move_to_end(structure_key)
+        self.template_hits += 1
+        return True
+
+    def mark_certified(self, structure_key: str):
+        """Record a certified template structure."""
+        if self.max_entries <= 0:
+            return
+        self._certified[structure_key] = True
+        self._certified.move_to_end(structure_key)
+        while len(self._certified) > self.max_entries:
+            self._certified.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached plans and certified structures."""
+        self._plans.clear()
+        self._certified.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._plans
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._plans),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "certified_templates": len(self._certified),
+            "template_hits": self.template_hits,
+        }
@@ -0,0 +1,175 @@
+"""
+Parameterized Graph Templates
+
+A template is an ordinary QVM graph in which some rotation-angle
+arguments are placeholders of the form ``{"param": "theta1"}``.
+``GraphTemplate.bind`` substitutes numeric values per job, copying only
+the nodes that change.
+
+Bound graphs record their parameter slots under ``"template"``, so an
+executor can re-mask those slots and recognise a structure it has
+already certified. Placeholders are only allowed in angle arguments and
+only accept numbers, which static verification never inspects, so every
+binding of a certified structure verifies identically.
+"""
+
+import copy
+from numbers import Real
+from typing import Dict, List, Any, Optional, Tuple
+
+from .execution_plan import graph_content_hash
+
+
+# Node arguments that may be template parameters
+PARAMETER_ARGS = frozenset({"theta", "phi", "lambda", "angle"})
+
+# Key under which bound graphs record their template
+TEMPLATE_KEY = "template"
+
+
+def _is_placeholder(value: Any) -> bool:
+    return isinstance(value, dict) and set(value) == {"param"}
+
+
+def _graph_nodes(graph: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if "program" in graph:
+        return graph["program"]["nodes"]
+    return graph["nodes"]
+
+
+def _with_nodes(graph: Dict[str, Any], nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shallow copy of a graph with its node list replaced."""
+    result = dict(graph)
+    if "program" in graph:
+        result["program"] = dict(graph["program"], nodes=nodes)
+    else:
+        result["nodes"] = nodes
+    return result
+
+
+class GraphTemplate:
+    """
+    QVM graph with named parameter slots.
+
+    Attributes:
+        graph: Template graph (placeholders in place)
+        slots: (node index, node ID, argument, parameter name) per slot
+        parameters: Sorted parameter names
+        structure_hash: Content hash of the template graph
+    """
+
+    def __init__(self, graph: Dict[str, Any]):
+        """
+        Parse a template.
+
+        Args:
+            graph: QVM graph with ``{"param": name}`` placeholders
+
+        Raises:
+            ValueError: If a placeholder is outside an angle argument or
+                        the graph already carries template metadata
+        """
+        if TEMPLATE_KEY in graph:
+            raise ValueError(f"Template graphs must not contain '{TEMPLATE_KEY}'")
+
+        self.graph = copy.deepcopy(graph)
+        self.slots: List[Tuple[int, str, str, str]] = []
+
+        for index, node in enumerate(_graph_nodes(self.graph)):
+            for arg, value in node.get("args", {}).items():
+                if not _is_placeholder(value):
+                    continue
+                if arg not in PARAMETER_ARGS:
+                    raise ValueError(
+                        f"Node '{node.get('id')}': argument '{arg}' cannot be a parameter "
+                        f"(allowed: {sorted(PARAMETER_ARGS)})"
+                    )
+                self.slots.append((index, node["id"], arg, str(value["param"])))
+
+        self.parameters = sorted({name for _, _, _, name in self.slots})
+        self.structure_hash = graph_content_hash(self.graph)
+
+    def bind(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Produce a concrete graph for one parameter row.
+
+        Args:
+            values: Parameter name -> number
+
+        Returns:
+            Bound graph sharing unchanged nodes with the template
+
+        Raises:
+            ValueError: If a parameter is missing, unknown or not a number
+        """
+        missing = [name for name in self.parameters if name not in values]
+        if missing:
+            raise ValueError(f"Missing template parameters: {missing}")
+        unknown = [name for name in values if name not in self.parameters]
+        if unknown:
+            raise ValueError(f"Unknown template parameters: {unknown}")
+        for name, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, Real):
+                raise ValueError(f"Parameter '{name}' must be a number, got {value!r}")
+
+        nodes = list(_graph_nodes(self.graph))
+        for index, _, arg, name in self.slots:
+            node = nodes[index]
+            if node is _graph_nodes(self.graph)[index]:
+                node = dict(node, args=dict(node["args"]))
+                nodes[index] = node
+            node["args"][arg] = float(values[name])
+
+        bound = _with_nodes(self.graph, nodes)
+        bound[TEMPLATE_KEY] = {
+            "structure_hash": self.structure_hash,
+            "slots": [[node_id, arg, name] for _, node_id, arg, name in self.slots],
+        }
+        return bound
+
+
+def template_structure(graph: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Recover the template structure of a bound graph.
+
+    Slot values are replaced by their placeholders again; the result is
+    only returned if it hashes to the recorded structure hash and every
+    slot is a numeric angle argument.
+
+    Args:
+        graph: Graph produced by ``GraphTemplate.bind`` (or any graph)
+
+    Returns:
+        The masked template graph, or None if the graph is not a valid
+        template binding
+    """
+    meta = graph.get(TEMPLATE_KEY)
+    if not isinstance(meta, dict):
+        return None
+
+    try:
+        slots = {(node_id, arg): name for node_id, arg, name in meta["slots"]}
+        nodes = list(_graph_nodes(graph))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    masked_nodes = []
+    for node in nodes:
+        node_slots = [(arg, name) for (node_id, arg), name in slots.items()
+                      if node_id == node.get("id")]
+        if node_slots:
+            args = dict(node.get("args", {}))
+            for arg, name in node_slots:
+                value = args.get(arg)
+                if (arg not in PARAMETER_ARGS or isinstance(value, bool)
+                        or not isinstance(value, Real)):
+                    return None
+                args[arg] = {"param": name}
+            node = dict(node, args=args)
+        masked_nodes.append(node)
+
+    masked = _with_nodes(graph, masked_nodes)
+    del masked[TEMPLATE_KEY]
+    if graph_content_hash(masked) != meta.get("structure_hash"):
+        return None
+    return masked
@@ -0,0 +1,177 @@
+"""
+Stabilizer Backend for QMK Executor
+
+Bit-packed Aaronson–Gottesman tableau simulation of Clifford-only QVM
+graphs. Memory and time grow polynomially with the register, so GHZ
+states, teleportation and QEC-style circuits on thousands of logical
+qubits run exactly where a statevector would need 2**n amplitudes.
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .backend_interface import QuantumBackend
+from ..simulator.batched_engine import (
+    BatchedShotEngine,
+    EVENT_NOT_PRODUCED,
+    collect_qubits,
+    normalize_node
+)
+from ..simulator.stabilizer import StabilizerTableau, is_clifford_graph
+from ..simulator.scheduler import topo_schedule
+
+
+class StabilizerBackend(QuantumBackend):
+    """
+    Clifford (stabilizer tableau) backend for QMK.
+
+    Supports H, S, SDG, Pauli gates, CNOT, CZ, SWAP, Z/X/Y/Bell
+    measurement, RESET and COND_PAULI feed-forward. Graphs containing T,
+    rotations, MEASURE_ANGLE or guarded non-Pauli gates are rejected.
+    """
+
+    MAX_QUBITS = 10000
+
+    def __init__(self, seed: Optional[int] = None, max_qubits: int = MAX_QUBITS, **kwargs):
+        """
+        Initialize stabilizer backend.
+
+        Args:
+            seed: Random seed for deterministic execution
+            max_qubits: Largest register accepted
+            **kwargs: Additional configuration
+        """
+        super().__init__(seed=seed, **kwargs)
+        self.max_qubits = max_qubits
+        self.rng = np.random.default_rng(seed)
+
+    def execute_graph(self, qvm_graph: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute QVM graph for a single shot.
+
+        Args:
+            qvm_graph: QVM graph in dictionary format
+
+        Returns:
+            Dictionary with events, telemetry, and metadata
+        """
+        start_time = time.time()
+
+        execution_order, qubits = self.translate_qvm_to_native(qvm_graph)
+        events = self._run(execution_order, shots=1)
+
+        execution_time = time.time() - start_time
+
+        return {
+            "events": self.translate_results_to_qvm(events),
+            "telemetry": {
+                "execution_time_s": execution_time,
+                "backend": "stabilizer",
+                "num_qubits": len(qubits),
+                "shots": 1
+            },
+            "metadata": {
+                "memory_bytes": StabilizerTableau.memory_bytes(len(qubits), 1)
+            }
+        }
+
+    def run_shots(self, qvm_graph: Dict[str, Any], shots: int) -> Dict[str, np.ndarray]:
+        """
+        Execute a QVM graph for many shots sharing one tableau.
+
+        Args:
+            qvm_graph: QVM graph in dictionary format
+            shots: Number of shots
+
+        Returns:
+            Dictionary mapping event IDs to per-shot int8 outcome arrays
+        """
+        execution_order, _ = self.translate_qvm_to_native(qvm_graph)
+        return self._run(execution_order, shots)
+
+    def _run(self, execution_order: List[Dict[str, Any]], shots: int) -> Dict[str, np.ndarray]:
+        """Run scheduled nodes on the tableau engine."""
+        engine = BatchedShotEngine(shots, rng=self.rng, method="stabilizer")
+        return engine.run(execution_order)
+
+    def translate_qvm_to_native(self, qvm_graph: Dict[str, Any]) -> tuple:
+        """
+        Normalize, check and schedule QVM nodes.
+
+        Args:
+            qvm_graph: QVM graph in dictionary format
+
+        Returns:
+            Tuple of (scheduled node list, qubit IDs in register order)
+
+        Raises:
+            RuntimeError: If the graph is not Clifford-only or the register
+                          exceeds ``max_qubits``
+        """
+        if 'program' in qvm_graph:
+            nodes = qvm_graph['program'].get('nodes', [])
+        else:
+            nodes = qvm_graph.get('nodes', [])
+
+        normalized = [normalize_node(node) for node in nodes]
+        if not is_clifford_graph(normalized):
+            raise RuntimeError(
+                "Stabilizer backend requires a Clifford-only graph "
+                "(no T, rotations, MEASURE_ANGLE or guarded non-Pauli gates)"
+            )
+
+        execution_order = topo_schedule(normalized)
+        qubits = collect_qubits(execution_order)
+
+        if len(qubits) > self.max_qubits:
+            raise RuntimeError(
+                f"Stabilizer backend supports at most {self.max_qubits} qubits, "
+                f"graph uses {len(qubits)}"
+            )
+
+        return execution_order, qubits
+
+    def translate_results_to_qvm(self, native_result: Dict[str, np.ndarray]) -> Dict[str, int]:
+        """
+        Convert single-shot outcome arrays to QVM events.
+
+        Args:
+            native_result: Dictionary of per-shot outcome arrays
+
+        Returns:
+            Dictionary mapping event IDs to measurement outcomes; events
+            skipped by a guard are omitted
+        """
+        events = {}
+        for event_id, values in native_result.items():
+            value = int(values[0])
+            if value != EVENT_NOT_PRODUCED:
+                events[event_id] = value
+        return events
+
+    def get_backend_info(self) -> Dict[str, Any]:
+        """Get information about the stabilizer backend."""
+        return {
+            "backend_type": "stabilizer",
+            "seed": self.seed,
+            "max_qubits": self.max_qubits,
+            "max_memory_bytes": StabilizerTableau.memory_bytes(self.max_qubits, 1),
+            "supports_noise": False,
+            "supports_mid_circuit_measurement": True,
+            "clifford_only": True
+        }
+
+    def supports_operation(self, operation: str) -> bool:
+        """Check if backend supports a specific operation."""
+        supported = {
+            "ALLOC_LQ", "FREE_LQ", "FENCE_EPOCH", "BAR_REGION",
+            "APPLY_H", "APPLY_X", "APPLY_Y", "APPLY_Z",
+            "APPLY_S", "APPLY_SDG",
+            "APPLY_CNOT", "APPLY_CZ", "APPLY_SWAP",
+            "MEASURE_Z", "MEASURE_X", "MEASURE_Y", "MEASURE_BELL",
+            "RESET", "COND_PAULI", "TELEPORT_CNOT",
+            "OPEN_CHAN", "CLOSE_CHAN", "SET_POLICY"
+        }
+        return operation in supported
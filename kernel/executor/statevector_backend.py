@@ -0,0 +1,198 @@
+"""
+Statevector Backend for QMK Executor
+
+Native NumPy statevector simulation of QVM graphs. Unlike the simplified
+LogicalQubit model it represents arbitrary multi-qubit entanglement
+(GHZ, W states) exactly, and unlike QiskitAerBackend it needs no external
+framework or circuit translation.
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .backend_interface import QuantumBackend
+from ..simulator.batched_engine import (
+    BatchedShotEngine,
+    DEFAULT_MAX_AMPLITUDES,
+    EVENT_NOT_PRODUCED,
+    collect_qubits,
+    normalize_node
+)
+from ..simulator.statevector import BatchedStatevector
+from ..simulator.scheduler import topo_schedule
+
+
+_PRECISIONS = {
+    "double": np.complex128,
+    "single": np.complex64,
+}
+
+
+class StatevectorBackend(QuantumBackend):
+    """
+    Dense statevector backend for QMK.
+
+    Gates are applied in place through strided views of the state; memory
+    is one amplitude array of 2**n entries (16 bytes each in double
+    precision, 8 in single precision). Mid-circuit measurement, RESET,
+    guards and COND_PAULI feed-forward are fully supported.
+    """
+
+    MAX_QUBITS = 28
+
+    def __init__(self, seed: Optional[int] = None, precision: str = "double",
+                 max_qubits: int = MAX_QUBITS, **kwargs):
+        """
+        Initialize statevector backend.
+
+        Args:
+            seed: Random seed for deterministic execution
+            precision: Amplitude precision ('double' or 'single')
+            max_qubits: Largest register accepted
+            **kwargs: Additional configuration
+        """
+        if precision not in _PRECISIONS:
+            raise ValueError(
+                f"Unknown precision '{precision}', expected one of {sorted(_PRECISIONS)}"
+            )
+
+        super().__init__(seed=seed, **kwargs)
+        self.precision = precision
+        self.dtype = _PRECISIONS[precision]
+        self.max_qubits = max_qubits
+        self.rng = np.random.default_rng(seed)
+
+    def execute_graph(self, qvm_graph: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute QVM graph for a single shot.
+
+        Args:
+            qvm_graph: QVM graph in dictionary format
+
+        Returns:
+            Dictionary with events, telemetry, and metadata
+        """
+        start_time = time.time()
+
+        execution_order, qubits = self.translate_qvm_to_native(qvm_graph)
+        events = self._run(execution_order, qubits, shots=1)
+
+        execution_time = time.time() - start_time
+
+        return {
+            "events": self.translate_results_to_qvm(events),
+            "telemetry": {
+                "execution_time_s": execution_time,
+                "backend": "statevector",
+                "precision": self.precision,
+                "num_qubits": len(qubits),
+                "shots": 1
+            },
+            "metadata": {
+                "memory_bytes": BatchedStatevector.memory_bytes(len(qubits), 1, self.dtype)
+            }
+        }
+
+    def run_shots(self, qvm_graph: Dict[str, Any], shots: int) -> Dict[str, np.ndarray]:
+        """
+        Execute a QVM graph for many shots in one batched run.
+
+        Args:
+            qvm_graph: QVM graph in dictionary format
+            shots: Number of shots
+
+        Returns:
+            Dictionary mapping event IDs to per-shot int8 outcome arrays
+        """
+        execution_order, qubits = self.translate_qvm_to_native(qvm_graph)
+        return self._run(execution_order, qubits, shots)
+
+    def _run(self, execution_order: List[Dict[str, Any]], qubits: List[str],
+             shots: int) -> Dict[str, np.ndarray]:
+        """Run scheduled nodes with an amplitude budget sized for this register."""
+        engine = BatchedShotEngine(
+            shots,
+            max_amplitudes=max(1 << len(qubits), DEFAULT_MAX_AMPLITUDES),
+            dtype=self.dtype,
+            rng=self.rng
+        )
+        return engine.run(execution_order)
+
+    def translate_qvm_to_native(self, qvm_graph: Dict[str, Any]) -> tuple:
+        """
+        Normalize and schedule QVM nodes.
+
+        Accepts both the canonical QVM form (``vqs``/``args``/``APPLY_*``)
+        and the ``qubits``/``params``/bare-gate form used by other backends.
+
+        Args:
+            qvm_graph: QVM graph in dictionary format
+
+        Returns:
+            Tuple of (scheduled node list, qubit IDs in register order)
+
+        Raises:
+            RuntimeError: If the register exceeds ``max_qubits``
+        """
+        if 'program' in qvm_graph:
+            nodes = qvm_graph['program'].get('nodes', [])
+        else:
+            nodes = qvm_graph.get('nodes', [])
+
+        normalized = [normalize_node(node) for node in nodes]
+        execution_order = topo_schedule(normalized)
+        qubits = collect_qubits(execution_order)
+
+        if len(qubits) > self.max_qubits:
+            raise RuntimeError(
+                f"Statevector backend supports at most {self.max_qubits} qubits, "
+                f"graph uses {len(qubits)}"
+            )
+
+        return execution_order, qubits
+
+    def translate_results_to_qvm(self, native_result: Dict[str, np.ndarray]) -> Dict[str, int]:
+        """
+        Convert single-shot outcome arrays to QVM events.
+
+        Args:
+            native_result: Dictionary of per-shot outcome arrays
+
+        Returns:
+            Dictionary mapping event IDs to measurement outcomes; events
+            skipped by a guard are omitted
+        """
+        events = {}
+        for event_id, values in native_result.items():
+            value = int(values[0])
+            if value != EVENT_NOT_PRODUCED:
+                events[event_id] = value
+        return events
+
+    def get_backend_info(self) -> Dict[str, Any]:
+        """Get information about the statevector backend."""
+        return {
+            "backend_type": "statevector",
+            "precision": self.precision,
+            "seed": self.seed,
+            "max_qubits": self.max_qubits,
+            "max_memory_bytes": BatchedStatevector.memory_bytes(self.max_qubits, 1, self.dtype),
+            "supports_noise": False,
+            "supports_mid_circuit_measurement": True
+        }
+
+    def supports_operation(self, operation: str) -> bool:
+        """Check if backend supports a specific operation."""
+        supported = {
+            "ALLOC_LQ", "FREE_LQ", "FENCE_EPOCH", "BAR_REGION",
+            "APPLY_H", "APPLY_X", "APPLY_Y", "APPLY_Z",
+            "APPLY_S", "APPLY_SDG", "APPLY_T", "APPLY_TDG",
+            "APPLY_RX", "APPLY_RY", "APPLY_RZ",
+            "APPLY_CNOT", "APPLY_CZ", "APPLY_SWAP",
+            "MEASURE_Z", "MEASURE_X", "MEASURE_Y", "MEASURE_ANGLE", "MEASURE_BELL",
+            "RESET", "COND_PAULI", "TELEPORT_CNOT",
+            "OPEN_CHAN", "CLOSE_CHAN", "SET_POLICY"
+        }
+        return operation in supported
@@ -5,20 +5,44 @@ Provides production-grade quantum error correction decoders.
 """
 
 from .mwpm_decoder import MWPMDecoder, Syndrome
+from .decoding_graph import DecodingGraph, DecodingEdge, BOUNDARY
+from .blossom import max_weight_matching, min_weight_perfect_matching
 from .union_find_decoder import UnionFindDecoder
-from .bp_decoder import BeliefPropagationDecoder, ParityCheck
-from .syndrome_extractor import SyndromeExtractor, SyndromeRound
-from .decoder_manager import DecoderManager, DecoderType, create_surface_code_decoders
+from .bp_decoder import BeliefPropagationDecoder, ParityCheck, BPResult
+from .syndrome_extractor import SyndromeExtractor, SyndromeRound, SurfaceCodeSampler, SampleResult
+from .surface_code import SurfaceCode, make_surface_code, rotated_surface_code, unrotated_surface_code
+from .threshold_sweep import ThresholdSweep, SweepPoint, LogicalErrorModel, wilson_interval
+from .decoder_manager import (
+    DecoderManager, DecoderType, create_surface_code_decoders, pack_bits, unpack_bits
+)
 
 __all__ = [
     "MWPMDecoder",
+    "DecodingGraph",
+    "DecodingEdge",
+    "BOUNDARY",
+    "max_weight_matching",
+    "min_weight_perfect_matching",
     "UnionFindDecoder",
     "BeliefPropagationDecoder",
     "SyndromeExtractor",
+    "SurfaceCodeSampler",
+    "SampleResult",
+    "SurfaceCode",
+    "make_surface_code",
+    "rotated_surface_code",
+    "unrotated_surface_code",
+    "ThresholdSweep",
+    "SweepPoint",
+    "LogicalErrorModel",
+    "wilson_interval",
     "DecoderManager",
     "DecoderType",
     "Syndrome",
     "ParityCheck",
+    "BPResult",
     "SyndromeRound",
     "create_surface_code_decoders",
+    "pack_bits",
+    "unpack_bits",
 ]
@@ -0,0 +1,469 @@
+"""
+Weighted Blossom Matching
+
+Edmonds' blossom algorithm for maximum-weight matching in general
+graphs, with Galil's O(n³) dual-variable bookkeeping (after the public
+domain formulation by J. van Rantwijk). ``min_weight_perfect_matching``
+adapts it to the minimum-weight perfect matchings used by the MWPM
+decoder.
+
+Integer edge weights keep every dual update exact; callers with real
+weights should scale and round them first.
+"""
+
+from typing import List, Tuple, Optional
+
+
+def max_weight_matching(
+    edges: List[Tuple[int, int, int]],
+    max_cardinality: bool = False
+) -> List[int]:
+    """
+    Compute a maximum-weight matching.
+    
+    Args:
+        edges: (i, j, weight) triples on vertices 0..n-1; no self loops
+        max_cardinality: Only consider matchings of maximum cardinality
+    
+    Returns:
+        mate list: mate[v] is the vertex matched to v, or -1
+    """
+    if not edges:
+        return []
+    
+    num_edges = len(edges)
+    num_vertices = 0
+    for i, j, _ in edges:
+        num_vertices = max(num_vertices, i + 1, j + 1)
+    max_weight = max(0, max(weight for _, _, weight in edges))
+    
+    # Edge k has endpoints 2k (vertex i) and 2k+1 (vertex j)
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * num_edges)]
+    neighbend: List[List[int]] = [[] for _ in range(num_vertices)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+    
+    # mate[v] is the remote endpoint of v's matched edge, or -1
+    mate = [-1] * num_vertices
+    
+    # Per top-level blossom (and vertex): 0 free, 1 S, 2 T; +4 breadcrumb
+    label = [0] * (2 * num_vertices)
+    labelend = [-1] * (2 * num_vertices)
+    inblossom = list(range(num_vertices))
+    blossomparent = [-1] * (2 * num_vertices)
+    blossomchilds: List[Optional[List[int]]] = [None] * (2 * num_vertices)
+    blossombase = list(range(num_vertices)) + [-1] * num_vertices
+    blossomendps: List[Optional[List[int]]] = [None] * (2 * num_vertices)
+    bestedge = [-1] * (2 * num_vertices)
+    blossombestedges: List[Optional[List[int]]] = [None] * (2 * num_vertices)
+    unusedblossoms = list(range(num_vertices, 2 * num_vertices))
+    dualvar = [max_weight] * num_vertices + [0] * num_vertices
+    allowedge = [False] * num_edges
+    queue: List[int] = []
+    
+    def slack(k: int) -> int:
+        i, j, weight = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * weight
+    
+    def blossom_leaves(b: int):
+        if b < num_vertices:
+            yield b
+        else:
+            for t in blossomchilds[b]:
+                if t < num_vertices:
+                    yield t
+                else:
+                    yield from blossom_leaves(t)
+    
+    def assign_label(w: int, t: int, p: int):
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        elif t == 2:
+            # T-blossom: its mate becomes an S-vertex
+            base = blossombase[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+    
+    def scan_blossom(v: int, w: int) -> int:
+        """Trace back from v and w; return the base of a new blossom or -1."""
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                # Base of b is single; stop tracing this path
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                # b is a T-blossom; trace one more step back
+                v = endpoint[labelend[b]]
+            # Alternate between both paths
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+    
+    def add_blossom(base: int, k: int):
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        
+        # Trace back from v to base
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        
+        # Trace back from w to base
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        
+        for leaf in blossom_leaves(b):
+            if label[inblossom[leaf]] == 2:
+                # T-vertex turns into an S-vertex
+                queue.append(leaf)
+            inblossom[leaf] = b
+        
+        # Least-slack edges from the new blossom to other S-blossoms
+        bestedgeto = [-1] * (2 * num_vertices)
+        for sub in path:
+            if blossombestedges[sub] is None:
+                nblists = [[p // 2 for p in neighbend[leaf]]
+                           for leaf in blossom_leaves(sub)]
+            else:
+                nblists = [blossombestedges[sub]]
+            for nblist in nblists:
+                for edge in nblist:
+                    i, j, _ = edges[edge]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if (bj != b and label[bj] == 1 and
+                            (bestedgeto[bj] == -1 or slack(edge) < slack(bestedgeto[bj]))):
+                        bestedgeto[bj] = edge
+            blossombestedges[sub] = None
+            bestedge[sub] = -1
+        blossombestedges[b] = [edge for edge in bestedgeto if edge != -1]
+        bestedge[b] = -1
+        for edge in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(edge) < slack(bestedge[b]):
+                bestedge[b] = edge
+    
+    def expand_blossom(b: int, endstage: bool):
+        for sub in blossomchilds[b]:
+            blossomparent[sub] = -1
+            if sub < num_vertices:
+                inblossom[sub] = sub
+            elif endstage and dualvar[sub] == 0:
+                expand_blossom(sub, endstage)
+            else:
+                for leaf in blossom_leaves(sub):
+                    inblossom[leaf] = sub
+        
+        # A T-blossom expanded mid-stage: relabel its sub-blossoms
+        if not endstage and label[b] == 2:
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                # Odd start index: go forward and wrap
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                # Even start index: go backward
+                jstep = -1
+                endptrick = 1
+            
+            p = labelend[b]
+            while j != 0:
+                # Relabel the T-sub-blossom
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                # Step to the next S-sub-blossom and note its forward endpoint
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                # Step to the next T-sub-blossom
+                allowedge[p // 2] = True
+                j += jstep
+            
+            # Relabel the base T-sub-blossom without stepping to its mate
+            sub = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[sub] = 2
+            labelend[endpoint[p ^ 1]] = labelend[sub] = p
+            bestedge[sub] = -1
+            
+            # Continue around the blossom back to entrychild
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                sub = blossomchilds[b][j]
+                if label[sub] == 1:
+                    # Already reached as S through a neighbour
+                    j += jstep
+                    continue
+                for leaf in blossom_leaves(sub):
+                    if label[leaf] != 0:
+                        break
+                if label[leaf] != 0:
+                    # Reachable from outside: label the sub-blossom T
+                    label[leaf] = 0
+                    label[endpoint[mate[blossombase[sub]]]] = 0
+                    assign_label(leaf, 2, labelend[leaf])
+                j += jstep
+        
+        # Recycle the blossom number
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+    
+    def augment_blossom(b: int, v: int):
+        """Swap matched/unmatched edges along the path from v to b's base."""
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= num_vertices:
+            augment_blossom(t, v)
+        
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= num_vertices:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= num_vertices:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        
+        # Rotate so the new base comes first
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+    
+    def augment_matching(k: int):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= num_vertices:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    # Reached a single vertex
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= num_vertices:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+    
+    # Each stage finds one augmenting path
+    for _ in range(num_vertices):
+        label[:] = [0] * (2 * num_vertices)
+        bestedge[:] = [-1] * (2 * num_vertices)
+        blossombestedges[num_vertices:] = [None] * num_vertices
+        allowedge[:] = [False] * num_edges
+        queue[:] = []
+        
+        for v in range(num_vertices):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+        
+        augmented = False
+        while True:
+            # Grow alternating trees from S-vertices
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            # w inside a T-blossom, reached from outside
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+            
+            if augmented:
+                break
+            
+            # No augmenting path under current duals: compute delta
+            deltatype = -1
+            delta = deltaedge = deltablossom = None
+            
+            if not max_cardinality:
+                deltatype = 1
+                delta = min(dualvar[:num_vertices])
+            
+            for v in range(num_vertices):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 2
+                        deltaedge = bestedge[v]
+            
+            for b in range(2 * num_vertices):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 3
+                        deltaedge = bestedge[b]
+            
+            for b in range(num_vertices, 2 * num_vertices):
+                if (blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2 and
+                        (deltatype == -1 or dualvar[b] < delta)):
+                    delta = dualvar[b]
+                    deltatype = 4
+                    deltablossom = b
+            
+            if deltatype == -1:
+                # Maximum cardinality reached; final update for verifiable duals
+                deltatype = 1
+                delta = max(0, min(dualvar[:num_vertices]))
+            
+            for v in range(num_vertices):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(num_vertices, 2 * num_vertices):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+            
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            else:
+                expand_blossom(deltablossom, False)
+        
+        if not augmented:
+            break
+        
+        # End of stage: expand S-blossoms with zero dual
+        for b in range(num_vertices, 2 * num_vertices):
+            if (blossomparent[b] == -1 and blossombase[b] >= 0 and
+                    label[b] == 1 and dualvar[b] == 0):
+                expand_blossom(b, True)
+    
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
+
+
+def min_weight_perfect_matching(
+    num_vertices: int,
+    edges: List[Tuple[int, int, int]]
+) -> List[int]:
+    """
+    Compute a minimum-weight perfect matching.
+    
+    Args:
+        num_vertices: Number of vertices (even)
+        edges: (i, j, weight) triples with non-negative integer weights
+    
+    Returns:
+        mate list covering every vertex
+    
+    Raises:
+        ValueError: If the graph has no perfect matching
+    """
+    if num_vertices == 0:
+        return []
+    if not edges:
+        raise ValueError("Graph has no perfect matching")
+    
+    # Maximising (W - w) over maximum-cardinality matchings minimises w
+    offset = max(weight for _, _, weight in edges) + 1
+    mate = max_weight_matching(
+        [(i, j, offset - weight) for i, j, weight in edges],
+        max_cardinality=True
+    )
+    mate += [-1] * (num_vertices - len(mate))
+    if any(m == -1 for m in mate):
+        raise ValueError("Graph has no perfect matching")
+    return mate
@@ -2,12 +2,14 @@
 Belief Propagation (BP) Decoder
 
 Implements BP decoding for QLDPC codes.
-Iterative message-passing algorithm for sparse parity-check codes.
+Iterative message-passing algorithm for sparse parity-check codes, with
+all messages of a batch of shots held in flat edge arrays.
 """
 
 import numpy as np
 from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
+from scipy.sparse import csr_matrix
 
 
 @dataclass
@@ -23,18 +25,46 @@ class ParityCheck:
     parity: str
 
 
+@dataclass
+class BPResult:
+    """
+    Outcome of a batch BP decode.
+    
+    Attributes:
+        errors: (shots x qubits) hard-decision error estimates
+        converged: Per-shot flag, True if the estimate reproduces the syndrome
+        iterations: Per-shot number of iterations run
+        posterior_llrs: (shots x qubits) final log-likelihood ratios
+    """
+    errors: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+    posterior_llrs: np.ndarray
+
+
 class BeliefPropagationDecoder:
     """
     Belief Propagation decoder for QLDPC codes.
     
-    Uses sum-product algorithm for iterative decoding.
+    The Tanner graph is stored as CSR edge arrays (edges sorted by
+    check), and every iteration updates all messages of all shots with
+    NumPy segment operations. Supported update rules are sum-product,
+    min-sum and normalized min-sum.
     """
     
+    METHODS = ("sum_product", "min_sum", "normalized_min_sum")
+    
+    # Keeps tanh products away from +-1 so arctanh stays finite
+    _TANH_CLIP = 1.0 - 1e-12
+    
     def __init__(
         self,
         parity_checks: List[ParityCheck],
         max_iterations: int = 100,
-        convergence_threshold: float = 1e-6
+        convergence_threshold: float = 1e-6,
+        method: str = "sum_product",
+        scaling_factor: float = 0.75,
+        num_qubits: Optional[int] = None
     ):
         """
         Initialize BP decoder.
@@ -42,21 +72,49 @@ class BeliefPropagationDecoder:
         Args:
             parity_checks: List of parity check constraints
             max_iterations: Maximum BP iterations
-            convergence_threshold: Convergence threshold
+            convergence_threshold: Stop a shot once no message moves by more
+            method: "sum_product", "min_sum" or "normalized_min_sum"
+            scaling_factor: Check-message scale for normalized min-sum
+            num_qubits: Number of qubits (defaults to the largest index + 1)
         """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown BP method '{method}'; expected one of {self.METHODS}")
+        
         self.parity_checks = parity_checks
         self.max_iterations = max_iterations
         self.convergence_threshold = convergence_threshold
+        self.method = method
+        self.scaling_factor = scaling_factor
         
         # Build factor graph
-        self._build_factor_graph()
+        self._build_factor_graph(num_qubits)
+    
+    @classmethod
+    def from_check_matrix(cls, check_matrix, parity: str = 'Z', **kwargs) -> "BeliefPropagationDecoder":
+        """
+        Create a decoder from a (checks x qubits) binary matrix.
+        
+        Args:
+            check_matrix: Dense or scipy sparse parity-check matrix
+            parity: Parity label for the generated checks
+            **kwargs: Passed to the constructor
+        """
+        H = csr_matrix(check_matrix, dtype=np.uint8)
+        checks = [
+            ParityCheck(qubits=H.indices[H.indptr[row]:H.indptr[row + 1]].tolist(), parity=parity)
+            for row in range(H.shape[0])
+        ]
+        return cls(checks, num_qubits=H.shape[1], **kwargs)
     
-    def _build_factor_graph(self):
+    def _build_factor_graph(self, num_qubits: Optional[int] = None):
         """Build bipartite factor graph for BP."""
         # Variable nodes (qubits)
         self.num_qubits = max(
-            max(check.qubits) for check in self.parity_checks
+            (max(check.qubits) for check in self.parity_checks if check.qubits),
+            default=-1
         ) + 1
+        if num_qubits is not None:
+            self.num_qubits = max(self.num_qubits, num_qubits)
         
         # Check nodes
         self.num_checks = len(self.parity_checks)
@@ -73,6 +131,38 @@ class BeliefPropagationDecoder:
             self.check_to_qubits[check_idx] = check.qubits
             for qubit in check.qubits:
                 self.qubit_to_checks[qubit].append(check_idx)
+        
+        self._build_edges()
+    
+    def _build_edges(self):
+        """Build CSR edge arrays and the segment-sum incidence matrices."""
+        lengths = np.array([len(check.qubits) for check in self.parity_checks], dtype=np.int64)
+        
+        # Edge e joins check edge_check[e] and qubit edge_qubit[e]; edges of
+        # one check are contiguous, starting at check_ptr[check]
+        self.check_ptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.edge_check = np.repeat(np.arange(self.num_checks), lengths)
+        self.edge_qubit = np.array(
+            [q for check in self.parity_checks for q in check.qubits], dtype=np.int64
+        )
+        self.num_edges = len(self.edge_qubit)
+        
+        ones = np.ones(self.num_edges)
+        edges = np.arange(self.num_edges)
+        self._check_incidence = csr_matrix(
+            (ones, (self.edge_check, edges)), shape=(self.num_checks, self.num_edges)
+        )
+        self._qubit_incidence = csr_matrix(
+            (ones, (self.edge_qubit, edges)), shape=(self.num_qubits, self.num_edges)
+        )
+        self.check_matrix = csr_matrix(
+            (np.ones(self.num_edges, dtype=np.int64), (self.edge_check, self.edge_qubit)),
+            shape=(self.num_checks, self.num_qubits)
+        )
+        
+        # reduceat needs non-empty segments
+        self._nonempty_checks = np.flatnonzero(lengths > 0)
+        self._segment_starts = self.check_ptr[:-1][self._nonempty_checks]
     
     def decode(
         self,
@@ -89,150 +179,128 @@ class BeliefPropagationDecoder:
         Returns:
             Decoded error vector
         """
+        result = self.decode_batch(np.asarray(syndrome)[None, :], channel_probs)
+        return result.errors[0].astype(int)
+    
+    def decode_batch(
+        self,
+        syndromes: np.ndarray,
+        channel_probs: Optional[np.ndarray] = None
+    ) -> BPResult:
+        """
+        Decode many syndromes at once.
+        
+        Shots leave the working set as soon as their hard decision
+        satisfies the syndrome or their messages stop moving.
+        
+        Args:
+            syndromes: (shots x checks) binary matrix
+            channel_probs: Prior error probability per qubit (or scalar)
+        
+        Returns:
+            BPResult with per-shot estimates and convergence flags
+        """
+        syndromes = np.asarray(syndromes, dtype=np.uint8).reshape(-1, self.num_checks)
+        num_shots = syndromes.shape[0]
+        
         if channel_probs is None:
             # Uniform prior
             channel_probs = np.ones(self.num_qubits) * 0.1
+        channel_llrs = np.broadcast_to(
+            self._prob_to_llr(np.asarray(channel_probs, dtype=np.float64)), (self.num_qubits,)
+        )
         
-        # Initialize messages
-        # qubit_to_check_msgs[qubit][check_idx] = log-likelihood ratio
-        qubit_to_check_msgs = {
-            qubit: {check: 0.0 for check in self.qubit_to_checks[qubit]}
-            for qubit in range(self.num_qubits)
-        }
+        errors = np.zeros((num_shots, self.num_qubits), dtype=np.uint8)
+        posterior = np.tile(channel_llrs, (num_shots, 1))
+        converged = np.zeros(num_shots, dtype=bool)
+        iterations = np.zeros(num_shots, dtype=np.int64)
         
-        check_to_qubit_msgs = {
-            check: {qubit: 0.0 for qubit in self.check_to_qubits[check]}
-            for check in range(self.num_checks)
-        }
+        # Shots whose syndrome is already explained by no error are done
+        hard = (posterior < 0).astype(np.uint8)
+        active = np.flatnonzero(~self._satisfies(hard, syndromes))
+        converged[np.setdiff1d(np.arange(num_shots), active)] = True
+        errors[:] = hard
         
-        # Convert channel probs to log-likelihood ratios
-        channel_llrs = self._prob_to_llr(channel_probs)
+        # Per-edge syndrome sign (-1 where the check is violated)
+        signs = 1.0 - 2.0 * syndromes[active][:, self.edge_check]
+        check_to_qubit = np.zeros((len(active), self.num_edges))
         
-        # BP iterations
-        for iteration in range(self.max_iterations):
-            # Check to qubit messages
-            new_check_to_qubit = self._update_check_to_qubit_messages(
-                qubit_to_check_msgs,
-                syndrome
-            )
+        for iteration in range(1, self.max_iterations + 1):
+            if len(active) == 0:
+                break
             
-            # Qubit to check messages
-            new_qubit_to_check = self._update_qubit_to_check_messages(
-                check_to_qubit_msgs,
-                channel_llrs
-            )
+            # Qubit to check: channel plus all other incoming messages
+            totals = (self._qubit_incidence @ check_to_qubit.T).T
+            qubit_to_check = (channel_llrs + totals)[:, self.edge_qubit] - check_to_qubit
             
-            # Check convergence
-            if self._has_converged(
-                check_to_qubit_msgs,
-                new_check_to_qubit
-            ):
-                break
+            # Check to qubit
+            new_check_to_qubit = self._check_update(qubit_to_check) * signs
+            
+            # Posterior and hard decision
+            beliefs = channel_llrs + (self._qubit_incidence @ new_check_to_qubit.T).T
+            hard = (beliefs < 0).astype(np.uint8)
             
-            check_to_qubit_msgs = new_check_to_qubit
-            qubit_to_check_msgs = new_qubit_to_check
+            satisfied = self._satisfies(hard, syndromes[active])
+            stalled = (np.abs(new_check_to_qubit - check_to_qubit).max(axis=1, initial=0.0)
+                       < self.convergence_threshold)
+            done = satisfied | stalled | (iteration == self.max_iterations)
+            
+            finished = active[done]
+            errors[finished] = hard[done]
+            posterior[finished] = beliefs[done]
+            converged[finished] = satisfied[done]
+            iterations[finished] = iteration
+            
+            keep = ~done
+            active = active[keep]
+            signs = signs[keep]
+            check_to_qubit = new_check_to_qubit[keep]
         
-        # Compute final beliefs
-        beliefs = self._compute_beliefs(
-            check_to_qubit_msgs,
-            channel_llrs
-        )
+        return BPResult(errors, converged, iterations, posterior)
+    
+    def _check_update(self, qubit_to_check: np.ndarray) -> np.ndarray:
+        """Check-to-qubit messages (before syndrome signs) for all edges."""
+        negative = qubit_to_check < 0
         
-        # Hard decision
-        error = (beliefs < 0).astype(int)
+        # Sign of the product over the other edges of each check
+        parity = (self._check_incidence @ negative.T.astype(np.float64)).T % 2
+        edge_sign = np.where((parity[:, self.edge_check] + negative) % 2 == 1, -1.0, 1.0)
         
-        return error
-    
-    def _update_check_to_qubit_messages(
-        self,
-        qubit_to_check_msgs: Dict,
-        syndrome: np.ndarray
-    ) -> Dict:
-        """Update messages from checks to qubits."""
-        new_msgs = {
-            check: {} for check in range(self.num_checks)
-        }
+        magnitude = np.abs(qubit_to_check)
+        if self.method == "sum_product":
+            # Product of tanh(|m|/2) over the other edges, in the log domain
+            t = np.clip(np.tanh(magnitude / 2.0), 1e-300, None)
+            log_t = np.log(t)
+            totals = (self._check_incidence @ log_t.T).T
+            others = np.exp(totals[:, self.edge_check] - log_t)
+            return edge_sign * 2.0 * np.arctanh(np.minimum(others, self._TANH_CLIP))
         
-        for check_idx in range(self.num_checks):
-            qubits = self.check_to_qubits[check_idx]
-            syndrome_bit = syndrome[check_idx]
-            
-            for target_qubit in qubits:
-                # Product of tanh(msg/2) from other qubits
-                product = 1.0
-                
-                for qubit in qubits:
-                    if qubit != target_qubit:
-                        msg = qubit_to_check_msgs[qubit].get(check_idx, 0.0)
-                        product *= np.tanh(msg / 2.0)
-                
-                # Incorporate syndrome
-                if syndrome_bit == 1:
-                    product *= -1
-                
-                # Convert back to LLR
-                product = np.clip(product, -0.9999, 0.9999)
-                new_msg = 2.0 * np.arctanh(product)
-                
-                new_msgs[check_idx][target_qubit] = new_msg
-        
-        return new_msgs
-    
-    def _update_qubit_to_check_messages(
-        self,
-        check_to_qubit_msgs: Dict,
-        channel_llrs: np.ndarray
-    ) -> Dict:
-        """Update messages from qubits to checks."""
-        new_msgs = {
-            qubit: {} for qubit in range(self.num_qubits)
-        }
+        # Min-sum: smallest |m| over the other edges of each check
+        num_shots = magnitude.shape[0]
+        starts = self._segment_starts
+        min1 = np.full((num_shots, self.num_checks), np.inf)
+        min1[:, self._nonempty_checks] = np.minimum.reduceat(magnitude, starts, axis=1)
         
-        for qubit in range(self.num_qubits):
-            checks = self.qubit_to_checks[qubit]
-            
-            for target_check in checks:
-                # Sum of messages from other checks + channel
-                msg_sum = channel_llrs[qubit]
-                
-                for check in checks:
-                    if check != target_check:
-                        msg_sum += check_to_qubit_msgs[check].get(qubit, 0.0)
-                
-                new_msgs[qubit][target_check] = msg_sum
-        
-        return new_msgs
-    
-    def _compute_beliefs(
-        self,
-        check_to_qubit_msgs: Dict,
-        channel_llrs: np.ndarray
-    ) -> np.ndarray:
-        """Compute final beliefs (posterior LLRs)."""
-        beliefs = np.copy(channel_llrs)
+        is_min = magnitude == min1[:, self.edge_check]
+        masked = np.where(is_min, np.inf, magnitude)
+        min2 = np.full((num_shots, self.num_checks), np.inf)
+        min2[:, self._nonempty_checks] = np.minimum.reduceat(masked, starts, axis=1)
+        
+        # A tied minimum is also the runner-up
+        ties = np.zeros((num_shots, self.num_checks))
+        ties[:, self._nonempty_checks] = np.add.reduceat(is_min, starts, axis=1)
+        min2 = np.where(ties > 1, min1, min2)
         
-        for qubit in range(self.num_qubits):
-            for check in self.qubit_to_checks[qubit]:
-                beliefs[qubit] += check_to_qubit_msgs[check].get(qubit, 0.0)
+        others = np.where(is_min, min2[:, self.edge_check], min1[:, self.edge_check])
+        others = np.where(np.isfinite(others), others, 0.0)
         
-        return beliefs
+        scale = self.scaling_factor if self.method == "normalized_min_sum" else 1.0
+        return edge_sign * scale * others
     
-    def _has_converged(
-        self,
-        old_msgs: Dict,
-        new_msgs: Dict
-    ) -> bool:
-        """Check if messages have converged."""
-        max_diff = 0.0
-        
-        for check in old_msgs:
-            for qubit in old_msgs[check]:
-                old_val = old_msgs[check][qubit]
-                new_val = new_msgs[check].get(qubit, 0.0)
-                diff = abs(new_val - old_val)
-                max_diff = max(max_diff, diff)
-        
-        return max_diff < self.convergence_threshold
+    def _satisfies(self, errors: np.ndarray, syndromes: np.ndarray) -> np.ndarray:
+        """Per-shot flag: does H e equal the syndrome?"""
+        computed = (self.check_matrix @ errors.T.astype(np.int64)).T % 2
+        return np.all(computed == syndromes, axis=1)
     
     def _prob_to_llr(self, probs: np.ndarray) -> np.ndarray:
         """Convert probabilities to log-likelihood ratios."""
@@ -273,10 +341,15 @@ class BeliefPropagationDecoder:
         """Get decoder statistics."""
         return {
             "decoder_type": "Belief Propagation",
-            "algorithm": "Sum-product message passing",
+            "algorithm": {
+                "sum_product": "Sum-product message passing",
+                "min_sum": "Min-sum message passing",
+                "normalized_min_sum": "Normalized min-sum message passing",
+            }[self.method],
             "num_qubits": self.num_qubits,
             "num_checks": self.num_checks,
             "max_iterations": self.max_iterations,
             "convergence_threshold": self.convergence_threshold,
-            "complexity": f"O(iterations * edges) ≈ O({self.max_iterations} * {self.num_checks * 10})"
+            "num_edges": self.num_edges,
+            "complexity": f"O(iterations * edges) = O({self.max_iterations} * {self.num_edges}) per shot"
         }
@@ -2,18 +2,36 @@
 Decoder Manager
 
 Manages multiple QEC decoders and provides unified interface.
+
+Batch decoding takes detection events as a packed bit array (shots x
+detectors, 8 detectors per byte, little-endian bit order as produced by
+``pack_bits``) and returns packed observable flips or corrections.
 """
 
+from collections import deque
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import time
 
+import numpy as np
+
 from .mwpm_decoder import MWPMDecoder, Syndrome
+from .decoding_graph import DecodingGraph
 from .union_find_decoder import UnionFindDecoder
 from .bp_decoder import BeliefPropagationDecoder, ParityCheck
 from .syndrome_extractor import SyndromeExtractor
 
 
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Pack a (shots x n) binary matrix into (shots x ceil(n / 8)) bytes."""
+    return np.packbits(np.asarray(bits, dtype=bool), axis=-1, bitorder="little")
+
+
+def unpack_bits(packed: np.ndarray, num_bits: int) -> np.ndarray:
+    """Inverse of ``pack_bits``: (shots x num_bits) uint8 matrix."""
+    return np.unpackbits(np.asarray(packed, dtype=np.uint8), axis=-1, count=num_bits, bitorder="little")
+
+
 class DecoderType(Enum):
     """Available decoder types."""
     MWPM = "mwpm"
@@ -29,12 +47,20 @@ class DecoderManager:
     - Decoder selection
     - Performance comparison
     - Unified interface
+    - Batch decoding with throughput and latency statistics
     """
     
+    # Shots per decoder call in batch mode (bounds BP message memory)
+    DEFAULT_CHUNK_SIZE = 4096
+    
+    # Most recent per-shot latencies kept for percentiles
+    LATENCY_WINDOW = 1 << 16
+    
     def __init__(self):
         """Initialize decoder manager."""
         self.decoders: Dict[str, Any] = {}
         self.performance_stats: Dict[str, List[float]] = {}
+        self.batch_stats: Dict[str, Dict[str, Any]] = {}
     
     def register_decoder(
         self,
@@ -50,6 +76,7 @@ class DecoderManager:
         """
         self.decoders[name] = decoder
         self.performance_stats[name] = []
+        self.batch_stats[name] = self._empty_batch_stats()
     
     def decode(
         self,
@@ -74,15 +101,153 @@ class DecoderManager:
         decoder = self.decoders[decoder_name]
         
         # Time the decoding
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = decoder.decode(syndromes, **kwargs)
-        decode_time = time.time() - start_time
+        decode_time = time.perf_counter() - start_time
         
         # Record performance
         self.performance_stats[decoder_name].append(decode_time)
         
         return result
     
+    def decode_batch(
+        self,
+        decoder_name: str,
+        detection_events: np.ndarray,
+        num_detectors: int,
+        output: str = "observables",
+        logicals: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = None,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Decode many shots with a batch-capable decoder.
+        
+        Args:
+            decoder_name: Name of decoder to use
+            detection_events: Packed (shots x ceil(num_detectors / 8)) bytes
+            num_detectors: Detectors per shot
+            output: "observables" (logical flips) or "corrections"
+            logicals: Optional (observables x faults) matrix; observable
+                      flips are then computed from the corrections
+            chunk_size: Shots per decoder call
+            **kwargs: Additional decoder arguments
+        
+        Returns:
+            Packed (shots x ceil(width / 8)) bytes of observable flips or
+            corrections
+        
+        Raises:
+            ValueError: If the packed events do not hold ``num_detectors``
+                        bits per shot, or a BP decoder has a different
+                        number of checks
+        """
+        if decoder_name not in self.decoders:
+            raise KeyError(f"Decoder '{decoder_name}' not registered")
+        if output not in ("observables", "corrections"):
+            raise ValueError(f"Unknown output '{output}'; expected 'observables' or 'corrections'")
+        
+        decoder = self.decoders[decoder_name]
+        if not (isinstance(decoder, BeliefPropagationDecoder) or hasattr(decoder, "decode_batch")):
+            raise TypeError(f"Decoder '{decoder_name}' does not support batch decoding")
+        if (output == "observables" and logicals is None
+                and isinstance(decoder, BeliefPropagationDecoder)):
+            raise ValueError("BP decoding to observables requires a logicals matrix")
+        
+        packed = np.asarray(detection_events, dtype=np.uint8)
+        width = (num_detectors + 7) // 8
+        if packed.ndim != 2 or packed.shape[1] != width:
+            raise ValueError(
+                f"Expected packed events of shape (shots, {width}) for "
+                f"{num_detectors} detectors, got {packed.shape}"
+            )
+        if isinstance(decoder, BeliefPropagationDecoder) and num_detectors != decoder.num_checks:
+            raise ValueError(
+                f"Decoder '{decoder_name}' has {decoder.num_checks} checks, "
+                f"got {num_detectors} detectors per shot"
+            )
+        
+        events = unpack_bits(packed, num_detectors)
+        num_shots = len(events)
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        latencies = np.zeros(num_shots)
+        
+        chunks = []
+        start_time = time.perf_counter()
+        for start in range(0, num_shots, chunk_size):
+            chunk = events[start:start + chunk_size]
+            chunk_start = time.perf_counter()
+            
+            if isinstance(decoder, BeliefPropagationDecoder):
+                result = decoder.decode_batch(chunk, **kwargs).errors
+                # Vectorized decoding: amortize the chunk over its shots
+                latencies[start:start + len(chunk)] = (
+                    (time.perf_counter() - chunk_start) / len(chunk)
+                )
+            else:
+                result = decoder.decode_batch(
+                    chunk,
+                    output="corrections" if logicals is not None else output,
+                    latencies=latencies[start:start + len(chunk)],
+                    **kwargs
+                )
+            
+            if logicals is not None and output == "observables":
+                result = (result.astype(np.int64) @ np.asarray(logicals, dtype=np.int64).T) % 2
+            chunks.append(np.asarray(result, dtype=np.uint8))
+        elapsed = time.perf_counter() - start_time
+        
+        self._record_batch(decoder_name, num_shots, elapsed, latencies)
+        
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.uint8)
+        return pack_bits(np.concatenate(chunks))
+    
+    def _empty_batch_stats(self) -> Dict[str, Any]:
+        return {"shots": 0, "seconds": 0.0, "latencies": deque(maxlen=self.LATENCY_WINDOW)}
+    
+    def _record_batch(self, decoder_name: str, shots: int, seconds: float, latencies: np.ndarray):
+        stats = self.batch_stats[decoder_name]
+        stats["shots"] += shots
+        stats["seconds"] += seconds
+        stats["latencies"].extend(latencies.tolist())
+    
+    def get_batch_stats(self) -> Dict[str, Dict]:
+        """
+        Get batch throughput and latency statistics for all decoders.
+        
+        Latencies are per shot over the most recent ``LATENCY_WINDOW``
+        shots; shots without detection events count as zero.
+        
+        Returns:
+            Dictionary with shots, shots_per_sec and latency percentiles
+            (microseconds) per decoder
+        """
+        stats = {}
+        
+        for name, batch in self.batch_stats.items():
+            latencies = np.fromiter(batch["latencies"], dtype=np.float64) * 1e6
+            if len(latencies):
+                p50, p90, p99, p999 = np.percentile(latencies, [50, 90, 99, 99.9])
+                max_latency = float(latencies.max())
+            else:
+                p50 = p90 = p99 = p999 = max_latency = 0.0
+            
+            stats[name] = {
+                "shots": batch["shots"],
+                "seconds": batch["seconds"],
+                "shots_per_sec": batch["shots"] / batch["seconds"] if batch["seconds"] > 0 else 0.0,
+                "latency_us": {
+                    "p50": float(p50),
+                    "p90": float(p90),
+                    "p99": float(p99),
+                    "p99.9": float(p999),
+                    "max": max_latency,
+                },
+            }
+        
+        return stats
+    
     def compare_decoders(
         self,
         syndromes: List[Syndrome],
@@ -107,9 +272,9 @@ class DecoderManager:
             if name not in self.decoders:
                 continue
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             corrections = self.decode(name, syndromes)
-            decode_time = time.time() - start_time
+            decode_time = time.perf_counter() - start_time
             
             results[name] = {
                 "corrections": corrections,
@@ -179,26 +344,34 @@ class DecoderManager:
         """Clear performance statistics."""
         for name in self.performance_stats:
             self.performance_stats[name] = []
+        for name in self.batch_stats:
+            self.batch_stats[name] = self._empty_batch_stats()
 
 
-def create_surface_code_decoders(distance: int) -> DecoderManager:
+def create_surface_code_decoders(
+    distance: int,
+    graph: Optional[DecodingGraph] = None
+) -> DecoderManager:
     """
     Create decoder manager with surface code decoders.
     
     Args:
         distance: Code distance
+        graph: Decoding graph shared by both decoders (defaults to the
+               square lattice for the distance)
     
     Returns:
-        DecoderManager with MWPM and Union-Find decoders
+        DecoderManager with MWPM (accuracy) and Union-Find (real-time)
+        decoders
     """
     manager = DecoderManager()
     
     # MWPM decoder
-    mwpm = MWPMDecoder(distance)
+    mwpm = MWPMDecoder(distance, graph=graph)
     manager.register_decoder("mwpm", mwpm)
     
-    # Union-Find decoder
-    uf = UnionFindDecoder(distance)
+    # Union-Find decoder: almost-linear time, the real-time option
+    uf = UnionFindDecoder(distance, graph=graph)
     manager.register_decoder("union_find", uf)
     
     return manager
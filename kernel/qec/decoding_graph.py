@@ -0,0 +1,378 @@
+"""
+Decoding Graph
+
+Sparse matching graph shared by graph-based decoders. Nodes are the
+detectors of one check type in a single round; every edge is a fault
+(a data-qubit error) flipping the detectors at its ends, or a single
+detector when the other end is the boundary. Repeated rounds are handled
+as a space-time product: a detector is (node, round) and the same check
+in consecutive rounds is joined by a measurement-error edge of weight
+``time_weight``.
+
+All-pairs shortest paths, boundary distances and path observable
+parities are computed once per graph, so decoding a shot only touches
+the detectors that fired.
+"""
+
+import time
+import numpy as np
+from typing import List, Tuple, Dict, Optional, Sequence, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+
+# Virtual node standing for the code boundary
+BOUNDARY = -1
+
+
+@dataclass
+class DecodingEdge:
+    """
+    Fault mechanism in a decoding graph.
+    
+    Attributes:
+        u: First detector node
+        v: Second detector node, or BOUNDARY
+        weight: Matching weight (log-likelihood ratio)
+        fault: Index of the data qubit (fault) the edge represents
+        observables: Bitmask of logical observables the fault flips
+    """
+    u: int
+    v: int
+    weight: float
+    fault: int
+    observables: int = 0
+
+
+def error_weight(probability: float) -> float:
+    """Matching weight log((1 - p) / p) of a fault with probability p."""
+    if not 0.0 < probability < 0.5:
+        raise ValueError(f"Fault probability must be in (0, 0.5), got {probability}")
+    return float(np.log((1.0 - probability) / probability))
+
+
+class DecodingGraph:
+    """
+    Sparse decoding graph with precomputed path tables.
+    
+    Edges may be added until the first distance query; the tables are
+    then built once and reused by every decode. Graphs returned by the
+    cached constructors are shared and must not be modified.
+    """
+    
+    def __init__(
+        self,
+        num_nodes: int,
+        num_faults: Optional[int] = None,
+        time_weight: float = 1.0,
+        coords: Optional[Sequence[Tuple[int, int]]] = None
+    ):
+        """
+        Initialize an empty decoding graph.
+        
+        Args:
+            num_nodes: Number of detector nodes per round
+            num_faults: Number of fault mechanisms (defaults to edge count)
+            time_weight: Weight of a measurement-error (time-like) edge
+            coords: Optional (x, y) position of each node
+        """
+        self.num_nodes = num_nodes
+        self.time_weight = time_weight
+        self.edges: List[DecodingEdge] = []
+        self.coords = list(coords) if coords is not None else None
+        self._num_faults = num_faults
+        self._node_index: Optional[Dict[Tuple[int, int], int]] = (
+            {tuple(c): i for i, c in enumerate(self.coords)} if self.coords is not None else None
+        )
+        self._tables_built = False
+    
+    @property
+    def num_observables(self) -> int:
+        """Number of logical observables referenced by the edges."""
+        return max((e.observables.bit_length() for e in self.edges), default=0)
+    
+    @property
+    def num_faults(self) -> int:
+        """Number of fault mechanisms (length of a correction vector)."""
+        if self._num_faults is not None:
+            return self._num_faults
+        return max((e.fault for e in self.edges), default=-1) + 1
+    
+    def add_edge(
+        self,
+        u: int,
+        v: int,
+        weight: float = 1.0,
+        fault: Optional[int] = None,
+        observables: int = 0
+    ) -> DecodingEdge:
+        """
+        Add a fault edge.
+        
+        Args:
+            u: Detector node
+            v: Detector node or BOUNDARY
+            weight: Non-negative matching weight
+            fault: Fault index (defaults to the edge index)
+            observables: Bitmask of observables flipped by the fault
+        
+        Returns:
+            The new edge
+        """
+        if not 0 <= u < self.num_nodes or not (v == BOUNDARY or 0 <= v < self.num_nodes):
+            raise ValueError(f"Edge ({u}, {v}) outside graph of {self.num_nodes} nodes")
+        if u == v:
+            raise ValueError(f"Self loop on node {u}")
+        if weight < 0:
+            raise ValueError(f"Edge weight must be non-negative, got {weight}")
+        
+        edge = DecodingEdge(u, v, float(weight), len(self.edges) if fault is None else fault, observables)
+        self.edges.append(edge)
+        self._tables_built = False
+        return edge
+    
+    @classmethod
+    def from_check_matrix(
+        cls,
+        check_matrix,
+        observables=None,
+        error_probabilities: Optional[Sequence[float]] = None,
+        time_weight: float = 1.0
+    ) -> "DecodingGraph":
+        """
+        Build a graph from a parity-check matrix.
+        
+        Each column (fault) must touch one or two checks; single-check
+        columns become boundary edges.
+        
+        Args:
+            check_matrix: (checks x faults) binary matrix, dense or sparse
+            observables: Optional (observables x faults) binary matrix
+            error_probabilities: Optional per-fault probability for weights
+            time_weight: Weight of measurement-error edges
+        
+        Returns:
+            Decoding graph with one node per check
+        """
+        H = csr_matrix(check_matrix, dtype=np.uint8).tocsc()
+        num_checks, num_faults = H.shape
+        
+        masks = np.zeros(num_faults, dtype=np.int64)
+        if observables is not None:
+            L = csr_matrix(observables, dtype=np.uint8)
+            if L.shape[1] != num_faults:
+                raise ValueError("Observable matrix must have one column per fault")
+            for row in range(L.shape[0]):
+                masks[L.indices[L.indptr[row]:L.indptr[row + 1]]] |= 1 << row
+        
+        graph = cls(num_checks, num_faults=num_faults, time_weight=time_weight)
+        for fault in range(num_faults):
+            checks = H.indices[H.indptr[fault]:H.indptr[fault + 1]]
+            if len(checks) == 0:
+                continue
+            if len(checks) > 2:
+                raise ValueError(f"Fault {fault} touches {len(checks)} checks; graph is not matchable")
+            weight = 1.0 if error_probabilities is None else error_weight(error_probabilities[fault])
+            v = int(checks[1]) if len(checks) == 2 else BOUNDARY
+            graph.add_edge(int(checks[0]), v, weight, fault, int(masks[fault]))
+        return graph
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def square_lattice(cls, size: int) -> "DecodingGraph":
+        """
+        Shared size x size grid graph with an open boundary on every side.
+        
+        Node (x, y) is index ``y * size + x``; neighbours are joined by
+        unit-weight edges and every border node has a unit-weight edge to
+        the boundary. This is the geometry behind position-based
+        ``Syndrome`` decoding.
+        """
+        coords = [(x, y) for y in range(size) for x in range(size)]
+        graph = cls(size * size, coords=coords)
+        for y in range(size):
+            for x in range(size):
+                node = y * size + x
+                if x + 1 < size:
+                    graph.add_edge(node, node + 1)
+                if y + 1 < size:
+                    graph.add_edge(node, node + size)
+                if x in (0, size - 1) or y in (0, size - 1):
+                    graph.add_edge(node, BOUNDARY)
+        graph.build_tables()
+        return graph
+    
+    def node_at(self, position: Tuple[int, int]) -> int:
+        """Node index at an (x, y) position."""
+        if self._node_index is None:
+            raise ValueError("Decoding graph has no node coordinates")
+        try:
+            return self._node_index[tuple(position)]
+        except KeyError:
+            raise ValueError(f"No detector at position {position}") from None
+    
+    def build_tables(self):
+        """Precompute shortest paths, boundary distances and parities."""
+        if self._tables_built:
+            return
+        
+        n = self.num_nodes
+        
+        # Keep the lightest of any parallel edges
+        best: Dict[Tuple[int, int], DecodingEdge] = {}
+        for edge in self.edges:
+            key = (n, edge.u) if edge.v == BOUNDARY else (min(edge.u, edge.v), max(edge.u, edge.v))
+            if key not in best or edge.weight < best[key].weight:
+                best[key] = edge
+        self._edge_between = best
+        
+        rows, cols, weights = [], [], []
+        for (a, b), edge in best.items():
+            # csgraph treats explicit zeros as missing edges
+            w = max(edge.weight, 1e-12)
+            rows += [a, b]
+            cols += [b, a]
+            weights += [w, w]
+        adjacency = csr_matrix((weights, (rows, cols)), shape=(n + 1, n + 1))
+        
+        # Bulk paths avoid the boundary; boundary paths start from it
+        bulk = adjacency[:n, :n]
+        self.distances, self._predecessors = dijkstra(bulk, directed=False, return_predecessors=True)
+        boundary, self._boundary_predecessors = dijkstra(
+            adjacency, directed=False, indices=n, return_predecessors=True
+        )
+        self.boundary_distances = boundary[:n]
+        
+        self.path_observables = self._bulk_observables()
+        self.boundary_observables = self._boundary_observables()
+        
+        self.fault_observables = np.zeros(self.num_faults, dtype=np.int64)
+        for edge in self.edges:
+            self.fault_observables[edge.fault] = edge.observables
+        self._tables_built = True
+    
+    def _bulk_observables(self) -> np.ndarray:
+        """Observable parity of every bulk shortest path, by pointer doubling."""
+        n = self.num_nodes
+        rows = np.arange(n)[:, None]
+        cols = np.arange(n)[None, :]
+        
+        edge_masks = np.zeros((n, n), dtype=np.int64)
+        for (a, b), edge in self._edge_between.items():
+            if a < n:
+                edge_masks[a, b] = edge_masks[b, a] = edge.observables
+        
+        parent = np.where(self._predecessors < 0, rows, self._predecessors)
+        parity = np.where(self._predecessors < 0, 0, edge_masks[parent, cols])
+        while not np.all(parent == rows):
+            parity = parity ^ parity[rows, parent]
+            parent = parent[rows, parent]
+        return parity
+    
+    def _boundary_observables(self) -> np.ndarray:
+        """Observable parity of each node's shortest path to the boundary."""
+        n = self.num_nodes
+        masks = np.zeros(n, dtype=np.int64)
+        for node in np.argsort(self.boundary_distances, kind="stable"):
+            if not np.isfinite(self.boundary_distances[node]):
+                break
+            prev = self._boundary_predecessors[node]
+            if prev == n:
+                masks[node] = self._edge_between[(n, node)].observables
+            else:
+                key = (min(prev, node), max(prev, node))
+                masks[node] = masks[prev] ^ self._edge_between[key].observables
+        return masks
+    
+    def distance(self, u: int, v: int) -> float:
+        """Shortest bulk path weight between two nodes."""
+        self.build_tables()
+        if v == BOUNDARY:
+            return float(self.boundary_distances[u])
+        return float(self.distances[u, v])
+    
+    def path_faults(self, u: int, v: int) -> List[int]:
+        """Faults along the shortest path from u to v (or the boundary)."""
+        self.build_tables()
+        n = self.num_nodes
+        faults = []
+        if v == BOUNDARY:
+            node = u
+            while True:
+                prev = int(self._boundary_predecessors[node])
+                if prev == n:
+                    faults.append(self._edge_between[(n, node)].fault)
+                    return faults
+                if prev < 0:
+                    raise ValueError(f"Node {u} cannot reach the boundary")
+                faults.append(self._edge_between[(min(prev, node), max(prev, node))].fault)
+                node = prev
+        
+        node = v
+        while node != u:
+            prev = int(self._predecessors[u, node])
+            if prev < 0:
+                raise ValueError(f"No path between nodes {u} and {v}")
+            faults.append(self._edge_between[(min(prev, node), max(prev, node))].fault)
+            node = prev
+        return faults
+    
+    def observable_flips(self, correction: np.ndarray) -> int:
+        """Bitmask of observables flipped by a fault-level correction."""
+        self.build_tables()
+        flips = 0
+        for mask in self.fault_observables[np.flatnonzero(correction)]:
+            flips ^= int(mask)
+        return flips
+    
+    def get_stats(self) -> Dict:
+        """Graph size summary."""
+        return {
+            "num_nodes": self.num_nodes,
+            "num_edges": len(self.edges),
+            "num_faults": self.num_faults,
+            "num_observables": self.num_observables,
+            "boundary_edges": sum(1 for e in self.edges if e.v == BOUNDARY),
+            "time_weight": self.time_weight,
+        }
+
+
+def mask_bits(mask: int, width: int) -> np.ndarray:
+    """Unpack an observable bitmask into a uint8 vector of ``width`` bits."""
+    return ((mask >> np.arange(width)) & 1).astype(np.uint8)
+
+
+def decode_shots(
+    events: np.ndarray,
+    decode_shot: Callable[[np.ndarray], np.ndarray],
+    width: int,
+    latencies: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Run a per-shot decoder over a batch of detection events.
+    
+    Args:
+        events: (shots x detectors) binary matrix
+        decode_shot: Maps one shot's detection events to ``width`` output bits
+        width: Output bits per shot
+        latencies: Optional per-shot array filled with decode seconds
+    
+    Returns:
+        (shots x width) uint8 matrix
+    """
+    events = np.asarray(events, dtype=bool)
+    events = events.reshape(len(events), -1)
+    output = np.zeros((len(events), width), dtype=np.uint8)
+    fired = events.any(axis=1)
+    
+    for shot in range(len(events)):
+        if not fired[shot]:
+            continue
+        start = time.perf_counter()
+        output[shot] = decode_shot(events[shot])
+        if latencies is not None:
+            latencies[shot] = time.perf_counter() - start
+    
+    return output
@@ -1,14 +1,19 @@
 """
 Minimum Weight Perfect Matching (MWPM) Decoder
 
-Implements MWPM decoding for surface codes using a simplified matching algorithm.
+Implements MWPM decoding for surface codes with Edmonds' blossom algorithm
+on a sparse, precomputed decoding graph (boundary and space-time aware).
 This is the gold-standard decoder for surface codes with near-optimal performance.
 """
 
 import numpy as np
-from typing import List, Tuple, Set, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Sequence, Any
 from dataclasses import dataclass
-import heapq
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from .blossom import min_weight_perfect_matching
+from .decoding_graph import DecodingGraph, BOUNDARY, error_weight, mask_bits, decode_shots
 
 
 @dataclass
@@ -38,19 +43,29 @@ class MWPMDecoder:
     """
     Minimum Weight Perfect Matching decoder for surface codes.
     
-    Uses a greedy matching algorithm for demonstration.
-    Production implementation would use Blossom algorithm.
+    Matches defects with the blossom algorithm on a precomputed
+    ``DecodingGraph``. The graph (by default the shared square lattice
+    for the code distance) and its path tables are built once, so a
+    decode only works on the k fired detectors: an O(k^2) cost matrix
+    and blossom over the clusters of defects that could pair up.
     """
     
-    def __init__(self, distance: int):
+    # Fixed-point scale for matching weights
+    WEIGHT_RESOLUTION = 1 << 16
+    
+    def __init__(self, distance: int, graph: Optional[DecodingGraph] = None):
         """
         Initialize MWPM decoder.
         
         Args:
             distance: Code distance
+            graph: Decoding graph (defaults to the distance x distance
+                   square lattice used for position-based syndromes)
         """
         self.distance = distance
         self.lattice_size = distance
+        self.graph = graph if graph is not None else DecodingGraph.square_lattice(distance)
+        self.graph.build_tables()
     
     def decode(
         self,
@@ -62,7 +77,8 @@ class MWPMDecoder:
         
         Args:
             syndromes: List of detected syndromes
-            error_rates: Error rates for weighting (optional)
+            error_rates: Optional {"data": p, "measurement": q} used to
+                         weight time-like against space-like edges
         
         Returns:
             List of correction chains (pairs of positions)
@@ -70,61 +86,222 @@ class MWPMDecoder:
         if not syndromes:
             return []
         
+        time_weight = None
+        if error_rates and "data" in error_rates and "measurement" in error_rates:
+            time_weight = (error_weight(error_rates["measurement"]) /
+                           error_weight(error_rates["data"]))
+        
         # Separate X and Z syndromes
         x_syndromes = [s for s in syndromes if s.parity == 'X']
         z_syndromes = [s for s in syndromes if s.parity == 'Z']
         
         # Match each parity separately
-        x_corrections = self._match_syndromes(x_syndromes, error_rates)
-        z_corrections = self._match_syndromes(z_syndromes, error_rates)
+        x_corrections = self._match_syndromes(x_syndromes, time_weight)
+        z_corrections = self._match_syndromes(z_syndromes, time_weight)
         
         return x_corrections + z_corrections
     
-    def _match_syndromes(
+    def decode_detection_events(self, events: np.ndarray) -> int:
+        """
+        Decode one shot of detection events.
+        
+        Args:
+            events: Binary array of shape (rounds, num_nodes) or flattened
+                    round-major with length a multiple of num_nodes
+        
+        Returns:
+            Bitmask of logical observables flipped by the correction
+        """
+        nodes, times = self._defects(events)
+        flips = 0
+        for i, j in self.match(nodes, times):
+            if j == BOUNDARY:
+                flips ^= int(self.graph.boundary_observables[nodes[i]])
+            else:
+                flips ^= int(self.graph.path_observables[nodes[i], nodes[j]])
+        return flips
+    
+    def correction(self, events: np.ndarray) -> np.ndarray:
+        """
+        Decode one shot to a fault-level correction.
+        
+        Args:
+            events: Detection events as for ``decode_detection_events``
+        
+        Returns:
+            uint8 vector over the graph's faults (1 = apply correction)
+        """
+        nodes, times = self._defects(events)
+        correction = np.zeros(self.graph.num_faults, dtype=np.uint8)
+        for i, j in self.match(nodes, times):
+            target = BOUNDARY if j == BOUNDARY else int(nodes[j])
+            for fault in self.graph.path_faults(int(nodes[i]), target):
+                correction[fault] ^= 1
+        return correction
+    
+    def decode_batch(
         self,
-        syndromes: List[Syndrome],
-        error_rates: Optional[Dict[str, float]]
-    ) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        events: np.ndarray,
+        output: str = "observables",
+        latencies: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Decode a batch of shots.
+        
+        Args:
+            events: (shots x detectors) binary matrix, detectors round-major
+            output: "observables" for observable flips or "corrections"
+                    for fault-level corrections
+            latencies: Optional per-shot array filled with decode seconds
+        
+        Returns:
+            (shots x num_observables) or (shots x num_faults) uint8 matrix
         """
-        Match syndromes using greedy algorithm.
+        if output == "observables":
+            width = self.graph.num_observables
+            decode_shot = lambda shot: mask_bits(self.decode_detection_events(shot), width)
+        elif output == "corrections":
+            width = self.graph.num_faults
+            decode_shot = self.correction
+        else:
+            raise ValueError(f"Unknown output '{output}'; expected 'observables' or 'corrections'")
         
-        Production implementation would use Blossom algorithm for
-        true minimum weight perfect matching.
+        return decode_shots(events, decode_shot, width, latencies)
+    
+    def match(
+        self,
+        nodes: Sequence[int],
+        times: Optional[Sequence[int]] = None,
+        time_weight: Optional[float] = None
+    ) -> List[Tuple[int, int]]:
         """
+        Minimum-weight perfect matching of defects.
+        
+        Args:
+            nodes: Graph node of each defect
+            times: Round of each defect (all 0 if omitted)
+            time_weight: Override for the graph's time-like edge weight
+        
+        Returns:
+            (i, j) index pairs into ``nodes``; j is BOUNDARY for defects
+            matched to the boundary
+        
+        Raises:
+            ValueError: If some defect cannot be matched
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        k = len(nodes)
+        if k == 0:
+            return []
+        
+        # Space-time distance: bulk path plus |dt| measurement errors
+        costs = self.graph.distances[nodes[:, None], nodes[None, :]]
+        if times is not None:
+            times = np.asarray(times, dtype=np.float64)
+            weight = self.graph.time_weight if time_weight is None else time_weight
+            costs = costs + weight * np.abs(times[:, None] - times[None, :])
+        boundary = self.graph.boundary_distances[nodes]
+        
+        # Pairs costlier than both going to the boundary never help, and
+        # pairs in different components of the graph cannot be joined
+        useful = np.isfinite(costs) & (costs <= boundary[:, None] + boundary[None, :])
+        np.fill_diagonal(useful, False)
+        
+        num_clusters, labels = connected_components(csr_matrix(useful), directed=False)
+        if num_clusters == k:
+            return self._to_boundary(range(k), boundary)
+        
+        pairs = []
+        for cluster in range(num_clusters):
+            members = np.flatnonzero(labels == cluster)
+            if len(members) == 1:
+                pairs += self._to_boundary(members, boundary)
+            elif len(members) == 2:
+                # Connected means pairing is no worse than the boundary
+                pairs.append((int(members[0]), int(members[1])))
+            else:
+                pairs += self._match_cluster(members, costs, boundary, useful)
+        return pairs
+    
+    def _to_boundary(self, members, boundary: np.ndarray) -> List[Tuple[int, int]]:
+        """Match lone defects to the boundary."""
+        for i in members:
+            if not np.isfinite(boundary[i]):
+                raise ValueError("Defect has no partner and no path to the boundary")
+        return [(int(i), BOUNDARY) for i in members]
+    
+    def _match_cluster(
+        self,
+        members: np.ndarray,
+        costs: np.ndarray,
+        boundary: np.ndarray,
+        useful: np.ndarray
+    ) -> List[Tuple[int, int]]:
+        """
+        Blossom matching of one cluster of mutually reachable defects.
+        
+        Vertex m + i is defect i's boundary copy; copies pair with each
+        other for free so any subset of defects can use the boundary.
+        Weights are fixed-point with a one-unit penalty per boundary
+        match in the low digits, breaking ties towards defect pairs.
+        """
+        m = len(members)
+        scale = self.WEIGHT_RESOLUTION
+        ties = m + 1
+        
+        def fixed(value: float) -> int:
+            return int(round(value * scale)) * ties
+        
+        edges = []
+        for a in range(m):
+            i = members[a]
+            for b in range(a + 1, m):
+                j = members[b]
+                if useful[i, j]:
+                    edges.append((a, b, fixed(costs[i, j])))
+            if np.isfinite(boundary[i]):
+                edges.append((a, m + a, fixed(boundary[i]) + 1))
+                for b in range(a + 1, m):
+                    if np.isfinite(boundary[members[b]]):
+                        edges.append((m + a, m + b, 0))
+        
+        try:
+            mate = min_weight_perfect_matching(2 * m, edges)
+        except ValueError:
+            raise ValueError("Defects admit no perfect matching") from None
+        
+        pairs = []
+        for a in range(m):
+            if mate[a] == m + a:
+                pairs.append((int(members[a]), BOUNDARY))
+            elif a < mate[a] < m:
+                pairs.append((int(members[a]), int(members[mate[a]])))
+        return pairs
+    
+    def _defects(self, events: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Split fired detector indices into (node, round)."""
+        flat = np.flatnonzero(np.asarray(events).reshape(-1))
+        return flat % self.graph.num_nodes, flat // self.graph.num_nodes
+    
+    def _match_syndromes(
+        self,
+        syndromes: List[Syndrome],
+        time_weight: Optional[float] = None
+    ) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """Match position-based syndromes of one parity."""
         if len(syndromes) == 0:
             return []
         
-        # If odd number of syndromes, add virtual boundary syndrome
-        if len(syndromes) % 2 == 1:
-            # Add boundary syndrome at nearest edge
-            boundary = self._get_boundary_syndrome(syndromes[0])
-            syndromes = syndromes + [boundary]
+        nodes = [self.graph.node_at(s.position) for s in syndromes]
+        times = [s.time for s in syndromes]
         
         corrections = []
-        remaining = set(syndromes)
-        
-        # Greedy matching: repeatedly match closest pairs
-        while len(remaining) > 0:
-            # Pick arbitrary syndrome
-            s1 = next(iter(remaining))
-            remaining.remove(s1)
-            
-            if len(remaining) == 0:
-                break
-            
-            # Find closest remaining syndrome
-            min_dist = float('inf')
-            closest = None
-            
-            for s2 in remaining:
-                dist = self._manhattan_distance(s1.position, s2.position)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest = s2
-            
-            if closest:
-                remaining.remove(closest)
-                corrections.append((s1.position, closest.position))
+        for i, j in self.match(nodes, times, time_weight):
+            if j == BOUNDARY:
+                partner = self._get_boundary_syndrome(syndromes[i]).position
+            else:
+                partner = syndromes[j].position
+            corrections.append((syndromes[i].position, partner))
         
         return corrections
     
@@ -169,7 +346,8 @@ class MWPMDecoder:
     def estimate_logical_error_probability(
         self,
         physical_error_rate: float,
-        num_rounds: int = 1
+        num_rounds: int = 1,
+        model: Optional[Any] = None
     ) -> float:
         """
         Estimate logical error probability using threshold formula.
@@ -177,10 +355,14 @@ class MWPMDecoder:
         Args:
             physical_error_rate: Physical error rate
             num_rounds: Number of QEC rounds
+            model: Fitted LogicalErrorModel to use instead of the formula
         
         Returns:
             Estimated logical error probability
         """
+        if model is not None:
+            return model.predict(self.distance, physical_error_rate, rounds=num_rounds)
+        
         # Surface code threshold ~0.01
         threshold = 0.01
         
@@ -206,9 +388,10 @@ class MWPMDecoder:
         """
         return {
             "decoder_type": "MWPM",
-            "algorithm": "Greedy (simplified)",
+            "algorithm": "Blossom (sparse decoding graph)",
             "distance": self.distance,
             "lattice_size": self.lattice_size,
-            "optimal": False,  # Greedy is not optimal
-            "complexity": f"O(n^3) where n = {self.lattice_size}^2"
+            "optimal": True,
+            "complexity": "O(k^3) in the number of defects k per shot",
+            "graph": self.graph.get_stats()
         }
@@ -0,0 +1,224 @@
+"""
+Surface Code Layouts
+
+Stabilizer parity-check matrices, logical operators and syndrome
+extraction schedules for rotated and unrotated (planar) surface codes.
+
+Qubits live on integer coordinates. Each check lists the data qubit it
+touches in each of the four CNOT layers of an extraction round (-1 when
+idle); the orders keep every detector deterministic in a noiseless
+circuit and point hook errors away from the logical direction.
+"""
+
+import numpy as np
+from typing import List, Tuple, Dict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from scipy.sparse import csr_matrix
+
+from .decoding_graph import DecodingGraph
+
+
+# CNOT order per check type as (dx, dy) offsets to data qubits
+ROTATED_X_ORDER = [(1, 1), (-1, 1), (1, -1), (-1, -1)]
+ROTATED_Z_ORDER = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+UNROTATED_X_ORDER = [(0, 1), (1, 0), (-1, 0), (0, -1)]
+UNROTATED_Z_ORDER = [(0, 1), (-1, 0), (1, 0), (0, -1)]
+
+
+@dataclass
+class SurfaceCode:
+    """
+    Surface code layout.
+    
+    Attributes:
+        distance: Code distance
+        kind: "rotated" or "unrotated"
+        data_coords: (x, y) of each data qubit
+        x_check_coords: (x, y) of each X-check ancilla
+        z_check_coords: (x, y) of each Z-check ancilla
+        hx: (X checks x data) parity-check matrix
+        hz: (Z checks x data) parity-check matrix
+        lx: Support of the logical X operator (data vector)
+        lz: Support of the logical Z operator (data vector)
+        x_schedule: (X checks x 4) data qubit per CNOT layer, -1 if idle
+        z_schedule: (Z checks x 4) data qubit per CNOT layer, -1 if idle
+    """
+    distance: int
+    kind: str
+    data_coords: List[Tuple[int, int]]
+    x_check_coords: List[Tuple[int, int]]
+    z_check_coords: List[Tuple[int, int]]
+    hx: csr_matrix
+    hz: csr_matrix
+    lx: np.ndarray
+    lz: np.ndarray
+    x_schedule: np.ndarray
+    z_schedule: np.ndarray
+    _graphs: Dict[Tuple[str, float], DecodingGraph] = field(default_factory=dict, repr=False)
+    
+    @property
+    def num_data(self) -> int:
+        """Number of data qubits."""
+        return len(self.data_coords)
+    
+    def checks(self, basis: str) -> csr_matrix:
+        """Checks that detect errors in a memory experiment of ``basis``."""
+        return self.hz if _basis(basis) == 'Z' else self.hx
+    
+    def logical(self, basis: str) -> np.ndarray:
+        """Logical operator read out by a memory experiment of ``basis``."""
+        return self.lz if _basis(basis) == 'Z' else self.lx
+    
+    def decoding_graph(self, basis: str = 'Z', time_weight: float = 1.0) -> DecodingGraph:
+        """
+        Matching graph for a memory experiment (built once per basis).
+        
+        A Z-basis memory is protected by the Z checks against X errors;
+        each data qubit is an edge between the (at most two) Z checks it
+        touches, and the logical observable is the support of Z_L.
+        
+        Args:
+            basis: 'Z' or 'X'
+            time_weight: Weight of measurement-error edges
+        """
+        key = (_basis(basis), time_weight)
+        if key not in self._graphs:
+            graph = DecodingGraph.from_check_matrix(
+                self.checks(basis), self.logical(basis)[None, :], time_weight=time_weight
+            )
+            graph.build_tables()
+            self._graphs[key] = graph
+        return self._graphs[key]
+
+
+def _basis(basis: str) -> str:
+    basis = basis.upper()
+    if basis not in ('X', 'Z'):
+        raise ValueError(f"Basis must be 'X' or 'Z', got {basis!r}")
+    return basis
+
+
+def _build(
+    distance: int,
+    kind: str,
+    data_coords: List[Tuple[int, int]],
+    x_checks: List[Tuple[int, int]],
+    z_checks: List[Tuple[int, int]],
+    x_order: List[Tuple[int, int]],
+    z_order: List[Tuple[int, int]]
+) -> SurfaceCode:
+    """Assemble matrices, schedules and logicals from coordinates."""
+    index = {c: i for i, c in enumerate(data_coords)}
+    
+    def schedule(checks, order):
+        table = np.full((len(checks), 4), -1, dtype=np.int64)
+        for row, (x, y) in enumerate(checks):
+            for layer, (dx, dy) in enumerate(order):
+                table[row, layer] = index.get((x + dx, y + dy), -1)
+        return table
+    
+    def matrix(table):
+        rows, layers = np.nonzero(table >= 0)
+        return csr_matrix(
+            (np.ones(len(rows), dtype=np.uint8), (rows, table[rows, layers])),
+            shape=(len(table), len(data_coords))
+        )
+    
+    x_schedule = schedule(x_checks, x_order)
+    z_schedule = schedule(z_checks, z_order)
+    hx = matrix(x_schedule)
+    hz = matrix(z_schedule)
+    
+    # Logicals run along a row or column of data qubits; Z_L must commute
+    # with every X check and X_L with every Z check
+    xs = sorted({x for x, _ in data_coords})
+    ys = sorted({y for _, y in data_coords})
+    candidates = []
+    for line in ([c for c in data_coords if c[1] == ys[0]], [c for c in data_coords if c[0] == xs[0]]):
+        support = np.zeros(len(data_coords), dtype=np.uint8)
+        support[[index[c] for c in line]] = 1
+        candidates.append(support)
+    
+    def commuting(checks):
+        for support in candidates:
+            if not np.any(checks.dot(support) % 2):
+                return support
+        raise ValueError(f"No logical operator found for {kind} distance-{distance} code")
+    
+    return SurfaceCode(
+        distance=distance,
+        kind=kind,
+        data_coords=data_coords,
+        x_check_coords=x_checks,
+        z_check_coords=z_checks,
+        hx=hx,
+        hz=hz,
+        lx=commuting(hz),
+        lz=commuting(hx),
+        x_schedule=x_schedule,
+        z_schedule=z_schedule
+    )
+
+
+@lru_cache(maxsize=None)
+def rotated_surface_code(distance: int) -> SurfaceCode:
+    """
+    Rotated surface code: d^2 data qubits and d^2 - 1 checks.
+    
+    Data qubits sit at odd coordinates (2i + 1, 2j + 1); checks at even
+    coordinates, alternating X and Z in a checkerboard, with weight-two X
+    checks on the top/bottom and Z checks on the left/right boundaries.
+    """
+    if distance < 2:
+        raise ValueError(f"Distance must be at least 2, got {distance}")
+    
+    data = [(2 * i + 1, 2 * j + 1) for j in range(distance) for i in range(distance)]
+    x_checks, z_checks = [], []
+    for b in range(distance + 1):
+        for a in range(distance + 1):
+            is_x = (a + b) % 2 == 0
+            on_x_boundary = b in (0, distance) and 0 < a < distance
+            on_z_boundary = a in (0, distance) and 0 < b < distance
+            bulk = 0 < a < distance and 0 < b < distance
+            if is_x and (bulk or on_x_boundary):
+                x_checks.append((2 * a, 2 * b))
+            elif not is_x and (bulk or on_z_boundary):
+                z_checks.append((2 * a, 2 * b))
+    
+    return _build(distance, "rotated", data, x_checks, z_checks, ROTATED_X_ORDER, ROTATED_Z_ORDER)
+
+
+@lru_cache(maxsize=None)
+def unrotated_surface_code(distance: int) -> SurfaceCode:
+    """
+    Unrotated (planar) surface code: d^2 + (d-1)^2 data qubits.
+    
+    On a (2d - 1) x (2d - 1) grid data qubits sit where x + y is even;
+    X checks at odd x / even y and Z checks at even x / odd y, each
+    touching its horizontal and vertical neighbours.
+    """
+    if distance < 2:
+        raise ValueError(f"Distance must be at least 2, got {distance}")
+    
+    size = 2 * distance - 1
+    data = [(x, y) for y in range(size) for x in range(size) if (x + y) % 2 == 0]
+    x_checks = [(x, y) for y in range(size) for x in range(size) if x % 2 == 1 and y % 2 == 0]
+    z_checks = [(x, y) for y in range(size) for x in range(size) if x % 2 == 0 and y % 2 == 1]
+    
+    return _build(distance, "unrotated", data, x_checks, z_checks, UNROTATED_X_ORDER, UNROTATED_Z_ORDER)
+
+
+def make_surface_code(distance: int, kind: str = "rotated") -> SurfaceCode:
+    """
+    Get a (cached) surface code layout.
+    
+    Args:
+        distance: Code distance
+        kind: "rotated" or "unrotated"
+    """
+    if kind == "rotated":
+        return rotated_surface_code(distance)
+    if kind == "unrotated":
+        return unrotated_surface_code(distance)
+    raise ValueError(f"Unknown surface code kind '{kind}'; expected 'rotated' or 'unrotated'")
@@ -2,12 +2,19 @@
 Syndrome Extraction Simulator
 
 Simulates syndrome extraction circuits for QEC codes.
+
+``SurfaceCodeSampler`` runs memory experiments on real rotated/unrotated
+surface code layouts as a Pauli-frame simulation: every gate layer acts
+on (shots x qubits) bit matrices at once, so a batch of shots over many
+rounds costs a few NumPy operations per layer.
 """
 
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union
 from dataclasses import dataclass
 from .mwpm_decoder import Syndrome
+from .decoding_graph import DecodingGraph
+from .surface_code import SurfaceCode, make_surface_code
 
 
 @dataclass
@@ -41,7 +48,8 @@ class SyndromeExtractor:
         self,
         code_distance: int,
         measurement_error_rate: float = 0.01,
-        extraction_time_us: float = 1.0
+        extraction_time_us: float = 1.0,
+        seed: Optional[int] = None
     ):
         """
         Initialize syndrome extractor.
@@ -50,10 +58,12 @@ class SyndromeExtractor:
             code_distance: Code distance
             measurement_error_rate: Measurement error rate
             extraction_time_us: Time per extraction round
+            seed: Seed for the random generator
         """
         self.code_distance = code_distance
         self.measurement_error_rate = measurement_error_rate
         self.extraction_time_us = extraction_time_us
+        self.rng = np.random.default_rng(seed)
         
         # Syndrome history for temporal correlation
         self.syndrome_history: List[SyndromeRound] = []
@@ -170,20 +180,20 @@ class SyndromeExtractor:
         
         # Flip some syndromes due to measurement errors
         for syndrome in ideal_syndromes:
-            if np.random.random() < self.measurement_error_rate:
+            if self.rng.random() < self.measurement_error_rate:
                 # Remove syndrome (measurement error)
                 measured.discard(syndrome)
                 num_errors += 1
         
         # Add spurious syndromes
-        num_spurious = np.random.poisson(
+        num_spurious = self.rng.poisson(
             self.measurement_error_rate * self.code_distance ** 2
         )
         
         for _ in range(num_spurious):
-            x = np.random.randint(0, self.code_distance)
-            y = np.random.randint(0, self.code_distance)
-            parity = np.random.choice(['X', 'Z'])
+            x = int(self.rng.integers(0, self.code_distance))
+            y = int(self.rng.integers(0, self.code_distance))
+            parity = 'X' if self.rng.random() < 0.5 else 'Z'
             
             measured.add(Syndrome(
                 position=(x, y),
@@ -227,3 +237,221 @@ class SyndromeExtractor:
     def clear_history(self):
         """Clear syndrome history."""
         self.syndrome_history = []
+
+
+@dataclass
+class SampleResult:
+    """
+    Detection events from a batch of memory experiments.
+    
+    Attributes:
+        detection_events: (shots x (rounds + 1) * num_checks) uint8,
+                          round-major; the last block compares the final
+                          data readout with the last measured round
+        observable_flips: (shots x 1) uint8 flips of the logical readout
+        rounds: Number of measured syndrome rounds
+        num_checks: Detectors per round
+    """
+    detection_events: np.ndarray
+    observable_flips: np.ndarray
+    rounds: int
+    num_checks: int
+    
+    @property
+    def num_detectors(self) -> int:
+        """Detectors per shot."""
+        return self.detection_events.shape[1]
+
+
+class SurfaceCodeSampler:
+    """
+    Vectorized memory-experiment sampler for surface codes.
+    
+    A Z-basis memory prepares |0>, runs ``rounds`` rounds of syndrome
+    extraction and reads all data qubits out in Z; detectors compare
+    consecutive Z-check outcomes (X basis: the same with X checks).
+    
+    Noise models:
+    - "circuit": depolarizing noise on the extraction circuit: data
+      qubits before each round, after Hadamards and after every CNOT
+      (two-qubit), plus reset and measurement flips
+    - "phenomenological": data depolarizing per round and flipped check
+      outcomes, with no circuit
+    """
+    
+    NOISE_MODELS = ("circuit", "phenomenological")
+    
+    def __init__(
+        self,
+        distance: int,
+        physical_error_rate: float,
+        rounds: Optional[int] = None,
+        kind: str = "rotated",
+        basis: str = 'Z',
+        measurement_error_rate: Optional[float] = None,
+        noise: str = "circuit",
+        seed: Optional[Union[int, np.random.Generator]] = None
+    ):
+        """
+        Initialize sampler.
+        
+        Args:
+            distance: Code distance
+            physical_error_rate: Depolarizing probability per location
+            rounds: Syndrome rounds (defaults to the distance)
+            kind: "rotated" or "unrotated"
+            basis: Memory basis, 'Z' or 'X'
+            measurement_error_rate: Readout flip probability (defaults to
+                                    the physical error rate)
+            noise: "circuit" or "phenomenological"
+            seed: Seed or Generator for reproducible sampling
+        """
+        if noise not in self.NOISE_MODELS:
+            raise ValueError(f"Unknown noise model '{noise}'; expected one of {self.NOISE_MODELS}")
+        
+        self.code: SurfaceCode = make_surface_code(distance, kind)
+        self.distance = distance
+        self.physical_error_rate = physical_error_rate
+        self.measurement_error_rate = (
+            physical_error_rate if measurement_error_rate is None else measurement_error_rate
+        )
+        self.rounds = distance if rounds is None else rounds
+        self.basis = basis.upper()
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        
+        # Qubit layout: data, then X ancillas, then Z ancillas
+        n = self.code.num_data
+        num_x = len(self.code.x_check_coords)
+        num_z = len(self.code.z_check_coords)
+        self.num_qubits = n + num_x + num_z
+        self._data = np.arange(n)
+        self._x_ancillas = n + np.arange(num_x)
+        self._z_ancillas = n + num_x + np.arange(num_z)
+        self._ancillas = np.arange(n, self.num_qubits)
+        
+        # (controls, targets) per CNOT layer: X ancillas control data,
+        # data control Z ancillas
+        self._layers = []
+        for layer in range(4):
+            x_rows = np.flatnonzero(self.code.x_schedule[:, layer] >= 0)
+            z_rows = np.flatnonzero(self.code.z_schedule[:, layer] >= 0)
+            controls = np.concatenate((self._x_ancillas[x_rows], self.code.z_schedule[z_rows, layer]))
+            targets = np.concatenate((self.code.x_schedule[x_rows, layer], self._z_ancillas[z_rows]))
+            self._layers.append((controls, targets))
+        
+        self._checks = self.code.checks(self.basis).T.tocsr()
+        self._logical = self.code.logical(self.basis).astype(np.int64)
+        self.num_checks = self._checks.shape[1]
+    
+    @property
+    def num_detectors(self) -> int:
+        """Detectors per shot: one per basis check per round, plus readout."""
+        return (self.rounds + 1) * self.num_checks
+    
+    def decoding_graph(self) -> DecodingGraph:
+        """Matching graph for this sampler's detectors."""
+        return self.code.decoding_graph(self.basis)
+    
+    def sample(self, shots: int) -> SampleResult:
+        """
+        Sample detection events and logical flips.
+        
+        Args:
+            shots: Number of independent experiments
+        
+        Returns:
+            SampleResult ready for the batch decoders
+        """
+        p = self.physical_error_rate
+        q = self.measurement_error_rate
+        x = np.zeros((shots, self.num_qubits), dtype=bool)
+        z = np.zeros((shots, self.num_qubits), dtype=bool)
+        
+        events = np.zeros((shots, self.rounds + 1, self.num_checks), dtype=np.uint8)
+        previous = np.zeros((shots, self.num_checks), dtype=bool)
+        
+        for r in range(self.rounds):
+            self._depolarize(x, z, self._data, p)
+            if self.noise == "circuit":
+                outcome = self._extraction_round(x, z, p)
+            else:
+                outcome = self._check_parities(x, z)
+            outcome ^= self.rng.random(outcome.shape) < q
+            events[:, r] = outcome ^ previous
+            previous = outcome
+        
+        # Transversal data readout in the memory basis
+        data_flips = (x if self.basis == 'Z' else z)[:, self._data]
+        data_flips = data_flips ^ (self.rng.random(data_flips.shape) < q)
+        final = (data_flips.astype(np.int64) @ self._checks) % 2
+        events[:, self.rounds] = final.astype(bool) ^ previous
+        
+        observable = (data_flips.astype(np.int64) @ self._logical) % 2
+        return SampleResult(
+            detection_events=events.reshape(shots, -1),
+            observable_flips=observable.astype(np.uint8)[:, None],
+            rounds=self.rounds,
+            num_checks=self.num_checks
+        )
+    
+    def _extraction_round(self, x: np.ndarray, z: np.ndarray, p: float) -> np.ndarray:
+        """One noisy extraction circuit; returns the memory-basis outcomes."""
+        ancillas = self._ancillas
+        
+        # Reset ancillas to |0>
+        x[:, ancillas] = False
+        z[:, ancillas] = False
+        x[:, ancillas] ^= self.rng.random((x.shape[0], len(ancillas))) < p
+        
+        self._hadamard(x, z, self._x_ancillas, p)
+        for controls, targets in self._layers:
+            x[:, targets] ^= x[:, controls]
+            z[:, controls] ^= z[:, targets]
+            self._depolarize_pairs(x, z, controls, targets, p)
+        self._hadamard(x, z, self._x_ancillas, p)
+        
+        # Z-basis ancilla measurement reads the X frame
+        measured = self._z_ancillas if self.basis == 'Z' else self._x_ancillas
+        return x[:, measured].copy()
+    
+    def _check_parities(self, x: np.ndarray, z: np.ndarray) -> np.ndarray:
+        """Noise-free check outcomes from the data frame."""
+        frame = (x if self.basis == 'Z' else z)[:, self._data]
+        return ((frame.astype(np.int64) @ self._checks) % 2).astype(bool)
+    
+    def _hadamard(self, x: np.ndarray, z: np.ndarray, qubits: np.ndarray, p: float):
+        x_cols = x[:, qubits]
+        x[:, qubits] = z[:, qubits]
+        z[:, qubits] = x_cols
+        self._depolarize(x, z, qubits, p)
+    
+    def _depolarize(self, x: np.ndarray, z: np.ndarray, qubits: np.ndarray, p: float):
+        """Single-qubit depolarizing: X, Y or Z with probability p / 3 each."""
+        if p <= 0 or len(qubits) == 0:
+            return
+        shape = (x.shape[0], len(qubits))
+        hit = self.rng.random(shape) < p
+        pauli = self.rng.integers(1, 4, size=shape)
+        x[:, qubits] ^= hit & (pauli & 1).astype(bool)
+        z[:, qubits] ^= hit & (pauli & 2).astype(bool)
+    
+    def _depolarize_pairs(
+        self,
+        x: np.ndarray,
+        z: np.ndarray,
+        first: np.ndarray,
+        second: np.ndarray,
+        p: float
+    ):
+        """Two-qubit depolarizing: one of 15 non-identity Paulis with probability p."""
+        if p <= 0 or len(first) == 0:
+            return
+        shape = (x.shape[0], len(first))
+        hit = self.rng.random(shape) < p
+        pauli = self.rng.integers(1, 16, size=shape)
+        x[:, first] ^= hit & (pauli & 1).astype(bool)
+        z[:, first] ^= hit & (pauli & 2).astype(bool)
+        x[:, second] ^= hit & (pauli & 4).astype(bool)
+        z[:, second] ^= hit & (pauli & 8).astype(bool)
+
@@ -0,0 +1,432 @@
+"""
+Monte-Carlo Logical Error Rate Estimation
+
+Samples surface code memory experiments, decodes them and counts logical
+failures over grids of (distance, physical error rate, rounds).
+
+Each grid point is split into fixed-size shards with seeds derived from
+the sweep seed and the point, so results do not depend on worker count
+or scheduling. Shards run on a process pool and a point stops early once
+its confidence interval is tight enough. Finished points can be cached on
+disk, and ``LogicalErrorModel.fit`` turns a sweep into a curve that
+``QECProfile`` can use in place of the closed-form threshold formula.
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import List, Tuple, Dict, Optional, Sequence, Any
+
+import numpy as np
+
+from .mwpm_decoder import MWPMDecoder
+from .union_find_decoder import UnionFindDecoder
+from .syndrome_extractor import SurfaceCodeSampler
+
+
+DECODERS = {
+    "mwpm": MWPMDecoder,
+    "union_find": UnionFindDecoder,
+}
+
+# Bump when sampling or decoding changes so stale cache entries are ignored
+CACHE_VERSION = 1
+
+
+def wilson_interval(failures: int, shots: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion.
+    
+    Args:
+        failures: Observed failures
+        shots: Trials
+        z: Normal quantile (1.96 for 95%)
+    
+    Returns:
+        (low, high) bounds
+    """
+    if shots == 0:
+        return 0.0, 1.0
+    rate = failures / shots
+    denominator = 1 + z * z / shots
+    center = (rate + z * z / (2 * shots)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / shots + z * z / (4 * shots * shots)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def per_round_rate(probability: float, rounds: int) -> float:
+    """Convert a failure probability over ``rounds`` rounds to one round."""
+    if probability >= 0.5:
+        return 0.5
+    # A logical flip is only visible as an odd number of per-round flips
+    return 0.5 * (1 - (1 - 2 * probability) ** (1 / rounds))
+
+
+@dataclass
+class SweepPoint:
+    """
+    Logical failure counts for one (distance, error rate, rounds) point.
+    
+    Attributes:
+        distance: Code distance
+        physical_error_rate: Physical error rate
+        rounds: Syndrome rounds per shot
+        shots: Decoded shots
+        failures: Shots whose decoded observable was wrong
+        seconds: Wall time spent sampling and decoding
+    """
+    distance: int
+    physical_error_rate: float
+    rounds: int
+    shots: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+    
+    @property
+    def logical_error_rate(self) -> float:
+        """Failure probability per shot."""
+        return self.failures / self.shots if self.shots else 0.0
+    
+    @property
+    def logical_error_rate_per_round(self) -> float:
+        """Failure probability per syndrome round."""
+        return per_round_rate(self.logical_error_rate, self.rounds)
+    
+    def confidence_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """Wilson interval of the per-shot failure probability."""
+        return wilson_interval(self.failures, self.shots, z)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+@dataclass
+class LogicalErrorModel:
+    """
+    Fitted per-round logical error rate curve.
+    
+    p_L(d, p) = prefactor * (p / threshold) ^ ((d + 1) / 2) per round,
+    fitted by weighted least squares on log p_L.
+    
+    Attributes:
+        prefactor: Per-round rate at p = threshold
+        threshold: Fitted threshold error rate
+        decoder: Decoder the curve was measured with
+        noise: Noise model of the sweep
+    """
+    prefactor: float
+    threshold: float
+    decoder: str = "mwpm"
+    noise: str = "circuit"
+    
+    @classmethod
+    def fit(cls, points: Sequence[SweepPoint], decoder: str = "mwpm",
+            noise: str = "circuit") -> 'LogicalErrorModel':
+        """
+        Fit the curve to sweep points below threshold.
+        
+        Points without failures carry no slope information and are
+        skipped; each remaining point is weighted by its failure count.
+        
+        Raises:
+            ValueError: If fewer than two distances have failures
+        """
+        usable = [
+            point for point in points
+            if 0 < point.failures and point.logical_error_rate < 0.5
+        ]
+        if len({point.distance for point in usable}) < 2:
+            raise ValueError("Fitting needs failures at two or more distances")
+        
+        # log p_L - k log p = log A - k log p_th with k = (d + 1) / 2
+        k = np.array([(point.distance + 1) / 2 for point in usable])
+        y = np.array([
+            math.log(point.logical_error_rate_per_round) - kk * math.log(point.physical_error_rate)
+            for point, kk in zip(usable, k)
+        ])
+        weights = np.sqrt([point.failures for point in usable])
+        design = np.stack([np.ones_like(k), k], axis=1) * weights[:, None]
+        (log_prefactor, slope), *_ = np.linalg.lstsq(design, y * weights, rcond=None)
+        
+        return cls(
+            prefactor=float(math.exp(log_prefactor)),
+            threshold=float(math.exp(-slope)),
+            decoder=decoder,
+            noise=noise
+        )
+    
+    def per_round(self, distance: int, physical_error_rate: float) -> float:
+        """Logical error rate per syndrome round."""
+        rate = self.prefactor * (physical_error_rate / self.threshold) ** ((distance + 1) / 2)
+        return min(rate, 0.5)
+    
+    def predict(self, distance: int, physical_error_rate: float,
+                rounds: Optional[int] = None) -> float:
+        """
+        Logical error probability over ``rounds`` rounds.
+        
+        Args:
+            distance: Code distance
+            physical_error_rate: Physical error rate
+            rounds: Syndrome rounds (defaults to one logical cycle of d rounds)
+        """
+        rounds = distance if rounds is None else rounds
+        return 0.5 * (1 - (1 - 2 * self.per_round(distance, physical_error_rate)) ** rounds)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LogicalErrorModel':
+        """Create model from dictionary."""
+        return cls(**data)
+
+
+def _run_shard(task: Tuple[Dict[str, Any], int, float, int, int, int]) -> Tuple[int, int]:
+    """Sample and decode one shard; returns (shots, failures)."""
+    config, distance, physical_error_rate, rounds, shard, shots = task
+    sampler = SurfaceCodeSampler(
+        distance,
+        physical_error_rate,
+        rounds=rounds,
+        kind=config["kind"],
+        basis=config["basis"],
+        noise=config["noise"],
+        seed=_shard_seed(config["seed"], distance, physical_error_rate, rounds, shard)
+    )
+    decoder = DECODERS[config["decoder"]](distance, graph=sampler.decoding_graph())
+    
+    result = sampler.sample(shots)
+    predicted = decoder.decode_batch(result.detection_events)
+    failures = int(np.any(predicted != result.observable_flips, axis=1).sum())
+    return shots, failures
+
+
+def _shard_seed(seed: int, distance: int, physical_error_rate: float,
+                rounds: int, shard: int) -> np.random.SeedSequence:
+    """Seed of one shard, independent of how shards are scheduled."""
+    rate_bits = int(np.float64(physical_error_rate).view(np.uint64))
+    return np.random.SeedSequence(seed, spawn_key=(distance, rate_bits, rounds, shard))
+
+
+class ThresholdSweep:
+    """
+    Threshold sweep over (distance, physical error rate, rounds).
+    
+    Example:
+        >>> sweep = ThresholdSweep(decoder="mwpm", workers=4, cache_dir=".qec_cache")
+        >>> points = sweep.run([3, 5, 7], [1e-3, 2e-3, 4e-3])
+        >>> model = sweep.fit(points)
+        >>> profile = surface_code(9, 1e-3, logical_error_model=model)
+    """
+    
+    def __init__(
+        self,
+        decoder: str = "mwpm",
+        kind: str = "rotated",
+        noise: str = "circuit",
+        basis: str = 'Z',
+        shard_shots: int = 1000,
+        max_shots: int = 100_000,
+        min_failures: int = 10,
+        relative_precision: float = 0.2,
+        z: float = 1.96,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        seed: int = 0
+    ):
+        """
+        Initialize sweep.
+        
+        Args:
+            decoder: "mwpm" or "union_find"
+            kind: Surface code kind ("rotated" or "unrotated")
+            noise: Sampler noise model ("circuit" or "phenomenological")
+            basis: Memory basis
+            shard_shots: Shots per shard
+            max_shots: Shot budget per point
+            min_failures: Failures required before stopping early
+            relative_precision: Stop once the interval half-width is below
+                                this fraction of the estimate
+            z: Normal quantile of the confidence interval
+            workers: Process pool size (None or 1 runs in-process)
+            cache_dir: Directory for cached points (None disables caching)
+            seed: Sweep seed; shard seeds derive from it
+        """
+        if decoder not in DECODERS:
+            raise ValueError(f"Unknown decoder '{decoder}'; expected one of {sorted(DECODERS)}")
+        if noise not in SurfaceCodeSampler.NOISE_MODELS:
+            raise ValueError(
+                f"Unknown noise model '{noise}'; expected one of {SurfaceCodeSampler.NOISE_MODELS}"
+            )
+        
+        self.decoder = decoder
+        self.kind = kind
+        self.noise = noise
+        self.basis = basis.upper()
+        self.shard_shots = shard_shots
+        self.max_shots = max_shots
+        self.min_failures = min_failures
+        self.relative_precision = relative_precision
+        self.z = z
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.seed = seed
+        
+        self.stats = {
+            "points": 0,
+            "cached_points": 0,
+            "shards": 0,
+            "shots": 0,
+        }
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Settings that determine sampled results (the cache key)."""
+        return {
+            "version": CACHE_VERSION,
+            "decoder": self.decoder,
+            "kind": self.kind,
+            "noise": self.noise,
+            "basis": self.basis,
+            "shard_shots": self.shard_shots,
+            "max_shots": self.max_shots,
+            "min_failures": self.min_failures,
+            "relative_precision": self.relative_precision,
+            "z": self.z,
+            "seed": self.seed,
+        }
+    
+    def run(
+        self,
+        distances: Sequence[int],
+        physical_error_rates: Sequence[float],
+        rounds: Sequence[Optional[int]] = (None,)
+    ) -> List[SweepPoint]:
+        """
+        Estimate logical error rates over a grid.
+        
+        Args:
+            distances: Code distances
+            physical_error_rates: Physical error rates
+            rounds: Rounds per shot; None means one round per unit distance
+        
+        Returns:
+            One SweepPoint per grid point, in grid order
+        """
+        grid = [
+            (d, float(p), d if r is None else r)
+            for d in distances for p in physical_error_rates for r in rounds
+        ]
+        
+        if self.workers is None or self.workers <= 1:
+            return [self._estimate(point, None) for point in grid]
+        
+        # Never fork: the sweep may run inside the threaded kernel server
+        start_method = ("forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                        else "spawn")
+        context = multiprocessing.get_context(start_method)
+        with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            return [self._estimate(point, pool) for point in grid]
+    
+    def fit(self, points: Sequence[SweepPoint]) -> LogicalErrorModel:
+        """Fit a LogicalErrorModel to sweep results."""
+        return LogicalErrorModel.fit(points, decoder=self.decoder, noise=self.noise)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get sweep statistics."""
+        return self.stats.copy()
+    
+    def _estimate(self, grid_point: Tuple[int, float, int],
+                  pool: Optional[ProcessPoolExecutor]) -> SweepPoint:
+        """Run shards for one point until it converges or exhausts its budget."""
+        distance, physical_error_rate, rounds = grid_point
+        self.stats["points"] += 1
+        
+        cached = self._load(grid_point)
+        if cached is not None:
+            self.stats["cached_points"] += 1
+            return cached
+        
+        config = self.config
+        point = SweepPoint(distance, physical_error_rate, rounds)
+        num_shards = max(1, -(-self.max_shots // self.shard_shots))
+        tasks = [
+            (config, distance, physical_error_rate, rounds, shard,
+             min(self.shard_shots, self.max_shots - shard * self.shard_shots))
+            for shard in range(num_shards)
+        ]
+        
+        start = time.perf_counter()
+        if pool is None:
+            for task in tasks:
+                self._accumulate(point, _run_shard(task))
+                if self._converged(point):
+                    break
+        else:
+            # Keep the pool busy but consume shards in index order, so the
+            # stopping shard (and the result) is the same for any pool size
+            window = 2 * self.workers
+            futures = {}
+            next_shard = 0
+            for shard in range(num_shards):
+                while next_shard < num_shards and next_shard < shard + window:
+                    futures[next_shard] = pool.submit(_run_shard, tasks[next_shard])
+                    next_shard += 1
+                self._accumulate(point, futures.pop(shard).result())
+                if self._converged(point):
+                    break
+            for future in futures.values():
+                future.cancel()
+        point.seconds = time.perf_counter() - start
+        
+        self._store(grid_point, point)
+        return point
+    
+    def _accumulate(self, point: SweepPoint, shard_result: Tuple[int, int]):
+        shots, failures = shard_result
+        point.shots += shots
+        point.failures += failures
+        self.stats["shards"] += 1
+        self.stats["shots"] += shots
+    
+    def _converged(self, point: SweepPoint) -> bool:
+        """Whether the point's confidence interval is tight enough."""
+        if point.failures < self.min_failures:
+            return False
+        low, high = point.confidence_interval(self.z)
+        return (high - low) / 2 <= self.relative_precision * point.logical_error_rate
+    
+    def _cache_path(self, grid_point: Tuple[int, float, int]) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        key = json.dumps({"config": self.config, "point": list(grid_point)}, sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+    
+    def _load(self, grid_point: Tuple[int, float, int]) -> Optional[SweepPoint]:
+        path = self._cache_path(grid_point)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return SweepPoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            # Unreadable entry: resample and overwrite it
+            return None
+    
+    def _store(self, grid_point: Tuple[int, float, int], point: SweepPoint):
+        path = self._cache_path(grid_point)
+        if path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(point.to_dict(), f)
+        os.replace(temporary, path)
@@ -1,14 +1,22 @@
 """
 Union-Find Decoder
 
-Implements Union-Find decoding for surface codes.
+Implements the Delfosse-Nickerson Union-Find decoder for surface codes.
+Clusters grow by half-edges over the decoding graph (unrolled over
+rounds), smallest clusters first, until every cluster is even or touches
+the boundary; a peeling pass over the grown edges then yields the
+correction. Work is proportional to the grown region, which is almost
+linear in the number of defects.
+
 Faster than MWPM with near-optimal performance for most error rates.
 """
 
-from typing import List, Tuple, Dict, Set, Optional
+from typing import List, Tuple, Dict, Set, Optional, Any
 from dataclasses import dataclass
 import numpy as np
 
+from .decoding_graph import DecodingGraph, BOUNDARY, mask_bits, decode_shots
+
 
 @dataclass
 class Syndrome:
@@ -21,30 +29,92 @@ class Syndrome:
         return hash((self.position, self.time, self.parity))
 
 
+class _SpaceTimeLattice:
+    """
+    Decoding graph unrolled over rounds as flat edge arrays.
+    
+    Vertex ``round * num_nodes + node`` is a detector; the last vertex is
+    the boundary. Edge lengths are in half-edge growth units, so a
+    lightest edge is fully grown after two half-steps.
+    """
+    
+    def __init__(self, graph: DecodingGraph, rounds: int):
+        n = graph.num_nodes
+        self.num_nodes = n
+        self.rounds = rounds
+        self.boundary = n * rounds
+        
+        weights = [e.weight for e in graph.edges if e.weight > 0]
+        if rounds > 1 and graph.time_weight > 0:
+            weights.append(graph.time_weight)
+        unit = min(weights, default=1.0)
+        
+        def length(weight: float) -> int:
+            return max(1, int(round(2 * weight / unit)))
+        
+        self.edge_u: List[int] = []
+        self.edge_v: List[int] = []
+        self.length: List[int] = []
+        self.fault: List[int] = []
+        
+        for r in range(rounds):
+            offset = r * n
+            for edge in graph.edges:
+                v = self.boundary if edge.v == BOUNDARY else edge.v + offset
+                self._add(edge.u + offset, v, length(edge.weight), edge.fault)
+            if r + 1 < rounds:
+                # Measurement errors: the same check in consecutive rounds
+                time_length = length(graph.time_weight)
+                for node in range(n):
+                    self._add(offset + node, offset + n + node, time_length, -1)
+        
+        self.adjacency: List[List[int]] = [[] for _ in range(self.boundary + 1)]
+        for e, (u, v) in enumerate(zip(self.edge_u, self.edge_v)):
+            self.adjacency[u].append(e)
+            self.adjacency[v].append(e)
+    
+    def _add(self, u: int, v: int, length: int, fault: int):
+        self.edge_u.append(u)
+        self.edge_v.append(v)
+        self.length.append(length)
+        self.fault.append(fault)
+
+
 class UnionFindDecoder:
     """
     Union-Find decoder for surface codes.
     
-    Uses union-find data structure for fast decoding.
-    Near-optimal performance with O(n log n) complexity.
+    Runs on a ``DecodingGraph`` (by default the shared square lattice for
+    the code distance). Per-shot state lives in dicts keyed by the
+    vertices and edges a decode touches, so nothing is reset or scanned
+    in proportion to the lattice size.
     """
     
-    def __init__(self, distance: int, growth_rate: float = 0.5):
+    def __init__(
+        self,
+        distance: int,
+        growth_rate: float = 0.5,
+        graph: Optional[DecodingGraph] = None
+    ):
         """
         Initialize Union-Find decoder.
         
         Args:
             distance: Code distance
-            growth_rate: Cluster growth rate parameter
+            growth_rate: Fraction of a unit edge grown per step (0.5 is
+                         half-edge growth)
+            graph: Decoding graph (defaults to the distance x distance
+                   square lattice used for position-based syndromes)
         """
         self.distance = distance
         self.lattice_size = distance
         self.growth_rate = growth_rate
+        self.graph = graph if graph is not None else DecodingGraph.square_lattice(distance)
+        self.graph.build_tables()
         
-        # Union-Find data structure
-        self.parent: Dict = {}
-        self.rank: Dict = {}
-        self.cluster_parity: Dict = {}
+        # Support added per growth step, in half-edge units
+        self._growth_step = max(1, int(round(2 * growth_rate)))
+        self._lattices: Dict[int, _SpaceTimeLattice] = {}
     
     def decode(
         self,
@@ -59,7 +129,9 @@ class UnionFindDecoder:
             error_rates: Error rates (optional)
         
         Returns:
-            List of correction chains
+            List of correction chains (pairs of positions; a defect
+            neutralised by the boundary is paired with its nearest
+            boundary position)
         """
         if not syndromes:
             return []
@@ -74,6 +146,75 @@ class UnionFindDecoder:
         
         return x_corrections + z_corrections
     
+    def decode_detection_events(self, events: np.ndarray) -> int:
+        """
+        Decode one shot of detection events.
+        
+        Args:
+            events: Binary array of shape (rounds, num_nodes) or flattened
+                    round-major with length a multiple of num_nodes
+        
+        Returns:
+            Bitmask of logical observables flipped by the correction
+        """
+        return self.graph.observable_flips(self.correction(events))
+    
+    def correction(self, events: np.ndarray) -> np.ndarray:
+        """
+        Decode one shot to a fault-level correction.
+        
+        Args:
+            events: Detection events as for ``decode_detection_events``
+        
+        Returns:
+            uint8 vector over the graph's faults (1 = apply correction)
+        """
+        events = np.asarray(events).reshape(-1)
+        lattice = self._lattice(len(events) // self.graph.num_nodes)
+        _, edges = self._cluster_and_peel(lattice, np.flatnonzero(events).tolist())
+        
+        correction = np.zeros(self.graph.num_faults, dtype=np.uint8)
+        for e in edges:
+            fault = lattice.fault[e]
+            if fault >= 0:
+                correction[fault] ^= 1
+        return correction
+    
+    def decode_batch(
+        self,
+        events: np.ndarray,
+        output: str = "observables",
+        latencies: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Decode a batch of shots.
+        
+        Args:
+            events: (shots x detectors) binary matrix, detectors round-major
+            output: "observables" or "corrections" (fault-level)
+            latencies: Optional per-shot array filled with decode seconds
+        
+        Returns:
+            (shots x num_observables) or (shots x num_faults) uint8 matrix
+        """
+        if output == "observables":
+            width = self.graph.num_observables
+            decode_shot = lambda shot: mask_bits(self.decode_detection_events(shot), width)
+        elif output == "corrections":
+            width = self.graph.num_faults
+            decode_shot = self.correction
+        else:
+            raise ValueError(f"Unknown output '{output}'; expected 'observables' or 'corrections'")
+        
+        return decode_shots(events, decode_shot, width, latencies)
+    
+    def _lattice(self, rounds: int) -> _SpaceTimeLattice:
+        """Space-time lattice for a number of rounds (built once)."""
+        rounds = max(rounds, 1)
+        if rounds not in self._lattices:
+            self._lattices[rounds] = _SpaceTimeLattice(self.graph, rounds)
+        return self._lattices[rounds]
+    
     def _decode_parity(
         self,
         syndromes: List[Syndrome]
@@ -82,149 +223,181 @@ class UnionFindDecoder:
         if not syndromes:
             return []
         
-        # Initialize union-find
-        self._initialize_union_find(syndromes)
+        n = self.graph.num_nodes
+        first = min(s.time for s in syndromes)
+        lattice = self._lattice(max(s.time for s in syndromes) - first + 1)
         
-        # Grow clusters
-        edges = self._get_sorted_edges(syndromes)
+        # A detector reported twice cancels out
+        defects: Set[int] = set()
+        for s in syndromes:
+            defects ^= {(s.time - first) * n + self.graph.node_at(s.position)}
         
-        for edge in edges:
-            s1, s2, weight = edge
-            
-            # Find cluster roots
-            root1 = self._find(s1)
-            root2 = self._find(s2)
-            
-            # If in different clusters, merge
-            if root1 != root2:
-                # Check if merging would create odd parity
-                parity1 = self.cluster_parity.get(root1, 0)
-                parity2 = self.cluster_parity.get(root2, 0)
-                
-                # Union clusters
-                self._union(root1, root2)
-                
-                # Update parity
-                new_root = self._find(root1)
-                self.cluster_parity[new_root] = (parity1 + parity2) % 2
+        pairs, _ = self._cluster_and_peel(lattice, sorted(defects))
         
-        # Extract corrections from cluster structure
-        corrections = self._extract_corrections(syndromes)
+        corrections = []
+        for a, b in pairs:
+            pos = self.graph.coords[a % n]
+            if b == BOUNDARY:
+                corrections.append((pos, self._get_boundary_position(pos)))
+            else:
+                corrections.append((pos, self.graph.coords[b % n]))
         
         return corrections
     
-    def _initialize_union_find(self, syndromes: List[Syndrome]):
-        """Initialize union-find data structure."""
-        self.parent = {}
-        self.rank = {}
-        self.cluster_parity = {}
-        
-        for syndrome in syndromes:
-            self.parent[syndrome] = syndrome
-            self.rank[syndrome] = 0
-            self.cluster_parity[syndrome] = 1  # Each syndrome has odd parity
-    
-    def _find(self, syndrome: Syndrome) -> Syndrome:
-        """Find root of cluster (with path compression)."""
-        if self.parent[syndrome] != syndrome:
-            self.parent[syndrome] = self._find(self.parent[syndrome])
-        return self.parent[syndrome]
-    
-    def _union(self, s1: Syndrome, s2: Syndrome):
-        """Union two clusters (by rank)."""
-        root1 = self._find(s1)
-        root2 = self._find(s2)
-        
-        if root1 == root2:
-            return
-        
-        # Union by rank
-        if self.rank[root1] < self.rank[root2]:
-            self.parent[root1] = root2
-        elif self.rank[root1] > self.rank[root2]:
-            self.parent[root2] = root1
-        else:
-            self.parent[root2] = root1
-            self.rank[root1] += 1
-    
-    def _get_sorted_edges(
+    def _cluster_and_peel(
         self,
-        syndromes: List[Syndrome]
-    ) -> List[Tuple[Syndrome, Syndrome, float]]:
+        lattice: _SpaceTimeLattice,
+        defects: List[int]
+    ) -> Tuple[List[Tuple[int, int]], List[int]]:
         """
-        Get edges sorted by weight (distance).
+        Grow clusters around defects and peel them into a correction.
+        
+        Args:
+            lattice: Space-time lattice
+            defects: Defect vertices
         
         Returns:
-            List of (syndrome1, syndrome2, weight) tuples
+            (defect pairs, correction edges); a pair's second element is
+            BOUNDARY when the boundary neutralised the defect
         """
-        edges = []
+        if not defects:
+            return [], []
         
-        for i, s1 in enumerate(syndromes):
-            for s2 in syndromes[i+1:]:
-                weight = self._edge_weight(s1.position, s2.position)
-                edges.append((s1, s2, weight))
-        
-        # Sort by weight
-        edges.sort(key=lambda x: x[2])
-        
-        return edges
+        grown = self._grow_clusters(lattice, defects)
+        return self._peel(lattice, defects, grown)
     
-    def _edge_weight(
-        self,
-        pos1: Tuple[int, int],
-        pos2: Tuple[int, int]
-    ) -> float:
-        """Calculate edge weight (Manhattan distance)."""
-        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-    
-    def _extract_corrections(
-        self,
-        syndromes: List[Syndrome]
-    ) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    def _grow_clusters(self, lattice: _SpaceTimeLattice, defects: List[int]) -> List[int]:
         """
-        Extract correction chains from cluster structure.
+        Grow odd clusters until all are even or touch the boundary.
         
-        Simplified: pairs syndromes in same cluster.
+        Returns:
+            Fully grown edges
         """
-        # Group syndromes by cluster
-        clusters: Dict[Syndrome, List[Syndrome]] = {}
+        adjacency = lattice.adjacency
+        length = lattice.length
+        edge_u = lattice.edge_u
+        edge_v = lattice.edge_v
+        step = self._growth_step
         
-        for syndrome in syndromes:
-            root = self._find(syndrome)
-            if root not in clusters:
-                clusters[root] = []
-            clusters[root].append(syndrome)
+        parent: Dict[int, int] = {}
+        size: Dict[int, int] = {}
+        parity: Dict[int, int] = {}
+        frontier: Dict[int, List[int]] = {lattice.boundary: []}
+        neutral: Set[int] = {lattice.boundary}
+        support: Dict[int, int] = {}
+        grown: List[int] = []
         
-        # Create corrections by pairing within clusters
-        corrections = []
+        def find(v: int) -> int:
+            root = v
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while v != root:
+                v, parent[v] = parent[v], root
+            return root
+        
+        for d in defects:
+            frontier[d] = [d]
+            parity[d] = 1
+        odd = set(defects)
         
-        for cluster_syndromes in clusters.values():
-            # Pair syndromes greedily
-            remaining = list(cluster_syndromes)
+        while odd:
+            # Weighted growth: only the clusters with the smallest frontier
+            smallest = min(len(frontier[r]) for r in odd)
+            if smallest == 0:
+                raise ValueError("Odd cluster cannot reach a partner or the boundary")
             
-            while len(remaining) >= 2:
-                s1 = remaining.pop(0)
-                
-                # Find closest
-                min_dist = float('inf')
-                closest_idx = 0
-                
-                for i, s2 in enumerate(remaining):
-                    dist = self._edge_weight(s1.position, s2.position)
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest_idx = i
+            fused = []
+            for root in [r for r in odd if len(frontier[r]) == smallest]:
+                remaining = []
+                for v in frontier[root]:
+                    active = False
+                    for e in adjacency[v]:
+                        current = support.get(e, 0)
+                        if current >= length[e]:
+                            continue
+                        current += step
+                        support[e] = current
+                        if current >= length[e]:
+                            fused.append(e)
+                        else:
+                            active = True
+                    if active:
+                        remaining.append(v)
+                frontier[root] = remaining
+            
+            for e in fused:
+                grown.append(e)
+                a, b = find(edge_u[e]), find(edge_v[e])
+                if a == b:
+                    continue
+                # Union by size; fresh vertices start as singleton clusters
+                if size.get(a, 1) < size.get(b, 1):
+                    a, b = b, a
+                parent[b] = a
+                size[a] = size.get(a, 1) + size.get(b, 1)
+                parity[a] = parity.get(a, 0) ^ parity.get(b, 0)
+                frontier.setdefault(a, [a]).extend(frontier.pop(b, [b]))
+                if b in neutral:
+                    neutral.add(a)
                 
-                s2 = remaining.pop(closest_idx)
-                corrections.append((s1.position, s2.position))
+                odd.discard(a)
+                odd.discard(b)
+                if parity[a] and a not in neutral:
+                    odd.add(a)
+        
+        return grown
+    
+    def _peel(
+        self,
+        lattice: _SpaceTimeLattice,
+        defects: List[int],
+        grown: List[int]
+    ) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """Peel spanning trees of the grown edges into a correction."""
+        adjacency: Dict[int, List[Tuple[int, int]]] = {}
+        for e in grown:
+            u, v = lattice.edge_u[e], lattice.edge_v[e]
+            adjacency.setdefault(u, []).append((e, v))
+            adjacency.setdefault(v, []).append((e, u))
+        
+        # Marked vertices, mapped to the defect whose chain reached them
+        origin = {d: d for d in defects}
+        pairs: List[Tuple[int, int]] = []
+        edges: List[int] = []
+        visited: Set[int] = set()
+        
+        # Root boundary-connected trees at the boundary so it absorbs parity
+        for start in [lattice.boundary] + list(defects):
+            if start in visited or start not in adjacency:
+                continue
+            
+            order = [start]
+            parent_edge = {start: (-1, -1)}
+            visited.add(start)
+            for v in order:
+                for e, w in adjacency[v]:
+                    if w not in visited:
+                        visited.add(w)
+                        parent_edge[w] = (e, v)
+                        order.append(w)
             
-            # Handle odd syndrome (connect to boundary)
-            if len(remaining) == 1:
-                s = remaining[0]
-                boundary = self._get_boundary_position(s.position)
-                corrections.append((s.position, boundary))
+            # Leaves first: push each marked vertex's parity to its parent
+            for v in reversed(order[1:]):
+                if v not in origin:
+                    continue
+                e, p = parent_edge[v]
+                edges.append(e)
+                o = origin.pop(v)
+                if p == lattice.boundary:
+                    pairs.append((o, BOUNDARY))
+                elif p in origin:
+                    pairs.append((o, origin.pop(p)))
+                else:
+                    origin[p] = o
         
-        return corrections
+        if origin:
+            raise ValueError("Peeling left unmatched defects")
+        return pairs, edges
     
     def _get_boundary_position(
         self,
@@ -248,13 +421,18 @@ class UnionFindDecoder:
     def estimate_logical_error_probability(
         self,
         physical_error_rate: float,
-        num_rounds: int = 1
+        num_rounds: int = 1,
+        model: Optional[Any] = None
     ) -> float:
         """
         Estimate logical error probability.
         
         Union-Find has slightly worse threshold than MWPM (~0.009 vs 0.01).
+        A fitted LogicalErrorModel passed as ``model`` replaces the formula.
         """
+        if model is not None:
+            return model.predict(self.distance, physical_error_rate, rounds=num_rounds)
+        
         threshold = 0.009  # Union-Find threshold
         
         if physical_error_rate >= threshold:
@@ -270,10 +448,11 @@ class UnionFindDecoder:
         """Get decoder statistics."""
         return {
             "decoder_type": "Union-Find",
-            "algorithm": "Union-Find with cluster growth",
+            "algorithm": "Union-Find (Delfosse-Nickerson) with peeling",
             "distance": self.distance,
             "lattice_size": self.lattice_size,
             "growth_rate": self.growth_rate,
-            "complexity": f"O(n log n) where n = {self.lattice_size}^2",
+            "complexity": "O(k alpha(k)) in the grown region around k defects",
+            "graph": self.graph.get_stats(),
             "threshold": 0.009
         }
@@ -8,6 +8,7 @@ policy enforcement, and entanglement firewall.
 from .tenant_manager import TenantManager, Tenant, TenantQuota
 from .handle_signer import HandleSigner, SignedHandle
 from .audit_logger import AuditLogger, AuditEvent, AuditEventType, AuditSeverity
+from .audit_log_store import AuditLogStore
 from .capability_delegator import CapabilityDelegator, DelegationToken
 from .policy_engine import SecurityPolicyEngine, Policy, PolicyAction, PolicyDecision
 from .entanglement_firewall import (
@@ -35,6 +36,7 @@ __all__ = [
     "AuditEvent",
     "AuditEventType",
     "AuditSeverity",
+    "AuditLogStore",
     "CapabilityDelegator",
     "DelegationToken",
     "SecurityPolicyEngine",
@@ -0,0 +1,597 @@
+"""
+Persistent Audit Log Store
+
+Append-only on-disk storage for audit records, for retention that does
+not fit in memory.
+
+The log is a directory of segment files. A segment holds a header and up
+to ``segment_records`` fixed-size records, so record n of the log lives
+at a computable offset and is read in O(1) through a read-only memory map
+of its segment. Appends are buffered and written with one fsync per
+``sync_every`` records or ``sync_interval`` seconds, whichever comes
+first. A full segment is sealed with a footer carrying the Merkle root of
+its records and the log rolls over to the next segment.
+
+Record payloads are the leaves of one RFC 6962 tree over the whole log.
+Segment sizes are powers of two, so every sealed segment is a complete
+subtree: reopening a log resumes the tree from the sealed roots and only
+rehashes the open segment, and the root equals that of a
+``TamperEvidentAuditLog`` holding the same events.
+
+Layout (little-endian):
+    header  magic, format version, record size, segment records, first sequence
+    record  sequence, timestamp, payload length, CRC-32, payload, zero padding
+    footer  seal magic, record count, Merkle root (sealed segments only)
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
+
+from .merkle_tree import MerkleTree, node_hash
+
+
+SEGMENT_MAGIC = b'QMKAUDIT'
+SEAL_MAGIC = b'QMKSEAL\x00'
+FORMAT_VERSION = 1
+
+SEGMENT_HEADER = struct.Struct('<8sIIIQ')
+SEGMENT_FOOTER = struct.Struct('<8sQ32s')
+RECORD_PREFIX = struct.Struct('<QdI')
+RECORD_HEADER = struct.Struct('<QdII')
+
+
+class AuditLogStore:
+    """
+    Segmented append-only audit log on disk.
+    
+    Records are opaque payloads (e.g. ``AuditEvent.to_bytes()``) numbered
+    by a sequence starting at 0. Only the open segment's Merkle frontier,
+    one root per sealed segment and the unsynced records are kept in
+    memory.
+    
+    Durability: a record is on disk once ``flush()`` returns or the next
+    batch sync happens. On reopen, records torn by a crash at the end of
+    the open segment are dropped; a damaged record followed by intact ones
+    is reported as corruption instead.
+    
+    Example:
+        >>> with AuditLogStore("/var/lib/qmk/audit") as store:
+        ...     sequence = store.append(event.to_bytes(), event.timestamp)
+        ...     assert store.verify_integrity()
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        record_size: int = 1024,
+        segment_records: int = 1 << 16,
+        sync_every: int = 64,
+        sync_interval: Optional[float] = 1.0,
+        max_mapped_segments: int = 16
+    ):
+        """
+        Open or create a store.
+        
+        Args:
+            directory: Directory holding the segment files
+            record_size: Bytes per record, including the record header
+            segment_records: Records per segment (a power of two)
+            sync_every: Records buffered before they are written and fsynced
+            sync_interval: Seconds after which buffered records are synced
+                           on the next append (None disables)
+            max_mapped_segments: Sealed segments kept memory-mapped; one
+                                 still being scanned is unmapped when the
+                                 scan finishes
+        
+        Raises:
+            ValueError: If the parameters are invalid or the directory
+                        holds a store with a different layout, a missing
+                        segment or corrupt records
+        """
+        if record_size <= RECORD_HEADER.size:
+            raise ValueError(f"Record size must exceed the {RECORD_HEADER.size}-byte record header")
+        if segment_records <= 0 or segment_records & (segment_records - 1):
+            raise ValueError(f"Records per segment must be a power of two, got {segment_records}")
+        
+        self.directory = directory
+        self.record_size = record_size
+        self.segment_records = segment_records
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self.max_mapped_segments = max(1, max_mapped_segments)
+        
+        # Sealed segments: root per segment and their frontier in the log tree
+        self._sealed_roots: List[bytes] = []
+        self._sealed_tree = MerkleTree(retain_nodes=False)
+        
+        # Open segment: records written to the file, then records buffered
+        self._segment_tree = MerkleTree(retain_nodes=False)
+        self._file = None
+        self._written = 0
+        self._pending: List[bytes] = []
+        self._last_sync = time.monotonic()
+        
+        self._maps: 'OrderedDict[int, mmap.mmap]' = OrderedDict()
+        self._active_map: Optional[mmap.mmap] = None
+        
+        # Scans pin the mapping they read; one unmapped while pinned is
+        # closed when its last reader releases it
+        self._readers: Dict[int, int] = {}
+        self._retired: Dict[int, mmap.mmap] = {}
+        
+        self.stats = {
+            "appends": 0,
+            "syncs": 0,
+            "segments_sealed": 0,
+            "recovered_records": 0,
+            "truncated_records": 0,
+        }
+        
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+    
+    @property
+    def payload_capacity(self) -> int:
+        """Largest payload that fits in a record."""
+        return self.record_size - RECORD_HEADER.size
+    
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    
+    def append(self, payload: bytes, timestamp: Optional[float] = None) -> int:
+        """
+        Append a record.
+        
+        Args:
+            payload: Record data (at most ``payload_capacity`` bytes)
+            timestamp: Record time (defaults to now)
+        
+        Returns:
+            Sequence number of the record
+        
+        Raises:
+            ValueError: If the payload does not fit in a record
+        """
+        sequence = self.size()
+        self._push(self._encode(sequence, time.time() if timestamp is None else timestamp, payload), payload)
+        return sequence
+    
+    def append_batch(self, payloads: Iterable[bytes], timestamp: Optional[float] = None) -> int:
+        """
+        Append many records with one timestamp.
+        
+        The batch is all or nothing: every payload is checked before the
+        first one is appended.
+        
+        Returns:
+            Sequence number of the last record, or -1 if there were none
+        
+        Raises:
+            ValueError: If any payload does not fit in a record
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        payloads = list(payloads)
+        first = self.size()
+        records = [
+            self._encode(first + offset, timestamp, payload)
+            for offset, payload in enumerate(payloads)
+        ]
+        for record, payload in zip(records, payloads):
+            self._push(record, payload)
+        return first + len(payloads) - 1
+    
+    def flush(self):
+        """Write buffered records and fsync the open segment."""
+        if self._pending:
+            self._file.write(b''.join(self._pending))
+            self._written += len(self._pending)
+            self._pending.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+        self.stats["syncs"] += 1
+    
+    def close(self):
+        """Flush and release files and memory maps."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        self._unmap_active()
+        for mapping in self._maps.values():
+            self._retire(mapping)
+        self._maps.clear()
+    
+    def __enter__(self) -> 'AuditLogStore':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    
+    def size(self) -> int:
+        """Number of records in the log."""
+        return len(self._sealed_roots) * self.segment_records + self._written + len(self._pending)
+    
+    def root(self) -> bytes:
+        """Merkle root over every record payload (empty bytes if empty)."""
+        # The open segment's subtrees are all below the sealed ones
+        levels = self.segment_records.bit_length() - 1
+        frontier = self._segment_tree.frontier + [None] * (levels - len(self._segment_tree.frontier))
+        root = None
+        for subtree in frontier + self._sealed_tree.frontier[levels:]:
+            if subtree is not None:
+                root = subtree if root is None else node_hash(subtree, root)
+        return root or b''
+    
+    def segment_roots(self) -> List[bytes]:
+        """Merkle roots of the sealed segments, in order."""
+        return list(self._sealed_roots)
+    
+    def read(self, sequence: int) -> Optional[bytes]:
+        """
+        Get the payload of one record.
+        
+        Returns:
+            Payload, or None if the sequence is out of range
+        
+        Raises:
+            ValueError: If the record is corrupt
+        """
+        for _, _, payload in self.scan(sequence, sequence + 1):
+            return payload
+        return None
+    
+    def scan(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, float, bytes]]:
+        """
+        Stream records in sequence order.
+        
+        Only one segment is touched at a time; sealed segments are read
+        through their memory maps. Appends made while scanning are safe
+        and, past the end fixed when the scan starts, not included.
+        
+        Args:
+            start: First sequence
+            end: Sequence to stop before (None = end of log)
+        
+        Yields:
+            (sequence, timestamp, payload)
+        
+        Raises:
+            ValueError: If a record is corrupt
+        """
+        size = self.size()
+        end = size if end is None else min(end, size)
+        sequence = max(start, 0)
+        while sequence < end:
+            index, position = divmod(sequence, self.segment_records)
+            stop = min(end, (index + 1) * self.segment_records)
+            for record in self._segment_records(index, position, stop - index * self.segment_records):
+                if record is None:
+                    raise ValueError(f"Corrupt audit record {sequence}")
+                yield record
+                sequence += 1
+    
+    # ------------------------------------------------------------------
+    # Verification
+    # ------------------------------------------------------------------
+    
+    def detect_tampering(self) -> Optional[int]:
+        """
+        Find the first record that is corrupt or no longer matches its seal.
+        
+        Streams through the segments one at a time, rehashing each and
+        comparing it with its footer and with the root recorded when the
+        segment was sealed or the store was opened. Buffered records are
+        flushed first.
+        
+        Returns:
+            Sequence of the first bad record (the first record of a segment
+            whose root no longer matches), or None if the log is intact
+        """
+        self.flush()
+        for index in range(len(self._sealed_roots) + 1):
+            first = index * self.segment_records
+            sealed = index < len(self._sealed_roots)
+            count = self.segment_records if sealed else self._written
+            
+            tree = MerkleTree(retain_nodes=False)
+            for offset, record in enumerate(self._segment_records(index, 0, count)):
+                if record is None or record[0] != first + offset:
+                    return first + offset
+                tree.append(record[2])
+            
+            if sealed:
+                expected = self._sealed_roots[index]
+                if self._read_seal(index) != expected:
+                    return first
+            else:
+                expected = self._segment_tree.root()
+            if tree.root() != expected:
+                return first
+        return None
+    
+    def verify_integrity(self, expected_root: Optional[bytes] = None) -> bool:
+        """
+        Verify every record against the segment seals.
+        
+        Args:
+            expected_root: Optional root published earlier for the current
+                           size; checks the log against it as well
+        
+        Returns:
+            True if no record was modified, dropped or reordered
+        """
+        if self.detect_tampering() is not None:
+            return False
+        return expected_root is None or expected_root == self.root()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        return {
+            **self.stats,
+            "records": self.size(),
+            "segments": len(self._sealed_roots) + 1,
+            "sealed_segments": len(self._sealed_roots),
+            "pending_records": len(self._pending),
+            "mapped_segments": len(self._maps),
+        }
+    
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+    
+    def _path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{index:012d}.seg")
+    
+    def _open(self):
+        """Load sealed roots and recover the open segment."""
+        indices = sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith('.seg'))
+        if indices != list(range(len(indices))):
+            missing = min(set(range(len(indices) + 1)) - set(indices))
+            raise ValueError(f"Audit log segment {missing} is missing from {self.directory}")
+        
+        for index in indices:
+            if index == indices[-1] and self._torn_header(index):
+                # Crashed while creating the segment, before any record
+                self._start_segment(index)
+                return
+            self._check_header(index)
+            root = self._read_seal(index)
+            if root is None:
+                if index != indices[-1]:
+                    raise ValueError(f"Audit log segment {index} is not sealed")
+                self._recover(index)
+                return
+            self._sealed_roots.append(root)
+            self._sealed_tree.append_subtree(root, self.segment_records)
+        
+        self._start_segment(len(self._sealed_roots))
+    
+    def _torn_header(self, index: int) -> bool:
+        """Whether a segment's header is short or was never written."""
+        with open(self._path(index), 'rb') as f:
+            data = f.read(SEGMENT_HEADER.size + 1)
+        if len(data) > SEGMENT_HEADER.size:
+            return False
+        return len(data) < SEGMENT_HEADER.size or not any(data)
+    
+    def _check_header(self, index: int):
+        with open(self._path(index), 'rb') as f:
+            data = f.read(SEGMENT_HEADER.size)
+        if len(data) < SEGMENT_HEADER.size:
+            raise ValueError(f"Audit log segment {index} has a truncated header")
+        magic, version, record_size, segment_records, first = SEGMENT_HEADER.unpack(data)
+        if magic != SEGMENT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Audit log segment {index} is not a version {FORMAT_VERSION} segment")
+        if (record_size, segment_records) != (self.record_size, self.segment_records):
+            raise ValueError(
+                f"Audit log segment {index} uses {record_size}-byte records and "
+                f"{segment_records} records per segment, expected "
+                f"{self.record_size} and {self.segment_records}"
+            )
+        if first != index * self.segment_records:
+            raise ValueError(f"Audit log segment {index} starts at sequence {first}")
+    
+    def _read_seal(self, index: int) -> Optional[bytes]:
+        """Root in a segment's footer, or None if it is not sealed."""
+        path = self._path(index)
+        offset = self._offset(self.segment_records)
+        if os.path.getsize(path) != offset + SEGMENT_FOOTER.size:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            magic, count, root = SEGMENT_FOOTER.unpack(f.read(SEGMENT_FOOTER.size))
+        if magic != SEAL_MAGIC or count != self.segment_records:
+            return None
+        return root
+    
+    def _recover(self, index: int):
+        """Reopen an unsealed segment, dropping records torn by a crash."""
+        path = self._path(index)
+        available = (os.path.getsize(path) - SEGMENT_HEADER.size) // self.record_size
+        # Anything past a full segment can only be a partly written footer
+        available = min(available, self.segment_records)
+        first = index * self.segment_records
+        
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            def intact(position):
+                record = self._decode(mapping, self._offset(position))
+                return record if record is not None and record[0] == first + position else None
+            
+            # Only the tail can be torn; damage before an intact record is corruption
+            count = available
+            while count and intact(count - 1) is None:
+                count -= 1
+            for position in range(count):
+                record = intact(position)
+                if record is None:
+                    raise ValueError(f"Corrupt audit record {first + position}")
+                self._segment_tree.append(record[2])
+        
+        with open(path, 'r+b') as f:
+            f.truncate(self._offset(count))
+            os.fsync(f.fileno())
+        self._written = count
+        self.stats["recovered_records"] += count
+        self.stats["truncated_records"] += available - count
+        self._file = open(path, 'a+b')
+        
+        if count == self.segment_records:
+            # Crashed between the last record and the footer
+            self._seal()
+    
+    def _start_segment(self, index: int):
+        self._file = open(self._path(index), 'w+b')
+        self._file.write(SEGMENT_HEADER.pack(
+            SEGMENT_MAGIC, FORMAT_VERSION, self.record_size, self.segment_records,
+            index * self.segment_records
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._sync_directory()
+    
+    def _seal(self):
+        """Write the footer of the full open segment and roll over."""
+        self.flush()
+        root = self._segment_tree.root()
+        self._file.write(SEGMENT_FOOTER.pack(SEAL_MAGIC, self.segment_records, root))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._unmap_active()
+        
+        self._sealed_roots.append(root)
+        self._sealed_tree.append_subtree(root, self.segment_records)
+        self._segment_tree = MerkleTree(retain_nodes=False)
+        self._written = 0
+        self.stats["segments_sealed"] += 1
+        self._start_segment(len(self._sealed_roots))
+    
+    def _sync_directory(self):
+        """Make new segment files durable (not supported on every platform)."""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+    
+    def _push(self, record: bytes, payload: bytes):
+        """Buffer an encoded record, syncing or sealing as due."""
+        self._pending.append(record)
+        self._segment_tree.append(payload)
+        self.stats["appends"] += 1
+        
+        if self._written + len(self._pending) == self.segment_records:
+            self._seal()
+        elif len(self._pending) >= self.sync_every or (
+                self.sync_interval is not None
+                and time.monotonic() - self._last_sync >= self.sync_interval):
+            self.flush()
+    
+    def _encode(self, sequence: int, timestamp: float, payload: bytes) -> bytes:
+        if len(payload) > self.payload_capacity:
+            raise ValueError(
+                f"Audit record of {len(payload)} bytes exceeds the "
+                f"{self.payload_capacity}-byte record payload"
+            )
+        prefix = RECORD_PREFIX.pack(sequence, timestamp, len(payload))
+        checksum = zlib.crc32(payload, zlib.crc32(prefix))
+        return (prefix + struct.pack('<I', checksum) + payload).ljust(self.record_size, b'\0')
+    
+    def _offset(self, position: int) -> int:
+        """File offset of the record at a position within its segment."""
+        return SEGMENT_HEADER.size + position * self.record_size
+    
+    def _decode(self, buffer, offset: int) -> Optional[Tuple[int, float, bytes]]:
+        """Record at an offset of a buffer, or None if it is damaged."""
+        sequence, timestamp, length, checksum = RECORD_HEADER.unpack_from(buffer, offset)
+        if length > self.payload_capacity:
+            return None
+        start = offset + RECORD_HEADER.size
+        payload = bytes(buffer[start:start + length])
+        prefix = buffer[offset:offset + RECORD_PREFIX.size]
+        if zlib.crc32(payload, zlib.crc32(prefix)) != checksum:
+            return None
+        return sequence, timestamp, payload
+    
+    def _segment_records(self, index: int, start: int,
+                         stop: int) -> Iterator[Optional[Tuple[int, float, bytes]]]:
+        """Decoded records [start, stop) of a segment (None for damaged ones)."""
+        if index < len(self._sealed_roots):
+            yield from self._mapped_records(self._map(index), start, stop)
+            return
+        
+        # Take the buffered records now: appends may flush or seal them
+        written = self._written
+        pending = self._pending[max(start - written, 0):max(stop - written, 0)]
+        if start < min(stop, written):
+            yield from self._mapped_records(self._map_active(), start, min(stop, written))
+        for record in pending:
+            yield self._decode(record, 0)
+    
+    def _mapped_records(self, mapping: mmap.mmap, start: int,
+                        stop: int) -> Iterator[Optional[Tuple[int, float, bytes]]]:
+        """Decode records [start, stop) of a mapping, pinning it meanwhile."""
+        key = id(mapping)
+        self._readers[key] = self._readers.get(key, 0) + 1
+        try:
+            for position in range(start, stop):
+                yield self._decode(mapping, self._offset(position))
+        finally:
+            self._readers[key] -= 1
+            if not self._readers[key]:
+                del self._readers[key]
+                retired = self._retired.pop(key, None)
+                if retired is not None:
+                    retired.close()
+    
+    def _retire(self, mapping: mmap.mmap):
+        """Close a mapping now, or after the scans reading it finish."""
+        if id(mapping) in self._readers:
+            self._retired[id(mapping)] = mapping
+        else:
+            mapping.close()
+    
+    def _map(self, index: int) -> mmap.mmap:
+        """Memory map of a sealed segment (least recently used are unmapped)."""
+        mapping = self._maps.get(index)
+        if mapping is not None:
+            self._maps.move_to_end(index)
+            return mapping
+        with open(self._path(index), 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[index] = mapping
+        if len(self._maps) > self.max_mapped_segments:
+            self._retire(self._maps.popitem(last=False)[1])
+        return mapping
+    
+    def _map_active(self) -> mmap.mmap:
+        """Memory map of the open segment covering every written record."""
+        needed = self._offset(self._written)
+        if self._active_map is None or len(self._active_map) < needed:
+            self._unmap_active()
+            self._file.flush()
+            self._active_map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._active_map
+    
+    def _unmap_active(self):
+        if self._active_map is not None:
+            self._retire(self._active_map)
+            self._active_map = None
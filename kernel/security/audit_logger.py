@@ -2,14 +2,32 @@
 Audit Logging System
 
 Provides comprehensive audit logging for security-relevant events.
+
+Queries are answered from indexes maintained as events are logged: one
+posting list of event ordinals per tenant, session, event type and
+severity, plus a time-ordered index for ranges. A query is driven by its
+most selective index and probes the remaining filters per candidate, so
+its cost follows the smallest matching set instead of the buffer size.
 """
 
 import time
 import json
-from typing import Dict, List, Optional
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .audit_log_store import AuditLogStore
+
+
+# Event attributes with a maintained index
+INDEXED_FIELDS = ("tenant_id", "session_id", "event_type", "severity")
+
+# Prefix of store records continuing an event too large for one record
+# (an event's first record is its JSON, which starts with "{")
+CONTINUATION = b"+"
+
 
 class AuditEventType(Enum):
     """Types of audit events."""
@@ -102,6 +120,15 @@ class AuditEvent:
             "metadata": self.metadata
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AuditEvent':
+        """Create from a dictionary produced by ``to_dict``."""
+        return cls(**{
+            **data,
+            "event_type": AuditEventType(data["event_type"]),
+            "severity": AuditSeverity(data["severity"]),
+        })
+    
     def to_json(self) -> str:
         """Convert to JSON string."""
         return json.dumps(self.to_dict())
@@ -113,21 +140,49 @@ class AuditLogger:
     
     Provides:
     - Event logging with severity levels
-    - Filtering and querying
+    - Indexed filtering and querying, with streaming iterators
     - Export capabilities
     - Retention management
+    
+    Only the latest ``max_events`` are kept in memory; with a ``store``
+    every event is also written to disk as JSON for long-term retention.
+    An event larger than a store record continues in the records after
+    it; its id is the sequence of its first record.
     """
     
-    def __init__(self, max_events: int = 10000):
+    def __init__(self, max_events: int = 10000, store: Optional[AuditLogStore] = None):
         """
         Initialize audit logger.
         
         Args:
             max_events: Maximum events to keep in memory
+            store: Optional persistent store; event ids continue after the
+                   events it already holds
         """
         self.max_events = max_events
-        self.events: List[AuditEvent] = []
-        self.event_counter = 0
+        self.store = store
+        self.event_counter = store.size() if store is not None else 0
+        
+        # Events are addressed by ordinal: the event with ordinal _first sits
+        # at _buffer[_head]. Eviction blanks the head slot and advances it;
+        # the dead prefix of the buffer and the evicted ordinals at the front
+        # of the index lists are dropped together at compaction.
+        self._buffer: List[Optional[AuditEvent]] = []
+        self._head = 0
+        self._first = 0
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {name: {} for name in INDEXED_FIELDS}
+        self._by_time: List[Tuple[float, int]] = []
+        self._evicted = 0
+        self._generation = 0
+    
+    @property
+    def events(self) -> List[AuditEvent]:
+        """Events held in memory, oldest first (a copy)."""
+        return self._buffer[self._head:]
+    
+    def _live(self) -> int:
+        """Number of events held in memory."""
+        return len(self._buffer) - self._head
     
     def log_event(
         self,
@@ -178,11 +233,20 @@ class AuditLogger:
             metadata=metadata or {}
         )
         
-        self.events.append(event)
+        if self.store is not None:
+            self.store.append_batch(self._records(event.to_json().encode('utf-8')), event.timestamp)
+            self.event_counter = self.store.size()
+        self._buffer.append(event)
+        self._index(event, self._first + self._live() - 1)
         
         # Enforce max events limit
-        if len(self.events) > self.max_events:
-            self.events.pop(0)
+        if self._live() > self.max_events:
+            self._buffer[self._head] = None
+            self._head += 1
+            self._first += 1
+            self._evicted += 1
+            if self._evicted > self.max_events:
+                self._compact()
         
         return event
     
@@ -211,34 +275,92 @@ class AuditLogger:
         Returns:
             List of matching AuditEvent objects
         """
-        results = []
+        return list(islice(
+            self.iter_events(tenant_id, session_id, event_type, severity, start_time, end_time),
+            limit
+        ))
+    
+    def iter_events(
+        self,
+        tenant_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        event_type: Optional[AuditEventType] = None,
+        severity: Optional[AuditSeverity] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> Iterator[AuditEvent]:
+        """
+        Stream events matching the filters without building a list.
         
-        for event in reversed(self.events):  # Most recent first
-            if len(results) >= limit:
-                break
-            
-            # Apply filters
-            if tenant_id and event.tenant_id != tenant_id:
-                continue
-            
-            if session_id and event.session_id != session_id:
-                continue
-            
-            if event_type and event.event_type != event_type:
-                continue
+        The smallest of the applicable indexes drives the scan and the
+        other filters are checked per candidate. Events come most recent
+        first (by timestamp when the time index drives the scan); events
+        logged after the iterator was created are not included.
+        
+        Args:
+            Same filters as ``query_events``
+        
+        Returns:
+            Iterator of matching AuditEvent objects; it raises RuntimeError
+            if events are cleared while iterating
+        """
+        filters = (tenant_id, session_id, event_type, severity)
+        ordinals = self._plan(filters, start_time, end_time)
+        return self._matching(ordinals, self._generation, filters, start_time, end_time)
+    
+    def _matching(self, ordinals: Iterator[int], generation: int, filters: Tuple,
+                  start_time: Optional[float], end_time: Optional[float]) -> Iterator[AuditEvent]:
+        """Events at the planned ordinals that pass every filter."""
+        for ordinal in ordinals:
+            if generation != self._generation:
+                raise RuntimeError("Audit events were cleared during iteration")
+            if ordinal < self._first:
+                continue  # Evicted since the scan started
             
-            if severity and event.severity != severity:
+            event = self._buffer[self._head + ordinal - self._first]
+            if any(value and getattr(event, name) != value for name, value in zip(INDEXED_FIELDS, filters)):
                 continue
-            
             if start_time and event.timestamp < start_time:
                 continue
-            
             if end_time and event.timestamp > end_time:
                 continue
-            
-            results.append(event)
+            yield event
+    
+    def iter_stored_events(self, start: int = 0) -> Iterator[AuditEvent]:
+        """
+        Stream events back from the store, oldest first.
+        
+        Args:
+            start: Store sequence to start from; records continuing an
+                   event that began earlier are skipped
         
-        return results
+        Returns:
+            Iterator of AuditEvent objects (empty without a store)
+        """
+        if self.store is None:
+            return
+        parts: List[bytes] = []
+        for _, _, payload in self.store.scan(start):
+            if payload.startswith(CONTINUATION):
+                if parts:
+                    parts.append(payload[len(CONTINUATION):])
+                continue
+            if parts:
+                yield AuditEvent.from_dict(json.loads(b"".join(parts)))
+            parts = [payload]
+        if parts:
+            yield AuditEvent.from_dict(json.loads(b"".join(parts)))
+    
+    def _records(self, data: bytes) -> List[bytes]:
+        """Split an encoded event into store record payloads."""
+        capacity = self.store.payload_capacity
+        if len(data) <= capacity:
+            return [data]
+        step = capacity - len(CONTINUATION)
+        return [data[:capacity]] + [
+            CONTINUATION + data[offset:offset + step]
+            for offset in range(capacity, len(data), step)
+        ]
     
     def get_event_stats(self) -> Dict:
         """
@@ -247,7 +369,7 @@ class AuditLogger:
         Returns:
             Dictionary with event statistics
         """
-        total = len(self.events)
+        total = self._live()
         
         by_type = {}
         by_severity = {}
@@ -291,28 +413,31 @@ class AuditLogger:
         Returns:
             Exported data as string
         """
-        events = self.query_events(
-            tenant_id=tenant_id,
-            start_time=start_time,
-            end_time=end_time,
-            limit=len(self.events)
-        )
+        return "".join(self.iter_export(format, tenant_id, start_time, end_time))
+    
+    def iter_export(
+        self,
+        format: str = "json",
+        tenant_id: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        Stream an export in chunks (one per event) for writing to a file.
+        
+        The chunks concatenate to the output of ``export_events``.
         
-        if format == "json":
-            return json.dumps([e.to_dict() for e in events], indent=2)
-        elif format == "csv":
-            # Simple CSV export
-            lines = ["event_id,event_type,severity,timestamp,tenant_id,session_id,result"]
-            for event in events:
-                lines.append(
-                    f"{event.event_id},{event.event_type.value},"
-                    f"{event.severity.value},{event.timestamp},"
-                    f"{event.tenant_id},{event.session_id or ''},"
-                    f"{event.result}"
-                )
-            return "\n".join(lines)
+        Args:
+            Same as ``export_events``
         
-        raise ValueError(f"Unsupported format: {format}")
+        Returns:
+            Iterator of string chunks
+        """
+        if format not in ("json", "csv"):
+            raise ValueError(f"Unsupported format: {format}")
+        
+        events = self.iter_events(tenant_id=tenant_id, start_time=start_time, end_time=end_time)
+        return self._json_chunks(events) if format == "json" else self._csv_chunks(events)
     
     def clear_events(self, tenant_id: Optional[str] = None):
         """
@@ -322,6 +447,103 @@ class AuditLogger:
             tenant_id: Only clear events for specific tenant (None = all)
         """
         if tenant_id:
-            self.events = [e for e in self.events if e.tenant_id != tenant_id]
+            self._buffer = [e for e in self.events if e.tenant_id != tenant_id]
         else:
-            self.events.clear()
+            self._buffer = []
+        self._reindex()
+    
+    @staticmethod
+    def _json_chunks(events: Iterator[AuditEvent]) -> Iterator[str]:
+        """Indented JSON array, identical to ``json.dumps(list, indent=2)``."""
+        opening = "[\n  "
+        for event in events:
+            yield opening + json.dumps(event.to_dict(), indent=2).replace("\n", "\n  ")
+            opening = ",\n  "
+        yield "[]" if opening == "[\n  " else "\n]"
+    
+    @staticmethod
+    def _csv_chunks(events: Iterator[AuditEvent]) -> Iterator[str]:
+        """Simple CSV export."""
+        yield "event_id,event_type,severity,timestamp,tenant_id,session_id,result"
+        for event in events:
+            yield (
+                f"\n{event.event_id},{event.event_type.value},"
+                f"{event.severity.value},{event.timestamp},"
+                f"{event.tenant_id},{event.session_id or ''},"
+                f"{event.result}"
+            )
+    
+    def _plan(self, filters: Tuple, start_time: Optional[float],
+              end_time: Optional[float]) -> Iterator[int]:
+        """Ordinals to check for a query, from its most selective index."""
+        best_size = self._live()
+        best: Optional[Iterator[int]] = None
+        
+        for name, value in zip(INDEXED_FIELDS, filters):
+            if not value:
+                continue
+            postings = self._indexes[name].get(value)
+            if postings is None:
+                return iter(())
+            start = bisect_left(postings, self._first)
+            if len(postings) - start < best_size:
+                best_size = len(postings) - start
+                best = self._descending(postings, start, len(postings))
+        
+        if start_time or end_time:
+            by_time = self._by_time
+            low = bisect_left(by_time, (start_time, -1)) if start_time else 0
+            high = bisect_right(by_time, (end_time, float('inf'))) if end_time else len(by_time)
+            # Evicted entries are counted too; good enough for an estimate
+            if high - low < best_size:
+                best = (ordinal for _, ordinal in self._descending(by_time, low, high))
+        
+        if best is None:
+            return iter(range(self._first + self._live() - 1, self._first - 1, -1))
+        return best
+    
+    @staticmethod
+    def _descending(items: List, low: int, high: int) -> Iterator:
+        """Yield items[high - 1] down to items[low], reading the list lazily."""
+        for position in range(high - 1, low - 1, -1):
+            yield items[position]
+    
+    def _index(self, event: AuditEvent, ordinal: int):
+        """Add an event to every index."""
+        for name in INDEXED_FIELDS:
+            value = getattr(event, name)
+            if value is not None:
+                self._indexes[name].setdefault(value, []).append(ordinal)
+        
+        entry = (event.timestamp, ordinal)
+        if not self._by_time or self._by_time[-1] <= entry:
+            self._by_time.append(entry)
+        else:
+            # Clock went backwards; copy so running scans keep their positions
+            position = bisect_left(self._by_time, entry)
+            self._by_time = self._by_time[:position] + [entry] + self._by_time[position:]
+    
+    def _compact(self):
+        """Drop evicted events and ordinals (amortized over evictions)."""
+        del self._buffer[:self._head]
+        self._head = 0
+        for name, postings in self._indexes.items():
+            live = {}
+            for value, ordinals in postings.items():
+                start = bisect_left(ordinals, self._first)
+                if start < len(ordinals):
+                    live[value] = ordinals[start:]
+            self._indexes[name] = live
+        self._by_time = [entry for entry in self._by_time if entry[1] >= self._first]
+        self._evicted = 0
+    
+    def _reindex(self):
+        """Rebuild the indexes after events were removed out of order."""
+        self._generation += 1
+        self._head = 0
+        self._first = 0
+        self._evicted = 0
+        self._indexes = {name: {} for name in INDEXED_FIELDS}
+        self._by_time = []
+        for ordinal, event in enumerate(self._buffer):
+            self._index(event, ordinal)
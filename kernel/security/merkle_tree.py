@@ -13,21 +13,50 @@ Security Properties:
 - Tamper Evidence: Any change to data changes the root hash
 - Efficient Verification: Can verify inclusion in O(log n) time
 - Append-Only: New data can be added without recomputing entire tree
+- Consistency: A later tree can be proven to extend an earlier one
 - Cryptographic Binding: Uses SHA-256 for collision resistance
 
+The tree follows RFC 6962 (Certificate Transparency): leaves are hashed
+as SHA-256(0x00 || data) and interior nodes as SHA-256(0x01 || left ||
+right), and a tree of n leaves splits into a complete left subtree of
+the largest power of two below n and the rest. Appends only touch the
+frontier of complete subtree roots, so they cost O(log n) at worst and
+O(1) amortized.
+
 Research:
     - Merkle, R. C. (1988). "A Digital Signature Based on a Conventional 
       Encryption Function"
     - Crosby, M., et al. (2016). "BlockChain Technology: Beyond Bitcoin"
     - Buldas, A., et al. (2000). "Accountable Certificate Management using 
       Undeniable Attestations"
+    - Laurie, B., Langley, A., & Kasper, E. (2013). RFC 6962 "Certificate
+      Transparency"
 """
 
 import hashlib
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple, Iterable
 from dataclasses import dataclass
 
 
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(data: bytes) -> bytes:
+    """RFC 6962 leaf hash: SHA-256(0x00 || data)."""
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """RFC 6962 interior node hash: SHA-256(0x01 || left || right)."""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _split(size: int) -> int:
+    """Largest power of two strictly below ``size`` (size >= 2)."""
+    return 1 << ((size - 1).bit_length() - 1)
+
+
 @dataclass
 class MerkleProof:
     """Proof of inclusion in Merkle tree."""
@@ -35,11 +64,12 @@ class MerkleProof:
     leaf_hash: bytes
     proof_hashes: List[Tuple[str, bytes]]  # ('left'/'right', hash)
     root_hash: bytes
+    tree_size: int = 0
     
     def verify(self, leaf_data: bytes) -> bool:
         """Verify that leaf_data is in the tree."""
         # Hash the leaf data
-        computed_hash = hashlib.sha256(leaf_data).digest()
+        computed_hash = leaf_hash(leaf_data)
         
         if computed_hash != self.leaf_hash:
             return False
@@ -48,13 +78,138 @@ class MerkleProof:
         current_hash = self.leaf_hash
         for direction, sibling_hash in self.proof_hashes:
             if direction == 'left':
-                current_hash = hashlib.sha256(sibling_hash + current_hash).digest()
+                current_hash = node_hash(sibling_hash, current_hash)
             else:
-                current_hash = hashlib.sha256(current_hash + sibling_hash).digest()
+                current_hash = node_hash(current_hash, sibling_hash)
         
         return current_hash == self.root_hash
 
 
+def inclusion_path(index: int, tree_size: int,
+                   range_hash: Callable[[int, int], bytes]) -> List[Tuple[str, bytes]]:
+    """
+    Sibling hashes proving leaf ``index`` in a tree of ``tree_size`` leaves.
+    
+    Args:
+        index: Leaf to prove (0 <= index < tree_size)
+        tree_size: Number of leaves in the tree
+        range_hash: Hash of the subtree over leaves [start, end)
+    
+    Returns:
+        ('left'/'right', hash) pairs from the leaf up, as in ``MerkleProof``
+    """
+    # Descend from the root, recording the sibling at every split
+    path = []
+    start, end = 0, tree_size
+    while end - start > 1:
+        k = _split(end - start)
+        if index < start + k:
+            path.append(('right', range_hash(start + k, end)))
+            end = start + k
+        else:
+            path.append(('left', range_hash(start, start + k)))
+            start += k
+    path.reverse()
+    return path
+
+
+def consistency_path(old_size: int, new_size: int,
+                     range_hash: Callable[[int, int], bytes]) -> List[bytes]:
+    """
+    RFC 6962 consistency proof from ``old_size`` to ``new_size`` leaves.
+    
+    Args:
+        old_size: Size of the earlier tree (0 <= old_size <= new_size)
+        new_size: Size of the later tree
+        range_hash: Hash of the subtree over leaves [start, end)
+    
+    Returns:
+        Consistency proof hashes
+    """
+    if old_size == 0 or old_size == new_size:
+        return []
+    
+    # SUBPROOF(m, D[start:end], complete) unrolled from the root down
+    proof = []
+    start, end, m = 0, new_size, old_size
+    complete = True
+    while m != end - start:
+        k = _split(end - start)
+        if m <= k:
+            proof.append(range_hash(start + k, end))
+            end = start + k
+        else:
+            proof.append(range_hash(start, start + k))
+            start += k
+            m -= k
+            complete = False
+    if not complete:
+        proof.append(range_hash(start, end))
+    proof.reverse()
+    return proof
+
+
+def verify_consistency(
+    old_size: int,
+    new_size: int,
+    old_root: bytes,
+    new_root: bytes,
+    proof: List[bytes]
+) -> bool:
+    """
+    Verify that the tree of ``new_size`` leaves extends that of ``old_size``.
+    
+    Implements the consistency proof check of RFC 9162 section 2.1.4.2.
+    
+    Args:
+        old_size: Size of the earlier tree
+        new_size: Size of the later tree
+        old_root: Root hash of the earlier tree
+        new_root: Root hash of the later tree
+        proof: Proof from ``MerkleTree.get_consistency_proof``
+    
+    Returns:
+        True if the earlier tree is a prefix of the later one
+    """
+    if old_size < 0 or old_size > new_size:
+        return False
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    if old_size == 0:
+        # Every tree extends the empty tree
+        return not proof
+    
+    path = list(proof)
+    if old_size & (old_size - 1) == 0:
+        # The old tree is a complete subtree; its root starts the path
+        path.insert(0, old_root)
+    if not path:
+        return False
+    
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    
+    old_hash = new_hash = path[0]
+    for sibling in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            old_hash = node_hash(sibling, old_hash)
+            new_hash = node_hash(sibling, new_hash)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            new_hash = node_hash(new_hash, sibling)
+        fn >>= 1
+        sn >>= 1
+    
+    return sn == 0 and old_hash == old_root and new_hash == new_root
+
+
 class MerkleTree:
     """
     Cryptographic Merkle tree for tamper-evident audit logs.
@@ -68,15 +223,33 @@ class MerkleTree:
     - Efficient verification: O(log n) proof size
     - Append-only: Can add entries without full recomputation
     
+    Only the frontier (one complete subtree root per set bit of the size)
+    is needed to append and compute the root. With ``retain_nodes`` the
+    tree also keeps every completed subtree hash (about 2n hashes), which
+    is what inclusion and consistency proofs are built from.
+    
     Attributes:
-        leaves: List of leaf hashes
-        tree: Complete binary tree of hashes
+        frontier: Root of the pending complete subtree of size 2^k at
+                  index k, or None
+        nodes: Completed subtree hashes per level (None if not retained)
     """
     
-    def __init__(self):
-        """Initialize empty Merkle tree."""
-        self.leaves: List[bytes] = []
-        self.tree: List[List[bytes]] = []
+    def __init__(self, retain_nodes: bool = True):
+        """
+        Initialize empty Merkle tree.
+        
+        Args:
+            retain_nodes: Keep subtree hashes for proofs and historical roots
+        """
+        self.frontier: List[Optional[bytes]] = []
+        self.nodes: Optional[List[List[bytes]]] = [[]] if retain_nodes else None
+        self._size = 0
+        self._root: Optional[bytes] = b''
+    
+    @property
+    def leaves(self) -> List[bytes]:
+        """Leaf hashes (empty if nodes are not retained)."""
+        return self.nodes[0] if self.nodes is not None else []
     
     def append(self, data: bytes) -> bytes:
         """
@@ -94,36 +267,88 @@ class MerkleTree:
             >>> root2 = tree.append(b'entry2')
             >>> assert root1 != root2  # Root changes
         """
-        # Hash the data
-        leaf_hash = hashlib.sha256(data).digest()
-        self.leaves.append(leaf_hash)
+        self._push(leaf_hash(data))
+        return self.root()
+    
+    def extend(self, items: Iterable[bytes]) -> bytes:
+        """
+        Append many data items with a single root update.
         
-        # Rebuild tree
-        self._build_tree()
+        Args:
+            items: Data items in order
         
+        Returns:
+            Root hash after the last item
+        """
+        for data in items:
+            self._push(leaf_hash(data))
         return self.root()
     
-    def root(self) -> bytes:
+    def append_subtree(self, root: bytes, size: int) -> bytes:
+        """
+        Append a complete subtree of ``size`` leaves given only its root.
+        
+        Lets a frontier-only tree resume from stored subtree roots without
+        rehashing their leaves. The subtree must be aligned: ``size`` is a
+        power of two dividing the current size.
+        
+        Args:
+            root: Root hash of the subtree
+            size: Number of leaves in the subtree
+        
+        Returns:
+            New root hash
+        
+        Raises:
+            ValueError: If nodes are retained or the subtree is not aligned
+        """
+        if self.nodes is not None:
+            raise ValueError("Subtrees can only be appended with retain_nodes=False")
+        if size <= 0 or size & (size - 1) or self._size % size:
+            raise ValueError(f"Subtree of {size} leaves is not aligned at size {self._size}")
+        
+        self._push(root, size.bit_length() - 1)
+        return self.root()
+    
+    def root(self, tree_size: Optional[int] = None) -> bytes:
         """
         Get current root hash.
         
+        Args:
+            tree_size: Root of the tree's first ``tree_size`` leaves instead
+                       (needs retained nodes)
+        
         Returns:
             Root hash, or empty bytes if tree is empty
         """
-        if not self.tree or not self.tree[-1]:
-            return b''
-        return self.tree[-1][0]
+        if tree_size is not None and tree_size != self._size:
+            self._check_size(tree_size)
+            return self._range_hash(0, tree_size) if tree_size else b''
+        
+        if self._root is None:
+            # Fold the frontier, smallest (rightmost) subtree first
+            root = None
+            for subtree in self.frontier:
+                if subtree is not None:
+                    root = subtree if root is None else node_hash(subtree, root)
+            self._root = root
+        return self._root or b''
     
-    def get_proof(self, index: int) -> Optional[MerkleProof]:
+    def get_proof(self, index: int, tree_size: Optional[int] = None) -> Optional[MerkleProof]:
         """
         Get Merkle proof for leaf at index.
         
         Args:
             index: Index of leaf to prove
+            tree_size: Prove inclusion in the tree of this many leaves
+                       (defaults to the current size)
         
         Returns:
             MerkleProof or None if index invalid
         
+        Raises:
+            ValueError: If tree_size is out of range or nodes are not retained
+        
         Example:
             >>> tree = MerkleTree()
             >>> tree.append(b'data1')
@@ -131,42 +356,17 @@ class MerkleTree:
             >>> proof = tree.get_proof(0)
             >>> assert proof.verify(b'data1')
         """
-        if index < 0 or index >= len(self.leaves):
+        tree_size = self._size if tree_size is None else tree_size
+        self._check_size(tree_size)
+        if index < 0 or index >= tree_size:
             return None
         
-        if not self.tree:
-            return None
-        
-        proof_hashes = []
-        current_index = index
-        
-        # Walk up the tree collecting sibling hashes
-        for level in range(len(self.tree) - 1):
-            level_nodes = self.tree[level]
-            
-            # Find sibling
-            if current_index % 2 == 0:
-                # We're a left child, sibling is on right
-                if current_index + 1 < len(level_nodes):
-                    sibling_hash = level_nodes[current_index + 1]
-                    proof_hashes.append(('right', sibling_hash))
-                else:
-                    # No sibling (odd number of nodes), duplicate ourselves
-                    sibling_hash = level_nodes[current_index]
-                    proof_hashes.append(('right', sibling_hash))
-            else:
-                # We're a right child, sibling is on left
-                sibling_hash = level_nodes[current_index - 1]
-                proof_hashes.append(('left', sibling_hash))
-            
-            # Move to parent
-            current_index = current_index // 2
-        
         return MerkleProof(
             leaf_index=index,
-            leaf_hash=self.leaves[index],
-            proof_hashes=proof_hashes,
-            root_hash=self.root()
+            leaf_hash=self.nodes[0][index],
+            proof_hashes=inclusion_path(index, tree_size, self._range_hash),
+            root_hash=self.root(tree_size),
+            tree_size=tree_size
         )
     
     def verify_proof(self, proof: MerkleProof, data: bytes) -> bool:
@@ -182,39 +382,33 @@ class MerkleTree:
         """
         return proof.verify(data)
     
+    def get_consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> List[bytes]:
+        """
+        Prove that the first ``old_size`` leaves form a prefix of the tree.
+        
+        Args:
+            old_size: Size of the earlier tree
+            new_size: Size of the later tree (defaults to the current size)
+        
+        Returns:
+            RFC 6962 consistency proof (O(log n) hashes)
+        
+        Raises:
+            ValueError: If the sizes are out of range
+        """
+        new_size = self._size if new_size is None else new_size
+        self._check_size(new_size)
+        if not 0 <= old_size <= new_size:
+            raise ValueError(f"Old size {old_size} must be between 0 and {new_size}")
+        return consistency_path(old_size, new_size, self._range_hash)
+    
+    def verify_consistency(self, old_size: int, old_root: bytes, proof: List[bytes]) -> bool:
+        """Check a consistency proof from ``old_size`` to the current tree."""
+        return verify_consistency(old_size, self._size, old_root, self.root(), proof)
+    
     def size(self) -> int:
         """Get number of leaves in tree."""
-        return len(self.leaves)
-    
-    def _build_tree(self):
-        """Build Merkle tree from leaves."""
-        if not self.leaves:
-            self.tree = []
-            return
-        
-        # Start with leaves as level 0
-        self.tree = [self.leaves.copy()]
-        
-        # Build up the tree
-        while len(self.tree[-1]) > 1:
-            current_level = self.tree[-1]
-            next_level = []
-            
-            # Process pairs
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                
-                if i + 1 < len(current_level):
-                    right = current_level[i + 1]
-                else:
-                    # Odd number of nodes, duplicate the last one
-                    right = left
-                
-                # Hash the pair
-                parent_hash = hashlib.sha256(left + right).digest()
-                next_level.append(parent_hash)
-            
-            self.tree.append(next_level)
+        return self._size
     
     def get_leaf_hash(self, index: int) -> Optional[bytes]:
         """Get hash of leaf at index."""
@@ -225,7 +419,50 @@ class MerkleTree:
     def to_dict(self) -> dict:
         """Serialize tree to dictionary."""
         return {
-            'size': len(self.leaves),
+            'size': self._size,
             'root': self.root().hex() if self.root() else '',
             'leaves': [leaf.hex() for leaf in self.leaves]
         }
+    
+    def _push(self, node: bytes, level: int = 0):
+        """Add a leaf hash (or subtree root at ``level``), merging up the frontier."""
+        if self.nodes is not None:
+            self.nodes[0].append(node)
+        
+        size = 1 << level
+        while len(self.frontier) < level:
+            self.frontier.append(None)
+        while level < len(self.frontier) and self.frontier[level] is not None:
+            node = node_hash(self.frontier[level], node)
+            self.frontier[level] = None
+            level += 1
+            if self.nodes is not None:
+                if level == len(self.nodes):
+                    self.nodes.append([])
+                self.nodes[level].append(node)
+        
+        if level == len(self.frontier):
+            self.frontier.append(node)
+        else:
+            self.frontier[level] = node
+        self._size += size
+        self._root = None
+    
+    def _range_hash(self, start: int, end: int) -> bytes:
+        """
+        Hash of the subtree over leaves [start, end).
+        
+        Ranges produced by RFC 6962 splits are either complete aligned
+        subtrees (one lookup) or split again, so this is O(log n).
+        """
+        size = end - start
+        if size & (size - 1) == 0:
+            return self.nodes[size.bit_length() - 1][start // size]
+        k = _split(size)
+        return node_hash(self._range_hash(start, start + k), self._range_hash(start + k, end))
+    
+    def _check_size(self, tree_size: int):
+        if not 0 <= tree_size <= self._size:
+            raise ValueError(f"Tree size {tree_size} out of range (tree has {self._size} leaves)")
+        if self.nodes is None:
+            raise ValueError("Proofs and historical roots need a tree with retain_nodes=True")
@@ -32,6 +32,18 @@ Example:
     >>> # Deallocate when done
     >>> allocator.deallocate('tenant1', qubits)
 
+Placement:
+    Free qubits are kept in a bitset with per-region free counts, so an
+    allocation costs O(count + regions) instead of a scan of every qubit.
+    Without a topology a request goes to the fullest region that can hold
+    it (best fit), taking the lowest free ids. With a ``HardwareTopology``
+    the allocator grows a connected, low-diameter patch inside the
+    smallest free component that fits, starting from its most enclosed
+    qubits, so small holes are filled first and large free areas stay
+    intact for later tenants. ``get_fragmentation`` and
+    ``suggest_compaction`` report how scattered free space and tenant
+    patches have become.
+
 Research:
     - Murali, P., et al. (2019). "Software Mitigation of Crosstalk on 
       Noisy Intermediate-Scale Quantum Computers"
@@ -43,10 +55,27 @@ Research:
 """
 
 import time
-from typing import Set, Dict, Optional, List
+from typing import Set, Dict, Optional, List, Iterator, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
+
+if TYPE_CHECKING:
+    from qir.optimizer.topology import HardwareTopology
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Indices of the set bits of a bitset, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count('1')
+
 
 class QubitState(Enum):
     """State of a physical qubit."""
@@ -125,13 +154,20 @@ class PhysicalQubitAllocator:
         allocations: Current allocations by tenant
         quotas: Resource quotas for tenants
         allocation_history: Historical allocation records
+        topology: Hardware connectivity used for placement (optional)
+    
+    Qubit states should be changed through the allocator's methods so the
+    free pool stays in sync.
     """
     
     def __init__(
         self,
         total_qubits: int,
         default_quota: Optional[int] = None,
-        reset_time: float = 0.1
+        reset_time: float = 0.1,
+        topology: Optional['HardwareTopology'] = None,
+        region_size: int = 64,
+        placement_seeds: int = 8
     ):
         """
         Initialize physical qubit allocator.
@@ -140,13 +176,47 @@ class PhysicalQubitAllocator:
             total_qubits: Total number of physical qubits available
             default_quota: Default quota per tenant (None = unlimited)
             reset_time: Time to reset a qubit (seconds)
+            topology: Connectivity of the qubits; enables patch placement
+            region_size: Qubit ids per free-pool region
+            placement_seeds: Starting qubits tried per patch placement
         """
         if total_qubits <= 0:
             raise ValueError("total_qubits must be positive")
+        if region_size <= 0:
+            raise ValueError("region_size must be positive")
+        if topology is not None and topology.num_qubits < total_qubits:
+            raise ValueError(
+                f"Topology has {topology.num_qubits} qubits, "
+                f"fewer than the {total_qubits} to allocate"
+            )
         
         self.total_qubits = total_qubits
         self.default_quota = default_quota
         self.reset_time = reset_time
+        self.topology = topology
+        self.region_size = region_size
+        self.placement_seeds = max(1, placement_seeds)
+        
+        # Free pool: one bit per FREE qubit, plus free counts per region
+        # of region_size consecutive ids
+        self._free_mask = (1 << total_qubits) - 1
+        self._region_free = [
+            min(region_size, total_qubits - start)
+            for start in range(0, total_qubits, region_size)
+        ]
+        self._free_count = total_qubits
+        
+        # Connectivity as bitsets and hop distances; without a topology
+        # consecutive ids count as neighbours
+        everything = self._free_mask
+        if topology is not None:
+            self._adjacency = [mask & everything for mask in topology.adjacency_bitsets[:total_qubits]]
+            distances = topology.distance_matrix[:total_qubits, :total_qubits].astype(np.int64)
+            distances[distances < 0] = total_qubits
+            self._distances: Optional[np.ndarray] = distances
+        else:
+            self._adjacency = [((1 << q >> 1) | (1 << q + 1)) & everything for q in range(total_qubits)]
+            self._distances = None
         
         # Initialize qubit metadata
         self.qubits: Dict[int, QubitMetadata] = {
@@ -166,6 +236,7 @@ class PhysicalQubitAllocator:
         # Statistics
         self.total_allocations = 0
         self.total_deallocations = 0
+        self.disconnected_placements = 0
     
     def allocate(
         self,
@@ -204,33 +275,35 @@ class PhysicalQubitAllocator:
                 f"Requested: {count}, Available: {quota.remaining_quota()}"
             )
         
-        # Find available qubits
-        available = self._get_available_qubits()
-        
-        if len(available) < count:
+        if self._free_count < count:
             raise ResourceError(
                 f"Insufficient physical qubits. "
-                f"Requested: {count}, Available: {len(available)}"
+                f"Requested: {count}, Available: {self._free_count}"
             )
         
         # Select qubits (prefer requested qubits if available)
-        selected = set()
+        selected = []
         
         if preferred_qubits:
-            # Try to allocate preferred qubits
-            preferred_available = preferred_qubits & available
-            selected = set(list(preferred_available)[:count])
+            for qubit_id in sorted(preferred_qubits):
+                if len(selected) == count:
+                    break
+                if 0 <= qubit_id < self.total_qubits and self._free_mask >> qubit_id & 1:
+                    selected.append(qubit_id)
         
-        # Fill remaining with any available qubits
+        # Fill remaining from the free pool
         if len(selected) < count:
-            remaining = available - selected
-            selected.update(list(remaining)[:count - len(selected)])
+            if self.topology is not None:
+                selected = self._place_patch(count, selected)
+            else:
+                selected += self._take_free(count - len(selected), exclude=selected)
+        selected = set(selected)
         
         # Allocate qubits
         now = time.time()
         for qubit_id in selected:
             qubit = self.qubits[qubit_id]
-            qubit.state = QubitState.ALLOCATED
+            self._set_state(qubit, QubitState.ALLOCATED)
             qubit.tenant_id = tenant_id
             qubit.allocated_at = now
             qubit.allocation_count += 1
@@ -241,7 +314,7 @@ class PhysicalQubitAllocator:
         self.allocations[tenant_id].update(selected)
         
         # Update quota
-        quota.allocated_qubits += count
+        quota.allocated_qubits += len(selected)
         quota.total_allocations += 1
         
         # Record allocation
@@ -292,12 +365,12 @@ class PhysicalQubitAllocator:
             
             if reset:
                 # Mark for reset (security best practice)
-                qubit.state = QubitState.RESETTING
+                self._set_state(qubit, QubitState.RESETTING)
                 qubit.last_reset_at = now
                 # In real system, would trigger physical reset
             else:
                 # Direct to free (not recommended for security)
-                qubit.state = QubitState.FREE
+                self._set_state(qubit, QubitState.FREE)
             
             qubit.tenant_id = None
             qubit.allocated_at = None
@@ -366,7 +439,7 @@ class PhysicalQubitAllocator:
         Returns:
             Number of free qubits
         """
-        return len(self._get_available_qubits())
+        return self._free_count
     
     def set_quota(self, tenant_id: str, max_qubits: int) -> None:
         """
@@ -415,7 +488,7 @@ class PhysicalQubitAllocator:
             if qubit.state == QubitState.ALLOCATED and qubit.tenant_id:
                 self.deallocate(qubit.tenant_id, {qubit_id}, reset=False)
             
-            qubit.state = QubitState.FAULTY
+            self._set_state(qubit, QubitState.FAULTY)
     
     def mark_maintenance(self, qubit_id: int) -> None:
         """
@@ -431,7 +504,7 @@ class PhysicalQubitAllocator:
             if qubit.state == QubitState.ALLOCATED and qubit.tenant_id:
                 self.deallocate(qubit.tenant_id, {qubit_id}, reset=False)
             
-            qubit.state = QubitState.MAINTENANCE
+            self._set_state(qubit, QubitState.MAINTENANCE)
     
     def restore_qubit(self, qubit_id: int) -> None:
         """
@@ -443,7 +516,7 @@ class PhysicalQubitAllocator:
         if qubit_id in self.qubits:
             qubit = self.qubits[qubit_id]
             if qubit.state in (QubitState.FAULTY, QubitState.MAINTENANCE):
-                qubit.state = QubitState.FREE
+                self._set_state(qubit, QubitState.FREE)
     
     def get_statistics(self) -> Dict:
         """
@@ -454,7 +527,7 @@ class PhysicalQubitAllocator:
         """
         return {
             'total_qubits': self.total_qubits,
-            'free_qubits': len(self._get_available_qubits()),
+            'free_qubits': self._free_count,
             'allocated_qubits': sum(len(q) for q in self.allocations.values()),
             'faulty_qubits': sum(1 for q in self.qubits.values() 
                                 if q.state == QubitState.FAULTY),
@@ -463,17 +536,265 @@ class PhysicalQubitAllocator:
             'total_allocations': self.total_allocations,
             'total_deallocations': self.total_deallocations,
             'active_tenants': len(self.allocations),
+            'disconnected_placements': self.disconnected_placements,
             'utilization': (sum(len(q) for q in self.allocations.values()) / 
                           self.total_qubits * 100)
         }
     
-    def _get_available_qubits(self) -> Set[int]:
-        """Get set of available qubit IDs."""
+    def get_fragmentation(self) -> Dict:
+        """
+        Measure how scattered free space and tenant allocations are.
+        
+        Free blocks are connected components of free qubits (runs of
+        consecutive ids without a topology). Fragmentation is the share of
+        free qubits outside the largest block: 0 when all free space is
+        one block, approaching 1 as it splinters.
+        
+        Returns:
+            Dictionary with free block sizes, fragmentation and, per
+            tenant, the number of connected pieces and the hop diameter
+            of its qubits
+        """
+        blocks = sorted((_popcount(block) for block in self._components(self._free_mask)), reverse=True)
+        largest = blocks[0] if blocks else 0
+        
+        tenants = {}
+        for tenant_id, qubit_ids in self.allocations.items():
+            tenants[tenant_id] = {
+                'qubits': len(qubit_ids),
+                'pieces': len(self._components(sum(1 << q for q in qubit_ids))),
+                'diameter': self._diameter(qubit_ids),
+            }
+        
         return {
-            qid for qid, qubit in self.qubits.items()
-            if qubit.is_available()
+            'free_qubits': self._free_count,
+            'free_blocks': len(blocks),
+            'largest_free_block': largest,
+            'free_block_sizes': blocks,
+            'fragmentation': 1 - largest / self._free_count if self._free_count else 0.0,
+            'tenants': tenants,
         }
     
+    def suggest_compaction(self, max_moves: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """
+        Suggest qubit migrations that would reassemble scattered tenants.
+        
+        Tenants split into the most pieces (then with the widest spread)
+        are considered first. For each, a fresh patch is placed over the
+        free qubits plus its own, preferring qubits it already holds, and
+        kept if it has fewer pieces or a smaller diameter. Later tenants
+        see the free space as it would be after the earlier moves. Nothing
+        is changed; migrating state is up to the caller.
+        
+        Args:
+            max_moves: Stop before exceeding this many moves (None = no limit)
+        
+        Returns:
+            (tenant_id, from_qubit, to_qubit) moves in suggested order
+        """
+        def spread(qubit_ids):
+            return len(self._components(sum(1 << q for q in qubit_ids))), self._diameter(qubit_ids)
+        
+        spreads = {tenant_id: spread(owned) for tenant_id, owned in self.allocations.items()}
+        pool = self._free_mask
+        moves = []
+        for tenant_id in sorted(spreads, key=spreads.get, reverse=True):
+            owned = self.allocations[tenant_id]
+            owned_mask = sum(1 << q for q in owned)
+            placement = self._best_patch(len(owned), pool | owned_mask, prefer=owned_mask)
+            if placement is None:
+                continue
+            target = set(placement[0])
+            if spread(target) >= spreads[tenant_id]:
+                continue
+            
+            sources = sorted(owned - target)
+            destinations = sorted(target - owned)
+            if max_moves is not None and len(moves) + len(sources) > max_moves:
+                break
+            moves += [(tenant_id, source, destination) for source, destination in zip(sources, destinations)]
+            pool = (pool | owned_mask) & ~sum(1 << q for q in target)
+        return moves
+    
+    def _get_available_qubits(self) -> Set[int]:
+        """Get set of available qubit IDs."""
+        return set(_bits(self._free_mask))
+    
+    def _set_state(self, qubit: QubitMetadata, state: QubitState) -> None:
+        """Change a qubit's state, keeping the free pool in sync."""
+        was_free = qubit.state == QubitState.FREE
+        qubit.state = state
+        if was_free == (state == QubitState.FREE):
+            return
+        
+        region = qubit.qubit_id // self.region_size
+        if was_free:
+            self._free_mask &= ~(1 << qubit.qubit_id)
+            self._region_free[region] -= 1
+            self._free_count -= 1
+        else:
+            self._free_mask |= 1 << qubit.qubit_id
+            self._region_free[region] += 1
+            self._free_count += 1
+    
+    def _take_free(self, count: int, exclude: Optional[List[int]] = None) -> List[int]:
+        """
+        Lowest free ids of the fullest region that can hold ``count``
+        qubits, or first fit across regions if none can.
+        
+        Args:
+            count: Qubits to choose
+            exclude: Free qubits already chosen by the caller
+        """
+        free = self._free_mask
+        region_free = list(self._region_free) if exclude else self._region_free
+        for qubit_id in exclude or ():
+            free &= ~(1 << qubit_id)
+            region_free[qubit_id // self.region_size] -= 1
+        
+        fitting = [r for r, available in enumerate(region_free) if available >= count]
+        if fitting:
+            regions = [min(fitting, key=lambda r: region_free[r])]
+        else:
+            regions = [r for r, available in enumerate(region_free) if available]
+        
+        window = (1 << self.region_size) - 1
+        chosen = []
+        for region in regions:
+            start = region * self.region_size
+            for offset in _bits((free >> start) & window):
+                chosen.append(start + offset)
+                if len(chosen) == count:
+                    return chosen
+        return chosen
+    
+    def _place_patch(self, count: int, anchor: List[int]) -> List[int]:
+        """Extend ``anchor`` to a low-diameter patch of ``count`` qubits."""
+        pool = self._free_mask & ~sum(1 << q for q in anchor)
+        patch, disconnected = self._best_patch(count, pool, anchor=anchor)
+        if disconnected:
+            self.disconnected_placements += 1
+        return patch
+    
+    def _best_patch(
+        self,
+        size: int,
+        pool: int,
+        anchor: Optional[List[int]] = None,
+        prefer: int = 0
+    ) -> Optional[Tuple[List[int], bool]]:
+        """
+        Best patch of ``size`` qubits grown from a few seeds.
+        
+        Seeds come from the smallest component of ``pool`` that can hold
+        the patch (the largest one if none can), starting with its qubits
+        that have the fewest pool neighbours, plus qubits in ``prefer``.
+        Patches are ranked by connectivity, diameter, qubits outside
+        ``prefer`` and remaining pool neighbours.
+        
+        Args:
+            size: Patch size, including ``anchor``
+            pool: Bitset of qubits the patch may use
+            anchor: Qubits that must be in the patch (then the only seed)
+            prefer: Bitset of qubits to favour
+        
+        Returns:
+            (patch, disconnected), or None if the pool is too small
+        """
+        if anchor:
+            seeds = [list(anchor)]
+        else:
+            if _popcount(pool) < size:
+                return None
+            components = self._components(pool)
+            fitting = [c for c in components if _popcount(c) >= size]
+            home = min(fitting, key=_popcount) if fitting else max(components, key=_popcount)
+            enclosed = sorted(_bits(home), key=lambda q: (_popcount(self._adjacency[q] & pool), q))
+            preferred = [q for q in _bits(prefer) if any(c >> q & 1 for c in fitting)]
+            starts = enclosed[:self.placement_seeds] + preferred[:self.placement_seeds]
+            seeds = [[q] for q in dict.fromkeys(starts)]
+        
+        best = None
+        for seed in seeds:
+            grown = self._grow(seed, size, pool, prefer)
+            if grown is not None and (best is None or grown[1] < best[1]):
+                best = grown
+        if best is None:
+            return None
+        return best[0], best[1][0]
+    
+    def _grow(self, seed: List[int], size: int, pool: int, prefer: int) -> Optional[Tuple[List[int], tuple]]:
+        """
+        Greedily add the pool neighbour that keeps the patch tightest.
+        
+        Each step adds the frontier qubit with the smallest distance to the
+        farthest patch member, then the smallest total distance. If the
+        frontier runs dry the nearest pool qubit anywhere is taken and the
+        patch is marked disconnected.
+        
+        Returns:
+            (patch, ranking key), or None if the pool runs out
+        """
+        patch = list(seed)
+        pool &= ~sum(1 << q for q in patch)
+        reach = self._distance_rows(patch).max(axis=0)
+        total = self._distance_rows(patch).sum(axis=0)
+        diameter = max(int(reach[q]) for q in patch)
+        frontier = 0
+        for q in patch:
+            frontier |= self._adjacency[q]
+        frontier &= pool
+        disconnected = False
+        
+        while len(patch) < size:
+            candidates = frontier or pool
+            if not candidates:
+                return None
+            if not frontier:
+                disconnected = True
+            qubit = min(
+                _bits(candidates),
+                key=lambda q: (reach[q], total[q], not prefer >> q & 1, q)
+            )
+            patch.append(qubit)
+            diameter = max(diameter, int(reach[qubit]))
+            row = self._distance_rows([qubit])[0]
+            reach = np.maximum(reach, row)
+            total = total + row
+            pool &= ~(1 << qubit)
+            frontier = (frontier | self._adjacency[qubit]) & pool
+        
+        outside = _popcount(sum(1 << q for q in patch) & ~prefer)
+        return patch, (disconnected, diameter, outside, _popcount(frontier))
+    
+    def _distance_rows(self, qubit_ids: List[int]) -> np.ndarray:
+        """Hop distances from each of ``qubit_ids`` to every qubit."""
+        if self._distances is not None:
+            return self._distances[qubit_ids]
+        return np.abs(np.arange(self.total_qubits)[None, :] - np.asarray(qubit_ids)[:, None])
+    
+    def _diameter(self, qubit_ids) -> int:
+        """Largest hop distance between two of ``qubit_ids``."""
+        qubit_ids = sorted(qubit_ids)
+        if len(qubit_ids) < 2:
+            return 0
+        return int(self._distance_rows(qubit_ids)[:, qubit_ids].max())
+    
+    def _components(self, mask: int) -> List[int]:
+        """Connected components of a qubit bitset, as bitsets."""
+        components = []
+        while mask:
+            component = frontier = mask & -mask
+            while frontier:
+                reached = 0
+                for q in _bits(frontier):
+                    reached |= self._adjacency[q]
+                frontier = reached & mask & ~component
+                component |= frontier
+            components.append(component)
+            mask &= ~component
+        return components
+    
     def _get_or_create_quota(self, tenant_id: str) -> TenantQuota:
         """Get or create quota for tenant."""
         if tenant_id not in self.quotas:
@@ -497,7 +818,7 @@ class PhysicalQubitAllocator:
             if qubit_id in self.qubits:
                 qubit = self.qubits[qubit_id]
                 if qubit.state == QubitState.RESETTING:
-                    qubit.state = QubitState.FREE
+                    self._set_state(qubit, QubitState.FREE)
 
 
 class ResourceError(Exception):
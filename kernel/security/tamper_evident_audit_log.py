@@ -18,11 +18,13 @@ Research:
 
 import json
 import time
-from typing import List, Optional, Dict, Any
+from collections import deque
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
-from .merkle_tree import MerkleTree, MerkleProof
+from .merkle_tree import MerkleTree, MerkleProof, leaf_hash, inclusion_path, consistency_path
+from .audit_log_store import AuditLogStore
 
 
 class AuditEventType(Enum):
@@ -73,6 +75,13 @@ class AuditEvent:
         }
         return json.dumps(data, sort_keys=True).encode('utf-8')
     
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'AuditEvent':
+        """Deserialize an event produced by ``to_bytes``."""
+        fields = json.loads(data)
+        fields['event_type'] = AuditEventType(fields['event_type'])
+        return cls(**fields)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -97,17 +106,40 @@ class TamperEvidentAuditLog:
     - Ordering: Sequence numbers prevent reordering
     - Completeness: Missing entries are detectable
     
+    With a ``store``, events live only on disk: ``events`` is None and
+    ``merkle_tree`` keeps just the frontier of the full history, resumed
+    from the store's segment roots. Queries and tamper checks stream from
+    the store, and proofs are built from segment roots plus at most one
+    segment of records.
+    
     Attributes:
         merkle_tree: Merkle tree of audit entries
-        events: List of audit events
+        events: List of audit events (None with a store)
         sequence_counter: Monotonically increasing sequence number
+        store: Optional persistent store
     """
     
-    def __init__(self):
-        """Initialize tamper-evident audit log."""
-        self.merkle_tree = MerkleTree()
-        self.events: List[AuditEvent] = []
-        self.sequence_counter = 0
+    def __init__(self, store: Optional[AuditLogStore] = None):
+        """
+        Initialize tamper-evident audit log.
+        
+        Args:
+            store: Persistent store to write events to; sequence numbers
+                   continue after the events it already holds
+        """
+        self.store = store
+        if store is None:
+            self.merkle_tree = MerkleTree()
+            self.events: Optional[List[AuditEvent]] = []
+            self.sequence_counter = 0
+            return
+        
+        self.merkle_tree = MerkleTree(retain_nodes=False)
+        self.events = None
+        for root in store.segment_roots():
+            self.merkle_tree.append_subtree(root, store.segment_records)
+        self.merkle_tree.extend(payload for _, _, payload in store.scan(self.merkle_tree.size()))
+        self.sequence_counter = store.size()
     
     def append(
         self,
@@ -143,8 +175,13 @@ class TamperEvidentAuditLog:
             sequence_number=self.sequence_counter
         )
         
+        # Persist first so an oversized event leaves the log unchanged
+        if self.store is not None:
+            self.store.append(event.to_bytes(), event.timestamp)
+        
         # Add to events list
-        self.events.append(event)
+        if self.events is not None:
+            self.events.append(event)
         
         # Add to Merkle tree
         root_hash = self.merkle_tree.append(event.to_bytes())
@@ -154,6 +191,40 @@ class TamperEvidentAuditLog:
         
         return root_hash.hex()
     
+    def append_batch(
+        self,
+        entries: List[Tuple[AuditEventType, str, Dict[str, Any]]]
+    ) -> str:
+        """
+        Append many audit events with a single root update.
+        
+        Args:
+            entries: (event_type, tenant_id, details) tuples in order
+        
+        Returns:
+            Root hash after the last event (hex string)
+        """
+        timestamp = time.time()
+        events = []
+        for event_type, tenant_id, details in entries:
+            events.append(AuditEvent(
+                event_type=event_type,
+                tenant_id=tenant_id,
+                timestamp=timestamp,
+                details=details,
+                sequence_number=self.sequence_counter + len(events)
+            ))
+        
+        # Serialize everything before writing anything, so a bad event
+        # leaves both the store and the log unchanged
+        payloads = [event.to_bytes() for event in events]
+        if self.store is not None:
+            self.store.append_batch(payloads, timestamp)
+        self.sequence_counter += len(events)
+        if self.events is not None:
+            self.events.extend(events)
+        return self.merkle_tree.extend(payloads).hex()
+    
     def get_root_hash(self) -> str:
         """
         Get current root hash.
@@ -173,8 +244,45 @@ class TamperEvidentAuditLog:
         Returns:
             Merkle proof or None if invalid index
         """
-        return self.merkle_tree.get_proof(index)
+        if self.store is None:
+            return self.merkle_tree.get_proof(index)
+        
+        size = self.merkle_tree.size()
+        if index < 0 or index >= size:
+            return None
+        return MerkleProof(
+            leaf_index=index,
+            leaf_hash=leaf_hash(self.store.read(index)),
+            proof_hashes=inclusion_path(index, size, self._stored_hash),
+            root_hash=self.merkle_tree.root(),
+            tree_size=size
+        )
     
+    def get_consistency_proof(self, old_size: int) -> List[bytes]:
+        """
+        Prove that the log's first ``old_size`` events are unchanged.
+        
+        A party that recorded the root hash at ``old_size`` events can
+        check the proof against the current root with
+        ``merkle_tree.verify_consistency``.
+        
+        Args:
+            old_size: Number of events when the old root was taken
+        
+        Returns:
+            Consistency proof hashes
+        
+        Raises:
+            ValueError: If old_size is out of range
+        """
+        if self.store is None:
+            return self.merkle_tree.get_consistency_proof(old_size)
+        
+        size = self.merkle_tree.size()
+        if not 0 <= old_size <= size:
+            raise ValueError(f"Old size {old_size} must be between 0 and {size}")
+        return consistency_path(old_size, size, self._stored_hash)
+
     def verify_event(self, index: int) -> bool:
         """
         Verify that event at index has not been tampered with.
@@ -185,6 +293,15 @@ class TamperEvidentAuditLog:
         Returns:
             True if event is valid
         """
+        if self.store is not None:
+            # Sibling hashes come from disk; the proof must reach the
+            # in-memory root
+            try:
+                proof = self.get_proof(index)
+                return proof is not None and proof.verify(self.store.read(index))
+            except ValueError:
+                return False  # Corrupt record
+        
         if index < 0 or index >= len(self.events):
             return False
         
@@ -206,12 +323,21 @@ class TamperEvidentAuditLog:
         
         Returns:
             True if all events in range are valid
+        
+        With a store, every segment is checked; the range fails if the
+        first bad record comes before its end.
         """
         if end_index is None:
-            end_index = len(self.events)
+            end_index = self.merkle_tree.size()
+        
+        if self.store is not None:
+            first_bad = self.detect_tampering()
+            return first_bad is None or first_bad >= end_index
         
+        # A proof only re-derives the root from committed hashes, so
+        # comparing each event with its leaf hash is the same check
         for i in range(start_index, end_index):
-            if not self.verify_event(i):
+            if not self._leaf_matches(i):
                 return False
         
         return True
@@ -237,26 +363,26 @@ class TamperEvidentAuditLog:
         Returns:
             List of matching audit events
         """
-        events = self.events
+        events = self._iter_events()
         
         # Apply filters
         if tenant_id:
-            events = [e for e in events if e.tenant_id == tenant_id]
+            events = (e for e in events if e.tenant_id == tenant_id)
         
         if event_type:
-            events = [e for e in events if e.event_type == event_type]
+            events = (e for e in events if e.event_type == event_type)
         
         if start_time:
-            events = [e for e in events if e.timestamp >= start_time]
+            events = (e for e in events if e.timestamp >= start_time)
         
         if end_time:
-            events = [e for e in events if e.timestamp <= end_time]
+            events = (e for e in events if e.timestamp <= end_time)
         
         # Apply limit
         if limit:
-            events = events[-limit:]
+            return list(deque(events, maxlen=limit))
         
-        return events
+        return list(events)
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -266,17 +392,17 @@ class TamperEvidentAuditLog:
             Dictionary with statistics
         """
         event_counts = {}
-        for event in self.events:
+        tenant_counts = {}
+        total = 0
+        for event in self._iter_events():
             event_type = event.event_type.value
             event_counts[event_type] = event_counts.get(event_type, 0) + 1
-        
-        tenant_counts = {}
-        for event in self.events:
             tenant_id = event.tenant_id
             tenant_counts[tenant_id] = tenant_counts.get(tenant_id, 0) + 1
+            total += 1
         
         return {
-            'total_events': len(self.events),
+            'total_events': total,
             'root_hash': self.get_root_hash(),
             'sequence_number': self.sequence_counter,
             'event_counts': event_counts,
@@ -295,13 +421,15 @@ class TamperEvidentAuditLog:
         Returns:
             List of event dictionaries
         """
-        if end_index is None:
-            end_index = len(self.events)
-        
-        return [
-            event.to_dict()
-            for event in self.events[start_index:end_index]
-        ]
+        if self.store is None:
+            if end_index is None:
+                end_index = len(self.events)
+            return [
+                event.to_dict()
+                for event in self.events[start_index:end_index]
+            ]
+        
+        return [event.to_dict() for event in self._iter_events(start_index, end_index)]
     
     def detect_tampering(self) -> Optional[int]:
         """
@@ -310,7 +438,40 @@ class TamperEvidentAuditLog:
         Returns:
             Index of first tampered event, or None if no tampering
         """
+        if self.store is not None:
+            return self.store.detect_tampering()
+        
         for i in range(len(self.events)):
-            if not self.verify_event(i):
+            if not self._leaf_matches(i):
                 return i
         return None
+    
+    def _leaf_matches(self, index: int) -> bool:
+        """Whether the event at index still hashes to its committed leaf."""
+        if index < 0 or index >= len(self.events):
+            return False
+        return self.merkle_tree.get_leaf_hash(index) == leaf_hash(self.events[index].to_bytes())
+    
+    def _iter_events(self, start: int = 0, end: Optional[int] = None) -> Iterator[AuditEvent]:
+        """Events [start, end) in order, from memory or streamed from the store."""
+        if self.store is None:
+            return iter(self.events[start:end])
+        return (AuditEvent.from_bytes(payload) for _, _, payload in self.store.scan(start, end))
+    
+    def _stored_hash(self, start: int, end: int) -> bytes:
+        """
+        Subtree hash over stored events [start, end).
+        
+        Proof ranges are aligned to their size rounded up to a power of
+        two, so whole segments come from their sealed roots and at most
+        one segment's records are rehashed.
+        """
+        per_segment = self.store.segment_records
+        tree = MerkleTree(retain_nodes=False)
+        position = start
+        if start % per_segment == 0:
+            for root in self.store.segment_roots()[start // per_segment:end // per_segment]:
+                tree.append_subtree(root, per_segment)
+                position += per_segment
+        tree.extend(payload for _, _, payload in self.store.scan(position, end))
+        return tree.root()
@@ -0,0 +1,389 @@
+"""
+Batched Multi-Shot Engine
+
+Runs a scheduled QVM node list for many shots at once on top of
+``BatchedStatevector``. Verification and scheduling are done by the caller
+exactly once; this engine only evolves quantum state and classical events.
+
+Classical feed-forward is vectorized: guards and COND_PAULI are evaluated
+per shot as boolean masks, so every shot follows its own branch while
+sharing the same array operations.
+
+Clifford-only graphs can run on ``StabilizerTableau`` instead
+(``method="stabilizer"``), which scales to thousands of qubits.
+"""
+
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from .statevector import BatchedStatevector, ROTATION_GATES
+from .stabilizer import StabilizerTableau
+
+
+# Outcome stored for events a shot never produced (e.g. guarded measurement skipped)
+EVENT_NOT_PRODUCED = -1
+
+# Default amplitude budget per batch (2**22 complex128 amplitudes = 64 MiB)
+DEFAULT_MAX_AMPLITUDES = 1 << 22
+
+# Simulation methods understood by BatchedShotEngine
+SIMULATION_METHODS = ("statevector", "stabilizer")
+
+# Gate names accepted without the APPLY_ prefix (Qiskit/Cirq backend style)
+BARE_GATES = {
+    "H", "X", "Y", "Z", "S", "SDG", "T", "TDG",
+    "RX", "RY", "RZ", "CNOT", "CX", "CZ", "SWAP",
+}
+
+# Nodes that only affect classical bookkeeping
+_CLASSICAL_OPS = {
+    "FENCE_EPOCH", "BAR_REGION", "OPEN_CHAN", "CLOSE_CHAN", "USE_CHAN",
+    "INJECT_T_STATE", "SET_POLICY", "FREE_LQ",
+}
+
+
+def normalize_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map alternate node spellings onto canonical QVM fields.
+
+    Accepts the ``qubits``/``params``/bare-gate form used by other backends
+    and returns canonical ``vqs``/``args``/``APPLY_*`` nodes; canonical
+    nodes are returned unchanged.
+    """
+    op = node["op"]
+    if op in BARE_GATES:
+        op = f"APPLY_{op}"
+    elif op == "MEASURE":
+        op = "MEASURE_Z"
+
+    if op == node["op"] and "vqs" in node:
+        return node
+
+    normalized = dict(node)
+    normalized["op"] = op
+    normalized["vqs"] = node.get("vqs", node.get("qubits", []))
+    normalized.setdefault("args", node.get("params") or {})
+    return normalized
+
+
+def collect_qubits(nodes: List[Dict[str, Any]]) -> List[str]:
+    """
+    Collect virtual qubit IDs in order of first appearance.
+
+    Args:
+        nodes: Scheduled QVM nodes
+
+    Returns:
+        List of unique virtual qubit IDs
+    """
+    seen = {}
+    for node in nodes:
+        for vq in node.get("vqs", []):
+            if vq not in seen:
+                seen[vq] = len(seen)
+    return list(seen)
+
+
+def collect_events(nodes: List[Dict[str, Any]]) -> List[str]:
+    """Collect produced event IDs in schedule order."""
+    events = []
+    for node in nodes:
+        for ev in node.get("produces", []):
+            if ev not in events:
+                events.append(ev)
+    return events
+
+
+def node_angle(node: Dict[str, Any]) -> float:
+    """Extract a rotation/measurement angle from node arguments."""
+    args = node.get("args", node.get("params", {})) or {}
+    return float(args.get("theta", args.get("angle", 0.0)))
+
+
+class BatchedShotEngine:
+    """
+    Vectorized multi-shot executor for scheduled QVM nodes.
+
+    Shots are split into chunks whose combined statevector stays within
+    ``max_amplitudes``; every chunk runs the whole schedule once. With
+    ``method="stabilizer"`` all shots share one tableau and run as a
+    single chunk.
+    """
+
+    def __init__(self, shots: int, seed: Optional[int] = None,
+                 max_amplitudes: int = DEFAULT_MAX_AMPLITUDES,
+                 readout_error: Optional[Dict[str, float]] = None,
+                 dtype=np.complex128,
+                 rng: Optional[np.random.Generator] = None,
+                 method: str = "statevector"):
+        """
+        Initialize engine.
+
+        Args:
+            shots: Total number of shots to run
+            seed: Seed for the NumPy random generator (ignored if rng is given)
+            max_amplitudes: Upper bound on amplitudes held per chunk
+            readout_error: Optional per-qubit probability of flipping a
+                           measurement outcome (logical error model)
+            dtype: Complex dtype used for amplitudes
+            rng: Existing random generator to draw from
+            method: 'statevector' or 'stabilizer' (Clifford-only graphs)
+        """
+        if shots < 1:
+            raise ValueError(f"shots must be positive, got {shots}")
+        if method not in SIMULATION_METHODS:
+            raise ValueError(
+                f"Unknown simulation method '{method}', expected one of {SIMULATION_METHODS}"
+            )
+
+        self.shots = shots
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self.max_amplitudes = max_amplitudes
+        self.readout_error = readout_error or {}
+        self.dtype = dtype
+        self.method = method
+        self._allocated = set()
+
+    def chunk_size(self, num_qubits: int) -> int:
+        """Number of shots simulated together for ``num_qubits`` qubits."""
+        if self.method == "stabilizer":
+            return self.shots
+
+        dim = 1 << num_qubits
+        if dim > self.max_amplitudes:
+            raise RuntimeError(
+                f"{num_qubits} qubits exceed the batched engine amplitude budget "
+                f"({self.max_amplitudes} amplitudes)"
+            )
+        return max(1, min(self.shots, self.max_amplitudes // dim))
+
+    def run(self, execution_order: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Execute all shots.
+
+        Args:
+            execution_order: Topologically scheduled QVM nodes
+
+        Returns:
+            Dictionary mapping event IDs to int8 outcome arrays of length
+            ``shots``; entries are ``EVENT_NOT_PRODUCED`` where a shot
+            skipped the producing node
+        """
+        qubits = collect_qubits(execution_order)
+        slots = {vq: i for i, vq in enumerate(qubits)}
+        event_ids = collect_events(execution_order)
+
+        events = {
+            ev: np.full(self.shots, EVENT_NOT_PRODUCED, dtype=np.int8)
+            for ev in event_ids
+        }
+
+        chunk = self.chunk_size(len(qubits))
+        for start in range(0, self.shots, chunk):
+            stop = min(start + chunk, self.shots)
+            chunk_events = self._run_chunk(execution_order, slots, event_ids, stop - start)
+            for ev, values in chunk_events.items():
+                events[ev][start:stop] = values
+
+        return events
+
+    def _run_chunk(self, execution_order: List[Dict[str, Any]],
+                   slots: Dict[str, int], event_ids: List[str],
+                   shots: int) -> Dict[str, np.ndarray]:
+        """Run one chunk of shots through the schedule."""
+        if self.method == "stabilizer":
+            sv = StabilizerTableau(len(slots), shots, rng=self.rng)
+        else:
+            sv = BatchedStatevector(len(slots), shots, rng=self.rng, dtype=self.dtype)
+        events = {
+            ev: np.full(shots, EVENT_NOT_PRODUCED, dtype=np.int8)
+            for ev in event_ids
+        }
+        self._allocated = set()
+
+        for node in execution_order:
+            mask = self._guard_mask(node, events, shots)
+            if mask is not None and not mask.any():
+                continue
+            self._apply_node(sv, node, slots, events, mask)
+
+        return events
+
+    # ------------------------------------------------------------------
+    # Classical control
+    # ------------------------------------------------------------------
+
+    def _guard_mask(self, node: Dict[str, Any], events: Dict[str, np.ndarray],
+                    shots: int) -> Optional[np.ndarray]:
+        """Evaluate a node guard per shot. Returns None if unguarded."""
+        guard = node.get("guard")
+        if not guard:
+            return None
+
+        guard_type = guard.get("type")
+        if guard_type == "and":
+            mask = np.ones(shots, dtype=bool)
+            for cond in guard.get("conditions", []):
+                mask &= self._condition_mask(cond, events, shots)
+            return mask
+        elif guard_type == "or":
+            mask = np.zeros(shots, dtype=bool)
+            for cond in guard.get("conditions", []):
+                mask |= self._condition_mask(cond, events, shots)
+            return mask
+
+        return self._condition_mask(guard, events, shots)
+
+    @staticmethod
+    def _condition_mask(condition: Dict[str, Any], events: Dict[str, np.ndarray],
+                        shots: int) -> np.ndarray:
+        """Evaluate a single guard condition per shot."""
+        expected = condition.get("equals", condition.get("value", 0))
+        values = events.get(condition["event"])
+        if values is None:
+            # Event never produced - guard cannot hold
+            return np.zeros(shots, dtype=bool)
+        return values == expected
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+
+    def _apply_node(self, sv: BatchedStatevector, node: Dict[str, Any],
+                    slots: Dict[str, int], events: Dict[str, np.ndarray],
+                    mask: Optional[np.ndarray]):
+        """Apply one node to the batch."""
+        op = node["op"]
+        vq_ids = node.get("vqs", [])
+
+        if op == "ALLOC_LQ":
+            # Slots start in |0⟩; re-allocation of a freed ID starts fresh
+            for vq in vq_ids:
+                if vq in self._allocated:
+                    sv.reset(slots[vq], mask)
+                self._allocated.add(vq)
+        elif op in _CLASSICAL_OPS:
+            return
+        elif op.startswith("APPLY_"):
+            self._apply_gate(sv, op[len("APPLY_"):], node, vq_ids, slots, mask)
+        elif op == "TELEPORT_CNOT":
+            if len(vq_ids) == 2:
+                sv.apply_cnot(slots[vq_ids[0]], slots[vq_ids[1]], mask)
+        elif op.startswith("MEASURE_"):
+            self._measure(sv, op, node, vq_ids, slots, events, mask)
+        elif op == "RESET":
+            for vq in vq_ids:
+                sv.reset(slots[vq], mask)
+        elif op == "COND_PAULI":
+            self._cond_pauli(sv, node, vq_ids, slots, events, mask)
+        else:
+            raise RuntimeError(f"Unknown operation: {op}")
+
+    def _apply_gate(self, sv: BatchedStatevector, gate: str, node: Dict[str, Any],
+                    vq_ids: List[str], slots: Dict[str, int],
+                    mask: Optional[np.ndarray]):
+        """Apply an APPLY_* gate."""
+        if len(vq_ids) == 1:
+            theta = node_angle(node) if gate in ROTATION_GATES else 0.0
+            sv.apply_gate(gate, slots[vq_ids[0]], theta, mask)
+        elif len(vq_ids) == 2:
+            sv.apply_two_qubit(gate, slots[vq_ids[0]], slots[vq_ids[1]], mask)
+        else:
+            raise RuntimeError(f"Invalid number of qubits for APPLY_{gate}: {len(vq_ids)}")
+
+    def _measure(self, sv: BatchedStatevector, op: str, node: Dict[str, Any],
+                 vq_ids: List[str], slots: Dict[str, int],
+                 events: Dict[str, np.ndarray], mask: Optional[np.ndarray]):
+        """Apply a MEASURE_* operation and record its events."""
+        event_ids = node.get("produces", [])
+
+        if op == "MEASURE_BELL" or len(vq_ids) == 2:
+            if len(vq_ids) != 2:
+                raise RuntimeError(f"Bell measurement requires exactly 2 qubits, got {len(vq_ids)}")
+            q1, q2 = slots[vq_ids[0]], slots[vq_ids[1]]
+            sv.apply_cnot(q1, q2, mask)
+            sv.apply_gate("H", q1, mask=mask)
+            outcome1 = self._read(sv, q1, vq_ids[0], mask)
+            outcome2 = self._read(sv, q2, vq_ids[1], mask)
+
+            if len(event_ids) >= 2:
+                self._store(events, event_ids[0], outcome1, mask)
+                self._store(events, event_ids[1], outcome2, mask)
+            elif len(event_ids) == 1:
+                self._store(events, event_ids[0], outcome1 * 2 + outcome2, mask)
+            return
+
+        if len(vq_ids) != 1:
+            raise RuntimeError(f"Single-qubit measurement requires exactly 1 qubit, got {len(vq_ids)}")
+
+        q = slots[vq_ids[0]]
+        pre, post = self._basis_change(op, node)
+        for gate, theta in pre:
+            sv.apply_gate(gate, q, theta, mask)
+        outcome = self._read(sv, q, vq_ids[0], mask)
+        for gate, theta in post:
+            sv.apply_gate(gate, q, theta, mask)
+
+        if event_ids:
+            self._store(events, event_ids[0], outcome, mask)
+
+    @staticmethod
+    def _basis_change(op: str, node: Dict[str, Any]):
+        """(gate, angle) lists mapping the measurement basis onto Z, and back."""
+        if op == "MEASURE_X":
+            return [("H", 0.0)], [("H", 0.0)]
+        elif op == "MEASURE_Y":
+            return [("SDG", 0.0), ("H", 0.0)], [("H", 0.0), ("S", 0.0)]
+        elif op == "MEASURE_ANGLE":
+            # |θ+⟩ = cos(θ/2)|0⟩ + sin(θ/2)|1⟩ = RY(θ)|0⟩
+            theta = node_angle(node)
+            return [("RY", -theta)], [("RY", theta)]
+        # MEASURE_Z and unknown bases default to Z
+        return [], []
+
+    def _read(self, sv: BatchedStatevector, qubit: int, vq_id: str,
+              mask: Optional[np.ndarray]) -> np.ndarray:
+        """Measure ``qubit`` and apply the configured readout error."""
+        outcomes = sv.measure(qubit, mask)
+        p_flip = self.readout_error.get(vq_id, 0.0)
+        if p_flip > 0:
+            flips = self.rng.random(outcomes.shape[0]) < p_flip
+            if mask is not None:
+                flips &= mask
+            outcomes ^= flips.astype(np.uint8)
+        return outcomes
+
+    @staticmethod
+    def _store(events: Dict[str, np.ndarray], event_id: str,
+               values: np.ndarray, mask: Optional[np.ndarray]):
+        """Record event values for the active shots."""
+        if event_id not in events:
+            events[event_id] = np.full(values.shape[0], EVENT_NOT_PRODUCED, dtype=np.int8)
+        if mask is None:
+            events[event_id][:] = values
+        else:
+            events[event_id][mask] = values[mask]
+
+    def _cond_pauli(self, sv: BatchedStatevector, node: Dict[str, Any],
+                    vq_ids: List[str], slots: Dict[str, int],
+                    events: Dict[str, np.ndarray], mask: Optional[np.ndarray]):
+        """Apply a Pauli correction on shots whose input event is 1."""
+        event_ids = node.get("inputs", [])
+        if not event_ids:
+            return
+
+        values = events.get(event_ids[0])
+        if values is None:
+            return
+
+        fire = values == 1
+        if mask is not None:
+            fire &= mask
+        if not fire.any():
+            return
+
+        pauli = node.get("args", {}).get("mask", "X")
+        for vq in vq_ids:
+            for p in pauli:
+                sv.apply_gate(p, slots[vq], mask=fire)
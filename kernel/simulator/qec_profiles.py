@@ -7,6 +7,10 @@ with Azure QRE parameter format. Each profile specifies:
 - Code distance
 - Logical cycle time
 - Error thresholds
+
+Logical error rates come from the closed-form threshold formula unless a
+fitted model (see ``kernel.qec.threshold_sweep``) is attached to the
+profile or registered for its code family.
 """
 
 from dataclasses import dataclass
@@ -21,6 +25,10 @@ from .azure_qre_compat import (
 )
 
 
+# Fitted logical error models by code family (see register_logical_error_model)
+LOGICAL_ERROR_MODELS: Dict[str, Any] = {}
+
+
 @dataclass
 class QECProfile:
     """Quantum Error Correction code profile."""
@@ -43,15 +51,24 @@ class QECProfile:
     decoder_type: str = "MWPM"  # Minimum Weight Perfect Matching
     decoder_cycle_time_us: float = 0.1
     
+    # Fitted model with predict(distance, physical_error_rate); overrides
+    # the threshold formula and any model registered for the code family
+    logical_error_model: Optional[Any] = None
+    
     def logical_error_rate(self) -> float:
         """
         Estimate logical error rate per logical cycle.
         
-        Uses simplified threshold formula:
+        Uses the profile's fitted model, else the model registered for its
+        code family, else the simplified threshold formula:
         P_L ≈ (p/p_th)^((d+1)/2) where p is physical error rate, p_th is threshold
         
         For surface codes, p_th ≈ 0.01 (1%)
         """
+        model = self.logical_error_model or LOGICAL_ERROR_MODELS.get(self.code_family)
+        if model is not None:
+            return model.predict(self.code_distance, self.physical_gate_error_rate)
+        
         p = self.physical_gate_error_rate
         p_th = 0.01  # Surface code threshold
         d = self.code_distance
@@ -169,7 +186,23 @@ class QECProfile:
         )
 
 
-def surface_code(distance: int = 9, gate_error: float = 1e-3) -> QECProfile:
+def register_logical_error_model(code_family: str, model: Optional[Any]):
+    """
+    Use a fitted logical error model for every profile of a code family.
+    
+    Args:
+        code_family: Profile code family (e.g., "surface_code")
+        model: Object with predict(distance, physical_error_rate), such as
+               a LogicalErrorModel; None restores the threshold formula
+    """
+    if model is None:
+        LOGICAL_ERROR_MODELS.pop(code_family, None)
+    else:
+        LOGICAL_ERROR_MODELS[code_family] = model
+
+
+def surface_code(distance: int = 9, gate_error: float = 1e-3,
+                 logical_error_model: Optional[Any] = None) -> QECProfile:
     """
     Standard surface code configuration.
     
@@ -179,6 +212,7 @@ def surface_code(distance: int = 9, gate_error: float = 1e-3) -> QECProfile:
     Args:
         distance: Code distance (odd integer, typically 5-21)
         gate_error: Physical gate error rate
+        logical_error_model: Optional fitted logical error model
     
     Returns:
         QECProfile for surface code
@@ -197,7 +231,8 @@ def surface_code(distance: int = 9, gate_error: float = 1e-3) -> QECProfile:
         t1_us=100.0,
         t2_us=80.0,
         decoder_type="MWPM",
-        decoder_cycle_time_us=0.1
+        decoder_cycle_time_us=0.1,
+        logical_error_model=logical_error_model
     )
 
 
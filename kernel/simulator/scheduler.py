@@ -17,10 +17,21 @@ def topo_schedule(nodes):
     for n in nodes:
         for ev in n.get("inputs",[]):
             src = produces.get(ev)
-            if src:
+            if src and n["id"] not in edges[src]:
                 edges[src].add(n["id"])
                 indeg[n["id"]] += 1
     
+    # Add edges from handle flow: consecutive uses of the same VQ/channel
+    # must keep their program order (e.g. a measurement after COND_PAULI)
+    last_use = {}
+    for n in nodes:
+        for handle in list(n.get("vqs", [])) + list(n.get("chs", [])):
+            prev = last_use.get(handle)
+            if prev is not None and prev != n["id"] and n["id"] not in edges[prev]:
+                edges[prev].add(n["id"])
+                indeg[n["id"]] += 1
+            last_use[handle] = n["id"]
+    
     # Add edges from guards
     for n in nodes:
         guard = n.get("guard")
@@ -29,10 +40,27 @@ def topo_schedule(nodes):
             guard_events = _extract_guard_events(guard)
             for ev in guard_events:
                 src = produces.get(ev)
-                if src:
+                if src and n["id"] not in edges[src]:
                     edges[src].add(n["id"])
                     indeg[n["id"]] += 1
     
+    # Add edges from epoch fences: a FENCE_EPOCH runs after the nodes
+    # listed before it (back to the previous fence) and before the nodes
+    # listed after it, so epochs execute in program order
+    fence = None
+    segment = []
+    for n in nodes:
+        if n.get("op") == "FENCE_EPOCH":
+            preds = segment if segment or fence is None else [fence]
+            for prev in preds:
+                _add_edge(edges, indeg, prev, n["id"])
+            fence = n["id"]
+            segment = []
+        else:
+            if fence is not None:
+                _add_edge(edges, indeg, fence, n["id"])
+            segment.append(n["id"])
+    
     q = deque([n["id"] for n in nodes if indeg[n["id"]]==0])
     order = []
     while q:
@@ -47,6 +75,13 @@ def topo_schedule(nodes):
     return order
 
 
+def _add_edge(edges, indeg, src, dst):
+    """Add a scheduling edge src -> dst unless it already exists."""
+    if src != dst and dst not in edges[src]:
+        edges[src].add(dst)
+        indeg[dst] += 1
+
+
 def _extract_guard_events(guard):
     """Extract all event IDs from a guard condition."""
     events = []
@@ -0,0 +1,345 @@
+"""
+Bit-Packed Stabilizer Tableau
+
+Aaronson–Gottesman (CHP) simulation of Clifford circuits. The X and Z
+parts of the 2n destabilizer/stabilizer generators are packed 64 qubits
+per ``uint64`` word, so gates touch one bit column and measurement costs
+O(n²/64) word operations instead of the O(2**n) of a statevector.
+
+Shots share the X/Z tableau and keep their own sign bits. This is exact
+for graphs whose only shot-dependent operations are Pauli gates
+(COND_PAULI corrections, guarded X/Y/Z, RESET): Paulis merely flip
+generator signs, and whether a measurement is random depends only on the
+shared X/Z bits. ``is_clifford_graph`` checks this condition.
+"""
+
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+
+# Gates with a tableau update
+CLIFFORD_GATES = {"I", "H", "S", "SDG", "X", "Y", "Z"}
+CLIFFORD_TWO_QUBIT_GATES = {"CNOT", "CX", "CZ", "SWAP"}
+PAULI_GATES = {"I", "X", "Y", "Z"}
+
+# Operations that may be guarded without splitting the shared X/Z tableau
+_GUARDABLE_OPS = {
+    "FENCE_EPOCH", "BAR_REGION", "OPEN_CHAN", "CLOSE_CHAN", "USE_CHAN",
+    "SET_POLICY", "COND_PAULI",
+}
+
+# Non-gate operations the stabilizer engine can run
+_CLIFFORD_OPS = _GUARDABLE_OPS | {
+    "ALLOC_LQ", "FREE_LQ",
+    "MEASURE_Z", "MEASURE_X", "MEASURE_Y", "MEASURE_BELL",
+    "RESET", "TELEPORT_CNOT",
+}
+
+_WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Count set bits per row of a 2D uint64 array."""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Count set bits per row of a 2D uint64 array."""
+        as_bytes = np.ascontiguousarray(words).view(np.uint8)
+        return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def is_clifford_graph(nodes: List[Dict[str, Any]]) -> bool:
+    """
+    Check whether a node list can run on the stabilizer tableau.
+
+    A graph qualifies when every gate is Clifford (no T/TDG, rotations or
+    MEASURE_ANGLE) and guards only ever select Pauli operations, so all
+    shots share the same X/Z tableau.
+
+    Args:
+        nodes: QVM nodes with canonical ``op``/``vqs`` fields
+
+    Returns:
+        True if the stabilizer engine simulates the graph exactly
+    """
+    for node in nodes:
+        op = node["op"]
+        guarded = bool(node.get("guard"))
+
+        if op.startswith("APPLY_"):
+            gate = op[len("APPLY_"):]
+            if gate in PAULI_GATES:
+                continue
+            if guarded or gate not in CLIFFORD_GATES | CLIFFORD_TWO_QUBIT_GATES:
+                return False
+        elif op not in _CLIFFORD_OPS:
+            return False
+        elif guarded and op not in _GUARDABLE_OPS:
+            return False
+    return True
+
+
+class StabilizerTableau:
+    """
+    Stabilizer state of ``num_qubits`` qubits for a batch of shots.
+
+    Rows ``0..n-1`` hold destabilizers and rows ``n..2n-1`` stabilizers.
+    ``x`` and ``z`` have shape ``(2n, words)``; ``r`` holds the sign bit of
+    every generator for every shot, packed 64 shots per word, shape
+    ``(2n, shot_words)``.
+
+    The method names mirror ``BatchedStatevector`` so the batched shot
+    engine can drive either representation.
+    """
+
+    def __init__(self, num_qubits: int, shots: int = 1,
+                 rng: Optional[np.random.Generator] = None):
+        """
+        Initialize every shot in |0...0⟩.
+
+        Args:
+            num_qubits: Number of qubits
+            shots: Number of independent shots in the batch
+            rng: Random generator used for measurement sampling
+        """
+        self.num_qubits = num_qubits
+        self.shots = shots
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        n = num_qubits
+        self.words = max(1, (n + _WORD_BITS - 1) // _WORD_BITS)
+        self.shot_words = max(1, (shots + _WORD_BITS - 1) // _WORD_BITS)
+        self.x = np.zeros((2 * n, self.words), dtype=np.uint64)
+        self.z = np.zeros((2 * n, self.words), dtype=np.uint64)
+        self.r = np.zeros((2 * n, self.shot_words), dtype=np.uint64)
+
+        for q in range(n):
+            word, bit = self._bit(q)
+            self.x[q, word] = bit
+            self.z[n + q, word] = bit
+
+    @staticmethod
+    def memory_bytes(num_qubits: int, shots: int = 1) -> int:
+        """Bytes needed for the tableau of ``num_qubits`` qubits."""
+        words = max(1, (num_qubits + _WORD_BITS - 1) // _WORD_BITS)
+        shot_words = max(1, (shots + _WORD_BITS - 1) // _WORD_BITS)
+        return 2 * num_qubits * (2 * words + shot_words) * 8
+
+    @staticmethod
+    def _bit(qubit: int):
+        """Word index and bit mask of ``qubit``."""
+        return qubit // _WORD_BITS, np.uint64(1 << (qubit % _WORD_BITS))
+
+    def _column(self, part: np.ndarray, qubit: int) -> np.ndarray:
+        """Boolean column of ``part`` for ``qubit`` over all rows."""
+        word, bit = self._bit(qubit)
+        return (part[:, word] & bit) != 0
+
+    def _pack_shots(self, mask: Optional[np.ndarray]) -> np.ndarray:
+        """Pack a boolean shot mask into sign words (None selects all)."""
+        if mask is None:
+            return np.full(self.shot_words, ~np.uint64(0), dtype=np.uint64)
+        packed = np.zeros(self.shot_words * 8, dtype=np.uint8)
+        bits = np.packbits(mask.astype(bool), bitorder="little")
+        packed[:bits.size] = bits
+        return packed.view("<u8").astype(np.uint64)
+
+    def _unpack_shots(self, words: np.ndarray) -> np.ndarray:
+        """Unpack sign words into a uint8 array with one entry per shot."""
+        as_bytes = words.astype("<u8").view(np.uint8)
+        return np.unpackbits(as_bytes, bitorder="little")[:self.shots]
+
+    def _flip_signs(self, rows: np.ndarray, mask: Optional[np.ndarray] = None):
+        """Flip the sign of generators ``rows`` (boolean) on the masked shots."""
+        idx = np.flatnonzero(rows)
+        if idx.size == 0:
+            return
+        self.r[idx] ^= self._pack_shots(mask)
+
+    # ------------------------------------------------------------------
+    # Gates
+    # ------------------------------------------------------------------
+
+    def apply_gate(self, gate: str, qubit: int, theta: float = 0.0,
+                   mask: Optional[np.ndarray] = None):
+        """
+        Apply a named single-qubit Clifford gate.
+
+        Args:
+            gate: Gate name (I, H, S, SDG, X, Y, Z)
+            qubit: Target qubit
+            theta: Unused; accepted for interface compatibility
+            mask: Optional per-shot selection (Pauli gates only)
+        """
+        if gate in PAULI_GATES:
+            self.apply_pauli(gate, qubit, mask)
+            return
+        if gate not in CLIFFORD_GATES:
+            raise ValueError(f"Gate {gate} is not Clifford")
+        if mask is not None and not mask.all():
+            raise ValueError(f"Stabilizer tableau cannot apply {gate} to a subset of shots")
+
+        word, bit = self._bit(qubit)
+        xq = self._column(self.x, qubit)
+        zq = self._column(self.z, qubit)
+
+        if gate == "H":
+            self._flip_signs(xq & zq)
+            self.x[:, word] ^= np.where(xq != zq, bit, np.uint64(0))
+            self.z[:, word] ^= np.where(xq != zq, bit, np.uint64(0))
+        elif gate == "S":
+            self._flip_signs(xq & zq)
+            self.z[:, word] ^= np.where(xq, bit, np.uint64(0))
+        elif gate == "SDG":
+            self._flip_signs(xq & ~zq)
+            self.z[:, word] ^= np.where(xq, bit, np.uint64(0))
+
+    def apply_pauli(self, pauli: str, qubit: int, mask: Optional[np.ndarray] = None):
+        """Apply a Pauli gate; only generator signs change."""
+        if pauli == "X":
+            self._flip_signs(self._column(self.z, qubit), mask)
+        elif pauli == "Z":
+            self._flip_signs(self._column(self.x, qubit), mask)
+        elif pauli == "Y":
+            self._flip_signs(self._column(self.x, qubit) ^ self._column(self.z, qubit), mask)
+
+    def apply_cnot(self, control: int, target: int, mask: Optional[np.ndarray] = None):
+        """Apply CNOT with ``control`` and ``target``."""
+        if mask is not None and not mask.all():
+            raise ValueError("Stabilizer tableau cannot apply CNOT to a subset of shots")
+
+        xa = self._column(self.x, control)
+        za = self._column(self.z, control)
+        xb = self._column(self.x, target)
+        zb = self._column(self.z, target)
+
+        self._flip_signs(xa & zb & ~(xb ^ za))
+
+        word_b, bit_b = self._bit(target)
+        word_a, bit_a = self._bit(control)
+        self.x[:, word_b] ^= np.where(xa, bit_b, np.uint64(0))
+        self.z[:, word_a] ^= np.where(zb, bit_a, np.uint64(0))
+
+    def apply_cz(self, q1: int, q2: int, mask: Optional[np.ndarray] = None):
+        """Apply CZ between ``q1`` and ``q2``."""
+        self.apply_gate("H", q2, mask=mask)
+        self.apply_cnot(q1, q2, mask)
+        self.apply_gate("H", q2, mask=mask)
+
+    def apply_swap(self, q1: int, q2: int, mask: Optional[np.ndarray] = None):
+        """Swap qubits ``q1`` and ``q2``."""
+        self.apply_cnot(q1, q2, mask)
+        self.apply_cnot(q2, q1, mask)
+        self.apply_cnot(q1, q2, mask)
+
+    def apply_two_qubit(self, gate: str, q1: int, q2: int,
+                        mask: Optional[np.ndarray] = None):
+        """Apply a named two-qubit Clifford gate."""
+        if gate in ("CNOT", "CX"):
+            self.apply_cnot(q1, q2, mask)
+        elif gate == "CZ":
+            self.apply_cz(q1, q2, mask)
+        elif gate == "SWAP":
+            self.apply_swap(q1, q2, mask)
+        else:
+            raise ValueError(f"Unknown two-qubit gate: {gate}")
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _phase_bits(px: np.ndarray, pz: np.ndarray,
+                    hx: np.ndarray, hz: np.ndarray) -> np.ndarray:
+        """
+        Extra sign from multiplying rows ``h`` by row ``p``.
+
+        Sums the Aaronson–Gottesman ``g`` function over all qubits with
+        bitwise counts of the single-qubit products contributing ``+i``
+        and ``-i``. Returns 1 where the total is 2 (mod 4), i.e. where
+        the product's sign flips.
+        """
+        nx_p, nz_p = ~px, ~pz
+        nx_h, nz_h = ~hx, ~hz
+        plus = ((px & pz & nx_h & hz) | (px & nz_p & hx & hz) | (nx_p & pz & hx & nz_h))
+        minus = ((px & pz & hx & nz_h) | (px & nz_p & nx_h & hz) | (nx_p & pz & hx & hz))
+        total = _popcount(plus) - _popcount(minus)
+        return ((total % 4) == 2).astype(np.uint8)
+
+    def measure(self, qubit: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Measure ``qubit`` in the Z basis on every shot.
+
+        Args:
+            qubit: Qubit to measure
+            mask: Must select every shot (or be None)
+
+        Returns:
+            uint8 array of outcomes, one per shot
+        """
+        if mask is not None and not mask.all():
+            raise ValueError("Stabilizer tableau cannot measure a subset of shots")
+
+        n = self.num_qubits
+        xq = self._column(self.x, qubit)
+        anticommuting = np.flatnonzero(xq[n:])
+
+        if anticommuting.size:
+            return self._measure_random(qubit, n + int(anticommuting[0]), xq)
+        return self._measure_deterministic(xq)
+
+    def _measure_random(self, qubit: int, p: int, xq: np.ndarray) -> np.ndarray:
+        """Random outcome: stabilizer ``p`` anticommutes with Z_qubit."""
+        n = self.num_qubits
+        targets = np.flatnonzero(xq)
+        targets = targets[targets != p]
+
+        if targets.size:
+            phase = self._phase_bits(self.x[p], self.z[p], self.x[targets], self.z[targets])
+            flips = np.where(phase[:, None] == 1, ~np.uint64(0), np.uint64(0))
+            self.r[targets] ^= self.r[p] ^ flips
+            self.x[targets] ^= self.x[p]
+            self.z[targets] ^= self.z[p]
+
+        # Destabilizer p-n takes the old stabilizer; stabilizer p becomes ±Z_qubit
+        self.x[p - n] = self.x[p]
+        self.z[p - n] = self.z[p]
+        self.r[p - n] = self.r[p]
+
+        word, bit = self._bit(qubit)
+        self.x[p] = 0
+        self.z[p] = 0
+        self.z[p, word] = bit
+
+        self.r[p] = self.rng.integers(0, 1 << 64, size=self.shot_words, dtype=np.uint64)
+        return self._unpack_shots(self.r[p])
+
+    def _measure_deterministic(self, xq: np.ndarray) -> np.ndarray:
+        """Deterministic outcome: Z_qubit is in the stabilizer group."""
+        n = self.num_qubits
+        rows = n + np.flatnonzero(xq[:n])
+        if rows.size == 0:
+            return np.zeros(self.shots, dtype=np.uint8)
+
+        # Z_qubit is the product of these stabilizers. Multiplying them in
+        # sequence, step j multiplies row j into the running product of
+        # rows < j; exclusive prefix XORs give every step at once.
+        x, z = self.x[rows], self.z[rows]
+        prefix_x = np.zeros_like(x)
+        prefix_z = np.zeros_like(z)
+        prefix_x[1:] = np.bitwise_xor.accumulate(x[:-1], axis=0)
+        prefix_z[1:] = np.bitwise_xor.accumulate(z[:-1], axis=0)
+        phase = int(np.bitwise_xor.reduce(self._phase_bits(x, z, prefix_x, prefix_z)))
+
+        signs = np.bitwise_xor.reduce(self.r[rows], axis=0)
+        if phase:
+            signs = ~signs
+        return self._unpack_shots(signs)
+
+    def reset(self, qubit: int, mask: Optional[np.ndarray] = None):
+        """Reset ``qubit`` to |0⟩ on every shot."""
+        outcomes = self.measure(qubit, mask)
+        self.apply_pauli("X", qubit, outcomes.astype(bool))
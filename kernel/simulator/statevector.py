@@ -0,0 +1,411 @@
+"""
+Batched Statevector Kernel
+
+NumPy statevector storage for many independent shots of the same circuit.
+The state is held as a ``(shots, 2**n)`` complex array and every operation
+is applied in place through strided views, so no full-size gate matrices
+(Kronecker products) are ever built.
+
+Qubit ``q`` corresponds to bit ``q`` of the basis-state index
+(little-endian, matching Qiskit's convention).
+
+Every mutating operation accepts an optional boolean shot mask so that
+classically-controlled operations (guards, COND_PAULI) only touch the
+shots whose feed-forward condition holds. Masked operations gather the
+selected shots in groups bounded by ``SCRATCH_AMPLITUDES`` (or work on a
+single shot's row in place), so they need no more scratch than unmasked
+ones.
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+_SQRT1_2 = 1.0 / math.sqrt(2.0)
+
+# Fixed single-qubit gate unitaries
+SINGLE_QUBIT_GATES: Dict[str, np.ndarray] = {
+    "I": np.eye(2, dtype=complex),
+    "H": np.array([[_SQRT1_2, _SQRT1_2], [_SQRT1_2, -_SQRT1_2]], dtype=complex),
+    "X": np.array([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+    "Z": np.array([[1, 0], [0, -1]], dtype=complex),
+    "S": np.array([[1, 0], [0, 1j]], dtype=complex),
+    "SDG": np.array([[1, 0], [0, -1j]], dtype=complex),
+    "T": np.array([[1, 0], [0, np.exp(1j * math.pi / 4)]], dtype=complex),
+    "TDG": np.array([[1, 0], [0, np.exp(-1j * math.pi / 4)]], dtype=complex),
+}
+
+# Parameterized rotation gates
+ROTATION_GATES = {"RX", "RY", "RZ"}
+
+# Two-qubit gates supported natively by the kernel
+TWO_QUBIT_GATES = {"CNOT", "CX", "CZ", "SWAP"}
+
+# Upper bound on scratch amplitudes per in-place block (2**20 = 16 MiB complex128)
+SCRATCH_AMPLITUDES = 1 << 20
+
+
+def rotation_matrix(axis: str, theta: float) -> np.ndarray:
+    """
+    Build the unitary for a rotation gate.
+
+    Args:
+        axis: Rotation gate name ("RX", "RY" or "RZ")
+        theta: Rotation angle in radians
+
+    Returns:
+        2x2 complex unitary
+    """
+    c = math.cos(theta / 2)
+    s = math.sin(theta / 2)
+
+    if axis == "RX":
+        return np.array([[c, -1j * s], [-1j * s, c]], dtype=complex)
+    elif axis == "RY":
+        return np.array([[c, -s], [s, c]], dtype=complex)
+    elif axis == "RZ":
+        return np.array([[np.exp(-1j * theta / 2), 0],
+                         [0, np.exp(1j * theta / 2)]], dtype=complex)
+
+    raise ValueError(f"Unknown rotation gate: {axis}")
+
+
+class BatchedStatevector:
+    """
+    Statevectors for a batch of independent shots.
+
+    All shots start in |0...0⟩ and evolve under the same operations, but
+    measurement collapse is sampled independently per shot, so shots
+    diverge after the first measurement.
+    """
+
+    def __init__(self, num_qubits: int, shots: int = 1,
+                 rng: Optional[np.random.Generator] = None,
+                 dtype=np.complex128):
+        """
+        Initialize batched statevector.
+
+        Args:
+            num_qubits: Number of qubits per shot
+            shots: Number of independent shots in the batch
+            rng: NumPy random generator used for measurement sampling
+            dtype: Complex dtype for amplitudes
+        """
+        if num_qubits < 0:
+            raise ValueError(f"num_qubits must be non-negative, got {num_qubits}")
+        if shots < 1:
+            raise ValueError(f"shots must be positive, got {shots}")
+
+        self.num_qubits = num_qubits
+        self.shots = shots
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.dtype = np.dtype(dtype)
+
+        self.state = np.zeros((shots, 1 << num_qubits), dtype=self.dtype)
+        self.state[:, 0] = 1.0
+
+    @staticmethod
+    def memory_bytes(num_qubits: int, shots: int = 1, dtype=np.complex128) -> int:
+        """Amplitude storage required for a batch, in bytes."""
+        return shots * (1 << num_qubits) * np.dtype(dtype).itemsize
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    def _split(self, qubit: int, state: Optional[np.ndarray] = None) -> np.ndarray:
+        """View the state (or a group of its shots) as (shots, high, 2, low) around ``qubit``."""
+        self._check_qubit(qubit)
+        if state is None:
+            state = self.state
+        low = 1 << qubit
+        high = 1 << (self.num_qubits - qubit - 1)
+        return state.reshape(state.shape[0], high, 2, low)
+
+    def _split_pair(self, q_a: int, q_b: int,
+                    state: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int, int]:
+        """
+        View the state (or a group of its shots) with separate axes for two qubits.
+
+        Returns:
+            Tuple of (view, axis_a, axis_b) where the view has shape
+            (shots, high, 2, mid, 2, low).
+        """
+        self._check_qubit(q_a)
+        self._check_qubit(q_b)
+        if q_a == q_b:
+            raise ValueError(f"Two-qubit operation on identical qubits: {q_a}")
+
+        if state is None:
+            state = self.state
+        lo, hi = min(q_a, q_b), max(q_a, q_b)
+        shape = (
+            state.shape[0],
+            1 << (self.num_qubits - hi - 1),
+            2,
+            1 << (hi - lo - 1),
+            2,
+            1 << lo,
+        )
+        view = state.reshape(shape)
+        # Axis 2 carries the higher qubit, axis 4 the lower one
+        axis_a = 2 if q_a == hi else 4
+        axis_b = 2 if q_b == hi else 4
+        return view, axis_a, axis_b
+
+    @staticmethod
+    def _single_blocks(view: np.ndarray):
+        """
+        Yield bounded sub-views of a (shots, high, 2, low) view.
+
+        Each block is a basic-slice view of shape (rows, 2, cols), so
+        per-block scratch stays under SCRATCH_AMPLITUDES.
+        """
+        shots, high, _, low = view.shape
+        merged = view.reshape(shots * high, 2, low)
+        rows = merged.shape[0]
+
+        if 2 * low <= SCRATCH_AMPLITUDES:
+            step = max(1, SCRATCH_AMPLITUDES // (2 * low))
+            for r in range(0, rows, step):
+                yield merged[r:r + step]
+        else:
+            step = SCRATCH_AMPLITUDES // 2
+            for r in range(rows):
+                for c in range(0, low, step):
+                    yield merged[r:r + 1, :, c:c + step]
+
+    @staticmethod
+    def _pair_blocks(view: np.ndarray):
+        """
+        Yield bounded sub-views of a (shots, high, 2, mid, 2, low) view.
+
+        Each block has shape (rows, 2, mids, 2, cols).
+        """
+        shots, high, _, mid, _, low = view.shape
+        merged = view.reshape(shots * high, 2, mid, 2, low)
+        rows = merged.shape[0]
+
+        if 4 * mid * low <= SCRATCH_AMPLITUDES:
+            step = max(1, SCRATCH_AMPLITUDES // (4 * mid * low))
+            for r in range(0, rows, step):
+                yield merged[r:r + step]
+        elif 4 * low <= SCRATCH_AMPLITUDES:
+            step = max(1, SCRATCH_AMPLITUDES // (4 * low))
+            for r in range(rows):
+                for m in range(0, mid, step):
+                    yield merged[r:r + 1, :, m:m + step]
+        else:
+            step = SCRATCH_AMPLITUDES // 4
+            for r in range(rows):
+                for m in range(mid):
+                    for c in range(0, low, step):
+                        yield merged[r:r + 1, :, m:m + 1, :, c:c + step]
+
+    def _exchange(self, state: np.ndarray, q_a: int, q_b: int,
+                  bits_x: Tuple[int, int], bits_y: Tuple[int, int]):
+        """
+        Swap the amplitude subspaces where (q_a, q_b) equal ``bits_x``
+        and ``bits_y``. Used for CNOT and SWAP.
+        """
+        view, ax_a, ax_b = self._split_pair(q_a, q_b, state)
+
+        # Blocks drop the leading shots axis: positions shift by one
+        idx_x = [slice(None)] * 5
+        idx_y = [slice(None)] * 5
+        idx_x[ax_a - 1], idx_x[ax_b - 1] = bits_x
+        idx_y[ax_a - 1], idx_y[ax_b - 1] = bits_y
+        idx_x, idx_y = tuple(idx_x), tuple(idx_y)
+
+        for block in self._pair_blocks(view):
+            tmp = block[idx_x].copy()
+            block[idx_x] = block[idx_y]
+            block[idx_y] = tmp
+
+    def _for_shots(self, mask: Optional[np.ndarray], apply):
+        """
+        Run ``apply(state)`` in place on the shots selected by ``mask``.
+
+        ``apply`` receives a (shots, 2**n) array. Without a mask, or when
+        it selects every shot, that is the full state. Otherwise selected
+        shots are gathered in groups of at most SCRATCH_AMPLITUDES
+        amplitudes and written back; a shot too large to group is passed
+        as an in-place single-row view.
+        """
+        if mask is None or mask.all():
+            apply(self.state)
+            return
+
+        rows = np.flatnonzero(mask)
+        step = SCRATCH_AMPLITUDES // self.state.shape[1]
+        if step <= 1:
+            for r in rows:
+                apply(self.state[r:r + 1])
+            return
+
+        for start in range(0, rows.size, step):
+            group = rows[start:start + step]
+            sub = self.state[group]
+            apply(sub)
+            self.state[group] = sub
+
+    def _check_qubit(self, qubit: int):
+        if not 0 <= qubit < self.num_qubits:
+            raise IndexError(f"Qubit index {qubit} out of range for {self.num_qubits} qubits")
+
+    # ------------------------------------------------------------------
+    # Gates
+    # ------------------------------------------------------------------
+
+    def apply_single(self, qubit: int, matrix: np.ndarray,
+                     mask: Optional[np.ndarray] = None):
+        """
+        Apply a 2x2 unitary to ``qubit`` in place.
+
+        Args:
+            qubit: Target qubit index
+            matrix: 2x2 unitary
+            mask: Optional boolean array selecting the shots to update
+        """
+        self._for_shots(mask, lambda state: self._apply_single(state, qubit, matrix))
+
+    def _apply_single(self, state: np.ndarray, qubit: int, matrix: np.ndarray):
+        """Apply a 2x2 unitary to every shot of ``state`` in place."""
+        view = self._split(qubit, state)
+        u00, u01 = matrix[0, 0], matrix[0, 1]
+        u10, u11 = matrix[1, 0], matrix[1, 1]
+
+        if u01 == 0 and u10 == 0:
+            # Diagonal gate: scale the two halves independently
+            if u00 != 1:
+                view[:, :, 0, :] *= u00
+            if u11 != 1:
+                view[:, :, 1, :] *= u11
+            return
+
+        for block in self._single_blocks(view):
+            a0 = block[:, 0, :].copy()
+            a1 = block[:, 1, :]
+            block[:, 0, :] *= u00
+            block[:, 0, :] += u01 * a1
+            a1 *= u11
+            a1 += u10 * a0
+
+    def apply_gate(self, gate: str, qubit: int, theta: float = 0.0,
+                   mask: Optional[np.ndarray] = None):
+        """
+        Apply a named single-qubit gate.
+
+        Args:
+            gate: Gate name (H, X, Y, Z, S, SDG, T, TDG, RX, RY, RZ)
+            qubit: Target qubit index
+            theta: Rotation angle for RX/RY/RZ
+            mask: Optional boolean shot mask
+        """
+        if gate in ROTATION_GATES:
+            matrix = rotation_matrix(gate, theta)
+        elif gate in SINGLE_QUBIT_GATES:
+            matrix = SINGLE_QUBIT_GATES[gate]
+        else:
+            raise ValueError(f"Unsupported single-qubit gate: {gate}")
+
+        self.apply_single(qubit, matrix, mask)
+
+    def apply_cnot(self, control: int, target: int,
+                   mask: Optional[np.ndarray] = None):
+        """Apply CNOT by swapping target amplitudes where control is 1."""
+        self._for_shots(mask, lambda state: self._exchange(state, control, target, (1, 0), (1, 1)))
+
+    def apply_cz(self, q_a: int, q_b: int, mask: Optional[np.ndarray] = None):
+        """Apply CZ by negating amplitudes where both qubits are 1."""
+        self._for_shots(mask, lambda state: self._negate_ones(state, q_a, q_b))
+
+    def _negate_ones(self, state: np.ndarray, q_a: int, q_b: int):
+        """Negate the amplitudes of ``state`` where both qubits are 1."""
+        view, ax_a, ax_b = self._split_pair(q_a, q_b, state)
+        idx = [slice(None)] * 6
+        idx[ax_a], idx[ax_b] = 1, 1
+        view[tuple(idx)] *= -1
+
+    def apply_swap(self, q_a: int, q_b: int, mask: Optional[np.ndarray] = None):
+        """Apply SWAP by exchanging the |01⟩ and |10⟩ amplitudes."""
+        self._for_shots(mask, lambda state: self._exchange(state, q_a, q_b, (0, 1), (1, 0)))
+
+    def apply_two_qubit(self, gate: str, q_a: int, q_b: int,
+                        mask: Optional[np.ndarray] = None):
+        """Apply a named two-qubit gate (CNOT/CX, CZ, SWAP)."""
+        if gate in ("CNOT", "CX"):
+            self.apply_cnot(q_a, q_b, mask)
+        elif gate == "CZ":
+            self.apply_cz(q_a, q_b, mask)
+        elif gate == "SWAP":
+            self.apply_swap(q_a, q_b, mask)
+        else:
+            raise ValueError(f"Unsupported two-qubit gate: {gate}")
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+
+    def probability_one(self, qubit: int) -> np.ndarray:
+        """Per-shot probability of measuring ``qubit`` as 1."""
+        view = self._split(qubit)
+        ones = view[:, :, 1, :]
+        # Real/imag parts are strided views, so no state-sized temporaries
+        return (np.einsum('shl,shl->s', ones.real, ones.real)
+                + np.einsum('shl,shl->s', ones.imag, ones.imag))
+
+    def measure(self, qubit: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Projectively measure ``qubit`` in the Z basis.
+
+        Args:
+            qubit: Qubit to measure
+            mask: Optional boolean shot mask; unselected shots are not
+                  collapsed and report outcome 0
+
+        Returns:
+            Array of outcomes (uint8) with one entry per shot
+        """
+        p1 = np.clip(self.probability_one(qubit), 0.0, 1.0)
+        outcomes = (self.rng.random(self.shots) < p1).astype(np.uint8)
+        if mask is not None:
+            outcomes[~mask] = 0
+
+        self._collapse(qubit, outcomes, p1, mask)
+        return outcomes
+
+    def _collapse(self, qubit: int, outcomes: np.ndarray, p1: np.ndarray,
+                  mask: Optional[np.ndarray]):
+        """Project each shot onto its sampled outcome and renormalize."""
+        view = self._split(qubit)
+        ones = outcomes.astype(bool)
+        active = np.ones(self.shots, dtype=bool) if mask is None else mask
+
+        drop_one = active & ~ones
+        drop_zero = active & ones
+        if drop_one.any():
+            view[drop_one, :, 1, :] = 0
+        if drop_zero.any():
+            view[drop_zero, :, 0, :] = 0
+
+        p_kept = np.where(ones, p1, 1.0 - p1)
+        scale = np.ones(self.shots)
+        nonzero = active & (p_kept > 0)
+        scale[nonzero] = 1.0 / np.sqrt(p_kept[nonzero])
+        if not np.all(scale == 1.0):
+            self.state *= scale[:, None].astype(self.dtype)
+
+    def reset(self, qubit: int, mask: Optional[np.ndarray] = None):
+        """Reset ``qubit`` to |0⟩ (measure, then flip shots that read 1)."""
+        outcomes = self.measure(qubit, mask)
+        flip = outcomes.astype(bool)
+        if flip.any():
+            self.apply_single(qubit, SINGLE_QUBIT_GATES["X"], flip)
+
+    def probabilities(self) -> np.ndarray:
+        """Basis-state probabilities, shape (shots, 2**n)."""
+        return np.abs(self.state) ** 2
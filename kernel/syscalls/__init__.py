@@ -6,8 +6,12 @@ Implements the qSyscall ABI handlers.
 
 from .q_negotiate_caps import handle_negotiate_caps
 from .q_submit import handle_submit
+from .q_submit_batch import handle_submit_batch
 from .q_status import handle_status
-from .q_wait import handle_wait
+from .q_wait import handle_wait, handle_wait_async
+from .q_watch import handle_watch
+from .q_subscribe import handle_subscribe, handle_unsubscribe
+from .q_wait_batch import handle_wait_batch
 from .q_cancel import handle_cancel
 from .q_open_chan import handle_open_chan
 from .q_get_telemetry import handle_get_telemetry
@@ -15,8 +19,14 @@ from .q_get_telemetry import handle_get_telemetry
 __all__ = [
     "handle_negotiate_caps",
     "handle_submit",
+    "handle_submit_batch",
     "handle_status",
     "handle_wait",
+    "handle_wait_async",
+    "handle_watch",
+    "handle_subscribe",
+    "handle_unsubscribe",
+    "handle_wait_batch",
     "handle_cancel",
     "handle_open_chan",
     "handle_get_telemetry",
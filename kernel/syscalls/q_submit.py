@@ -42,20 +42,7 @@ def handle_submit(params: Dict, session_manager, job_manager) -> Dict:
     policy = params.get("policy")
     
     # Validate graph structure
-    if not isinstance(graph, dict):
-        raise ValueError("'graph' must be a dictionary")
-    
-    # Support both old format (nodes/edges) and new QVM format (program/resources)
-    if "program" in graph:
-        # New QVM format
-        if "nodes" not in graph.get("program", {}):
-            raise ValueError("QVM graph must have 'program.nodes'")
-    elif "nodes" in graph:
-        # Old format (for backwards compatibility)
-        if "edges" not in graph:
-            raise ValueError("Graph must have 'nodes' and 'edges'")
-    else:
-        raise ValueError("Graph must have either 'program.nodes' (QVM format) or 'nodes'/'edges' (legacy format)")
+    _validate_graph(graph, "graph")
     
     # Validate session
     session = session_manager.get_session(session_id)
@@ -80,12 +67,41 @@ def handle_submit(params: Dict, session_manager, job_manager) -> Dict:
     
     job_id = result["job_id"]
     
-    # Track job in session
-    session_manager.register_job(session_id, job_id)
+    # Track job in session (job managers wired to this session manager
+    # register the job themselves before it is queued)
+    if getattr(job_manager, "session_manager", None) is not session_manager:
+        session_manager.register_job(session_id, job_id)
     
     return result
 
 
+def _validate_graph(graph: Dict, name: str):
+    """
+    Check the top-level structure of a submitted graph.
+    
+    Args:
+        graph: Submitted graph
+        name: Parameter name used in error messages
+    
+    Raises:
+        ValueError: If the graph is malformed
+    """
+    if not isinstance(graph, dict):
+        raise ValueError(f"'{name}' must be a dictionary")
+    
+    # Support both old format (nodes/edges) and new QVM format (program/resources)
+    if "program" in graph:
+        # New QVM format
+        if "nodes" not in graph.get("program", {}):
+            raise ValueError("QVM graph must have 'program.nodes'")
+    elif "nodes" in graph:
+        # Old format (for backwards compatibility)
+        if "edges" not in graph:
+            raise ValueError("Graph must have 'nodes' and 'edges'")
+    else:
+        raise ValueError("Graph must have either 'program.nodes' (QVM format) or 'nodes'/'edges' (legacy format)")
+
+
 def _extract_required_capabilities(graph: Dict) -> list:
     """
     Extract required capabilities from graph operations.
@@ -0,0 +1,98 @@
+"""
+q_submit_batch syscall handler
+
+Submits one job per parameter row of a template graph. Structure,
+session and capabilities are checked once for the whole batch, and every
+bound graph shares the template's certified structure in the executor.
+"""
+
+from typing import Dict
+
+from kernel.executor.graph_template import GraphTemplate
+from .q_submit import _validate_graph, _extract_required_capabilities
+
+
+def handle_submit_batch(params: Dict, session_manager, job_manager) -> Dict:
+    """
+    Handle q_submit_batch syscall.
+    
+    Args:
+        params: Request parameters with:
+            - template: QVM graph whose angle arguments may be
+              ``{"param": name}`` placeholders
+            - parameters: List of {name: value} rows, one job per row
+            - session_id: Session identifier
+            - policy: Optional execution policy shared by all jobs
+        session_manager: SessionManager instance
+        job_manager: JobManager instance
+    
+    Returns:
+        Dictionary with:
+        - batch_id: Handle for q_wait_batch
+        - job_ids: Job identifiers in row order
+        - state: Initial job state
+        - parameters: Template parameter names
+    
+    Raises:
+        ValueError: If the template or a parameter row is invalid
+        KeyError: If session not found
+        RuntimeError: If quota exceeded or capabilities missing
+    """
+    # Validate parameters
+    if "template" not in params:
+        raise ValueError("Missing 'template' parameter")
+    
+    if "parameters" not in params:
+        raise ValueError("Missing 'parameters' parameter")
+    
+    if "session_id" not in params:
+        raise ValueError("Missing 'session_id' parameter")
+    
+    template_graph = params["template"]
+    rows = params["parameters"]
+    session_id = params["session_id"]
+    policy = params.get("policy")
+    
+    _validate_graph(template_graph, "template")
+    
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("'parameters' must be a non-empty list")
+    
+    # Validate session
+    session_manager.get_session(session_id)
+    
+    # Check capabilities once for the shared structure
+    required_caps = _extract_required_capabilities(template_graph)
+    
+    if required_caps:
+        cap_check = session_manager.check_capabilities(session_id, required_caps)
+        
+        if not cap_check["has_all"]:
+            raise RuntimeError(
+                f"Insufficient capabilities. Missing: {cap_check['missing']}"
+            )
+    
+    # Bind every row before queueing anything
+    template = GraphTemplate(template_graph)
+    graphs = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"Parameter row {index} must be a dictionary")
+        try:
+            graphs.append(template.bind(row))
+        except ValueError as e:
+            raise ValueError(f"Parameter row {index}: {e}") from None
+    
+    result = job_manager.submit_batch(
+        session_id=session_id,
+        graphs=graphs,
+        policy=policy
+    )
+    
+    # Track jobs in session (job managers wired to this session manager
+    # register them themselves before they are queued)
+    if getattr(job_manager, "session_manager", None) is not session_manager:
+        session_manager.register_jobs(session_id, result["job_ids"])
+    
+    result["parameters"] = template.parameters
+    return result
@@ -0,0 +1,108 @@
+"""
+q_subscribe / q_unsubscribe syscall handlers
+
+Stream a job's state transitions, per-epoch progress and measurement
+events to a persistent connection as JSON-RPC notifications.
+"""
+
+from typing import Dict, Callable, Optional
+
+# Notification carrying one job event stream message
+JOB_EVENT_NOTIFICATION = "q_job_event"
+
+# Message types a subscriber may select
+EVENT_TYPES = ("state", "progress", "events")
+
+
+def handle_subscribe(
+    params: Dict,
+    session_manager,
+    job_manager,
+    notify: Callable[[str, Dict], None],
+    on_close: Optional[Callable[[Callable[[], None]], None]] = None
+) -> Dict:
+    """
+    Handle q_subscribe syscall.
+    
+    Args:
+        params: Request parameters with:
+            - job_id: Job identifier
+            - session_id: Session identifier
+            - types: Optional subset of ("state", "progress", "events");
+              the final state message is always delivered
+        session_manager: SessionManager instance
+        job_manager: JobManager instance
+        notify: Thread-safe ``notify(method, params)`` pushing a JSON-RPC
+                notification to the caller's connection
+        on_close: Optional hook registering a callable to run when the
+                  connection closes, so abandoned streams are dropped
+    
+    Returns:
+        Dictionary with job_id and subscription_id. Messages follow as
+        ``q_job_event`` notifications (see ``JobManager.subscribe``) until
+        the one marked ``final``; the first ones may arrive before this
+        response.
+    
+    Raises:
+        ValueError: If parameters are invalid
+        KeyError: If job or session not found
+        PermissionError: If job belongs to different session
+    """
+    if "job_id" not in params:
+        raise ValueError("Missing 'job_id' parameter")
+    if "session_id" not in params:
+        raise ValueError("Missing 'session_id' parameter")
+    
+    job_id = params["job_id"]
+    session_id = params["session_id"]
+    types = params.get("types", list(EVENT_TYPES))
+    
+    if not isinstance(types, list):
+        raise ValueError("'types' must be a list")
+    unknown = [t for t in types if t not in EVENT_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown event types: {unknown} (allowed: {list(EVENT_TYPES)})")
+    selected = frozenset(types)
+    
+    session_manager.get_session(session_id)
+    
+    def listener(message: Dict):
+        if message["type"] in selected or message.get("final"):
+            notify(JOB_EVENT_NOTIFICATION, message)
+    
+    subscription_id = job_manager.subscribe(job_id, session_id, listener)
+    
+    if on_close is not None:
+        on_close(lambda: job_manager.unsubscribe(subscription_id, session_id))
+    
+    return {"job_id": job_id, "subscription_id": subscription_id}
+
+
+def handle_unsubscribe(params: Dict, session_manager, job_manager) -> Dict:
+    """
+    Handle q_unsubscribe syscall.
+    
+    Args:
+        params: Request parameters with:
+            - subscription_id: Identifier returned by q_subscribe
+            - session_id: Session identifier
+        session_manager: SessionManager instance
+        job_manager: JobManager instance
+    
+    Returns:
+        Dictionary with subscription_id and whether it was still active
+    
+    Raises:
+        ValueError: If parameters are invalid
+        KeyError: If session not found
+        PermissionError: If subscription belongs to different session
+    """
+    if "subscription_id" not in params:
+        raise ValueError("Missing 'subscription_id' parameter")
+    if "session_id" not in params:
+        raise ValueError("Missing 'session_id' parameter")
+    
+    session_manager.get_session(params["session_id"])
+    active = job_manager.unsubscribe(params["subscription_id"], params["session_id"])
+    
+    return {"subscription_id": params["subscription_id"], "unsubscribed": active}
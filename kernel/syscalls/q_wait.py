@@ -1,5 +1,6 @@
 """q_wait syscall handler"""
 
+import asyncio
 from typing import Dict
 
 
@@ -18,3 +19,44 @@ def handle_wait(params: Dict, session_manager, job_manager) -> Dict:
     status = job_manager.wait_for_job(job_id, session_id, timeout_ms)
     
     return status
+
+
+async def handle_wait_async(params: Dict, session_manager, job_manager) -> Dict:
+    """
+    Handle q_wait syscall on an event loop.
+    
+    Awaits a completion callback instead of blocking a thread in
+    ``JobManager.wait_for_job``.
+    """
+    if "job_id" not in params:
+        raise ValueError("Missing 'job_id' parameter")
+    if "session_id" not in params:
+        raise ValueError("Missing 'session_id' parameter")
+    
+    job_id = params["job_id"]
+    session_id = params["session_id"]
+    timeout_ms = params.get("timeout_ms")
+    
+    session_manager.get_session(session_id)
+    
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    
+    def resolve(status):
+        if not done.done():
+            done.set_result(status)
+    
+    def on_done(status):
+        loop.call_soon_threadsafe(resolve, status)
+    
+    job_manager.add_done_callback(job_id, session_id, on_done)
+    
+    timeout_sec = timeout_ms / 1000.0 if timeout_ms else None
+    try:
+        return await asyncio.wait_for(done, timeout_sec)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Job '{job_id}' did not complete within timeout") from None
+    finally:
+        # On timeout or cancellation the callback is still registered; do
+        # not leave one closure per poll behind (a no-op once it has fired)
+        job_manager.remove_done_callback(job_id, on_done)
@@ -0,0 +1,28 @@
+"""q_wait_batch syscall handler"""
+
+from typing import Dict
+
+
+def handle_wait_batch(params: Dict, session_manager, job_manager) -> Dict:
+    """
+    Handle q_wait_batch syscall.
+    
+    Returns the batch results completed after ``cursor``, waiting up to
+    ``timeout_ms`` for at least one. Clients stream a batch by passing the
+    returned cursor back until ``done`` is true.
+    """
+    if "batch_id" not in params:
+        raise ValueError("Missing 'batch_id' parameter")
+    if "session_id" not in params:
+        raise ValueError("Missing 'session_id' parameter")
+    
+    batch_id = params["batch_id"]
+    session_id = params["session_id"]
+    cursor = params.get("cursor", 0)
+    timeout_ms = params.get("timeout_ms")
+    
+    if not isinstance(cursor, int) or cursor < 0:
+        raise ValueError("'cursor' must be a non-negative integer")
+    
+    session_manager.get_session(session_id)
+    return job_manager.wait_for_batch(batch_id, session_id, cursor, timeout_ms)
@@ -0,0 +1,64 @@
+"""
+q_watch syscall handler
+
+Registers for a server-pushed completion notification on a persistent
+connection.
+"""
+
+from typing import Dict, Callable, Optional
+
+# Notification pushed to the watching connection when the job finishes
+JOB_DONE_NOTIFICATION = "q_job_done"
+
+
+def handle_watch(
+    params: Dict,
+    session_manager,
+    job_manager,
+    notify: Callable[[str, Dict], None],
+    on_close: Optional[Callable[[Callable[[], None]], None]] = None
+) -> Dict:
+    """
+    Handle q_watch syscall.
+    
+    Args:
+        params: Request parameters with:
+            - job_id: Job identifier
+            - session_id: Session identifier
+        session_manager: SessionManager instance
+        job_manager: JobManager instance
+        notify: Thread-safe ``notify(method, params)`` pushing a JSON-RPC
+                notification to the caller's connection
+        on_close: Optional hook registering a callable to run when the
+                  connection closes, so a dropped watcher's completion
+                  callback is removed
+    
+    Returns:
+        Dictionary with job_id and watching flag. The final job status
+        follows as a ``q_job_done`` notification, possibly before this
+        response if the job has already finished.
+    
+    Raises:
+        ValueError: If parameters are invalid
+        KeyError: If job or session not found
+        PermissionError: If job belongs to different session
+    """
+    if "job_id" not in params:
+        raise ValueError("Missing 'job_id' parameter")
+    if "session_id" not in params:
+        raise ValueError("Missing 'session_id' parameter")
+    
+    job_id = params["job_id"]
+    session_id = params["session_id"]
+    
+    session_manager.get_session(session_id)
+    
+    def on_done(status: Dict):
+        notify(JOB_DONE_NOTIFICATION, status)
+    
+    job_manager.add_done_callback(job_id, session_id, on_done)
+    
+    if on_close is not None:
+        on_close(lambda: job_manager.remove_done_callback(job_id, on_done))
+    
+    return {"job_id": job_id, "watching": True}
@@ -4,8 +4,9 @@ QIR Optimization Framework
 Provides infrastructure for QIR-to-QIR optimizations with validation.
 """
 
-from .ir import QIRCircuit, QIRInstruction, QIRQubit, InstructionType
-from .pass_base import OptimizationPass, PassManager
+from .ir import QIRCircuit, QIRInstruction, QIRQubit, InstructionType, InstructionNode
+from .dag import CircuitDAG, CommutationGroup
+from .pass_base import OptimizationPass, PassManager, run_pass
 from .metrics import OptimizationMetrics
 from .converters import QIRToIRConverter, IRToQVMConverter, QVMToIRConverter
 
@@ -14,8 +15,12 @@ __all__ = [
     'QIRInstruction', 
     'QIRQubit',
     'InstructionType',
+    'InstructionNode',
+    'CircuitDAG',
+    'CommutationGroup',
     'OptimizationPass',
     'PassManager',
+    'run_pass',
     'OptimizationMetrics',
     'QIRToIRConverter',
     'IRToQVMConverter',
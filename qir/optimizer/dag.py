@@ -0,0 +1,327 @@
+"""
+Circuit DAG View
+
+Dependency view of a ``QIRCircuit`` shared by optimization passes.
+
+The circuit's linked nodes already form a DAG: every node's wire links
+are its dependency edges. On top of that the view tracks, per qubit,
+commutation groups - maximal runs of consecutive wire uses that act on
+the qubit in the same basis (all diagonal, or all X-type) and therefore
+commute with each other there. Gates in one group may be reordered
+freely on that wire, so a pass can find a gate that could be brought
+next to another one by comparing groups instead of rescanning the
+instruction list.
+
+The view is attached to its circuit and updated on every insertion and
+removal, so it stays valid while a pass rewrites the circuit. Every edit
+also stamps the wires it touched with a new version, which lets callers
+ask which qubits changed since a point in time.
+"""
+
+from typing import List, Dict, Optional, Set, Iterable, Iterator, Tuple
+
+from .ir import QIRCircuit, QIRQubit, QIRInstruction, InstructionType, InstructionNode
+
+
+# Gates acting diagonally (Z basis) on every qubit they touch
+DIAGONAL_GATES = {
+    InstructionType.Z,
+    InstructionType.S,
+    InstructionType.SDG,
+    InstructionType.T,
+    InstructionType.TDG,
+    InstructionType.RZ,
+    InstructionType.CZ,
+}
+
+# Gates acting as X-basis rotations on their (only) qubit
+X_GATES = {
+    InstructionType.X,
+    InstructionType.RX,
+}
+
+
+def wire_action(instruction: QIRInstruction, qubit: QIRQubit) -> Optional[str]:
+    """
+    Basis in which an instruction acts on one of its qubits.
+    
+    Returns:
+        'Z' for diagonal action (including a CNOT control), 'X' for
+        X-type action (including a CNOT target), or None if the
+        instruction does not commute with either kind on that qubit
+    """
+    inst_type = instruction.inst_type
+    if inst_type in DIAGONAL_GATES:
+        return 'Z'
+    if inst_type in X_GATES:
+        return 'X'
+    if inst_type == InstructionType.CNOT:
+        return 'Z' if instruction.qubits[0] == qubit else 'X'
+    return None
+
+
+class CommutationGroup:
+    """
+    Run of consecutive uses of a qubit that commute with each other on it.
+    
+    Attributes:
+        qubit: Qubit whose wire the group lies on
+        kind: 'Z' or 'X', or None for a single non-commuting use
+        nodes: Nodes in the group
+    """
+    __slots__ = ('qubit', 'kind', 'nodes')
+    
+    def __init__(self, qubit: QIRQubit, kind: Optional[str]):
+        self.qubit = qubit
+        self.kind = kind
+        self.nodes: Set[InstructionNode] = set()
+    
+    def __len__(self):
+        return len(self.nodes)
+    
+    def __repr__(self):
+        return f"CommutationGroup({self.qubit.id}, {self.kind}, {len(self.nodes)} nodes)"
+
+
+class CircuitDAG:
+    """
+    Commutation-aware dependency view of a circuit.
+    
+    Obtain it with ``circuit.dag()``; the circuit keeps the view current
+    as nodes are inserted and removed. Per-node queries are O(1) except
+    where noted.
+    
+    Example:
+        >>> dag = circuit.dag()
+        >>> for partner in dag.mates(node):
+        ...     if partner.instruction.inverse() == node.instruction:
+        ...         ...
+    """
+    
+    def __init__(self, circuit: QIRCircuit):
+        """
+        Build the view of a circuit.
+        
+        Args:
+            circuit: Circuit to track
+        """
+        self.circuit = circuit
+        self._groups: Dict[Tuple[InstructionNode, QIRQubit], CommutationGroup] = {}
+        self._front: Set[InstructionNode] = set()
+        self._two_qubit_uses: Dict[QIRQubit, int] = {}
+        self._wire_versions: Dict[QIRQubit, int] = {}
+        self.version = 0
+        for node in circuit.nodes():
+            self._node_linked(node)
+        
+        # Edit counter; the building edits above do not count
+        self.version = 0
+        self._wire_versions.clear()
+    
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    
+    def wire(self, qubit: QIRQubit) -> Iterator[InstructionNode]:
+        """Iterate over the uses of ``qubit`` in program order."""
+        return self.circuit.wire(qubit)
+    
+    def predecessors(self, node: InstructionNode) -> List[InstructionNode]:
+        """Nodes ``node`` directly depends on (one per wire, deduplicated)."""
+        return list(dict.fromkeys(p for p in node.wire_prev.values() if p is not None))
+    
+    def successors(self, node: InstructionNode) -> List[InstructionNode]:
+        """Nodes directly depending on ``node`` (one per wire, deduplicated)."""
+        return list(dict.fromkeys(s for s in node.wire_next.values() if s is not None))
+    
+    def front_layer(self) -> List[InstructionNode]:
+        """Nodes without predecessors, in program order."""
+        return sorted(self._front, key=lambda node: node.order)
+    
+    def layers(self) -> List[List[InstructionNode]]:
+        """
+        ASAP layers: each node sits one layer after its latest predecessor.
+        
+        O(n) per call; the first layer is ``front_layer()``.
+        """
+        depth: Dict[InstructionNode, int] = {}
+        layers: List[List[InstructionNode]] = []
+        for node in self.circuit.nodes():
+            level = max((depth[p] + 1 for p in node.wire_prev.values() if p is not None), default=0)
+            depth[node] = level
+            if level == len(layers):
+                layers.append([])
+            layers[level].append(node)
+        return layers
+    
+    def group(self, node: InstructionNode, qubit: QIRQubit) -> CommutationGroup:
+        """Commutation group of ``node`` on ``qubit``."""
+        return self._groups[(node, qubit)]
+    
+    def commutation_groups(self, qubit: QIRQubit) -> List[CommutationGroup]:
+        """Commutation groups along the wire of ``qubit``, in program order."""
+        groups = []
+        for node in self.circuit.wire(qubit):
+            group = self._groups[(node, qubit)]
+            if not groups or groups[-1] is not group:
+                groups.append(group)
+        return groups
+    
+    def commute_on(self, first: InstructionNode, second: InstructionNode,
+                   qubit: QIRQubit) -> bool:
+        """Whether two uses of ``qubit`` are in the same commutation group."""
+        return self._groups[(first, qubit)] is self._groups[(second, qubit)]
+    
+    def mates(self, node: InstructionNode) -> Iterator[InstructionNode]:
+        """
+        Later nodes on exactly ``node``'s qubits that could be moved next to it.
+        
+        A candidate qualifies when, on every qubit, everything between it
+        and ``node`` lies in its commutation group, so it commutes past all
+        of them. Candidates come nearest first; the cost is linear in the
+        size of the group following ``node`` on its first qubit.
+        """
+        qubits = list(node.wire_next)
+        if not qubits:
+            return
+        
+        first = node.wire_next[qubits[0]]
+        if first is None:
+            return
+        run = self._groups[(first, qubits[0])]
+        
+        candidate = first
+        while candidate is not None:
+            if candidate.wire_next.keys() == node.wire_next.keys() and all(
+                node.wire_next[q] is candidate
+                or self._groups[(node.wire_next[q], q)] is self._groups[(candidate, q)]
+                for q in qubits
+            ):
+                yield candidate
+            if run.kind is None:
+                return
+            candidate = candidate.wire_next[qubits[0]]
+            if candidate is not None and self._groups[(candidate, qubits[0])] is not run:
+                return
+    
+    def changed_since(self, version: int) -> Set[QIRQubit]:
+        """Qubits whose wires were edited after ``version``."""
+        return {qubit for qubit, stamp in self._wire_versions.items() if stamp > version}
+    
+    def nodes_on(self, qubits: Iterable[QIRQubit]) -> List[InstructionNode]:
+        """Nodes using any of ``qubits``, in program order."""
+        nodes = set()
+        for qubit in qubits:
+            nodes.update(self.circuit.wire(qubit))
+        return sorted(nodes, key=lambda node: node.order)
+    
+    def two_qubit_gate_count(self, qubit: QIRQubit) -> int:
+        """Number of two-qubit gates acting on ``qubit``."""
+        return self._two_qubit_uses.get(qubit, 0)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """View size summary."""
+        return {
+            "nodes": self.circuit.get_instruction_count(),
+            "front": len(self._front),
+            "groups": len(set(map(id, self._groups.values()))),
+        }
+    
+    # ------------------------------------------------------------------
+    # Maintenance (called by QIRCircuit)
+    # ------------------------------------------------------------------
+    
+    def _node_linked(self, node: InstructionNode):
+        """Account for a node just linked into the circuit."""
+        instruction = node.instruction
+        self._touch(node)
+        if all(p is None for p in node.wire_prev.values()):
+            self._front.add(node)
+        
+        for qubit, before in node.wire_prev.items():
+            after = node.wire_next[qubit]
+            if after is not None:
+                self._front.discard(after)
+            if instruction.is_two_qubit_gate():
+                self._two_qubit_uses[qubit] = self._two_qubit_uses.get(qubit, 0) + 1
+            
+            kind = wire_action(instruction, qubit)
+            # Neighbours not seen yet (while building) count as absent
+            group_before = self._groups.get((before, qubit))
+            group_after = self._groups.get((after, qubit))
+            
+            if group_before is not None and group_before is group_after and kind != group_before.kind:
+                # Inserted into the middle of a run it does not commute with
+                self._split(after, qubit, group_before)
+                group_after = self._groups.get((after, qubit))
+            
+            if kind is not None and group_before is not None and group_before.kind == kind:
+                group = group_before
+            elif kind is not None and group_after is not None and group_after.kind == kind:
+                group = group_after
+            else:
+                group = CommutationGroup(qubit, kind)
+            group.nodes.add(node)
+            self._groups[(node, qubit)] = group
+    
+    def _node_removed(self, node: InstructionNode):
+        """Account for a node just unlinked from the circuit."""
+        self._touch(node)
+        self._front.discard(node)
+        
+        for qubit, before in node.wire_prev.items():
+            after = node.wire_next[qubit]
+            if node.instruction.is_two_qubit_gate():
+                self._two_qubit_uses[qubit] -= 1
+            
+            group = self._groups.pop((node, qubit))
+            group.nodes.discard(node)
+            
+            if after is not None and after.alive and all(p is None for p in after.wire_prev.values()):
+                self._front.add(after)
+            if before is None or after is None:
+                continue
+            
+            # The neighbours are now adjacent: join runs of the same kind
+            group_before = self._groups[(before, qubit)]
+            group_after = self._groups[(after, qubit)]
+            if (group_before is not group_after and group_before.kind is not None
+                    and group_before.kind == group_after.kind):
+                self._merge(group_before, group_after)
+    
+    def _clear(self):
+        """Forget every node (the circuit was emptied)."""
+        self.version += 1
+        for _, qubit in self._groups:
+            self._wire_versions[qubit] = self.version
+        self._groups.clear()
+        self._front.clear()
+        self._two_qubit_uses.clear()
+    
+    def _touch(self, node: InstructionNode):
+        """Stamp the wires of an edited node with a new version."""
+        self.version += 1
+        for qubit in node.wire_prev:
+            self._wire_versions[qubit] = self.version
+    
+    def _split(self, start: InstructionNode, qubit: QIRQubit, group: CommutationGroup):
+        """Move ``start`` and the rest of its run on ``qubit`` to a new group."""
+        tail = CommutationGroup(qubit, group.kind)
+        node = start
+        while node is not None and self._groups.get((node, qubit)) is group:
+            group.nodes.discard(node)
+            tail.nodes.add(node)
+            self._groups[(node, qubit)] = tail
+            node = node.wire_next[qubit]
+    
+    def _merge(self, first: CommutationGroup, second: CommutationGroup):
+        """Merge two adjacent groups of the same kind (relabels the smaller)."""
+        if len(first) < len(second):
+            first, second = second, first
+        for node in second.nodes:
+            self._groups[(node, second.qubit)] = first
+        first.nodes |= second.nodes
+        second.nodes.clear()
+    
+    def __repr__(self):
+        return f"CircuitDAG({self.circuit!r})"
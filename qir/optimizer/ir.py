@@ -5,7 +5,7 @@ Provides a mutable IR for circuit optimization that can be converted
 to/from QIR and QVM formats.
 """
 
-from typing import List, Dict, Optional, Set, Any
+from typing import List, Dict, Optional, Set, Any, Iterator, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -185,18 +185,118 @@ class QIRInstruction:
         return f"{self.inst_type.value}({qubits_str}{params_str})"
 
 
+class InstructionNode:
+    """
+    Position of one instruction in a ``QIRCircuit``.
+    
+    Nodes form a doubly linked list in program order and, for every qubit
+    the instruction touches, a doubly linked wire of the uses of that
+    qubit. A removed node keeps its forward links, so a pass iterating
+    over ``circuit.nodes()`` can remove the current node and carry on.
+    
+    Attributes:
+        instruction: The instruction at this position
+        prev: Previous node in program order
+        next: Next node in program order
+        wire_prev: Qubit -> previous node on that qubit's wire
+        wire_next: Qubit -> next node on that qubit's wire
+        order: Label increasing in program order
+        alive: False once the node has been removed
+    """
+    __slots__ = ('instruction', 'prev', 'next', 'wire_prev', 'wire_next', 'order', 'alive')
+    
+    def __init__(self, instruction: QIRInstruction):
+        self.instruction = instruction
+        self.prev: Optional['InstructionNode'] = None
+        self.next: Optional['InstructionNode'] = None
+        self.wire_prev: Dict[QIRQubit, Optional['InstructionNode']] = {}
+        self.wire_next: Dict[QIRQubit, Optional['InstructionNode']] = {}
+        self.order = 0
+        self.alive = True
+    
+    def next_on(self, qubit: QIRQubit) -> Optional['InstructionNode']:
+        """Next instruction on ``qubit`` (None at the end of its wire)."""
+        return self.wire_next.get(qubit)
+    
+    def prev_on(self, qubit: QIRQubit) -> Optional['InstructionNode']:
+        """Previous instruction on ``qubit`` (None at the start of its wire)."""
+        return self.wire_prev.get(qubit)
+    
+    def wire_successor(self) -> Optional['InstructionNode']:
+        """The instruction that comes next on every qubit of this one, if any."""
+        following = set(self.wire_next.values())
+        if len(following) == 1:
+            return following.pop()
+        return None
+    
+    def wire_predecessor(self) -> Optional['InstructionNode']:
+        """The instruction that comes last before this one on all its qubits, if any."""
+        preceding = set(self.wire_prev.values())
+        if len(preceding) == 1:
+            return preceding.pop()
+        return None
+    
+    def __repr__(self):
+        return f"InstructionNode({self.instruction!r})"
+
+
 class QIRCircuit:
     """
     Mutable intermediate representation of a quantum circuit.
     
-    Provides methods for circuit manipulation and optimization.
+    Instructions are held in linked ``InstructionNode`` objects with
+    per-qubit use lists, so removing or inserting an instruction next to
+    a known node and finding the next instruction on a qubit are O(1).
+    ``instructions`` remains available as an indexed view for analyses
+    and index-based callers; it is rebuilt lazily after mutation.
     """
     
+    # Spacing of order labels; labels are renumbered when a gap runs out
+    ORDER_GAP = 1 << 16
+    
     def __init__(self):
-        self.instructions: List[QIRInstruction] = []
         self.qubits: Dict[str, QIRQubit] = {}
         self.results: Set[str] = set()
         self.metadata: Dict[str, Any] = {}
+        
+        self._head: Optional[InstructionNode] = None
+        self._tail: Optional[InstructionNode] = None
+        self._count = 0
+        self._first_use: Dict[QIRQubit, InstructionNode] = {}
+        self._last_use: Dict[QIRQubit, InstructionNode] = {}
+        self._result_refs: Dict[str, int] = {}
+        self._node_view: Optional[List[InstructionNode]] = []
+        self._instruction_view: Optional[Tuple[QIRInstruction, ...]] = ()
+        self._dag = None
+    
+    @property
+    def instructions(self) -> Tuple[QIRInstruction, ...]:
+        """
+        Instructions in program order (read-only snapshot).
+        
+        The snapshot is rebuilt in O(n) on first access after a mutation;
+        loops that edit the circuit should walk ``nodes()`` instead.
+        """
+        if self._instruction_view is None:
+            self._instruction_view = tuple(node.instruction for node in self._nodes_list())
+        return self._instruction_view
+    
+    @instructions.setter
+    def instructions(self, instructions: List[QIRInstruction]):
+        """Replace all instructions."""
+        for node in self.nodes():
+            node.alive = False
+        self._head = self._tail = None
+        self._count = 0
+        self._first_use.clear()
+        self._last_use.clear()
+        self._result_refs.clear()
+        self.results.clear()
+        self._invalidate()
+        if self._dag is not None:
+            self._dag._clear()
+        for instruction in instructions:
+            self.add_instruction(instruction)
     
     def add_qubit(self, qubit_id: str) -> QIRQubit:
         """Add a qubit to the circuit."""
@@ -209,48 +309,180 @@ class QIRCircuit:
         """Get a qubit by ID."""
         return self.qubits.get(qubit_id)
     
+    def dag(self) -> 'CircuitDAG':
+        """
+        Commutation-aware DAG view of this circuit.
+        
+        Built on first use and kept current by every later insertion and
+        removal until ``release_dag`` is called.
+        """
+        if self._dag is None:
+            from .dag import CircuitDAG
+            self._dag = CircuitDAG(self)
+        return self._dag
+    
+    def release_dag(self):
+        """Stop maintaining the DAG view."""
+        self._dag = None
+    
+    @property
+    def has_dag(self) -> bool:
+        """Whether a DAG view is currently being maintained."""
+        return self._dag is not None
+    
+    # ------------------------------------------------------------------
+    # Node API
+    # ------------------------------------------------------------------
+    
+    def nodes(self) -> Iterator[InstructionNode]:
+        """
+        Iterate over instruction nodes in program order.
+        
+        The current node may be removed, and nodes may be inserted after
+        it, while iterating.
+        """
+        node = self._head
+        while node is not None:
+            if node.alive:
+                yield node
+            node = node.next
+    
+    def first_node(self) -> Optional[InstructionNode]:
+        """First instruction node (None if the circuit is empty)."""
+        return self._head
+    
+    def last_node(self) -> Optional[InstructionNode]:
+        """Last instruction node (None if the circuit is empty)."""
+        return self._tail
+    
+    def first_on(self, qubit: QIRQubit) -> Optional[InstructionNode]:
+        """First instruction using ``qubit``."""
+        return self._first_use.get(qubit)
+    
+    def last_on(self, qubit: QIRQubit) -> Optional[InstructionNode]:
+        """Last instruction using ``qubit``."""
+        return self._last_use.get(qubit)
+    
+    def wire(self, qubit: QIRQubit) -> Iterator[InstructionNode]:
+        """Iterate over the instructions using ``qubit`` in program order."""
+        node = self._first_use.get(qubit)
+        while node is not None:
+            if node.alive:
+                yield node
+            node = node.wire_next.get(qubit)
+    
+    def append(self, instruction: QIRInstruction) -> InstructionNode:
+        """Append an instruction and return its node."""
+        return self._link(InstructionNode(instruction), self._tail, None)
+    
+    def insert_before(self, node: InstructionNode, instruction: QIRInstruction) -> InstructionNode:
+        """Insert an instruction immediately before ``node``."""
+        self._check_alive(node)
+        return self._link(InstructionNode(instruction), node.prev, node)
+    
+    def insert_after(self, node: InstructionNode, instruction: QIRInstruction) -> InstructionNode:
+        """Insert an instruction immediately after ``node``."""
+        self._check_alive(node)
+        return self._link(InstructionNode(instruction), node, node.next)
+    
+    def remove(self, node: InstructionNode):
+        """
+        Remove an instruction node.
+        
+        The node keeps its ``next`` link so iteration can continue past it.
+        """
+        self._check_alive(node)
+        node.alive = False
+        
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self._head = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self._tail = node.prev
+        
+        for qubit, before in node.wire_prev.items():
+            after = node.wire_next[qubit]
+            if before is not None:
+                before.wire_next[qubit] = after
+            elif after is not None:
+                self._first_use[qubit] = after
+            else:
+                del self._first_use[qubit]
+            if after is not None:
+                after.wire_prev[qubit] = before
+            elif before is not None:
+                self._last_use[qubit] = before
+            else:
+                del self._last_use[qubit]
+        
+        result = node.instruction.result
+        if result:
+            self._result_refs[result] -= 1
+            if not self._result_refs[result]:
+                del self._result_refs[result]
+                self.results.discard(result)
+        
+        self._count -= 1
+        self._invalidate()
+        if self._dag is not None:
+            self._dag._node_removed(node)
+    
+    def replace(self, node: InstructionNode, instruction: QIRInstruction) -> InstructionNode:
+        """Replace the instruction at ``node``; returns the new node."""
+        new_node = self.insert_before(node, instruction)
+        self.remove(node)
+        return new_node
+    
+    def get_instruction_count(self) -> int:
+        """Count all instructions."""
+        return self._count
+    
+    # ------------------------------------------------------------------
+    # Index-based API
+    #
+    # Indexes are resolved through a node list rebuilt after every
+    # mutation, so each call below is O(n). They suit one-off edits; a
+    # pass that edits in a loop should use the node API above.
+    # ------------------------------------------------------------------
+    
     def add_instruction(self, instruction: QIRInstruction):
         """Add an instruction to the circuit."""
-        self.instructions.append(instruction)
-        
-        # Track result registers
-        if instruction.result:
-            self.results.add(instruction.result)
+        self.append(instruction)
     
     def remove_instruction(self, index: int):
-        """Remove an instruction by index."""
-        if 0 <= index < len(self.instructions):
-            inst = self.instructions.pop(index)
-            # Clean up result if it was the only use
-            if inst.result and not any(i.result == inst.result for i in self.instructions):
-                self.results.discard(inst.result)
+        """Remove an instruction by index (O(n); see ``remove`` for O(1))."""
+        if 0 <= index < self._count:
+            self.remove(self._nodes_list()[index])
     
     def insert_instruction(self, index: int, instruction: QIRInstruction):
-        """Insert an instruction at a specific index."""
-        self.instructions.insert(index, instruction)
-        if instruction.result:
-            self.results.add(instruction.result)
+        """Insert an instruction at an index (O(n); see ``insert_before`` for O(1))."""
+        if index >= self._count:
+            self.append(instruction)
+        else:
+            self.insert_before(self._nodes_list()[max(index, 0)], instruction)
     
     def get_qubit_last_use(self, qubit: QIRQubit) -> Optional[int]:
-        """Get the index of the last instruction using this qubit."""
-        for i in range(len(self.instructions) - 1, -1, -1):
-            if qubit in self.instructions[i].qubits:
-                return i
-        return None
+        """Get the index of the last instruction using this qubit (O(n); see ``last_on``)."""
+        last = self._last_use.get(qubit)
+        if last is None:
+            return None
+        return self._nodes_list().index(last)
     
     def get_qubit_uses(self, qubit: QIRQubit) -> List[int]:
-        """Get all instruction indices that use this qubit."""
-        return [i for i, inst in enumerate(self.instructions) 
-                if qubit in inst.qubits]
+        """Get all instruction indices that use this qubit (O(n); see ``wire``)."""
+        return [i for i, node in enumerate(self._nodes_list())
+                if qubit in node.wire_prev]
     
     def is_qubit_measured(self, qubit: QIRQubit) -> bool:
         """Check if a qubit is ever measured."""
-        return any(inst.is_measurement() and qubit in inst.qubits 
-                  for inst in self.instructions)
+        return any(node.instruction.is_measurement() for node in self.wire(qubit))
     
     def get_gate_count(self) -> int:
         """Count the number of gate operations."""
-        return sum(1 for inst in self.instructions if inst.is_gate())
+        return sum(1 for node in self.nodes() if node.instruction.is_gate())
     
     def get_depth(self) -> int:
         """
@@ -258,13 +490,14 @@ class QIRCircuit:
         
         Simplified: assumes all gates on different qubits can be parallel.
         """
-        if not self.instructions:
+        if not self._count:
             return 0
         
         # Track depth for each qubit
         qubit_depths = {q: 0 for q in self.qubits.values()}
         
-        for inst in self.instructions:
+        for node in self.nodes():
+            inst = node.instruction
             if inst.is_gate():
                 # Depth is max of all qubits involved + 1
                 max_depth = max(qubit_depths[q] for q in inst.qubits)
@@ -275,26 +508,27 @@ class QIRCircuit:
     
     def get_t_count(self) -> int:
         """Count the number of T gates."""
-        return sum(1 for inst in self.instructions 
-                  if inst.inst_type in [InstructionType.T, InstructionType.TDG])
+        return sum(1 for node in self.nodes()
+                  if node.instruction.inst_type in [InstructionType.T, InstructionType.TDG])
     
     def get_cnot_count(self) -> int:
         """Count the number of CNOT gates."""
-        return sum(1 for inst in self.instructions 
-                  if inst.inst_type == InstructionType.CNOT)
+        return sum(1 for node in self.nodes()
+                  if node.instruction.inst_type == InstructionType.CNOT)
     
     def clone(self) -> 'QIRCircuit':
         """Create a deep copy of this circuit."""
         new_circuit = QIRCircuit()
-        new_circuit.qubits = {qid: QIRQubit(q.id, q.index) 
+        new_circuit.qubits = {qid: QIRQubit(q.id, q.index)
                              for qid, q in self.qubits.items()}
         
         # Map old qubits to new qubits
-        qubit_map = {old_q: new_circuit.qubits[old_q.id] 
+        qubit_map = {old_q: new_circuit.qubits[old_q.id]
                     for old_q in self.qubits.values()}
         
         # Copy instructions with new qubit references
-        for inst in self.instructions:
+        for node in self.nodes():
+            inst = node.instruction
             new_inst = QIRInstruction(
                 inst_type=inst.inst_type,
                 qubits=[qubit_map[q] for q in inst.qubits],
@@ -307,12 +541,117 @@ class QIRCircuit:
         new_circuit.metadata = self.metadata.copy()
         return new_circuit
     
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    
+    def _nodes_list(self) -> List[InstructionNode]:
+        """Live nodes in program order (cached until the next mutation)."""
+        if self._node_view is None:
+            self._node_view = list(self.nodes())
+        return self._node_view
+    
+    def _invalidate(self):
+        self._node_view = None
+        self._instruction_view = None
+    
+    def _check_alive(self, node: InstructionNode):
+        if not node.alive:
+            raise ValueError(f"{node!r} has been removed from the circuit")
+    
+    def _link(self, node: InstructionNode,
+              before: Optional[InstructionNode],
+              after: Optional[InstructionNode]) -> InstructionNode:
+        """Link ``node`` between two adjacent nodes (None at either end)."""
+        node.prev = before
+        node.next = after
+        if before is not None:
+            before.next = node
+        else:
+            self._head = node
+        if after is not None:
+            after.prev = node
+        else:
+            self._tail = node
+        self._assign_order(node)
+        
+        for qubit in dict.fromkeys(node.instruction.qubits):
+            wire_before = self._find_wire_predecessor(node, qubit)
+            if wire_before is not None:
+                wire_after = wire_before.wire_next[qubit]
+                wire_before.wire_next[qubit] = node
+            else:
+                wire_after = self._first_use.get(qubit)
+                self._first_use[qubit] = node
+            if wire_after is not None:
+                wire_after.wire_prev[qubit] = node
+            else:
+                self._last_use[qubit] = node
+            node.wire_prev[qubit] = wire_before
+            node.wire_next[qubit] = wire_after
+        
+        result = node.instruction.result
+        if result:
+            self._result_refs[result] = self._result_refs.get(result, 0) + 1
+            self.results.add(result)
+        
+        self._count += 1
+        self._invalidate()
+        if self._dag is not None:
+            self._dag._node_linked(node)
+        return node
+    
+    def _assign_order(self, node: InstructionNode):
+        """Give a freshly linked node an order label between its neighbours."""
+        low = node.prev.order if node.prev is not None else 0
+        if node.next is None:
+            node.order = low + self.ORDER_GAP
+            return
+        high = node.next.order
+        if high - low > 1:
+            node.order = (low + high) // 2
+            return
+        
+        # Gap exhausted: renumber everything
+        order = 0
+        current = self._head
+        while current is not None:
+            order += self.ORDER_GAP
+            current.order = order
+            current = current.next
+    
+    def _find_wire_predecessor(self, node: InstructionNode,
+                          qubit: QIRQubit) -> Optional[InstructionNode]:
+        """
+        Find the last use of ``qubit`` before a newly linked ``node``.
+        
+        Scans outwards from the node in both directions and stops at the
+        nearest existing use of the qubit, so inserting next to an
+        instruction on the same qubit is O(1).
+        """
+        if node.next is None:
+            return self._last_use.get(qubit)
+        if qubit not in self._first_use:
+            return None
+        
+        before, after = node.prev, node.next
+        while before is not None or after is not None:
+            if before is not None:
+                if qubit in before.wire_prev:
+                    return before
+                before = before.prev
+            if after is not None:
+                if qubit in after.wire_prev:
+                    return after.wire_prev[qubit]
+                after = after.next
+        return None
+    
     def __repr__(self):
-        return f"QIRCircuit({len(self.qubits)} qubits, {len(self.instructions)} instructions)"
+        return f"QIRCircuit({len(self.qubits)} qubits, {self._count} instructions)"
     
     def to_string(self) -> str:
         """Convert circuit to human-readable string."""
-        lines = [f"Circuit: {len(self.qubits)} qubits, {len(self.instructions)} instructions"]
+        lines = [f"Circuit: {len(self.qubits)} qubits, {self._count} instructions"]
         lines.append(f"Qubits: {', '.join(self.qubits.keys())}")
         lines.append("Instructions:")
         for i, inst in enumerate(self.instructions):
@@ -4,9 +4,10 @@ Optimization Pass Base Classes
 Provides infrastructure for implementing optimization passes.
 """
 
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from .ir import QIRCircuit
+from typing import List, Dict, Any, Optional, Set, Iterator
+from .ir import QIRCircuit, QIRQubit, InstructionNode
 from .metrics import OptimizationMetrics
 
 
@@ -15,12 +16,24 @@ class OptimizationPass(ABC):
     Base class for optimization passes.
     
     Each optimization pass implements a single transformation on the circuit.
+    
+    Passes that set ``incremental`` honour ``scope``: when the pass
+    manager re-runs them on a partly changed circuit it sets ``scope`` to
+    the changed qubits, and only nodes on those wires need revisiting.
+    
+    ``run`` leaves any DAG view it built on the circuit so following
+    passes can share it; ``PassManager`` releases it after the sequence,
+    and ``run_pass`` does the same for a single pass.
     """
     
+    # Whether run() restricts itself to ``scope`` when it is set
+    incremental = False
+    
     def __init__(self, name: str):
         self.name = name
         self.enabled = True
         self.metrics = OptimizationMetrics()
+        self.scope: Optional[Set[QIRQubit]] = None
     
     @abstractmethod
     def run(self, circuit: QIRCircuit) -> QIRCircuit:
@@ -43,6 +56,21 @@ class OptimizationPass(ABC):
         """
         return self.enabled
     
+    def scope_nodes(self, circuit: QIRCircuit,
+                    scope: Optional[Set[QIRQubit]] = None) -> Iterator[InstructionNode]:
+        """
+        Nodes a sweep should visit, in program order.
+        
+        All nodes when ``scope`` is None, otherwise those on its wires.
+        Nodes removed during the sweep are skipped.
+        """
+        if scope is None:
+            yield from circuit.nodes()
+            return
+        for node in circuit.dag().nodes_on(scope):
+            if node.alive:
+                yield node
+    
     def get_metrics(self) -> OptimizationMetrics:
         """Get metrics collected during optimization."""
         return self.metrics
@@ -56,17 +84,66 @@ class OptimizationPass(ABC):
         return f"{self.name} ({status})"
 
 
+def run_pass(opt_pass: OptimizationPass, circuit: QIRCircuit) -> QIRCircuit:
+    """
+    Run a single pass outside a ``PassManager``.
+    
+    Releases the DAG view afterwards, so the circuit stops maintaining it.
+    
+    Args:
+        opt_pass: Pass to run
+        circuit: Input circuit
+    
+    Returns:
+        Optimized circuit
+    """
+    result = circuit
+    try:
+        result = opt_pass.run(circuit)
+    finally:
+        circuit.release_dag()
+        result.release_dag()
+    return result
+
+
 class PassManager:
     """
     Manages a sequence of optimization passes.
     
-    Runs passes in order and collects metrics.
+    Runs passes in order and collects metrics. With ``fixed_point`` the
+    sequence is repeated until no pass has new input: a pass is re-run
+    only if a qubit wire changed since it last ran, and incremental
+    passes are restricted to the changed wires.
     """
     
-    def __init__(self, passes: Optional[List[OptimizationPass]] = None):
+    def __init__(
+        self,
+        passes: Optional[List[OptimizationPass]] = None,
+        fixed_point: bool = False,
+        max_rounds: int = 10,
+        time_budget_ms: Optional[float] = None
+    ):
+        """
+        Initialize pass manager.
+        
+        Args:
+            passes: Passes in run order
+            fixed_point: Repeat passes until the circuit stops changing
+            max_rounds: Cap on fixed-point rounds
+            time_budget_ms: Stop starting new passes after this much time
+        """
         self.passes: List[OptimizationPass] = passes or []
         self.verbose = False
         self.validate = True  # Validate circuit after each pass
+        self.fixed_point = fixed_point
+        self.max_rounds = max_rounds
+        self.time_budget_ms = time_budget_ms
+        
+        # Profile of the last run
+        self.profile: List[Dict[str, Any]] = []
+        self.rounds = 0
+        self.converged = False
+        self.total_time_ms = 0.0
     
     def add_pass(self, optimization_pass: OptimizationPass):
         """Add an optimization pass to the manager."""
@@ -98,46 +175,126 @@ class PassManager:
         Returns:
             Optimized circuit
         """
+        start = time.perf_counter()
         current_circuit = circuit
         
+        # Passes share one DAG view, kept current as they rewrite the circuit
+        current_circuit.dag()
+        
+        for opt_pass in self.passes:
+            opt_pass.reset_metrics()
+        self.profile = [{'runs': 0, 'skipped': 0, 'time_ms': 0.0} for _ in self.passes]
+        self.rounds = 0
+        self.converged = not self.fixed_point
+        
         if self.verbose:
             print(f"Starting optimization with {len(self.passes)} passes")
             print(f"Initial: {current_circuit}")
         
-        for i, opt_pass in enumerate(self.passes):
-            if not opt_pass.should_run(current_circuit):
-                if self.verbose:
-                    print(f"  Skipping {opt_pass.name} (preconditions not met)")
-                continue
-            
-            if self.verbose:
-                print(f"\nPass {i+1}/{len(self.passes)}: {opt_pass.name}")
-                print(f"  Before: {current_circuit.get_gate_count()} gates, "
-                      f"depth {current_circuit.get_depth()}")
-            
-            # Run the pass
-            opt_pass.reset_metrics()
-            current_circuit = opt_pass.run(current_circuit)
-            
-            if self.verbose:
-                print(f"  After: {current_circuit.get_gate_count()} gates, "
-                      f"depth {current_circuit.get_depth()}")
-                metrics = opt_pass.get_metrics()
-                if metrics.gates_removed > 0:
-                    print(f"  Removed {metrics.gates_removed} gates")
-                if metrics.gates_added > 0:
-                    print(f"  Added {metrics.gates_added} gates")
-            
-            # Validate if enabled
-            if self.validate:
-                self._validate_circuit(current_circuit, opt_pass.name)
+        if self.fixed_point:
+            current_circuit = self._run_to_fixed_point(current_circuit, start)
+        else:
+            self.rounds = 1
+            for i, opt_pass in enumerate(self.passes):
+                current_circuit = self._run_pass(i, current_circuit)
+        
+        self.total_time_ms = (time.perf_counter() - start) * 1000
         
         if self.verbose:
             print(f"\nOptimization complete")
             print(f"Final: {current_circuit}")
         
+        circuit.release_dag()
+        current_circuit.release_dag()
         return current_circuit
     
+    def _run_to_fixed_point(self, circuit: QIRCircuit, start: float) -> QIRCircuit:
+        """
+        Re-run passes until none of them has new input.
+        
+        A pass is re-run only when some wire changed since it last started
+        (its own edits count, as they can expose new matches); incremental
+        passes then only sweep the changed wires.
+        """
+        dag = circuit.dag()
+        last_start: Dict[int, int] = {}
+        
+        while self.rounds < self.max_rounds:
+            self.rounds += 1
+            ran = False
+            
+            for i, opt_pass in enumerate(self.passes):
+                if self._out_of_time(start):
+                    return circuit
+                
+                scope = None
+                if i in last_start:
+                    dirty = dag.changed_since(last_start[i])
+                    if not dirty:
+                        self.profile[i]['skipped'] += 1
+                        continue
+                    if opt_pass.incremental:
+                        scope = dirty
+                
+                last_start[i] = dag.version
+                opt_pass.scope = scope
+                try:
+                    result = self._run_pass(i, circuit)
+                finally:
+                    opt_pass.scope = None
+                ran = True
+                
+                if result is not circuit:
+                    # A new circuit invalidates what every pass has seen
+                    circuit = result
+                    dag = circuit.dag()
+                    last_start.clear()
+            
+            if not ran:
+                self.converged = True
+                break
+        
+        return circuit
+    
+    def _run_pass(self, index: int, circuit: QIRCircuit) -> QIRCircuit:
+        """Run one pass with profiling, verbose output and validation."""
+        opt_pass = self.passes[index]
+        if not opt_pass.should_run(circuit):
+            if self.verbose:
+                print(f"  Skipping {opt_pass.name} (preconditions not met)")
+            return circuit
+        
+        if self.verbose:
+            print(f"\nPass {index+1}/{len(self.passes)}: {opt_pass.name}")
+            print(f"  Before: {circuit.get_gate_count()} gates, "
+                  f"depth {circuit.get_depth()}")
+        
+        # Run the pass
+        start = time.perf_counter()
+        circuit = opt_pass.run(circuit)
+        self.profile[index]['runs'] += 1
+        self.profile[index]['time_ms'] += (time.perf_counter() - start) * 1000
+        
+        if self.verbose:
+            print(f"  After: {circuit.get_gate_count()} gates, "
+                  f"depth {circuit.get_depth()}")
+            metrics = opt_pass.get_metrics()
+            if metrics.gates_removed > 0:
+                print(f"  Removed {metrics.gates_removed} gates")
+            if metrics.gates_added > 0:
+                print(f"  Added {metrics.gates_added} gates")
+        
+        # Validate if enabled
+        if self.validate:
+            self._validate_circuit(circuit, opt_pass.name)
+        
+        return circuit
+    
+    def _out_of_time(self, start: float) -> bool:
+        if self.time_budget_ms is None:
+            return False
+        return (time.perf_counter() - start) * 1000 >= self.time_budget_ms
+    
     def _validate_circuit(self, circuit: QIRCircuit, pass_name: str):
         """
         Validate circuit structure.
@@ -163,16 +320,25 @@ class PassManager:
     
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of all passes and their metrics."""
+        profile = self.profile if len(self.profile) == len(self.passes) else [
+            {'runs': 0, 'skipped': 0, 'time_ms': 0.0} for _ in self.passes
+        ]
         return {
             'total_passes': len(self.passes),
             'enabled_passes': sum(1 for p in self.passes if p.enabled),
+            'rounds': self.rounds,
+            'converged': self.converged,
+            'total_time_ms': self.total_time_ms,
             'passes': [
                 {
                     'name': p.name,
                     'enabled': p.enabled,
+                    'runs': stats['runs'],
+                    'skipped': stats['skipped'],
+                    'time_ms': stats['time_ms'],
                     'metrics': p.get_metrics().to_dict()
                 }
-                for p in self.passes
+                for p, stats in zip(self.passes, profile)
             ]
         }
     
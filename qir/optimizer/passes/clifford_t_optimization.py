@@ -350,7 +350,6 @@ class CliffordTPlusOptimizationPass(OptimizationPass):
         initial_t_count = self._count_t_gates(circuit)
         
         # Apply optimization strategies
-        circuit = self._commute_t_gates(circuit)
         circuit = self._cancel_t_gates(circuit)
         circuit = self._simplify_clifford_subcircuits(circuit)
         
@@ -376,88 +375,49 @@ class CliffordTPlusOptimizationPass(OptimizationPass):
                 count += 1
         return count
     
-    def _commute_t_gates(self, circuit: QIRCircuit) -> QIRCircuit:
-        """
-        Commute T gates together when possible.
-        
-        T gates on different qubits commute with each other and
-        with Clifford gates on different qubits.
-        """
-        changed = True
-        iterations = 0
-        max_iterations = 5
-        
-        while changed and iterations < max_iterations:
-            changed = False
-            iterations += 1
-            
-            i = 0
-            while i < len(circuit.instructions) - 1:
-                inst1 = circuit.instructions[i]
-                inst2 = circuit.instructions[i + 1]
-                
-                # Try to move T gates forward
-                if (inst1.inst_type == InstructionType.T and 
-                    inst2.inst_type in self.clifford_gates and
-                    inst2.is_single_qubit_gate() and
-                    inst1.qubits[0] != inst2.qubits[0]):
-                    
-                    # Swap them
-                    circuit.instructions[i] = inst2
-                    circuit.instructions[i + 1] = inst1
-                    changed = True
-                
-                i += 1
-        
-        return circuit
-    
     def _cancel_t_gates(self, circuit: QIRCircuit) -> QIRCircuit:
         """
         Cancel adjacent T gates.
         
         T⁴ = S, T⁸ = I
+        
+        Runs are followed along the qubit's wire, so gates on other qubits
+        between the T gates (which commute with them) do not split a run.
         """
-        i = 0
-        while i < len(circuit.instructions):
-            # Look for sequences of T gates on same qubit
-            if circuit.instructions[i].inst_type == InstructionType.T:
-                qubit = circuit.instructions[i].qubits[0]
-                
-                # Count consecutive T gates on this qubit
-                count = 1
-                j = i + 1
-                while (j < len(circuit.instructions) and
-                       circuit.instructions[j].inst_type == InstructionType.T and
-                       circuit.instructions[j].qubits[0] == qubit):
-                    count += 1
-                    j += 1
-                
-                if count >= 4:
-                    # Replace T⁴ with S, or T⁸ with identity
-                    num_s = count // 4
-                    remaining_t = count % 4
-                    
-                    # Remove all T gates
-                    for _ in range(count):
-                        circuit.remove_instruction(i)
-                    
-                    # Add S gates
-                    for _ in range(num_s):
-                        circuit.insert_instruction(i, 
-                            QIRInstruction(InstructionType.S, [qubit]))
-                        i += 1
-                    
-                    # Add remaining T gates
-                    for _ in range(remaining_t):
-                        circuit.insert_instruction(i,
-                            QIRInstruction(InstructionType.T, [qubit]))
-                        i += 1
-                    
-                    self.metrics.patterns_matched += 1
-                else:
-                    i += 1
-            else:
-                i += 1
+        for node in circuit.nodes():
+            if node.instruction.inst_type != InstructionType.T:
+                continue
+            qubit = node.instruction.qubits[0]
+            
+            # Only start at the first T gate of a run
+            previous = node.prev_on(qubit)
+            if previous is not None and previous.instruction.inst_type == InstructionType.T:
+                continue
+            
+            # Collect consecutive T gates on this qubit
+            run = [node]
+            following = node.next_on(qubit)
+            while following is not None and following.instruction.inst_type == InstructionType.T:
+                run.append(following)
+                following = following.next_on(qubit)
+            
+            if len(run) < 4:
+                continue
+            
+            # Replace T⁴ with S, or T⁸ with identity
+            num_s = len(run) // 4
+            remaining_t = len(run) % 4
+            
+            for _ in range(num_s):
+                circuit.insert_before(node, QIRInstruction(InstructionType.S, [qubit]))
+            for _ in range(remaining_t):
+                circuit.insert_before(node, QIRInstruction(InstructionType.T, [qubit]))
+            
+            # Remove all T gates
+            for t_node in run:
+                circuit.remove(t_node)
+            
+            self.metrics.patterns_matched += 1
         
         return circuit
     
@@ -467,27 +427,22 @@ class CliffordTPlusOptimizationPass(OptimizationPass):
         
         Clifford gates are cheap, but we can still reduce them.
         """
-        # Look for H-S-H patterns (can be simplified)
-        i = 0
-        while i < len(circuit.instructions) - 2:
-            inst1 = circuit.instructions[i]
-            inst2 = circuit.instructions[i + 1]
-            inst3 = circuit.instructions[i + 2]
+        # Look for H-S-H patterns along each wire (can be simplified)
+        for node in circuit.nodes():
+            if node.instruction.inst_type != InstructionType.H:
+                continue
             
             # H-S-H on same qubit
-            if (inst1.inst_type == InstructionType.H and
-                inst2.inst_type == InstructionType.S and
-                inst3.inst_type == InstructionType.H and
-                inst1.qubits[0] == inst2.qubits[0] == inst3.qubits[0]):
-                
-                qubit = inst1.qubits[0]
-                
+            qubit = node.instruction.qubits[0]
+            s_node = node.next_on(qubit)
+            if s_node is None or s_node.instruction.inst_type != InstructionType.S:
+                continue
+            h_node = s_node.next_on(qubit)
+            if h_node is not None and h_node.instruction.inst_type == InstructionType.H:
                 # H-S-H = S†-H-S† (but simpler: just different Clifford)
                 # For now, we'll leave as-is since it's still 3 Clifford gates
                 # In a full implementation, we'd use Clifford group multiplication
                 pass
-            
-            i += 1
         
         return circuit
     
@@ -63,11 +63,9 @@ class ConstantPropagationPass(OptimizationPass):
         # Initialize state tracking
         qubit_states = {q: QubitState.ZERO for q in circuit.qubits.values()}
         
-        # Track which instructions to remove
-        instructions_to_remove = set()
-        
         # Process instructions
-        for i, inst in enumerate(circuit.instructions):
+        for node in circuit.nodes():
+            inst = node.instruction
             if not inst.is_gate():
                 # Measurements make state unknown
                 if inst.is_measurement():
@@ -77,7 +75,7 @@ class ConstantPropagationPass(OptimizationPass):
             
             # Check if this operation is redundant
             if self._is_redundant(inst, qubit_states):
-                instructions_to_remove.add(i)
+                circuit.remove(node)
                 self.metrics.gates_removed += 1
                 self.metrics.patterns_matched += 1
                 # Don't update state for redundant operations
@@ -86,10 +84,6 @@ class ConstantPropagationPass(OptimizationPass):
             # Update states based on this operation
             self._update_states(inst, qubit_states)
         
-        # Remove redundant instructions
-        for idx in sorted(instructions_to_remove, reverse=True):
-            circuit.remove_instruction(idx)
-        
         self.metrics.execution_time_ms = (time.time() - start_time) * 1000
         
         return circuit
@@ -22,7 +22,7 @@ Example:
 import time
 from typing import Set, Dict, List
 from ..pass_base import OptimizationPass
-from ..ir import QIRCircuit, QIRInstruction, QIRQubit
+from ..ir import QIRCircuit, QIRInstruction, QIRQubit, InstructionNode
 
 
 class DeadCodeEliminationPass(OptimizationPass):
@@ -70,9 +70,9 @@ class DeadCodeEliminationPass(OptimizationPass):
         last_measurements = self._find_last_measurements(circuit)
         
         # Remove dead operations
-        instructions_to_remove = set()
-        
-        for i, inst in enumerate(circuit.instructions):
+        for node in circuit.nodes():
+            inst = node.instruction
+            
             # Skip non-gate operations
             if not inst.is_gate():
                 continue
@@ -86,24 +86,19 @@ class DeadCodeEliminationPass(OptimizationPass):
             
             if all_dead:
                 # All qubits are dead - remove this instruction
-                instructions_to_remove.add(i)
+                circuit.remove(node)
                 self.metrics.gates_removed += 1
                 continue
             
             # Check if this operation is after a qubit's final measurement
             for qubit in inst.qubits:
                 if qubit in last_measurements:
-                    last_meas_idx = last_measurements[qubit]
-                    if i > last_meas_idx:
+                    if node.order > last_measurements[qubit].order:
                         # Operation after final measurement - dead code
-                        instructions_to_remove.add(i)
+                        circuit.remove(node)
                         self.metrics.gates_removed += 1
                         break
         
-        # Remove marked instructions (in reverse order)
-        for idx in sorted(instructions_to_remove, reverse=True):
-            circuit.remove_instruction(idx)
-        
         # Track qubit reduction
         dead_qubits = set(circuit.qubits.values()) - live_qubits
         self.metrics.qubit_reduction = len(dead_qubits)
@@ -171,19 +166,23 @@ class DeadCodeEliminationPass(OptimizationPass):
         
         return live
     
-    def _find_last_measurements(self, circuit: QIRCircuit) -> Dict[QIRQubit, int]:
+    def _find_last_measurements(self, circuit: QIRCircuit) -> Dict[QIRQubit, InstructionNode]:
         """
-        Find the index of the last measurement for each qubit.
+        Find the last measurement of each qubit.
+        
+        Walks each qubit's wire backwards from its last use.
         
         Returns:
-            Dict mapping qubit -> index of last measurement
+            Dict mapping qubit -> node of last measurement
         """
         last_measurements = {}
         
-        for i, inst in enumerate(circuit.instructions):
-            if inst.is_measurement():
-                for qubit in inst.qubits:
-                    last_measurements[qubit] = i
+        for qubit in circuit.qubits.values():
+            node = circuit.last_on(qubit)
+            while node is not None and not node.instruction.is_measurement():
+                node = node.prev_on(qubit)
+            if node is not None:
+                last_measurements[qubit] = node
         
         return last_measurements
     
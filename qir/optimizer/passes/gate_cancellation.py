@@ -209,6 +209,13 @@ Example 8: Real-World Circuit (VQE Ansatz)
 Non-adjacent gates:
   q0: ─H─X─H─  (H gates not adjacent, can't cancel)
   
+  Gates on other qubits in between do not count: adjacency is judged
+  along each qubit's wire. Gates that commute with both do not count
+  either, so Z─S─Z cancels to S and CNOTs sharing a control commute:
+    q0: ─●─●─●─      q0: ─●─
+    q1: ─⊕─┼─⊕─  →  q1: ───
+    q2: ───⊕───      q2: ─⊕─
+  
 Different qubits:
   q0: ─H─
   q1: ─H─  (Different qubits, can't cancel)
@@ -218,9 +225,10 @@ Gates with different parameters:
 """
 
 import time
-from typing import List, Set
+from typing import List
 from ..pass_base import OptimizationPass
-from ..ir import QIRCircuit, QIRInstruction, InstructionType
+from ..ir import QIRCircuit, QIRInstruction, InstructionType, InstructionNode
+from ..dag import CircuitDAG
 
 
 class GateCancellationPass(OptimizationPass):
@@ -237,6 +245,8 @@ class GateCancellationPass(OptimizationPass):
       RZ(θ) → RZ(-θ) → (removed)
     """
     
+    incremental = True
+    
     def __init__(self):
         super().__init__("GateCancellation")
         self.self_inverse_gates = {
@@ -260,53 +270,43 @@ class GateCancellationPass(OptimizationPass):
         """
         Run gate cancellation on the circuit.
         
-        Iterates through instructions looking for adjacent cancellable pairs.
+        Walks the circuit looking for cancellable pairs that are adjacent
+        on their qubits' wires, or separated only by gates both commute
+        with (the same commutation group in the circuit's DAG view).
         """
         start_time = time.time()
+        dag = circuit.dag()
         
-        # Track which instructions to remove
-        to_remove: Set[int] = set()
-        
-        i = 0
-        while i < len(circuit.instructions) - 1:
-            if i in to_remove:
-                i += 1
+        for node in self.scope_nodes(circuit, self.scope):
+            inst1 = node.instruction
+            if not inst1.is_gate():
                 continue
             
-            inst1 = circuit.instructions[i]
-            inst2 = circuit.instructions[i + 1]
+            # Nearest partner that can be brought next to this gate
+            successor = next(
+                (mate for mate in dag.mates(node) if self._can_cancel(inst1, mate.instruction)),
+                None
+            )
+            if successor is None:
+                continue
             
-            # Check if they can cancel
-            if self._can_cancel(inst1, inst2):
-                # Safety check: Don't cancel if it would leave qubits uninitialized
-                if self._would_leave_uninitialized(circuit, i, i + 1):
-                    # Skip this cancellation to preserve qubit initialization
-                    i += 1
-                    continue
-                
-                # Mark both for removal
-                to_remove.add(i)
-                to_remove.add(i + 1)
-                
-                # Update metrics
-                self.metrics.gates_removed += 2
-                self.metrics.patterns_matched += 1
-                
-                # Track specific gate types
-                if inst1.inst_type == InstructionType.CNOT:
-                    self.metrics.cnot_removed += 2
-                elif inst1.inst_type in [InstructionType.T, InstructionType.TDG]:
-                    self.metrics.t_gates_removed += 2
-                
-                # Skip both instructions
-                i += 2
-            else:
-                i += 1
-        
-        # Remove marked instructions (in reverse order to preserve indices)
-        for idx in sorted(to_remove, reverse=True):
-            circuit.remove_instruction(idx)
-        
+            # Safety check: Don't cancel if it would leave qubits uninitialized
+            if self._would_leave_uninitialized(dag, node):
+                continue
+            
+            circuit.remove(node)
+            circuit.remove(successor)
+            
+            # Update metrics
+            self.metrics.gates_removed += 2
+            self.metrics.patterns_matched += 1
+            
+            # Track specific gate types
+            if inst1.inst_type == InstructionType.CNOT:
+                self.metrics.cnot_removed += 2
+            elif inst1.inst_type in [InstructionType.T, InstructionType.TDG]:
+                self.metrics.t_gates_removed += 2
+
         # Record execution time
         self.metrics.execution_time_ms = (time.time() - start_time) * 1000
         
@@ -356,18 +356,17 @@ class GateCancellationPass(OptimizationPass):
         
         return False
     
-    def _would_leave_uninitialized(self, circuit: QIRCircuit, idx1: int, idx2: int) -> bool:
+    def _would_leave_uninitialized(self, dag: CircuitDAG, node1: InstructionNode) -> bool:
         """
-        Check if canceling instructions at idx1 and idx2 would leave qubits uninitialized.
+        Check if canceling two instructions would leave qubits uninitialized.
         
         A qubit is considered uninitialized if:
         1. These are the ONLY gates on the qubit before a multi-qubit operation
         2. The qubit is later used in a multi-qubit operation
         
         Args:
-            circuit: The circuit
-            idx1: Index of first instruction to cancel
-            idx2: Index of second instruction to cancel
+            dag: DAG view of the circuit
+            node1: First instruction to cancel
         
         Returns:
             True if cancellation would leave qubits uninitialized
@@ -376,34 +375,25 @@ class GateCancellationPass(OptimizationPass):
         the qubit in |0⟩ state. For multi-qubit operations, we need explicit
         single-qubit gates to prepare the state.
         """
-        inst1 = circuit.instructions[idx1]
-        qubits_affected = set(inst1.qubits)
+        inst1 = node1.instruction
         
         # Only check single-qubit gates (multi-qubit gates don't have this issue)
         if not inst1.is_single_qubit_gate():
             return False
         
-        # Check if these are the first GATES (not ALLOC) on any of the qubits
-        for qubit in qubits_affected:
-            # Look backwards to see if there are any prior GATES on this qubit
-            has_prior_gate = False
-            for i in range(idx1):
-                inst = circuit.instructions[i]
-                if qubit in inst.qubits and inst.is_gate():
-                    has_prior_gate = True
-                    break
-            
-            # If no prior gates, check if qubit is used later in multi-qubit ops
-            if not has_prior_gate:
-                # Look forward (past idx2) for multi-qubit operations involving this qubit
-                for i in range(idx2 + 1, len(circuit.instructions)):
-                    inst = circuit.instructions[i]
-                    if qubit in inst.qubits and inst.is_two_qubit_gate():
-                        # Found a multi-qubit operation with no prior gates!
-                        # This would leave the qubit in |0⟩ with no preparation
-                        return True
+        # Check if these are the first GATES (not ALLOC) on the qubit
+        qubit = inst1.qubits[0]
         
-        return False
+        # Look backwards along the wire for any prior GATES on this qubit
+        node = node1.prev_on(qubit)
+        while node is not None:
+            if node.instruction.is_gate():
+                return False
+            node = node.prev_on(qubit)
+        
+        # No prior gates, so any multi-qubit operation on the qubit comes
+        # later and would see it in |0⟩ with no preparation
+        return dag.two_qubit_gate_count(qubit) > 0
     
     def should_run(self, circuit: QIRCircuit) -> bool:
         """Only run if there are gates to potentially cancel."""
@@ -26,9 +26,13 @@ class GateFusionPass(OptimizationPass):
     """
     Fuses sequences of gates into equivalent single gates.
     
-    Looks for adjacent gates on the same qubits that can be combined.
+    Looks for consecutive gates on the same qubits that can be combined;
+    gates on other qubits in between do not block fusion, and neither do
+    gates both commute with (e.g. a CZ between two S gates).
     """
     
+    incremental = True
+    
     def __init__(self):
         super().__init__("GateFusion")
         
@@ -47,37 +51,43 @@ class GateFusionPass(OptimizationPass):
         Iterates through instructions looking for fusible sequences.
         """
         start_time = time.time()
+        dag = circuit.dag()
         
-        changed = True
+        scope = self.scope
         iterations = 0
         max_iterations = 10
         
-        while changed and iterations < max_iterations:
+        while iterations < max_iterations:
             changed = False
             iterations += 1
+            version = dag.version
             
-            i = 0
-            while i < len(circuit.instructions) - 1:
-                inst1 = circuit.instructions[i]
-                inst2 = circuit.instructions[i + 1]
-                
-                # Try to fuse these two instructions
-                fused = self._try_fuse(inst1, inst2)
-                
-                if fused:
+            for node in self.scope_nodes(circuit, scope):
+                # Keep fusing into this position while possible
+                while node.alive:
+                    # Try to fuse with the nearest gate that can be brought next to it
+                    fused = None
+                    for successor in dag.mates(node):
+                        fused = self._try_fuse(node.instruction, successor.instruction)
+                        if fused:
+                            break
+                    if not fused:
+                        break
+                    
                     # Replace both instructions with the fused one
-                    circuit.remove_instruction(i + 1)
-                    circuit.remove_instruction(i)
-                    circuit.insert_instruction(i, fused)
+                    circuit.remove(successor)
+                    node = circuit.replace(node, fused)
                     
                     # Update metrics
                     self.metrics.gates_removed += 1  # Net: 2 removed, 1 added
                     self.metrics.patterns_matched += 1
                     
                     changed = True
-                    # Don't increment i - check if we can fuse again at this position
-                else:
-                    i += 1
+            
+            if not changed:
+                break
+            # Only wires touched by this sweep can hold new opportunities
+            scope = dag.changed_since(version)
         
         self.metrics.custom['iterations'] = iterations
         self.metrics.execution_time_ms = (time.time() - start_time) * 1000
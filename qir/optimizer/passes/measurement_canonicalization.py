@@ -25,7 +25,6 @@ Example:
 """
 
 import time
-from typing import List, Optional, Tuple
 from ..pass_base import OptimizationPass
 from ..ir import QIRCircuit, QIRInstruction, InstructionType, QIRQubit
 
@@ -61,200 +60,146 @@ class MeasurementCanonicalizationPass(OptimizationPass):
             # Check longer patterns first to avoid partial matches
             
             # Try Bell basis canonicalization (4 instructions)
-            if self._canonicalize_bell_basis(circuit):
+            count = self._canonicalize_bell_basis(circuit)
+            if count:
                 changes_made = True
-                total_canonicalizations += 1
+                total_canonicalizations += count
             
             # Try Y-basis canonicalization (3 instructions)
-            if self._canonicalize_y_basis(circuit):
+            count = self._canonicalize_y_basis(circuit)
+            if count:
                 changes_made = True
-                total_canonicalizations += 1
+                total_canonicalizations += count
             
             # Try X-basis canonicalization (2 instructions)
-            if self._canonicalize_x_basis(circuit):
+            count = self._canonicalize_x_basis(circuit)
+            if count:
                 changes_made = True
-                total_canonicalizations += 1
+                total_canonicalizations += count
         
         self.metrics.custom['measurements_canonicalized'] = total_canonicalizations
         self.metrics.execution_time_ms = (time.time() - start_time) * 1000
         
         return circuit
     
-    def _canonicalize_x_basis(self, circuit: QIRCircuit) -> bool:
+    def _canonicalize_x_basis(self, circuit: QIRCircuit) -> int:
         """
         Detect and canonicalize X-basis measurements.
         
         Pattern: H → MEASURE_Z  ⟹  MEASURE_X
         
-        Returns True if any canonicalization was performed.
+        Returns the number of canonicalizations performed.
         """
-        instructions = circuit.instructions
+        count = 0
         
-        for i in range(len(instructions) - 1):
-            inst1 = instructions[i]
-            inst2 = instructions[i + 1]
+        for node in circuit.nodes():
+            inst2 = node.instruction
+            if not self._is_single_z_measurement(inst2):
+                continue
             
-            # Check for H followed by MEASURE_Z on same qubit
-            if (inst1.inst_type == InstructionType.H and
-                inst2.inst_type == InstructionType.MEASURE and
-                inst2.params.get('basis', 'Z') == 'Z' and
-                len(inst1.qubits) == 1 and
-                len(inst2.qubits) == 1 and
-                inst1.qubits[0] == inst2.qubits[0]):
-                
-                # Replace MEASURE_Z with MEASURE_X
-                inst2.params['basis'] = 'X'
-                
-                # Remove the H gate
-                circuit.remove_instruction(i)
-                
-                return True
+            # Check for H directly before MEASURE_Z on its qubit
+            h_node = node.prev_on(inst2.qubits[0])
+            if h_node is None or not self._is_single(h_node.instruction, InstructionType.H):
+                continue
+            
+            # Replace MEASURE_Z with MEASURE_X
+            inst2.params['basis'] = 'X'
+            
+            # Remove the H gate
+            circuit.remove(h_node)
+            count += 1
         
-        return False
+        return count
     
-    def _canonicalize_y_basis(self, circuit: QIRCircuit) -> bool:
+    def _canonicalize_y_basis(self, circuit: QIRCircuit) -> int:
         """
         Detect and canonicalize Y-basis measurements.
         
         Pattern: S† → H → MEASURE_Z  ⟹  MEASURE_Y
         
-        Returns True if any canonicalization was performed.
+        Returns the number of canonicalizations performed.
         """
-        instructions = circuit.instructions
+        count = 0
         
-        for i in range(len(instructions) - 2):
-            inst1 = instructions[i]
-            inst2 = instructions[i + 1]
-            inst3 = instructions[i + 2]
+        for node in circuit.nodes():
+            inst3 = node.instruction
+            if not self._is_single_z_measurement(inst3):
+                continue
             
-            # Check for S† → H → MEASURE_Z on same qubit
-            if (inst1.inst_type == InstructionType.SDG and
-                inst2.inst_type == InstructionType.H and
-                inst3.inst_type == InstructionType.MEASURE and
-                inst3.params.get('basis', 'Z') == 'Z' and
-                len(inst1.qubits) == 1 and
-                len(inst2.qubits) == 1 and
-                len(inst3.qubits) == 1 and
-                inst1.qubits[0] == inst2.qubits[0] == inst3.qubits[0]):
-                
-                # Replace MEASURE_Z with MEASURE_Y
-                inst3.params['basis'] = 'Y'
-                
-                # Remove S† and H gates (remove in reverse order to maintain indices)
-                circuit.remove_instruction(i + 1)  # Remove H first
-                circuit.remove_instruction(i)      # Then remove S†
-                
-                return True
+            # Check for S† → H directly before MEASURE_Z on its qubit
+            qubit = inst3.qubits[0]
+            h_node = node.prev_on(qubit)
+            if h_node is None or not self._is_single(h_node.instruction, InstructionType.H):
+                continue
+            sdg_node = h_node.prev_on(qubit)
+            if sdg_node is None or not self._is_single(sdg_node.instruction, InstructionType.SDG):
+                continue
+            
+            # Replace MEASURE_Z with MEASURE_Y
+            inst3.params['basis'] = 'Y'
+            
+            # Remove S† and H gates
+            circuit.remove(h_node)
+            circuit.remove(sdg_node)
+            count += 1
         
-        return False
+        return count
     
-    def _canonicalize_bell_basis(self, circuit: QIRCircuit) -> bool:
+    def _canonicalize_bell_basis(self, circuit: QIRCircuit) -> int:
         """
         Detect and canonicalize Bell basis measurements.
         
         Pattern: CNOT(q0,q1) → H(q0) → MEASURE_Z(q0) → MEASURE_Z(q1)
                  ⟹  MEASURE_BELL(q0,q1)
         
-        Returns True if any canonicalization was performed.
+        Returns the number of canonicalizations performed.
         """
-        instructions = circuit.instructions
+        count = 0
         
-        for i in range(len(instructions) - 3):
-            inst1 = instructions[i]
-            inst2 = instructions[i + 1]
-            inst3 = instructions[i + 2]
-            inst4 = instructions[i + 3]
+        for node in circuit.nodes():
+            inst1 = node.instruction
+            if inst1.inst_type != InstructionType.CNOT or len(inst1.qubits) != 2:
+                continue
             
-            # Check for CNOT → H → MEASURE_Z → MEASURE_Z pattern
-            if (inst1.inst_type == InstructionType.CNOT and
-                inst2.inst_type == InstructionType.H and
-                inst3.inst_type == InstructionType.MEASURE and
-                inst4.inst_type == InstructionType.MEASURE and
-                inst3.params.get('basis', 'Z') == 'Z' and
-                inst4.params.get('basis', 'Z') == 'Z' and
-                len(inst1.qubits) == 2 and
-                len(inst2.qubits) == 1 and
-                len(inst3.qubits) == 1 and
-                len(inst4.qubits) == 1):
-                
-                q0, q1 = inst1.qubits[0], inst1.qubits[1]
-                
-                # Check that H is on control qubit and both measurements match
-                if (inst2.qubits[0] == q0 and
-                    inst3.qubits[0] == q0 and
-                    inst4.qubits[0] == q1):
-                    
-                    # Create Bell measurement instruction
-                    bell_meas = QIRInstruction(
-                        inst_type=InstructionType.MEASURE,
-                        qubits=[q0, q1],
-                        params={'basis': 'BELL'},
-                        result=inst3.result,  # Use first measurement result
-                        metadata={'bell_measurement': True}
-                    )
-                    
-                    # Remove the four instructions in reverse order
-                    circuit.remove_instruction(i + 3)  # MEASURE_Z(q1)
-                    circuit.remove_instruction(i + 2)  # MEASURE_Z(q0)
-                    circuit.remove_instruction(i + 1)  # H(q0)
-                    circuit.remove_instruction(i)      # CNOT
-                    
-                    # Insert Bell measurement at position i
-                    circuit.instructions.insert(i, bell_meas)
-                    
-                    return True
-        
-        return False
-    
-    def _find_pattern(
-        self,
-        circuit: QIRCircuit,
-        pattern: List[InstructionType],
-        start_idx: int = 0
-    ) -> Optional[Tuple[int, List[QIRInstruction]]]:
-        """
-        Find a pattern of instructions in the circuit.
-        
-        Args:
-            circuit: Circuit to search
-            pattern: List of instruction types to match
-            start_idx: Index to start searching from
-        
-        Returns:
-            Tuple of (start_index, matched_instructions) or None
-        """
-        instructions = circuit.instructions
-        
-        for i in range(start_idx, len(instructions) - len(pattern) + 1):
-            # Check if pattern matches
-            match = True
-            matched = []
+            q0, q1 = inst1.qubits[0], inst1.qubits[1]
             
-            for j, inst_type in enumerate(pattern):
-                if instructions[i + j].inst_type != inst_type:
-                    match = False
-                    break
-                matched.append(instructions[i + j])
+            # H on the control qubit, then measurements of both qubits
+            h_node = node.next_on(q0)
+            if h_node is None or not self._is_single(h_node.instruction, InstructionType.H):
+                continue
+            m0_node = h_node.next_on(q0)
+            m1_node = node.next_on(q1)
+            if (m0_node is None or m1_node is None or
+                not self._is_single_z_measurement(m0_node.instruction) or
+                not self._is_single_z_measurement(m1_node.instruction)):
+                continue
             
-            if match:
-                # Verify all instructions operate on same qubit(s)
-                if self._same_qubits(matched):
-                    return (i, matched)
-        
-        return None
+            # Create Bell measurement instruction
+            bell_meas = QIRInstruction(
+                inst_type=InstructionType.MEASURE,
+                qubits=[q0, q1],
+                params={'basis': 'BELL'},
+                result=m0_node.instruction.result,  # Use first measurement result
+                metadata={'bell_measurement': True}
+            )
+            
+            # Replace the CNOT with the Bell measurement and drop the rest
+            circuit.replace(node, bell_meas)
+            circuit.remove(h_node)
+            circuit.remove(m0_node)
+            circuit.remove(m1_node)
+            count += 1
+        
+        return count
     
-    def _same_qubits(self, instructions: List[QIRInstruction]) -> bool:
-        """Check if all instructions operate on the same qubit(s)."""
-        if not instructions:
-            return False
-        
-        first_qubits = set(instructions[0].qubits)
-        
-        for inst in instructions[1:]:
-            if set(inst.qubits) != first_qubits:
-                return False
-        
-        return True
+    def _is_single(self, inst: QIRInstruction, inst_type: InstructionType) -> bool:
+        """Check for a single-qubit instruction of the given type."""
+        return inst.inst_type == inst_type and len(inst.qubits) == 1
+    
+    def _is_single_z_measurement(self, inst: QIRInstruction) -> bool:
+        """Check for a single-qubit Z-basis measurement."""
+        return (self._is_single(inst, InstructionType.MEASURE) and
+                inst.params.get('basis', 'Z') == 'Z')
     
     def estimate_benefit(self, circuit: QIRCircuit) -> float:
         """
@@ -263,27 +208,34 @@ class MeasurementCanonicalizationPass(OptimizationPass):
         Returns a score indicating potential for canonicalization.
         """
         score = 0.0
-        instructions = circuit.instructions
         
-        # Count potential X-basis patterns (H before MEASURE)
-        for i in range(len(instructions) - 1):
-            if (instructions[i].inst_type == InstructionType.H and
-                instructions[i + 1].inst_type == InstructionType.MEASURE):
+        for node in circuit.nodes():
+            inst = node.instruction
+            if self._is_single_z_measurement(inst):
+                qubit = inst.qubits[0]
+                
+                # Potential X-basis pattern (H before MEASURE)
+                h_node = node.prev_on(qubit)
+                if h_node is None or not self._is_single(h_node.instruction, InstructionType.H):
+                    continue
                 score += 1.0
-        
-        # Count potential Y-basis patterns (S† → H before MEASURE)
-        for i in range(len(instructions) - 2):
-            if (instructions[i].inst_type == InstructionType.SDG and
-                instructions[i + 1].inst_type == InstructionType.H and
-                instructions[i + 2].inst_type == InstructionType.MEASURE):
-                score += 1.5
-        
-        # Count potential Bell patterns (CNOT → H → MEASURE → MEASURE)
-        for i in range(len(instructions) - 3):
-            if (instructions[i].inst_type == InstructionType.CNOT and
-                instructions[i + 1].inst_type == InstructionType.H and
-                instructions[i + 2].inst_type == InstructionType.MEASURE and
-                instructions[i + 3].inst_type == InstructionType.MEASURE):
-                score += 2.0
+                
+                # Potential Y-basis pattern (S† → H before MEASURE)
+                sdg_node = h_node.prev_on(qubit)
+                if sdg_node is not None and self._is_single(sdg_node.instruction, InstructionType.SDG):
+                    score += 1.5
+            
+            elif inst.inst_type == InstructionType.CNOT and len(inst.qubits) == 2:
+                # Potential Bell pattern (CNOT → H → MEASURE → MEASURE)
+                q0, q1 = inst.qubits
+                h_node = node.next_on(q0)
+                if h_node is None or not self._is_single(h_node.instruction, InstructionType.H):
+                    continue
+                m0_node = h_node.next_on(q0)
+                m1_node = node.next_on(q1)
+                if (m0_node is not None and m1_node is not None and
+                        self._is_single_z_measurement(m0_node.instruction) and
+                        self._is_single_z_measurement(m1_node.instruction)):
+                    score += 2.0
         
         return score
@@ -30,7 +30,7 @@ import time
 from typing import List, Optional, Tuple, Dict, Set
 from collections import defaultdict
 from ..pass_base import OptimizationPass
-from ..ir import QIRCircuit, QIRInstruction, InstructionType, QIRQubit
+from ..ir import QIRCircuit, QIRInstruction, InstructionType, QIRQubit, InstructionNode
 
 
 class MeasurementCanonicalizationPass(OptimizationPass):
@@ -63,13 +63,13 @@ class MeasurementCanonicalizationPass(OptimizationPass):
         # Find measurements and their preceding gates
         measurement_patterns = self._find_measurement_patterns(circuit, qubit_histories)
         
-        # Sort patterns by measurement index in REVERSE order
-        # This ensures we process from end to beginning, avoiding index shift issues
-        measurement_patterns.sort(key=lambda p: p['measurement_idx'], reverse=True)
+        # Patterns refer to indices in the unmodified circuit; resolve them
+        # through the nodes so removals do not shift later patterns
+        nodes = list(circuit.nodes())
         
         # Canonicalize each pattern
         for pattern in measurement_patterns:
-            if self._canonicalize_pattern(circuit, pattern):
+            if self._canonicalize_pattern(circuit, pattern, nodes):
                 total_canonicalizations += 1
         
         self.metrics.custom['measurements_canonicalized'] = total_canonicalizations
@@ -275,19 +275,27 @@ class MeasurementCanonicalizationPass(OptimizationPass):
         }
         return inst.inst_type in basis_changing
     
-    def _canonicalize_pattern(self, circuit: QIRCircuit, pattern: Dict) -> bool:
+    def _canonicalize_pattern(
+        self,
+        circuit: QIRCircuit,
+        pattern: Dict,
+        nodes: List[InstructionNode]
+    ) -> bool:
         """
         Apply canonicalization for a detected pattern.
         
+        Args:
+            circuit: Circuit to modify
+            pattern: Pattern from ``_find_measurement_patterns``
+            nodes: Circuit nodes indexed as when the pattern was found
+        
         Returns True if canonicalization was successful.
         """
         try:
             meas_idx = pattern['measurement_idx']
-            gates_to_remove = sorted(pattern['gates_to_remove'], reverse=True)
+            gates_to_remove = pattern['gates_to_remove']
             
-            # First, update the measurement basis BEFORE removing gates
-            # (since removing gates will shift indices)
-            meas_inst = circuit.instructions[meas_idx]
+            meas_inst = nodes[meas_idx].instruction
             
             if pattern['type'] == 'X':
                 meas_inst.params['basis'] = 'X'
@@ -296,11 +304,10 @@ class MeasurementCanonicalizationPass(OptimizationPass):
             elif pattern['type'] == 'BELL':
                 meas_inst.params['basis'] = 'BELL'
             
-            # Now remove gates in reverse order to maintain indices
             # Only remove gates that come BEFORE the measurement
             for gate_idx in gates_to_remove:
                 if gate_idx < meas_idx:
-                    circuit.remove_instruction(gate_idx)
+                    circuit.remove(nodes[gate_idx])
             
             return True
         except Exception as e:
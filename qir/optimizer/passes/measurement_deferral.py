@@ -25,7 +25,7 @@ Example:
 import time
 from typing import List, Set, Dict
 from ..pass_base import OptimizationPass
-from ..ir import QIRCircuit, QIRInstruction, QIRQubit
+from ..ir import QIRCircuit, QIRQubit, InstructionNode
 
 
 class MeasurementDeferralPass(OptimizationPass):
@@ -51,46 +51,31 @@ class MeasurementDeferralPass(OptimizationPass):
         start_time = time.time()
         
         # Find all measurements
-        measurements = []
-        measurement_indices = []
-        
-        for i, inst in enumerate(circuit.instructions):
-            if inst.is_measurement():
-                measurements.append(inst)
-                measurement_indices.append(i)
+        measurements = [node for node in circuit.nodes()
+                        if node.instruction.is_measurement()]
         
         if not measurements:
             self.metrics.execution_time_ms = (time.time() - start_time) * 1000
             return circuit
         
         # Check which measurements can be deferred
-        deferrable = []
-        
-        for i, (meas_inst, meas_idx) in enumerate(zip(measurements, measurement_indices)):
-            if self._can_defer(circuit, meas_inst, meas_idx):
-                deferrable.append((meas_inst, meas_idx))
+        deferrable = [node for node in measurements if self._can_defer(node)]
         
         # Remove deferrable measurements from their current positions
-        # (in reverse order to maintain indices)
-        for meas_inst, meas_idx in reversed(deferrable):
-            circuit.remove_instruction(meas_idx)
+        for node in deferrable:
+            circuit.remove(node)
             self.metrics.custom['measurements_deferred'] = \
                 self.metrics.custom.get('measurements_deferred', 0) + 1
         
         # Add them at the end
-        for meas_inst, _ in deferrable:
-            circuit.add_instruction(meas_inst)
+        for node in deferrable:
+            circuit.add_instruction(node.instruction)
         
         self.metrics.execution_time_ms = (time.time() - start_time) * 1000
         
         return circuit
     
-    def _can_defer(
-        self,
-        circuit: QIRCircuit,
-        measurement: QIRInstruction,
-        meas_idx: int
-    ) -> bool:
+    def _can_defer(self, measurement: InstructionNode) -> bool:
         """
         Check if a measurement can be safely deferred.
         
@@ -100,28 +85,23 @@ class MeasurementDeferralPass(OptimizationPass):
         3. No classical control dependencies
         
         Args:
-            circuit: The circuit
-            measurement: The measurement instruction
-            meas_idx: Index of the measurement
+            measurement: Node of the measurement instruction
         
         Returns:
             True if measurement can be deferred
         """
-        measured_qubit = measurement.qubits[0]
-        result_name = measurement.result
+        measured_qubit = measurement.instruction.qubits[0]
         
-        # Check all instructions after this measurement
-        for i in range(meas_idx + 1, len(circuit.instructions)):
-            inst = circuit.instructions[i]
-            
-            # Check if measurement result is used (classical control)
-            # For now, we assume no classical control if not explicitly marked
-            # In a full implementation, we'd check for conditional gates
-            
-            # Check if measured qubit is used in subsequent gates
-            if inst.is_gate() and measured_qubit in inst.qubits:
+        # Check the later instructions on the measured qubit
+        # Measurement results are not checked for use (classical control):
+        # we assume no classical control if not explicitly marked. In a
+        # full implementation, we'd check for conditional gates.
+        node = measurement.next_on(measured_qubit)
+        while node is not None:
+            if node.instruction.is_gate():
                 # Qubit is used after measurement - cannot defer
                 return False
+            node = node.next_on(measured_qubit)
         
         return True
     
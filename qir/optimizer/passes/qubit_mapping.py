@@ -20,6 +20,9 @@ Example:
 import time
 from typing import Dict, List, Tuple, Set
 from collections import defaultdict
+
+import numpy as np
+
 from ..pass_base import OptimizationPass
 from ..ir import QIRCircuit, QIRQubit
 from ..topology import HardwareTopology
@@ -168,11 +171,14 @@ class QubitMappingPass(OptimizationPass):
     
     def _find_nearest_to(self, physical: int, used: Set[int]) -> int:
         """Find nearest free physical qubit to given position."""
-        for distance in range(1, self.topology.num_qubits):
-            for candidate in range(self.topology.num_qubits):
-                if candidate not in used:
-                    if self.topology.get_distance(physical, candidate) == distance:
-                        return candidate
+        hops = self.topology.distance_matrix[physical, :self.topology.num_qubits]
+        nearest = None
+        for candidate in np.flatnonzero(hops > 0)[np.argsort(hops[hops > 0], kind="stable")]:
+            if candidate not in used:
+                nearest = int(candidate)
+                break
+        if nearest is not None:
+            return nearest
         # Fallback: return any free qubit
         for i in range(self.topology.num_qubits):
             if i not in used:
@@ -4,22 +4,45 @@ SWAP Insertion Pass
 Inserts SWAP gates to satisfy hardware connectivity constraints.
 
 For hardware with limited connectivity, two-qubit gates can only be applied
-to adjacent qubits. This pass inserts SWAPs to bring qubits together.
+to adjacent qubits. This pass routes the circuit with the SABRE heuristic
+(Li, Ding and Xie, ASPLOS 2019):
+
+- Gates are scheduled from the front layer of the circuit's dependency DAG;
+  every gate whose qubits are adjacent executes immediately
+- When the front layer is blocked, the SWAP that most reduces the distance
+  of the front layer, plus a weighted lookahead set of upcoming two-qubit
+  gates, is inserted; a decay factor discourages swapping the same qubits
+  repeatedly, which keeps independent SWAPs parallel
+- The initial layout is refined by routing the circuit forwards and
+  backwards and starting from where the backward pass ends
 
 Example:
   Hardware: Linear topology 0-1-2-3
   Circuit: CNOT(0, 3)
   
-  After SWAP insertion:
-    SWAP(1, 2)
-    SWAP(2, 3)
-    CNOT(0, 3)  # Now 0 and 3 are adjacent
-    SWAP(2, 3)  # Restore
+  Identity layout after SWAP insertion:
+    SWAP(0, 1)
     SWAP(1, 2)
+    CNOT(2, 3)  # The state of logical 0 now lives on qubit 2
+  
+  With layout refinement logical 0 and 3 start adjacent and no SWAP is
+  needed.
+
+Routed instructions act on qubit slots: the circuit qubit initially placed
+on a physical qubit names that physical qubit for the rest of the circuit,
+and gates are rewritten onto the slots that currently hold their logical
+states. ``circuit.metadata`` records the initial (``qubit_mapping``) and
+final (``final_qubit_mapping``) logical-to-physical layouts.
 """
 
+import random
 import time
-from typing import Dict, List, Tuple, Set
+from collections import deque
+from dataclasses import replace
+from typing import Dict, List, Tuple, Set, Optional
+
+import numpy as np
+
 from ..pass_base import OptimizationPass
 from ..ir import QIRCircuit, QIRInstruction, QIRQubit, InstructionType
 from ..topology import HardwareTopology
@@ -29,22 +52,53 @@ class SWAPInsertionPass(OptimizationPass):
     """
     Inserts SWAP gates to satisfy hardware connectivity.
     
-    Strategy:
-    1. Maintain mapping of logical qubits to physical qubits
-    2. For each two-qubit gate, check if qubits are adjacent
-    3. If not, insert SWAPs to bring them together
-    4. Update mapping after each SWAP
+    Strategy (SABRE):
+    1. Pick an initial layout, refined by forward/backward routing passes
+    2. Execute every front-layer gate whose qubits are adjacent
+    3. Otherwise insert the best-scoring SWAP next to a blocked gate
+    4. Repeat until every gate has executed
     """
     
-    def __init__(self, topology: HardwareTopology):
+    LAYOUTS = ("sabre", "identity", "mapping")
+    
+    def __init__(
+        self,
+        topology: HardwareTopology,
+        initial_layout: str = "sabre",
+        lookahead_size: int = 20,
+        lookahead_weight: float = 0.5,
+        decay_delta: float = 0.001,
+        decay_reset: int = 5,
+        layout_iterations: int = 2,
+        seed: int = 0
+    ):
         """
         Initialize SWAP insertion pass.
         
         Args:
             topology: Hardware topology defining connectivity
+            initial_layout: "sabre" (refine a starting layout), "identity"
+                            (logical i -> physical i) or "mapping" (use
+                            ``circuit.metadata['qubit_mapping']`` as is);
+                            "sabre" starts from that mapping when present
+            lookahead_size: Two-qubit gates in the lookahead set
+            lookahead_weight: Weight of the lookahead cost
+            decay_delta: Decay added to both qubits of each inserted SWAP
+            decay_reset: SWAPs after which decay factors reset
+            layout_iterations: Forward/backward passes for layout refinement
+            seed: Seed for breaking ties between equal-scoring SWAPs
         """
         super().__init__("SWAPInsertion")
+        if initial_layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown layout '{initial_layout}'; expected one of {self.LAYOUTS}")
         self.topology = topology
+        self.initial_layout = initial_layout
+        self.lookahead_size = lookahead_size
+        self.lookahead_weight = lookahead_weight
+        self.decay_delta = decay_delta
+        self.decay_reset = decay_reset
+        self.layout_iterations = layout_iterations
+        self.seed = seed
     
     def run(self, circuit: QIRCircuit) -> QIRCircuit:
         """
@@ -54,114 +108,347 @@ class SWAPInsertionPass(OptimizationPass):
         """
         start_time = time.time()
         
-        # Create initial mapping (logical -> physical)
-        # For now, use identity mapping
-        logical_to_physical = self._create_initial_mapping(circuit)
+        qubits = [qubit for _, qubit in sorted(circuit.qubits.items())]
+        if len(qubits) > self.topology.num_qubits:
+            # More logical qubits than physical - error
+            raise ValueError(
+                f"Circuit has {len(circuit.qubits)} qubits but "
+                f"topology only has {self.topology.num_qubits}"
+            )
         
-        # Process instructions and insert SWAPs as needed
-        new_instructions = []
+        instructions = list(circuit.instructions)
+        index = {qubit: i for i, qubit in enumerate(qubits)}
+        gates = [[index[q] for q in inst.qubits] for inst in instructions]
+        routed = [inst.is_two_qubit_gate() for inst in instructions]
+        successors, predecessors = self._build_dag(gates)
         
-        for inst in circuit.instructions:
-            if inst.is_two_qubit_gate():
-                # Check if qubits are adjacent in current mapping
-                logical_q0, logical_q1 = inst.qubits[0], inst.qubits[1]
-                physical_q0 = logical_to_physical[logical_q0]
-                physical_q1 = logical_to_physical[logical_q1]
-                
-                if not self.topology.are_connected(physical_q0, physical_q1):
-                    # Need to insert SWAPs
-                    swaps = self._find_swap_sequence(
-                        physical_q0, physical_q1, logical_to_physical
-                    )
-                    
-                    # Add SWAP instructions
-                    for swap_q0, swap_q1 in swaps:
-                        # Find logical qubits for these physical qubits
-                        log_q0 = self._physical_to_logical(swap_q0, logical_to_physical)
-                        log_q1 = self._physical_to_logical(swap_q1, logical_to_physical)
-                        
-                        swap_inst = QIRInstruction(
-                            InstructionType.SWAP,
-                            [log_q0, log_q1]
-                        )
-                        new_instructions.append(swap_inst)
-                        
-                        # Update mapping
-                        logical_to_physical[log_q0] = swap_q1
-                        logical_to_physical[log_q1] = swap_q0
-                        
-                        self.metrics.swap_gates_added += 1
-                        self.metrics.gates_added += 1
-            
-            # Add the original instruction
-            new_instructions.append(inst)
+        # Qubit pairs of two-qubit gates as an array, for vectorized scoring
+        self._pairs = np.array([g if r else [0, 0] for g, r in zip(gates, routed)], dtype=np.int64)
+        self._pairs = self._pairs.reshape(len(gates), 2)
+        self._distances = self.topology.distance_matrix
+        self._build_swap_tables()
         
-        # Replace circuit instructions
-        circuit.instructions = new_instructions
+        layout = self._create_initial_mapping(circuit, qubits)
+        if self.initial_layout == "sabre":
+            for _ in range(self.layout_iterations):
+                _, layout = self._route(successors, predecessors, gates, routed, layout)
+                _, layout = self._route(predecessors, successors, gates, routed, layout)
+        
+        events, final_layout = self._route(successors, predecessors, gates, routed, layout)
+        circuit.instructions = self._emit(circuit, instructions, gates, events, qubits, layout)
+        
+        circuit.metadata['qubit_mapping'] = {q: int(layout[i]) for i, q in enumerate(qubits)}
+        circuit.metadata['final_qubit_mapping'] = {
+            q: int(final_layout[i]) for i, q in enumerate(qubits)
+        }
         
         self.metrics.execution_time_ms = (time.time() - start_time) * 1000
         
         return circuit
     
-    def _create_initial_mapping(self, circuit: QIRCircuit) -> Dict[QIRQubit, int]:
+    def _build_swap_tables(self):
         """
-        Create initial logical to physical qubit mapping.
+        Edge tables for scoring every possible SWAP at once.
         
-        For now, uses identity mapping (logical i -> physical i).
-        A smarter approach would analyze the circuit first.
+        Index ``num_qubits`` pads every table: it is "no qubit", at distance
+        zero from everything and on no edge.
         """
-        mapping = {}
-        for i, (qid, qubit) in enumerate(sorted(circuit.qubits.items())):
-            if i < self.topology.num_qubits:
-                mapping[qubit] = i
-            else:
-                # More logical qubits than physical - error
-                raise ValueError(
-                    f"Circuit has {len(circuit.qubits)} qubits but "
-                    f"topology only has {self.topology.num_qubits}"
-                )
-        return mapping
+        n = self.topology.num_qubits
+        edges = sorted((p, q) for p, q in self.topology.edges if p < q < n)
+        self._edges = np.array(edges, dtype=np.int64).reshape(len(edges), 2)
+        
+        self._padded_distances = np.zeros((n + 1, n + 1), dtype=np.int64)
+        self._padded_distances[:n, :n] = self._distances[:n, :n]
+        
+        # edge_ids[p, q]: index of edge (p, q) in self._edges
+        self._edge_ids = np.full((n + 1, n + 1), len(edges), dtype=np.int64)
+        for i, (p, q) in enumerate(edges):
+            self._edge_ids[p, q] = self._edge_ids[q, p] = i
+        
+        neighbors = [sorted(self.topology.get_neighbors(p) & set(range(n))) for p in range(n)]
+        degree = max([len(adjacent) for adjacent in neighbors] + [1])
+        self._neighbor_table = np.full((n + 1, degree), n, dtype=np.int64)
+        for p, adjacent in enumerate(neighbors):
+            self._neighbor_table[p, :len(adjacent)] = adjacent
     
-    def _find_swap_sequence(
-        self,
-        physical_q0: int,
-        physical_q1: int,
-        mapping: Dict[QIRQubit, int]
-    ) -> List[Tuple[int, int]]:
+    def _build_dag(self, gates: List[List[int]]) -> Tuple[List[List[int]], List[List[int]]]:
         """
-        Find sequence of SWAPs to bring two physical qubits adjacent.
+        Dependency DAG: each instruction depends on the previous one on each of its qubits.
         
-        Uses a simple greedy approach: move q0 towards q1.
+        Returns:
+            (successors, predecessors) adjacency lists by instruction index
+        """
+        successors = [[] for _ in gates]
+        predecessors = [[] for _ in gates]
+        last: Dict[int, int] = {}
+        for i, qubits in enumerate(gates):
+            for q in qubits:
+                j = last.get(q)
+                if j is not None and j not in predecessors[i]:
+                    predecessors[i].append(j)
+                    successors[j].append(i)
+                last[q] = i
+        return successors, predecessors
+    
+    def _create_initial_mapping(self, circuit: QIRCircuit, qubits: List[QIRQubit]) -> np.ndarray:
+        """
+        Create initial logical to physical layout.
         
         Returns:
-            List of (physical_qubit_0, physical_qubit_1) SWAP pairs
+            Array mapping every logical slot to a physical qubit; slots past
+            the circuit's qubits stand for unused physical qubits
         """
-        swaps = []
+        num_physical = self.topology.num_qubits
+        layout = np.full(num_physical, -1, dtype=np.int64)
         
-        # Find path from q0 to q1
-        path = self.topology.find_path(physical_q0, physical_q1)
+        mapping = circuit.metadata.get('qubit_mapping', {}) if self.initial_layout != "identity" else {}
+        used: Set[int] = set()
+        for i, qubit in enumerate(qubits):
+            physical = mapping.get(qubit)
+            if physical is not None and 0 <= physical < num_physical and physical not in used:
+                layout[i] = physical
+                used.add(physical)
         
-        if not path or len(path) < 2:
-            return swaps
+        free = iter(p for p in range(num_physical) if p not in used)
+        for i in range(num_physical):
+            if layout[i] < 0:
+                layout[i] = next(free)
+        return layout
+    
+    def _route(
+        self,
+        successors: List[List[int]],
+        predecessors: List[List[int]],
+        gates: List[List[int]],
+        routed: List[bool],
+        layout: np.ndarray
+    ) -> Tuple[list, np.ndarray]:
+        """
+        Route the DAG from ``layout``.
         
-        # Move q0 along the path towards q1
-        current_pos = physical_q0
-        for next_pos in path[1:-1]:  # Don't include start or end
-            swaps.append((current_pos, next_pos))
-            current_pos = next_pos
+        Returns:
+            (events, final layout); events are instruction indices in
+            execution order and (physical, physical) SWAP tuples
+        """
+        distances = self._distances
+        num_physical = len(layout)
+        rng = random.Random(self.seed)
         
-        return swaps
+        logical_to_physical = layout.copy()
+        physical_to_logical = np.empty(num_physical, dtype=np.int64)
+        physical_to_logical[logical_to_physical] = np.arange(num_physical)
+        
+        remaining = [len(p) for p in predecessors]
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        # Blocked front-layer gates (an ordered set) and the physical qubits they wait on
+        front: Dict[int, None] = {}
+        waiting: Dict[int, int] = {}
+        events = []
+        decay = np.ones(num_physical)
+        swaps_since_reset = 0
+        swaps_without_progress = 0
+        stall_limit = 10 * num_physical
+        
+        def swap(p1: int, p2: int):
+            # Only blocked gates on the swapped qubits can become executable
+            for p in (p1, p2):
+                g = waiting.get(p)
+                if g is not None:
+                    del front[g]
+                    for q in gates[g]:
+                        del waiting[int(logical_to_physical[q])]
+                    ready.append(g)
+            self._apply_swap(p1, p2, logical_to_physical, physical_to_logical, events)
+        
+        while ready or front:
+            # Execute everything that is executable, following newly freed gates
+            executed = False
+            while ready:
+                unlocked = []
+                for g in ready:
+                    if routed[g]:
+                        a, b = gates[g]
+                        pa, pb = int(logical_to_physical[a]), int(logical_to_physical[b])
+                        hops = distances[pa, pb]
+                        if hops != 1:
+                            if hops < 0:
+                                raise ValueError(
+                                    f"Cannot route gate {g}: physical qubits "
+                                    f"{pa} and {pb} are not connected"
+                                )
+                            front[g] = None
+                            waiting[pa] = waiting[pb] = g
+                            continue
+                    events.append(g)
+                    executed = True
+                    for s in successors[g]:
+                        remaining[s] -= 1
+                        if remaining[s] == 0:
+                            unlocked.append(s)
+                ready = unlocked
+            if not front:
+                break
+            if executed:
+                decay.fill(1.0)
+                swaps_since_reset = 0
+                swaps_without_progress = 0
+            
+            if swaps_without_progress >= stall_limit:
+                # Release valve: walk the closest blocked pair together
+                g = min(front, key=lambda g: distances[
+                    logical_to_physical[gates[g][0]], logical_to_physical[gates[g][1]]
+                ])
+                path = self.topology.find_path(
+                    int(logical_to_physical[gates[g][0]]), int(logical_to_physical[gates[g][1]])
+                )
+                for p1, p2 in zip(path[:-2], path[1:-1]):
+                    swap(p1, p2)
+                decay.fill(1.0)
+                swaps_since_reset = 0
+                swaps_without_progress = 0
+                continue
+            
+            p1, p2 = self._choose_swap(list(front), successors, gates, routed, logical_to_physical, decay, rng)
+            swap(p1, p2)
+            
+            decay[p1] += self.decay_delta
+            decay[p2] += self.decay_delta
+            swaps_since_reset += 1
+            swaps_without_progress += 1
+            if swaps_since_reset >= self.decay_reset:
+                decay.fill(1.0)
+                swaps_since_reset = 0
+        
+        return events, logical_to_physical
+    
+    def _choose_swap(
+        self,
+        front: List[int],
+        successors: List[List[int]],
+        gates: List[List[int]],
+        routed: List[bool],
+        logical_to_physical: np.ndarray,
+        decay: np.ndarray,
+        rng: random.Random
+    ) -> Tuple[int, int]:
+        """Score every SWAP touching a blocked gate and pick the cheapest."""
+        # Lookahead: the next two-qubit gates reachable from the front layer
+        extended = []
+        seen = set(front)
+        queue = deque(front)
+        while queue and len(extended) < self.lookahead_size:
+            for s in successors[queue.popleft()]:
+                if s not in seen:
+                    seen.add(s)
+                    queue.append(s)
+                    if routed[s]:
+                        extended.append(s)
+        
+        distances = self._padded_distances
+        num_physical = len(logical_to_physical)
+        front_pairs = logical_to_physical[self._pairs[front]]
+        
+        # Front gates share no qubits: partner[p] is the other qubit of the
+        # blocked gate on p, or the padding index if p is not in one
+        partner = np.full(num_physical + 1, num_physical, dtype=np.int64)
+        partner[front_pairs[:, 0]] = front_pairs[:, 1]
+        partner[front_pairs[:, 1]] = front_pairs[:, 0]
+        
+        # Every edge is scored; only those at a blocked gate are candidates
+        first, second = self._edges[:, 0], self._edges[:, 1]
+        other_first, other_second = partner[first], partner[second]
+        candidate = (other_first < num_physical) | (other_second < num_physical)
+        
+        # A SWAP changes the distance of at most the two front gates it touches
+        change = (
+            distances[second, other_first] - distances[first, other_first]
+            + distances[first, other_second] - distances[second, other_second]
+        )
+        change[other_first == second] = 0
+        score = (distances[front_pairs[:, 0], front_pairs[:, 1]].sum() + change) / len(front)
+        
+        if extended:
+            pairs = logical_to_physical[self._pairs[extended]]
+            # Moving endpoint a of gate (a, b) to each neighbour x changes
+            # its distance by D[x, b] - D[a, b]; sum that into edge (a, x)
+            moved = pairs.T.ravel()
+            fixed = pairs[:, ::-1].T.ravel()
+            targets = self._neighbor_table[moved]
+            change = distances[targets, fixed[:, None]] - distances[moved, fixed][:, None]
+            change[(targets == fixed[:, None]) | (targets == num_physical)] = 0
+            change = np.bincount(
+                self._edge_ids[moved[:, None], targets].ravel(),
+                weights=change.ravel(),
+                minlength=len(self._edges) + 1
+            )[:-1]
+            total = distances[pairs[:, 0], pairs[:, 1]].sum() + change
+            score = score + self.lookahead_weight * total / len(extended)
+        
+        score = score * np.maximum(decay[first], decay[second])
+        score[~candidate] = np.inf
+        
+        best = np.flatnonzero(score <= score.min() + 1e-10)
+        choice = best[rng.randrange(len(best))]
+        return int(first[choice]), int(second[choice])
     
-    def _physical_to_logical(
+    def _apply_swap(
         self,
-        physical: int,
-        mapping: Dict[QIRQubit, int]
-    ) -> QIRQubit:
-        """Find logical qubit mapped to given physical qubit."""
-        for logical, phys in mapping.items():
-            if phys == physical:
-                return logical
-        raise ValueError(f"No logical qubit mapped to physical {physical}")
+        p1: int,
+        p2: int,
+        logical_to_physical: np.ndarray,
+        physical_to_logical: np.ndarray,
+        events: list
+    ):
+        l1, l2 = physical_to_logical[p1], physical_to_logical[p2]
+        physical_to_logical[p1], physical_to_logical[p2] = l2, l1
+        logical_to_physical[l1], logical_to_physical[l2] = p2, p1
+        events.append((p1, p2))
+    
+    def _emit(
+        self,
+        circuit: QIRCircuit,
+        instructions: List[QIRInstruction],
+        gates: List[List[int]],
+        events: list,
+        qubits: List[QIRQubit],
+        layout: np.ndarray
+    ) -> List[QIRInstruction]:
+        """Build routed instructions on qubit slots."""
+        num_physical = len(layout)
+        slots: List[Optional[QIRQubit]] = [None] * num_physical
+        for i, qubit in enumerate(qubits):
+            slots[layout[i]] = qubit
+        
+        def slot(physical: int) -> QIRQubit:
+            # Unused physical qubits get an ancilla the first time a SWAP touches them
+            if slots[physical] is None:
+                name = f"ancilla_{physical}"
+                while name in circuit.qubits:
+                    name = f"_{name}"
+                slots[physical] = circuit.add_qubit(name)
+            return slots[physical]
+        
+        logical_to_physical = layout.copy()
+        physical_to_logical = np.empty(num_physical, dtype=np.int64)
+        physical_to_logical[logical_to_physical] = np.arange(num_physical)
+        
+        new_instructions = []
+        for event in events:
+            if isinstance(event, tuple):
+                p1, p2 = event
+                new_instructions.append(QIRInstruction(InstructionType.SWAP, [slot(p1), slot(p2)]))
+                self._apply_swap(p1, p2, logical_to_physical, physical_to_logical, [])
+                self.metrics.swap_gates_added += 1
+                self.metrics.gates_added += 1
+                continue
+            
+            inst = instructions[event]
+            placed = [slot(logical_to_physical[q]) for q in gates[event]]
+            if placed != inst.qubits:
+                inst = replace(inst, qubits=placed)
+            new_instructions.append(inst)
+        
+        return new_instructions
     
     def should_run(self, circuit: QIRCircuit) -> bool:
         """Only run if there are two-qubit gates."""
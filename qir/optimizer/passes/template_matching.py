@@ -289,7 +289,7 @@ import math
 from typing import List, Optional, Tuple
 from dataclasses import dataclass
 from ..pass_base import OptimizationPass
-from ..ir import QIRCircuit, QIRInstruction, QIRQubit, InstructionType
+from ..ir import QIRCircuit, QIRInstruction, QIRQubit, InstructionType, InstructionNode
 
 
 @dataclass
@@ -310,6 +310,11 @@ class GateTemplate:
     cost_before: int
     cost_after: int
     
+    @property
+    def single_qubit(self) -> bool:
+        """Whether every gate of the pattern acts on the same single qubit."""
+        return all(qubit_indices == [0] for _, qubit_indices in self.pattern)
+    
     def matches(self, instructions: List[QIRInstruction], start_idx: int) -> bool:
         """Check if pattern matches at given position."""
         if start_idx + len(self.pattern) > len(instructions):
@@ -368,6 +373,7 @@ class TemplateMatchingPass(OptimizationPass):
     def __init__(self):
         super().__init__("TemplateMatching")
         self.templates = self._build_template_library()
+        self.max_pattern_length = max(len(t.pattern) for t in self.templates)
     
     def _build_template_library(self) -> List[GateTemplate]:
         """Build library of known gate patterns."""
@@ -488,38 +494,54 @@ class TemplateMatchingPass(OptimizationPass):
             changed = False
             iterations += 1
             
-            i = 0
-            while i < len(circuit.instructions):
+            node = circuit.first_node()
+            while node is not None:
                 # Try each template at this position
+                windows = {}
                 matched = False
                 
                 for template in self.templates:
-                    if template.matches(circuit.instructions, i):
+                    # Single-qubit templates follow the qubit's wire, so
+                    # gates on other qubits in between do not get in the way
+                    on_wire = template.single_qubit and len(node.instruction.qubits) == 1
+                    if on_wire not in windows:
+                        windows[on_wire] = self._window(node, on_wire)
+                    window = windows[on_wire]
+                    instructions = [n.instruction for n in window]
+                    
+                    if template.matches(instructions, 0):
                         # Extract qubits
-                        qubit_map = template.extract_qubits(circuit.instructions, i)
+                        qubit_map = template.extract_qubits(instructions, 0)
                         
                         # Create replacement
                         replacements = template.create_replacement(qubit_map)
                         
+                        # Insert replacements in front of the old pattern
+                        inserted = [circuit.insert_before(node, replacement)
+                                    for replacement in replacements]
+                        
                         # Remove old pattern
-                        for _ in range(len(template.pattern)):
-                            circuit.remove_instruction(i)
+                        for old in window[:len(template.pattern)]:
+                            circuit.remove(old)
                         
-                        # Insert replacements
-                        for j, replacement in enumerate(replacements):
-                            circuit.insert_instruction(i + j, replacement)
+                        # Removed nodes keep their forward links
+                        following = node.next
+                        while following is not None and not following.alive:
+                            following = following.next
                         
                         # Update metrics
                         gates_saved = template.cost_before - template.cost_after
                         self.metrics.gates_removed += gates_saved
                         self.metrics.patterns_matched += 1
                         
+                        # Try again at this position
+                        node = inserted[0] if inserted else following
                         changed = True
                         matched = True
                         break
                 
                 if not matched:
-                    i += 1
+                    node = node.next
         
         self.metrics.custom['iterations'] = iterations
         self.metrics.custom['templates_applied'] = self.metrics.patterns_matched
@@ -527,6 +549,21 @@ class TemplateMatchingPass(OptimizationPass):
         
         return circuit
     
+    def _window(self, node: InstructionNode, on_wire: bool) -> List[InstructionNode]:
+        """
+        Up to ``max_pattern_length`` consecutive nodes starting at ``node``.
+        
+        Args:
+            node: First node of the window
+            on_wire: Follow the wire of ``node``'s qubit instead of program order
+        """
+        qubit = node.instruction.qubits[0] if on_wire else None
+        window = []
+        while node is not None and len(window) < self.max_pattern_length:
+            window.append(node)
+            node = node.next_on(qubit) if on_wire else node.next
+        return window
+    
     def should_run(self, circuit: QIRCircuit) -> bool:
         """Only run if there are enough gates to match patterns."""
         return self.enabled and circuit.get_gate_count() >= 3
@@ -2,11 +2,18 @@
 Hardware Topology Representation
 
 Represents the connectivity constraints of quantum hardware.
+
+All-pairs hop distances and next-hop routing tables are built once per
+topology on first use (one BFS level per matrix product) and cached as
+NumPy arrays, so distance and path queries from routing passes are table
+lookups instead of a BFS per call.
 """
 
 from typing import Set, Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class HardwareTopology:
@@ -17,6 +24,9 @@ class HardwareTopology:
         num_qubits: Number of physical qubits
         edges: Set of (qubit1, qubit2) tuples representing connectivity
         name: Name of the topology
+    
+    Change connectivity with ``add_edge``/``remove_edge`` or by assigning a
+    new edge set; the cached tables do not see in-place edits of ``edges``.
     """
     num_qubits: int
     edges: Set[Tuple[int, int]]
@@ -30,6 +40,79 @@ class HardwareTopology:
             all_edges.add((q1, q2))
             all_edges.add((q2, q1))
         self.edges = all_edges
+        self._tables_edges = None
+    
+    def add_edge(self, q1: int, q2: int):
+        """Connect two qubits in both directions."""
+        self.edges.add((q1, q2))
+        self.edges.add((q2, q1))
+        self._tables_edges = None
+    
+    def remove_edge(self, q1: int, q2: int):
+        """Disconnect two qubits in both directions."""
+        self.edges.discard((q1, q2))
+        self.edges.discard((q2, q1))
+        self._tables_edges = None
+    
+    def _tables(self):
+        """Build (or reuse) adjacency and routing tables for the current edges."""
+        if self._tables_edges is self.edges:
+            return
+        
+        size = max([self.num_qubits] + [max(q1, q2) + 1 for q1, q2 in self.edges])
+        adjacency = np.zeros((size, size), dtype=bool)
+        if self.edges:
+            rows, cols = zip(*self.edges)
+            adjacency[list(rows), list(cols)] = True
+        neighbors = [np.flatnonzero(adjacency[q]) for q in range(size)]
+        
+        # Breadth-first search from every qubit at once
+        distances = np.full((size, size), -1, dtype=np.int32)
+        np.fill_diagonal(distances, 0)
+        reached = np.eye(size, dtype=bool)
+        frontier = reached.astype(np.float32)
+        hops = 0
+        while True:
+            hops += 1
+            step = (frontier @ adjacency.astype(np.float32) > 0) & ~reached
+            if not step.any():
+                break
+            distances[step] = hops
+            reached |= step
+            frontier = step.astype(np.float32)
+        
+        # next_hop[u, v]: lowest-index neighbour of u one hop closer to v
+        next_hop = np.full((size, size), -1, dtype=np.int32)
+        for qubit, adjacent in enumerate(neighbors):
+            if len(adjacent) == 0:
+                continue
+            closer = distances[adjacent] == (distances[qubit] - 1)
+            closer &= distances[qubit] > 0
+            next_hop[qubit] = np.where(closer.any(axis=0), adjacent[closer.argmax(axis=0)], -1)
+        
+        self._neighbors = [set(adjacent.tolist()) for adjacent in neighbors]
+        self._bitsets = [sum(1 << int(q) for q in adjacent) for adjacent in neighbors]
+        self._distances = distances
+        self._next_hop = next_hop
+        self._tables_edges = self.edges
+    
+    @property
+    def distance_matrix(self) -> np.ndarray:
+        """(n x n) shortest-path hop counts; -1 where unreachable."""
+        self._tables()
+        return self._distances
+    
+    @property
+    def next_hop_matrix(self) -> np.ndarray:
+        """(n x n) first step from row qubit towards column qubit; -1 if none."""
+        self._tables()
+        return self._next_hop
+    
+    @property
+    def adjacency_bitsets(self) -> List[int]:
+        """Neighbours of each qubit as an integer bitset (bit j set if adjacent to j)."""
+        self._tables()
+        return self._bitsets
     
     def are_connected(self, q1: int, q2: int) -> bool:
         """Check if two qubits are directly connected."""
@@ -37,7 +120,10 @@ class HardwareTopology:
     
     def get_neighbors(self, qubit: int) -> Set[int]:
         """Get all qubits connected to the given qubit."""
-        return {q2 for q1, q2 in self.edges if q1 == qubit}
+        self._tables()
+        if qubit >= len(self._neighbors):
+            return set()
+        return set(self._neighbors[qubit])
     
     def get_distance(self, q1: int, q2: int) -> int:
         """
@@ -48,25 +134,11 @@ class HardwareTopology:
         """
         if q1 == q2:
             return 0
-        if self.are_connected(q1, q2):
-            return 0  # Already adjacent
-        
-        # BFS to find shortest path
-        visited = {q1}
-        queue = [(q1, 0)]
         
-        while queue:
-            current, dist = queue.pop(0)
-            
-            for neighbor in self.get_neighbors(current):
-                if neighbor == q2:
-                    return dist
-                
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, dist + 1))
-        
-        return float('inf')  # Not connected
+        hops = int(self.distance_matrix[q1, q2])
+        if hops < 0:
+            return float('inf')  # Not connected
+        return max(hops - 1, 0)
     
     def find_path(self, q1: int, q2: int) -> Optional[List[int]]:
         """
@@ -77,23 +149,18 @@ class HardwareTopology:
         """
         if q1 == q2:
             return [q1]
+        if self.distance_matrix[q1, q2] < 0:
+            return None
         
-        # BFS with path tracking
-        visited = {q1}
-        queue = [(q1, [q1])]
-        
-        while queue:
-            current, path = queue.pop(0)
-            
-            for neighbor in self.get_neighbors(current):
-                if neighbor == q2:
-                    return path + [q2]
-                
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
+        # Follow next hops
+        next_hop = self._next_hop
+        path = [q1]
+        current = q1
+        while current != q2:
+            current = int(next_hop[current, q2])
+            path.append(current)
         
-        return None
+        return path
     
     @staticmethod
     def linear(num_qubits: int) -> 'HardwareTopology':
@@ -55,9 +55,8 @@ class OptimizedExecutor:
             pm.add_pass(GateCommutationPass())
             pm.add_pass(GateCancellationPass())
         elif self.optimization_level == OptimizationLevel.AGGRESSIVE:
-            # Multiple rounds of optimization
-            pm.add_pass(GateCommutationPass())
-            pm.add_pass(GateCancellationPass())
+            # Repeat until no pass finds anything new
+            pm.fixed_point = True
             pm.add_pass(GateCommutationPass())
             pm.add_pass(GateCancellationPass())
         
@@ -98,7 +97,10 @@ class OptimizedExecutor:
         Returns:
             Dictionary with optimization statistics
         """
+        summary = self.pass_manager.get_summary()
         return {
             'level': self.optimization_level.name,
-            'passes': [pass_.__class__.__name__ for pass_ in self.pass_manager.passes]
+            'passes': [pass_.__class__.__name__ for pass_ in self.pass_manager.passes],
+            'rounds': summary['rounds'],
+            'pass_times_ms': {p['name']: p['time_ms'] for p in summary['passes']}
         }
@@ -1,5 +1,6 @@
 """QMK Client Library"""
 
-from .qsyscall_client import QSyscallClient
+from .qsyscall_client import QSyscallClient, FramingUnsupportedError, HandshakeTimeoutError
+from .async_qsyscall_client import AsyncQSyscallClient
 
-__all__ = ["QSyscallClient"]
+__all__ = ["QSyscallClient", "AsyncQSyscallClient", "FramingUnsupportedError", "HandshakeTimeoutError"]
@@ -0,0 +1,499 @@
+"""
+Async QSyscall Client Library
+
+asyncio client for the qSyscall ABI over one persistent framed
+connection. Calls are pipelined: any number of coroutines may await
+requests on the same client concurrently.
+
+``wait_for_job`` subscribes with q_watch and awaits the server-pushed
+``q_job_done`` notification, so waiting on many jobs costs neither
+threads nor polling. ``subscribe`` streams a job's state, progress and
+measurement events the same way.
+"""
+
+import asyncio
+import itertools
+import json
+from typing import Dict, List, Optional, Any
+
+from kernel.abi.framing import FRAME_MAGIC, FRAME_HEADER, encode_frame, frame_length
+from .qsyscall_client import (
+    QSyscallClient,
+    QSyscallError,
+    FramingUnsupportedError,
+    HandshakeTimeoutError,
+    JOB_EVENT_NOTIFICATION,
+)
+
+# JSON-RPC error code for unknown methods
+_METHOD_NOT_FOUND = -32601
+
+# Notification carrying a finished job's status (see kernel.syscalls.q_watch)
+JOB_DONE_NOTIFICATION = "q_job_done"
+
+
+class AsyncQSyscallClient:
+    """
+    asyncio client for qSyscall ABI.
+
+    Mirrors ``QSyscallClient`` with coroutine methods. Use as an async
+    context manager or call ``close()`` when done.
+    """
+
+    def __init__(self, socket_path: str = "/tmp/qmk.sock",
+                 handshake_timeout: float = QSyscallClient.DEFAULT_HANDSHAKE_TIMEOUT):
+        """
+        Initialize client.
+
+        Args:
+            socket_path: Path to Unix domain socket
+            handshake_timeout: Seconds to wait for the server to echo the
+                               framing magic
+        """
+        self.socket_path = socket_path
+        self.handshake_timeout = handshake_timeout
+        self.session_id: Optional[str] = None
+
+        self._id_counter = itertools.count(1)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._job_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._job_streams: Dict[str, List[asyncio.Queue]] = {}
+        self._watch_supported = True
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def connect(self):
+        """
+        Open the framed connection (called automatically on first use).
+
+        Raises:
+            FramingUnsupportedError: If the server does not support framing
+            HandshakeTimeoutError: If the server did not echo the magic in time
+        """
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+            self._write_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            try:
+                writer.write(FRAME_MAGIC)
+                await writer.drain()
+                # A server without framing never echoes the magic
+                ack = await asyncio.wait_for(reader.readexactly(len(FRAME_MAGIC)),
+                                             self.handshake_timeout)
+            except asyncio.TimeoutError:
+                writer.close()
+                raise HandshakeTimeoutError("Framing handshake timed out") from None
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+                raise FramingUnsupportedError("Server does not support framed connections")
+            if ack != FRAME_MAGIC:
+                writer.close()
+                raise FramingUnsupportedError("Server does not support framed connections")
+
+            self._reader, self._writer = reader, writer
+            self._reader_task = asyncio.get_running_loop().create_task(self._read_loop(reader))
+
+    async def close(self):
+        """Close the connection; pending calls fail with ConnectionError."""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+    async def call(self, method: str, params: Dict) -> Any:
+        """
+        Make a JSON-RPC call.
+
+        Args:
+            method: Method name
+            params: Parameters
+
+        Returns:
+            Result from the call
+
+        Raises:
+            QSyscallError: If the call fails
+            ConnectionError: If the connection is lost
+        """
+        await self.connect()
+
+        request_id = next(self._id_counter)
+        frame = encode_frame(json.dumps({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": request_id
+        }))
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._write_lock:
+                writer = self._writer
+                if writer is None:
+                    raise ConnectionError("qSyscall connection closed")
+                writer.write(frame)
+                await writer.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def negotiate_capabilities(self, requested: List[str]) -> Dict:
+        """
+        Negotiate capabilities with the kernel.
+
+        Args:
+            requested: List of requested capabilities
+
+        Returns:
+            Dictionary with negotiation results
+        """
+        result = await self.call("q_negotiate_caps", {"requested": requested})
+        self.session_id = result["session_id"]
+        return result
+
+    async def submit_job(
+        self,
+        graph: Dict,
+        priority: int = 10,
+        seed: Optional[int] = None,
+        debug: bool = False
+    ) -> str:
+        """
+        Submit a QVM graph for execution.
+
+        Args:
+            graph: QVM graph to execute
+            priority: Job priority (higher = more urgent)
+            seed: Optional random seed for deterministic execution
+            debug: Enable debug logging
+
+        Returns:
+            Job ID
+        """
+        self._require_session()
+
+        policy = {
+            "priority": priority,
+            "debug": debug
+        }
+
+        if seed is not None:
+            policy["seed"] = seed
+
+        result = await self.call("q_submit", {
+            "graph": graph,
+            "policy": policy,
+            "session_id": self.session_id
+        })
+
+        return result["job_id"]
+
+    async def submit_batch(
+        self,
+        template: Dict,
+        parameters: List[Dict[str, float]],
+        priority: int = 10,
+        seed: Optional[int] = None,
+        debug: bool = False
+    ) -> Dict:
+        """
+        Submit one job per parameter row of a template graph.
+
+        Returns:
+            Dictionary with batch_id and job_ids (in row order)
+        """
+        self._require_session()
+
+        policy = {
+            "priority": priority,
+            "debug": debug
+        }
+
+        if seed is not None:
+            policy["seed"] = seed
+
+        return await self.call("q_submit_batch", {
+            "template": template,
+            "parameters": parameters,
+            "policy": policy,
+            "session_id": self.session_id
+        })
+
+    async def iter_batch_results(self, batch_id: str, timeout_ms: Optional[int] = None):
+        """
+        Asynchronously yield final job statuses of a batch as they complete.
+
+        Raises:
+            TimeoutError: If no result arrives within timeout_ms
+        """
+        self._require_session()
+        cursor = 0
+        while True:
+            params = {
+                "batch_id": batch_id,
+                "session_id": self.session_id,
+                "cursor": cursor
+            }
+            if timeout_ms is not None:
+                params["timeout_ms"] = timeout_ms
+
+            page = await self.call("q_wait_batch", params)
+            if not page["results"] and not page["done"]:
+                raise TimeoutError(f"No result from batch '{batch_id}' within timeout")
+            for status in page["results"]:
+                yield status
+            cursor = page["cursor"]
+            if page["done"]:
+                return
+
+    async def get_job_status(self, job_id: str) -> Dict:
+        """Get job status."""
+        self._require_session()
+        return await self.call("q_status", {
+            "job_id": job_id,
+            "session_id": self.session_id
+        })
+
+    async def wait_for_job(self, job_id: str, timeout_ms: Optional[int] = None) -> Dict:
+        """
+        Wait for job completion without blocking the event loop.
+
+        Uses the server's q_job_done notification; falls back to q_wait on
+        servers without q_watch.
+
+        Args:
+            job_id: Job identifier
+            timeout_ms: Optional timeout in milliseconds
+
+        Returns:
+            Final job status
+
+        Raises:
+            TimeoutError: If the job does not finish in time
+        """
+        self._require_session()
+        params = {
+            "job_id": job_id,
+            "session_id": self.session_id
+        }
+
+        if not self._watch_supported:
+            if timeout_ms is not None:
+                params["timeout_ms"] = timeout_ms
+            return await self.call("q_wait", params)
+
+        # Register before subscribing: the notification may beat the response
+        done = asyncio.get_running_loop().create_future()
+        self._job_waiters.setdefault(job_id, []).append(done)
+
+        try:
+            try:
+                await self.call("q_watch", params)
+            except QSyscallError as e:
+                if e.code != _METHOD_NOT_FOUND:
+                    raise
+                self._watch_supported = False
+                return await self.wait_for_job(job_id, timeout_ms)
+
+            timeout_sec = timeout_ms / 1000.0 if timeout_ms is not None else None
+            try:
+                return await asyncio.wait_for(done, timeout_sec)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Job '{job_id}' did not complete within timeout") from None
+        finally:
+            waiters = self._job_waiters.get(job_id)
+            if waiters and done in waiters:
+                waiters.remove(done)
+                if not waiters:
+                    del self._job_waiters[job_id]
+
+    async def subscribe(
+        self,
+        job_id: str,
+        types: Optional[List[str]] = None,
+        timeout_ms: Optional[int] = None
+    ):
+        """
+        Asynchronously yield a job's event stream messages until its final state.
+
+        See ``QSyscallClient.subscribe``.
+
+        Raises:
+            TimeoutError: If no message arrives within timeout_ms
+            ConnectionError: If the connection is lost
+        """
+        self._require_session()
+        params = {
+            "job_id": job_id,
+            "session_id": self.session_id
+        }
+        if types is not None:
+            params["types"] = types
+
+        # Register before subscribing: the first messages may beat the response
+        stream: asyncio.Queue = asyncio.Queue()
+        self._job_streams.setdefault(job_id, []).append(stream)
+
+        subscription_id = None
+        try:
+            subscription_id = (await self.call("q_subscribe", params))["subscription_id"]
+            timeout_sec = timeout_ms / 1000.0 if timeout_ms is not None else None
+            while True:
+                try:
+                    message = await asyncio.wait_for(stream.get(), timeout_sec)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No event from job '{job_id}' within timeout") from None
+                if isinstance(message, Exception):
+                    raise message
+                yield message
+                if message.get("final"):
+                    subscription_id = None
+                    return
+        finally:
+            streams = self._job_streams.get(job_id)
+            if streams and stream in streams:
+                streams.remove(stream)
+                if not streams:
+                    del self._job_streams[job_id]
+            if subscription_id is not None and self._writer is not None:
+                # Abandoned early: stop the server-side stream, best effort
+                try:
+                    await self.call("q_unsubscribe", {
+                        "subscription_id": subscription_id,
+                        "session_id": self.session_id
+                    })
+                except (QSyscallError, ConnectionError):
+                    pass
+
+    async def cancel_job(self, job_id: str) -> Dict:
+        """Cancel a job."""
+        self._require_session()
+        return await self.call("q_cancel", {
+            "job_id": job_id,
+            "session_id": self.session_id
+        })
+
+    async def open_channel(self, vq_a: str, vq_b: str, fidelity: float = 0.99) -> Dict:
+        """Open an entanglement channel."""
+        self._require_session()
+        return await self.call("q_open_chan", {
+            "vq_a": vq_a,
+            "vq_b": vq_b,
+            "options": {"fidelity": fidelity},
+            "session_id": self.session_id
+        })
+
+    async def get_telemetry(self) -> Dict:
+        """Get system telemetry."""
+        self._require_session()
+        return await self.call("q_get_telemetry", {
+            "session_id": self.session_id
+        })
+
+    async def submit_and_wait(
+        self,
+        graph: Dict,
+        timeout_ms: Optional[int] = None,
+        **kwargs
+    ) -> Dict:
+        """
+        Submit a job and wait for completion.
+
+        Args:
+            graph: QVM graph to execute
+            timeout_ms: Optional timeout in milliseconds
+            **kwargs: Additional arguments for submit_job
+
+        Returns:
+            Final job status with results
+        """
+        job_id = await self.submit_job(graph, **kwargs)
+        return await self.wait_for_job(job_id, timeout_ms)
+
+    def _require_session(self):
+        if not self.session_id:
+            raise RuntimeError("Must negotiate capabilities first")
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        """Route responses to pending calls and notifications to job waiters."""
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                length = frame_length(header)
+                message = json.loads((await reader.readexactly(length)).decode('utf-8'))
+
+                if "id" not in message:
+                    self._handle_notification(message)
+                    continue
+
+                future = self._pending.pop(message["id"], None)
+                if future is None or future.done():
+                    continue
+
+                if "error" in message:
+                    error = message["error"]
+                    future.set_exception(QSyscallError(
+                        error["code"],
+                        error["message"],
+                        error.get("data")
+                    ))
+                else:
+                    future.set_result(message["result"])
+        except (asyncio.IncompleteReadError, ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            if self._reader is reader:
+                self._reader = None
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            self._fail_all(ConnectionError("qSyscall connection closed"))
+
+    def _handle_notification(self, message: Dict):
+        """Route job event messages and resolve q_job_done waiters."""
+        if message.get("method") == JOB_EVENT_NOTIFICATION:
+            event = message.get("params", {})
+            for stream in self._job_streams.get(event.get("job_id"), []):
+                stream.put_nowait(event)
+            return
+        if message.get("method") != JOB_DONE_NOTIFICATION:
+            return
+        status = message.get("params", {})
+        for future in self._job_waiters.pop(status.get("job_id"), []):
+            if not future.done():
+                future.set_result(status)
+
+    def _fail_all(self, error: Exception):
+        """Fail every pending call and job waiter."""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+        waiters, self._job_waiters = self._job_waiters, {}
+        for futures in waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+        for streams in self._job_streams.values():
+            for stream in streams:
+                stream.put_nowait(error)
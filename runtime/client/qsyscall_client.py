@@ -2,11 +2,32 @@
 QSyscall Client Library
 
 Python client for the qSyscall ABI over Unix domain sockets.
+
+By default the client keeps one persistent connection using the kernel's
+length-prefixed framing, so calls skip the per-call connect and several
+requests can be in flight at once (see ``call_async`` and
+``call_pipelined``). ``persistent=False`` selects the legacy one-shot
+transport (one connection per call). A server that answers the framing
+handshake with anything but the echoed magic predates framing; the
+client then falls back to the one-shot transport for good. A handshake
+that merely times out only sends that one call one-shot.
+
+On servers that push notifications (``AsyncQMKServer``), ``subscribe``
+streams a job's state, progress and measurement events.
 """
 
+import itertools
 import json
+import queue
 import socket
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Any, Tuple
+
+from kernel.abi.framing import FRAME_MAGIC, encode_frame, read_frame, socket_has_pending_data
+
+# Notification carrying job event stream messages (see kernel.syscalls.q_subscribe)
+JOB_EVENT_NOTIFICATION = "q_job_event"
 
 
 class QSyscallError(Exception):
@@ -19,23 +40,69 @@ class QSyscallError(Exception):
         super().__init__(f"[{code}] {message}")
 
 
+class FramingUnsupportedError(ConnectionError):
+    """Raised when the server answers the framing handshake without framing."""
+    pass
+
+
+class HandshakeTimeoutError(ConnectionError):
+    """Raised when the server gives no definite answer to the framing handshake."""
+    pass
+
+
 class QSyscallClient:
     """
     Client for qSyscall ABI.
     
-    Provides high-level interface to QMK kernel operations.
+    Provides high-level interface to QMK kernel operations. Methods are
+    safe to call from several threads sharing one client.
     """
     
-    def __init__(self, socket_path: str = "/tmp/qmk.sock"):
+    DEFAULT_HANDSHAKE_TIMEOUT = 1.0
+    
+    def __init__(self, socket_path: str = "/tmp/qmk.sock", persistent: bool = True,
+                 handshake_timeout: float = DEFAULT_HANDSHAKE_TIMEOUT):
         """
         Initialize client.
         
         Args:
             socket_path: Path to Unix domain socket
+            persistent: Use one long-lived framed connection (False: legacy
+                        one connection per call); falls back to one-shot
+                        calls if the server does not support framing
+            handshake_timeout: Seconds to wait for each step of the framing
+                               handshake
         """
         self.socket_path = socket_path
+        self.persistent = persistent
+        self.handshake_timeout = handshake_timeout
         self.request_id = 0
         self.session_id: Optional[str] = None
+        
+        self._id_counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._pending: Dict[int, Future] = {}
+        self._job_streams: Dict[str, List[queue.Queue]] = {}
+    
+    def close(self):
+        """Close the persistent connection; pending calls fail."""
+        with self._lock:
+            sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def negotiate_capabilities(self, requested: List[str]) -> Dict:
         """
@@ -95,6 +162,104 @@ class QSyscallClient:
         
         return result["job_id"]
     
+    def submit_batch(
+        self,
+        template: Dict,
+        parameters: List[Dict[str, float]],
+        priority: int = 10,
+        seed: Optional[int] = None,
+        debug: bool = False
+    ) -> Dict:
+        """
+        Submit one job per parameter row of a template graph.
+        
+        Angle arguments in the template may be ``{"param": name}``
+        placeholders. The kernel verifies the structure once and binds
+        each row into its own job.
+        
+        Args:
+            template: Parameterized QVM graph
+            parameters: List of {name: value} rows
+            priority: Job priority (higher = more urgent)
+            seed: Optional random seed for deterministic execution
+            debug: Enable debug logging
+        
+        Returns:
+            Dictionary with batch_id and job_ids (in row order)
+        
+        Raises:
+            QSyscallError: If submission fails
+        """
+        if not self.session_id:
+            raise RuntimeError("Must negotiate capabilities first")
+        
+        policy = {
+            "priority": priority,
+            "debug": debug
+        }
+        
+        if seed is not None:
+            policy["seed"] = seed
+        
+        return self._call("q_submit_batch", {
+            "template": template,
+            "parameters": parameters,
+            "policy": policy,
+            "session_id": self.session_id
+        })
+    
+    def wait_batch(
+        self,
+        batch_id: str,
+        cursor: int = 0,
+        timeout_ms: Optional[int] = None
+    ) -> Dict:
+        """
+        Fetch batch results completed after ``cursor``.
+        
+        Args:
+            batch_id: Batch identifier
+            cursor: Number of results already received
+            timeout_ms: Maximum wait for a new result
+        
+        Returns:
+            Dictionary with results, cursor, completed, total and done
+        """
+        if not self.session_id:
+            raise RuntimeError("Must negotiate capabilities first")
+        
+        params = {
+            "batch_id": batch_id,
+            "session_id": self.session_id,
+            "cursor": cursor
+        }
+        
+        if timeout_ms is not None:
+            params["timeout_ms"] = timeout_ms
+        
+        return self._call("q_wait_batch", params)
+    
+    def iter_batch_results(self, batch_id: str, timeout_ms: Optional[int] = None):
+        """
+        Yield final job statuses of a batch as they complete.
+        
+        Args:
+            batch_id: Batch identifier
+            timeout_ms: Maximum wait between consecutive results
+        
+        Raises:
+            TimeoutError: If no result arrives within timeout_ms
+        """
+        cursor = 0
+        while True:
+            page = self.wait_batch(batch_id, cursor, timeout_ms)
+            if not page["results"] and not page["done"]:
+                raise TimeoutError(f"No result from batch '{batch_id}' within timeout")
+            yield from page["results"]
+            cursor = page["cursor"]
+            if page["done"]:
+                return
+    
     def get_job_status(self, job_id: str) -> Dict:
         """
         Get job status.
@@ -137,6 +302,78 @@ class QSyscallClient:
         
         return self._call("q_wait", params)
     
+    def subscribe(
+        self,
+        job_id: str,
+        types: Optional[List[str]] = None,
+        timeout_ms: Optional[int] = None
+    ):
+        """
+        Yield a job's event stream messages until its final state.
+        
+        Messages are ``state``, ``progress`` and ``events`` dictionaries
+        (see ``JobManager.subscribe``); the last one has ``final`` set.
+        Requires the persistent transport and a server that pushes
+        notifications.
+        
+        Args:
+            job_id: Job identifier
+            types: Optional subset of ("state", "progress", "events")
+            timeout_ms: Maximum wait between consecutive messages
+        
+        Raises:
+            TimeoutError: If no message arrives within timeout_ms
+            ConnectionError: If the connection is lost
+        """
+        if not self.session_id:
+            raise RuntimeError("Must negotiate capabilities first")
+        if not self.persistent:
+            raise RuntimeError("subscribe requires a persistent connection")
+        
+        params = {
+            "job_id": job_id,
+            "session_id": self.session_id
+        }
+        if types is not None:
+            params["types"] = types
+        
+        # Register before subscribing: the first messages may beat the response
+        stream: queue.Queue = queue.Queue()
+        with self._lock:
+            self._job_streams.setdefault(job_id, []).append(stream)
+        
+        subscription_id = None
+        try:
+            subscription_id = self.call_async("q_subscribe", params).result()["subscription_id"]
+            timeout_sec = timeout_ms / 1000.0 if timeout_ms is not None else None
+            while True:
+                try:
+                    message = stream.get(timeout=timeout_sec)
+                except queue.Empty:
+                    raise TimeoutError(f"No event from job '{job_id}' within timeout") from None
+                if isinstance(message, Exception):
+                    raise message
+                yield message
+                if message.get("final"):
+                    subscription_id = None
+                    return
+        finally:
+            with self._lock:
+                streams = self._job_streams.get(job_id, [])
+                if stream in streams:
+                    streams.remove(stream)
+                    if not streams:
+                        del self._job_streams[job_id]
+            if subscription_id is not None and self._sock is not None:
+                # Abandoned early: stop the server-side stream, best effort
+                try:
+                    self.call_async("q_unsubscribe", {
+                        "subscription_id": subscription_id,
+                        "session_id": self.session_id
+                    })
+                except (ConnectionError, OSError):
+                    pass
+    
     def cancel_job(self, job_id: str) -> Dict:
         """
         Cancel a job.
@@ -216,6 +453,69 @@ class QSyscallClient:
         job_id = self.submit_job(graph, **kwargs)
         return self.wait_for_job(job_id, timeout_ms)
     
+    def call_async(self, method: str, params: Dict) -> Future:
+        """
+        Send a JSON-RPC request without waiting for its response.
+        
+        Requires the persistent transport. Responses may arrive in any
+        order; each future resolves to its own result.
+        
+        Args:
+            method: Method name
+            params: Parameters
+        
+        Returns:
+            Future resolving to the result or raising QSyscallError
+        
+        Raises:
+            FramingUnsupportedError: If the server does not support framing
+            HandshakeTimeoutError: If the server did not finish the handshake
+        """
+        if not self.persistent:
+            raise RuntimeError("call_async requires a persistent connection")
+        
+        future: Future = Future()
+        while True:
+            with self._lock:
+                if self._sock is not None:
+                    request_id = self._next_request_id()
+                    sock = self._sock
+                    pending = self._pending
+                    pending[request_id] = future
+                    break
+            self._connect()
+        
+        frame = encode_frame(self._build_request(method, params, request_id))
+        
+        # Sending never holds the pending-map lock, so the reader thread can
+        # keep draining responses while a large pipeline is written
+        try:
+            with self._send_lock:
+                sock.sendall(frame)
+        except OSError as e:
+            with self._lock:
+                self._drop_connection_locked(sock, pending)
+            raise ConnectionError(f"qSyscall connection lost: {e}") from e
+        return future
+    
+    def call_pipelined(self, calls: List[Tuple[str, Dict]]) -> List[Any]:
+        """
+        Send several requests back-to-back and collect their results.
+        
+        Args:
+            calls: List of (method, params) pairs
+        
+        Returns:
+            Results in the order of ``calls``
+        
+        Raises:
+            QSyscallError: For the first failed call
+        """
+        if not self.persistent:
+            return [self._call(method, params) for method, params in calls]
+        futures = [self.call_async(method, params) for method, params in calls]
+        return [future.result() for future in futures]
+    
     def _call(self, method: str, params: Dict) -> Any:
         """
         Make a JSON-RPC call.
@@ -230,14 +530,190 @@ class QSyscallClient:
         Raises:
             QSyscallError: If the call fails
         """
-        self.request_id += 1
-        
-        request = {
+        if self.persistent:
+            try:
+                future = self.call_async(method, params)
+            except FramingUnsupportedError:
+                # Server predates framing; nothing was sent on the probe
+                self.persistent = False
+            except HandshakeTimeoutError:
+                # No definite answer: send this call one-shot, but try the
+                # framed connection again next time
+                pass
+            else:
+                return future.result()
+        return self._call_oneshot(method, params)
+    
+    def _next_request_id(self) -> int:
+        """Allocate a request ID (caller holds the lock)."""
+        self.request_id = next(self._id_counter)
+        return self.request_id
+    
+    @staticmethod
+    def _build_request(method: str, params: Dict, request_id: int) -> str:
+        """Serialize a JSON-RPC request."""
+        return json.dumps({
             "jsonrpc": "2.0",
             "method": method,
             "params": params,
-            "id": self.request_id
-        }
+            "id": request_id
+        })
+    
+    @staticmethod
+    def _unwrap(response: Dict) -> Any:
+        """Return a response's result or raise its error."""
+        if "error" in response:
+            error = response["error"]
+            raise QSyscallError(
+                error["code"],
+                error["message"],
+                error.get("data")
+            )
+        return response["result"]
+    
+    def _connect(self):
+        """
+        Open the persistent connection unless one is open.
+        
+        The handshake runs without ``_lock`` held, so other threads can
+        keep using the client (e.g. the reader thread) meanwhile;
+        ``_connect_lock`` keeps concurrent callers from each opening a
+        connection.
+        """
+        with self._connect_lock:
+            with self._lock:
+                if self._sock is not None:
+                    return
+            
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                self._handshake(sock)
+            except Exception:
+                sock.close()
+                raise
+            
+            with self._lock:
+                self._sock = sock
+                self._pending = {}
+                threading.Thread(
+                    target=self._read_responses,
+                    args=(sock, self._pending),
+                    name="qsyscall-client-reader",
+                    daemon=True
+                ).start()
+    
+    def _handshake(self, sock: socket.socket):
+        """
+        Negotiate the framed transport on a fresh connection.
+        
+        A framing server echoes ``FRAME_MAGIC``. A server without framing
+        keeps reading, waiting for a complete JSON request; if nothing
+        arrives within ``handshake_timeout`` the write side is closed, which
+        makes such a server answer the magic with a JSON error (or close).
+        
+        Raises:
+            FramingUnsupportedError: On a definite non-framed answer
+            HandshakeTimeoutError: If no definite answer arrived
+        """
+        sock.sendall(FRAME_MAGIC)
+        sock.settimeout(self.handshake_timeout)
+        
+        ack, timed_out = self._read_ack(sock, b"")
+        if timed_out:
+            sock.shutdown(socket.SHUT_WR)
+            ack, timed_out = self._read_ack(sock, ack)
+            if ack == FRAME_MAGIC:
+                # A slow framing server; this connection can no longer send
+                raise HandshakeTimeoutError("Framing handshake timed out")
+        
+        if timed_out:
+            raise HandshakeTimeoutError("Framing handshake timed out")
+        if ack != FRAME_MAGIC:
+            raise FramingUnsupportedError("Server does not support framed connections")
+        sock.settimeout(None)
+    
+    @staticmethod
+    def _read_ack(sock: socket.socket, ack: bytes) -> Tuple[bytes, bool]:
+        """
+        Continue reading the handshake answer.
+        
+        Reading stops at the full magic, at the first bytes that cannot be
+        the magic, or when the server closes.
+        
+        Returns:
+            Tuple of (answer so far, whether the read timed out)
+        """
+        try:
+            while len(ack) < len(FRAME_MAGIC) and FRAME_MAGIC.startswith(ack):
+                chunk = sock.recv(len(FRAME_MAGIC) - len(ack))
+                if not chunk:
+                    break
+                ack += chunk
+        except socket.timeout:
+            return ack, True
+        return ack, False
+    
+    def _drop_connection_locked(self, sock: socket.socket, pending: Dict[int, Future]):
+        """Forget a broken connection and fail its pending calls (caller holds the lock)."""
+        if self._sock is sock:
+            self._sock = None
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("qSyscall connection closed"))
+        pending.clear()
+        
+        if self._sock is None:
+            for streams in self._job_streams.values():
+                for stream in streams:
+                    stream.put(ConnectionError("qSyscall connection closed"))
+    
+    def _read_responses(self, sock: socket.socket, pending: Dict[int, Future]):
+        """Reader thread: route response frames to their pending futures."""
+        reader = sock.makefile("rb")
+        try:
+            while True:
+                payload = read_frame(reader)
+                if payload is None:
+                    break
+
+                response = json.loads(payload.decode('utf-8'))
+                if "id" not in response:
+                    self._handle_notification(response)
+                    continue
+                
+                with self._lock:
+                    future = pending.pop(response.get("id"), None)
+                if future is None:
+                    continue
+                
+                try:
+                    future.set_result(self._unwrap(response))
+                except QSyscallError as e:
+                    future.set_exception(e)
+        except (OSError, ValueError):
+            pass
+        finally:
+            reader.close()
+            with self._lock:
+                self._drop_connection_locked(sock, pending)
+            sock.close()
+    
+    def _handle_notification(self, message: Dict):
+        """Route a job event notification to its subscribers."""
+        if message.get("method") != JOB_EVENT_NOTIFICATION:
+            return
+        event = message.get("params", {})
+        with self._lock:
+            streams = list(self._job_streams.get(event.get("job_id"), []))
+        for stream in streams:
+            stream.put(event)
+    
+    def _call_oneshot(self, method: str, params: Dict) -> Any:
+        """Make a JSON-RPC call on a fresh connection (legacy transport)."""
+        with self._lock:
+            request_id = self._next_request_id()
+        request_data = self._build_request(method, params, request_id).encode('utf-8')
         
         # Connect to server
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
@@ -246,36 +722,27 @@ class QSyscallClient:
             sock.connect(self.socket_path)
             
             # Send request
-            request_data = json.dumps(request).encode('utf-8')
             sock.sendall(request_data)
             
             # Receive response
-            response_data = b""
+            response_data = bytearray()
             while True:
                 chunk = sock.recv(4096)
                 if not chunk:
                     break
                 response_data += chunk
                 
-                # Check if we have a complete JSON message
+                # Only attempt a parse once the message could be complete
+                if not chunk.rstrip().endswith(b"}") or socket_has_pending_data(sock):
+                    continue
                 try:
                     json.loads(response_data.decode('utf-8'))
                     break
-                except json.JSONDecodeError:
+                except (json.JSONDecodeError, UnicodeDecodeError):
                     continue
             
             response = json.loads(response_data.decode('utf-8'))
-            
-            # Check for errors
-            if "error" in response:
-                error = response["error"]
-                raise QSyscallError(
-                    error["code"],
-                    error["message"],
-                    error.get("data")
-                )
-            
-            return response["result"]
+            return self._unwrap(response)
         
         finally:
             sock.close()
@@ -221,6 +221,81 @@ class TestEnhancedExecutor(unittest.TestCase):
         self.assertEqual(result1["events"]["m0"], result2["events"]["m0"])
 
 
+class TestMultiShotExecution(unittest.TestCase):
+    """Test batched multi-shot execution."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.graph = {
+            "version": "0.1",
+            "program": {
+                "nodes": [
+                    {"id": "alloc1", "op": "ALLOC_LQ", "args": {"n": 3, "profile": "logical:surface_code(d=5)"}, "vqs": ["q0", "q1", "q2"], "caps": ["CAP_ALLOC"]},
+                    {"id": "h1", "op": "APPLY_H", "vqs": ["q0"]},
+                    {"id": "cnot1", "op": "APPLY_CNOT", "vqs": ["q0", "q1"]},
+                    {"id": "cnot2", "op": "APPLY_CNOT", "vqs": ["q1", "q2"]},
+                    {"id": "m1", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["m0"]},
+                    {"id": "m2", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["m1"]},
+                    {"id": "m3", "op": "MEASURE_Z", "vqs": ["q2"], "produces": ["m2"]},
+                ]
+            },
+            "resources": {"vqs": ["q0", "q1", "q2"], "chs": [], "events": ["m0", "m1", "m2"]},
+            "caps": ["CAP_ALLOC"]
+        }
+
+    def test_execute_shots_ghz(self):
+        """Test GHZ sampling returns correlated outcomes up to logical errors."""
+        executor = create_test_executor(seed=42)
+        result = executor.execute_shots(self.graph, shots=2000)
+
+        self.assertEqual(result["status"], "COMPLETED")
+        self.assertEqual(result["shots"], 2000)
+        self.assertEqual(result["events"]["m0"].shape, (2000,))
+        correlated = result["counts"].get("000", 0) + result["counts"].get("111", 0)
+        # d=5 profile has a ~1e-3 logical readout error per qubit
+        self.assertGreater(correlated, 0.99 * 2000)
+        self.assertEqual(sum(result["counts"].values()), 2000)
+        self.assertEqual(sum(result["histograms"]["m1"].values()), 2000)
+
+    def test_execute_shots_verifies_once(self):
+        """Test verification and scheduling run once per call."""
+        executor = create_test_executor(seed=42)
+        calls = []
+        original = executor.static_verifier.certify_graph
+
+        def counting_certify(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+
+        executor.static_verifier.certify_graph = counting_certify
+        executor.execute_shots(self.graph, shots=500)
+
+        self.assertEqual(len(calls), 1)
+        # Resources are released after the batch
+        self.assertEqual(len(executor.resource_manager.logical_qubits), 0)
+
+    def test_execute_shots_peak_resources(self):
+        """Test peak resources reflect the allocation."""
+        executor = create_test_executor(seed=1)
+        result = executor.execute_shots(self.graph, shots=10)
+
+        self.assertEqual(result["peak_resources"]["logical_qubits"], 3)
+        self.assertGreater(result["peak_resources"]["physical_qubits"], 0)
+
+    def test_execute_shots_deterministic(self):
+        """Test same seed gives identical shot arrays."""
+        result1 = create_test_executor(seed=7).execute_shots(self.graph, shots=100)
+        result2 = create_test_executor(seed=7).execute_shots(self.graph, shots=100)
+
+        self.assertEqual(result1["counts"], result2["counts"])
+
+    def test_execute_shots_rejects_invalid_shots(self):
+        """Test non-positive shot counts are rejected."""
+        executor = create_test_executor(seed=1)
+        with self.assertRaises(ValueError):
+            executor.execute_shots(self.graph, shots=0)
+
+
 class TestRealWorldGraphs(unittest.TestCase):
     """Test execution of real-world QVM graphs."""
     
@@ -99,7 +99,7 @@ class TestSWAPInsertion(unittest.TestCase):
         circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q2]))
         
         topo = HardwareTopology.linear(3)  # 0-1-2
-        opt_pass = SWAPInsertionPass(topo)
+        opt_pass = SWAPInsertionPass(topo, initial_layout="identity")
         result = opt_pass.run(circuit)
         
         # Should add SWAPs
@@ -134,7 +134,7 @@ class TestSWAPInsertion(unittest.TestCase):
         circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q3]))  # Not adjacent
         
         topo = HardwareTopology.linear(4)
-        opt_pass = SWAPInsertionPass(topo)
+        opt_pass = SWAPInsertionPass(topo, initial_layout="identity")
         result = opt_pass.run(circuit)
         
         # Should add SWAPs for second CNOT
@@ -172,7 +172,7 @@ class TestSWAPInsertion(unittest.TestCase):
         circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q3]))
         
         topo = HardwareTopology.grid(2, 2)
-        opt_pass = SWAPInsertionPass(topo)
+        opt_pass = SWAPInsertionPass(topo, initial_layout="identity")
         result = opt_pass.run(circuit)
         
         # Should add SWAPs (diagonal not connected)
@@ -13,17 +13,20 @@ Tests cover:
 import unittest
 import time
 import sys
+import os
+import tempfile
 from pathlib import Path
 
 ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(ROOT))
 
-from kernel.security.merkle_tree import MerkleTree, MerkleProof
+from kernel.security.merkle_tree import MerkleTree, MerkleProof, verify_consistency
 from kernel.security.tamper_evident_audit_log import (
     TamperEvidentAuditLog,
     AuditEvent,
     AuditEventType
 )
+from kernel.security.audit_log_store import AuditLogStore
 
 
 class TestMerkleTree(unittest.TestCase):
@@ -108,6 +111,58 @@ class TestMerkleTree(unittest.TestCase):
         
         proof = self.tree.get_proof(10)
         self.assertIsNone(proof)
+    
+    def test_rfc6962_test_vectors(self):
+        """Test roots against the Certificate Transparency test vectors."""
+        leaves = ['', '00', '10', '2021', '3031', '40414243',
+                  '5051525354555657', '606162636465666768696a6b6c6d6e6f']
+        roots = [self.tree.append(bytes.fromhex(leaf)).hex() for leaf in leaves]
+        
+        self.assertEqual(roots[0], '6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d')
+        self.assertEqual(roots[2], 'aeb6bcfe274b70a14fb067a5e5578264db0fa9b51af5e0ba159158f329e06e77')
+        self.assertEqual(roots[7], '5dc9da79a70659a9ad559cb701ded9a2ab9d823aad2f4960cfe370eff4604328')
+        self.assertEqual(self.tree.root(5).hex(), roots[4])
+    
+    def test_consistency_proofs(self):
+        """Test consistency proofs between every pair of tree sizes."""
+        roots = [self.tree.root()]
+        for i in range(20):
+            roots.append(self.tree.append(f'event{i}'.encode()))
+        
+        for old_size in range(21):
+            for new_size in range(old_size, 21):
+                proof = self.tree.get_consistency_proof(old_size, new_size)
+                self.assertTrue(verify_consistency(
+                    old_size, new_size, roots[old_size], roots[new_size], proof
+                ))
+                if old_size and old_size < new_size:
+                    # A rewritten history fails the check
+                    self.assertFalse(verify_consistency(
+                        old_size, new_size, roots[old_size - 1], roots[new_size], proof
+                    ))
+    
+    def test_historical_inclusion_proof(self):
+        """Test proving inclusion in an earlier tree size."""
+        for i in range(13):
+            self.tree.append(f'event{i}'.encode())
+        
+        proof = self.tree.get_proof(3, tree_size=7)
+        self.assertTrue(proof.verify(b'event3'))
+        self.assertEqual(proof.root_hash, self.tree.root(7))
+        self.assertIsNone(self.tree.get_proof(7, tree_size=7))
+    
+    def test_batch_and_frontier_only(self):
+        """Test that batching and frontier-only trees give the same root."""
+        data = [f'event{i}'.encode() for i in range(100)]
+        for item in data:
+            self.tree.append(item)
+        
+        compact = MerkleTree(retain_nodes=False)
+        self.assertEqual(compact.extend(data), self.tree.root())
+        self.assertEqual(compact.size(), 100)
+        self.assertLessEqual(len(compact.frontier), 7)
+        with self.assertRaises(ValueError):
+            compact.get_proof(0)
 
 
 class TestTamperEvidentAuditLog(unittest.TestCase):
@@ -247,6 +302,21 @@ class TestTamperEvidentAuditLog(unittest.TestCase):
         self.assertEqual(len(exported), 2)
         self.assertEqual(exported[0]['event_type'], 'CAPABILITY_CHECK')
         self.assertEqual(exported[0]['tenant_id'], 'tenant1')
+    
+    def test_append_batch(self):
+        """Test appending a batch of events with one root update."""
+        self.log.append(AuditEventType.SESSION_CREATED, 'tenant1', {})
+        old_root = bytes.fromhex(self.log.get_root_hash())
+        
+        root = self.log.append_batch([
+            (AuditEventType.CAPABILITY_CHECK, 'tenant1', {'id': i}) for i in range(10)
+        ])
+        
+        self.assertEqual(root, self.log.get_root_hash())
+        self.assertEqual([e.sequence_number for e in self.log.events], list(range(11)))
+        self.assertTrue(self.log.verify_integrity())
+        proof = self.log.get_consistency_proof(1)
+        self.assertTrue(self.log.merkle_tree.verify_consistency(1, old_root, proof))
 
 
 class TestTamperDetection(unittest.TestCase):
@@ -347,5 +417,221 @@ class TestSecurityProperties(unittest.TestCase):
         # (This is a simple check; more sophisticated checks could be added)
 
 
+class TestAuditLogStore(unittest.TestCase):
+    """Test the segmented on-disk audit log store."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+    
+    def tearDown(self):
+        """Remove the store directory."""
+        self.tmp.cleanup()
+    
+    def open_store(self, **kwargs):
+        """Open a store with small segments so tests roll over."""
+        store = AuditLogStore(self.directory, record_size=256, segment_records=8, **kwargs)
+        self.addCleanup(store.close)
+        return store
+    
+    def test_rollover_and_reopen(self):
+        """Test that sealed segments resume the log tree after reopening."""
+        store = self.open_store(sync_every=3)
+        tree = MerkleTree()
+        for i in range(29):
+            store.append(f'event-{i}'.encode())
+            tree.append(f'event-{i}'.encode())
+            self.assertEqual(store.root(), tree.root())
+        
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+        self.assertEqual(len(store.segment_roots()), 3)
+        self.assertEqual(store.read(17), b'event-17')
+        self.assertIsNone(store.read(29))
+        store.close()
+        
+        reopened = self.open_store()
+        self.assertEqual(reopened.size(), 29)
+        self.assertEqual(reopened.root(), tree.root())
+        self.assertEqual(
+            [payload for _, _, payload in reopened.scan(6, 10)],
+            [f'event-{i}'.encode() for i in range(6, 10)]
+        )
+        self.assertTrue(reopened.verify_integrity(tree.root()))
+    
+    def test_tampering_detected_in_sealed_segment(self):
+        """Test that a modified record fails its segment seal."""
+        store = self.open_store()
+        store.append_batch(f'event-{i}'.encode() for i in range(20))
+        self.assertIsNone(store.detect_tampering())
+        store.close()
+        
+        path = os.path.join(self.directory, '000000000001.seg')
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data.replace(b'event-10', b'event-99'))
+        
+        store = self.open_store()
+        self.assertEqual(store.detect_tampering(), 10)
+        self.assertFalse(store.verify_integrity())
+    
+    def test_torn_tail_recovered(self):
+        """Test that a record torn by a crash is dropped on reopen."""
+        store = self.open_store()
+        store.append_batch(f'event-{i}'.encode() for i in range(5))
+        store.close()
+        
+        with open(os.path.join(self.directory, '000000000000.seg'), 'ab') as f:
+            f.write(b'\x01' * 300)
+        
+        store = self.open_store()
+        self.assertEqual(store.size(), 5)
+        self.assertEqual(store.get_stats()['truncated_records'], 1)
+        self.assertEqual(store.append(b'event-5'), 5)
+        self.assertTrue(store.verify_integrity())
+    
+    def test_crash_before_seal_recovered(self):
+        """Test that a full segment left without its footer is sealed on reopen."""
+        store = self.open_store()
+        store.append_batch(f'event-{i}'.encode() for i in range(7))
+        
+        # Crash inside the seal: the records reach disk, the footer does not
+        store._seal = store.flush
+        store.append(b'event-7')
+        store._file.close()
+        store._file = None
+        
+        store = self.open_store()
+        self.assertEqual(store.size(), 8)
+        self.assertEqual(len(store.segment_roots()), 1)
+        
+        tree = MerkleTree()
+        tree.extend(f'event-{i}'.encode() for i in range(11))
+        store.append_batch(f'event-{i}'.encode() for i in range(8, 11))
+        self.assertEqual(store.read(9), b'event-9')
+        self.assertEqual(store.root(), tree.root())
+        self.assertIsNone(store.detect_tampering())
+    
+    def test_torn_segment_header_recovered(self):
+        """Test that a segment whose header was never completed is recreated."""
+        store = self.open_store()
+        store.append_batch(f'event-{i}'.encode() for i in range(8))
+        store.close()
+        
+        with open(os.path.join(self.directory, '000000000001.seg'), 'wb') as f:
+            f.write(b'QMK')
+        
+        store = self.open_store()
+        self.assertEqual(store.size(), 8)
+        self.assertEqual(store.append(b'event-8'), 8)
+        self.assertTrue(store.verify_integrity())
+    
+    def test_scans_outlive_unmapped_segments(self):
+        """Test that a scan keeps reading a segment unmapped under it."""
+        store = self.open_store(max_mapped_segments=1)
+        store.append_batch(f'event-{i}'.encode() for i in range(20))
+        
+        first, second = store.scan(0), store.scan(8)
+        self.assertEqual(next(first)[2], b'event-0')
+        self.assertEqual(next(second)[2], b'event-8')
+        self.assertEqual(next(first)[2], b'event-1')
+        
+        # The open segment is remapped when it grows, and sealed when full
+        tail = store.scan(16)
+        self.assertEqual(next(tail)[2], b'event-16')
+        store.append_batch(f'event-{i}'.encode() for i in range(20, 24))
+        self.assertEqual(store.read(21), b'event-21')
+        self.assertEqual([payload for _, _, payload in tail],
+                         [f'event-{i}'.encode() for i in range(17, 20)])
+        
+        del first, second
+        self.assertEqual(store._readers, {})
+        self.assertEqual(store._retired, {})
+    
+    def test_oversized_record_rejected(self):
+        """Test that payloads must fit a fixed-size record."""
+        store = self.open_store()
+        with self.assertRaises(ValueError):
+            store.append(b'x' * (store.payload_capacity + 1))
+        with self.assertRaises(ValueError):
+            store.append_batch([b'ok', b'x' * (store.payload_capacity + 1)])
+        self.assertEqual(store.size(), 0)
+    
+    def test_tamper_evident_log_with_store(self):
+        """Test that the audit log persists events with matching roots."""
+        log = TamperEvidentAuditLog(store=self.open_store())
+        log.append(AuditEventType.SESSION_CREATED, 'tenant1', {})
+        log.append_batch([
+            (AuditEventType.CAPABILITY_CHECK, 'tenant1', {'id': i}) for i in range(10)
+        ])
+        
+        self.assertIsNone(log.events)
+        self.assertEqual(log.store.root().hex(), log.get_root_hash())
+        self.assertEqual(AuditEvent.from_bytes(log.store.read(3)).details, {'id': 2})
+        log.store.close()
+        
+        resumed = TamperEvidentAuditLog(store=self.open_store())
+        self.assertEqual(resumed.sequence_counter, 11)
+        
+        # A batch with an event too large for a record is rejected whole
+        root = resumed.get_root_hash()
+        with self.assertRaises(ValueError):
+            resumed.append_batch([
+                (AuditEventType.CAPABILITY_CHECK, 'tenant1', {}),
+                (AuditEventType.CAPABILITY_CHECK, 'tenant1', {'blob': 'x' * 1000}),
+            ])
+        self.assertEqual(resumed.store.size(), 11)
+        self.assertIsNone(resumed.events)
+        self.assertEqual(resumed.sequence_counter, 11)
+        self.assertEqual(resumed.get_root_hash(), root)
+    
+    def test_store_backed_log_reads_from_store(self):
+        """Test that a resumed log serves proofs, queries and checks from disk."""
+        log = TamperEvidentAuditLog(store=self.open_store())
+        log.append_batch([
+            (AuditEventType.CAPABILITY_CHECK, f'tenant{i % 2}', {'id': i}) for i in range(13)
+        ])
+        root = log.get_root_hash()
+        log.store.close()
+        
+        resumed = TamperEvidentAuditLog(store=self.open_store())
+        self.assertEqual(resumed.get_root_hash(), root)
+        self.assertIsNone(resumed.merkle_tree.nodes)
+        resumed.append_batch([
+            (AuditEventType.CAPABILITY_CHECK, f'tenant{i % 2}', {'id': i}) for i in range(13, 21)
+        ])
+        
+        tree = MerkleTree()
+        tree.extend(payload for _, _, payload in resumed.store.scan())
+        self.assertEqual(resumed.get_root_hash(), tree.root().hex())
+        for index in range(21):
+            self.assertEqual(resumed.get_proof(index).proof_hashes, tree.get_proof(index).proof_hashes)
+            self.assertTrue(resumed.verify_event(index))
+        for old_size in range(22):
+            self.assertEqual(resumed.get_consistency_proof(old_size), tree.get_consistency_proof(old_size))
+        self.assertIsNone(resumed.get_proof(21))
+        
+        self.assertEqual(len(resumed.get_events(tenant_id='tenant0')), 11)
+        self.assertEqual([e.sequence_number for e in resumed.get_events(limit=2)], [19, 20])
+        self.assertEqual([e['details'] for e in resumed.export_events(5, 7)], [{'id': 5}, {'id': 6}])
+        self.assertEqual(resumed.get_statistics()['total_events'], 21)
+        self.assertTrue(resumed.verify_integrity())
+        resumed.store.close()
+        
+        path = os.path.join(self.directory, '000000000001.seg')
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data.replace(b'"id": 10', b'"id": 99'))
+        
+        tampered = TamperEvidentAuditLog(store=self.open_store())
+        self.assertEqual(tampered.detect_tampering(), 10)
+        self.assertTrue(tampered.verify_integrity(0, 10))
+        self.assertFalse(tampered.verify_integrity())
+        self.assertFalse(tampered.verify_event(10))
+        self.assertTrue(tampered.verify_event(3))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -28,6 +28,7 @@ from kernel.security.timing_isolator import (
     TimingIsolator,
     TimingMode
 )
+from qir.optimizer.topology import HardwareTopology
 
 
 class TestPhysicalQubitAllocator(unittest.TestCase):
@@ -164,6 +165,71 @@ class TestPhysicalQubitAllocator(unittest.TestCase):
         self.assertEqual(stats['free_qubits'], 5)
         self.assertEqual(stats['active_tenants'], 2)
         self.assertEqual(stats['utilization'], 50.0)
+    
+    def test_free_pool_best_fit(self):
+        """Test that requests go to the fullest region that can hold them."""
+        allocator = PhysicalQubitAllocator(total_qubits=24, region_size=8)
+        allocator.allocate('tenant1', count=6)
+        
+        # Region 0 has 2 free qubits left, so a pair fills it exactly
+        self.assertEqual(allocator.allocate('tenant2', count=2), {6, 7})
+        self.assertEqual(allocator.allocate('tenant3', count=3), {8, 9, 10})
+        
+        allocator.deallocate('tenant1', {0, 1, 2, 3, 4, 5})
+        allocator.mark_faulty(0)
+        self.assertEqual(allocator.get_available_count(), 18)
+        self.assertEqual(
+            allocator._get_available_qubits(),
+            {q for q, meta in allocator.qubits.items() if meta.is_available()}
+        )
+    
+    def test_preferred_qubits_with_fill(self):
+        """Test that qubits filled around preferred ones are distinct."""
+        allocator = PhysicalQubitAllocator(total_qubits=16)
+        
+        qubits = allocator.allocate('tenant1', count=4, preferred_qubits={0, 40})
+        
+        self.assertEqual(len(qubits), 4)
+        self.assertIn(0, qubits)
+        self.assertEqual(allocator.get_quota('tenant1').allocated_qubits, 4)
+        self.assertEqual(allocator.get_available_count(), 12)
+    
+    def test_topology_patch_placement(self):
+        """Test that placement returns connected, compact patches."""
+        allocator = PhysicalQubitAllocator(total_qubits=36, topology=HardwareTopology.grid(6, 6))
+        
+        for tenant in ('tenant1', 'tenant2', 'tenant3', 'tenant4'):
+            allocator.allocate(tenant, count=9)
+        
+        fragmentation = allocator.get_fragmentation()
+        for patch in fragmentation['tenants'].values():
+            self.assertEqual(patch['pieces'], 1)
+            self.assertEqual(patch['diameter'], 4)  # 3x3 square
+        self.assertEqual(fragmentation['free_qubits'], 0)
+        self.assertEqual(allocator.get_statistics()['disconnected_placements'], 0)
+    
+    def test_fragmentation_and_compaction(self):
+        """Test fragmentation metrics and compaction suggestions."""
+        topology = HardwareTopology.grid(4, 4)
+        allocator = PhysicalQubitAllocator(total_qubits=16, topology=topology)
+        allocator.allocate('tenant1', count=2, preferred_qubits={0, 15})
+        allocator.allocate('tenant2', count=4, preferred_qubits={5, 6, 9, 10})
+        
+        fragmentation = allocator.get_fragmentation()
+        self.assertEqual(fragmentation['tenants']['tenant1']['pieces'], 2)
+        # The two tenants cut the free qubits into two corners of 5
+        self.assertEqual(fragmentation['free_block_sizes'], [5, 5])
+        self.assertEqual(fragmentation['fragmentation'], 0.5)
+        
+        moves = allocator.suggest_compaction()
+        self.assertEqual(len(moves), 1)
+        tenant_id, source, destination = moves[0]
+        self.assertEqual(tenant_id, 'tenant1')
+        self.assertTrue(allocator.qubits[destination].is_available())
+        
+        remaining = (allocator.get_tenant_qubits('tenant1') - {source}).pop()
+        self.assertTrue(topology.are_connected(remaining, destination))
+        self.assertEqual(allocator.suggest_compaction(max_moves=0), [])
 
 
 class TestTimingIsolator(unittest.TestCase):
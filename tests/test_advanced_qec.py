@@ -2,15 +2,30 @@
 Unit tests for Advanced QEC Decoders
 """
 
+import itertools
 import unittest
+from unittest import mock
 import numpy as np
 from kernel.qec import (
     MWPMDecoder, UnionFindDecoder, BeliefPropagationDecoder,
     SyndromeExtractor, DecoderManager, Syndrome, ParityCheck,
-    create_surface_code_decoders
+    create_surface_code_decoders, DecodingGraph, BOUNDARY,
+    min_weight_perfect_matching, pack_bits, unpack_bits,
+    SurfaceCodeSampler, make_surface_code, ThresholdSweep, SweepPoint,
+    LogicalErrorModel, wilson_interval
 )
 
 
+def repetition_code(distance):
+    """Check matrix and logical of a distance-d repetition code."""
+    H = np.zeros((distance - 1, distance), dtype=np.uint8)
+    for i in range(distance - 1):
+        H[i, i] = H[i, i + 1] = 1
+    logical = np.zeros((1, distance), dtype=np.uint8)
+    logical[0, 0] = 1
+    return H, logical
+
+
 class TestMWPMDecoder(unittest.TestCase):
     """Test MWPM decoder."""
     
@@ -70,6 +85,98 @@ class TestMWPMDecoder(unittest.TestCase):
         
         self.assertEqual(stats["decoder_type"], "MWPM")
         self.assertEqual(stats["distance"], 5)
+        self.assertTrue(stats["optimal"])
+    
+    def test_blossom_matches_brute_force(self):
+        """Blossom finds the minimum-weight perfect matching."""
+        rng = np.random.default_rng(7)
+        for n in (4, 6, 8):
+            weights = rng.integers(0, 20, size=(n, n))
+            edges = [(i, j, int(weights[i, j])) for i in range(n) for j in range(i + 1, n)]
+            mate = min_weight_perfect_matching(n, edges)
+            
+            def best(nodes):
+                if not nodes:
+                    return 0
+                return min(weights[nodes[0], nodes[k]] + best(nodes[1:k] + nodes[k + 1:])
+                           for k in range(1, len(nodes)))
+            
+            cost = sum(weights[v, mate[v]] for v in range(n) if v < mate[v])
+            self.assertEqual(cost, best(list(range(n))))
+    
+    def test_matching_beats_greedy(self):
+        """Defects are paired globally, not nearest-first."""
+        # Greedy from (2, 2) takes (3, 2) and strands both outer defects
+        syndromes = [
+            Syndrome(position=(1, 2), time=0, parity='X'),
+            Syndrome(position=(2, 2), time=0, parity='X'),
+            Syndrome(position=(3, 2), time=0, parity='X'),
+            Syndrome(position=(4, 2), time=0, parity='X'),
+        ]
+        decoder = MWPMDecoder(distance=7)
+        corrections = decoder.decode(syndromes)
+        self.assertEqual(
+            sorted(tuple(sorted(c)) for c in corrections),
+            [((1, 2), (2, 2)), ((3, 2), (4, 2))]
+        )
+    
+    def test_boundary_matching(self):
+        """A lone defect near the edge matches to the boundary."""
+        pairs = self.decoder.match([self.decoder.graph.node_at((0, 2))])
+        self.assertEqual(pairs, [(0, BOUNDARY)])
+        
+        # Two edge defects far apart both prefer the boundary
+        nodes = [self.decoder.graph.node_at((0, 2)), self.decoder.graph.node_at((4, 2))]
+        self.assertEqual(sorted(self.decoder.match(nodes)), [(0, BOUNDARY), (1, BOUNDARY)])
+    
+    def test_space_time_matching(self):
+        """The same check firing in consecutive rounds is a measurement error."""
+        node = self.decoder.graph.node_at((2, 2))
+        self.assertEqual(self.decoder.match([node, node], [3, 4]), [(0, 1)])
+        
+        # Expensive time-like edges send both defects to the boundary instead
+        pairs = self.decoder.match([node, node], [0, 4], time_weight=10.0)
+        self.assertEqual(sorted(pairs), [(0, BOUNDARY), (1, BOUNDARY)])
+    
+    def test_graph_shared_across_decoders(self):
+        """The lattice graph and its tables are built once per distance."""
+        other = MWPMDecoder(distance=5)
+        self.assertIs(other.graph, self.decoder.graph)
+        self.assertIs(other.graph.distances, self.decoder.graph.distances)
+    
+    def test_check_matrix_graph(self):
+        """Repetition code: every error of weight <= (d-1)/2 is corrected."""
+        d = 7
+        H, logical = repetition_code(d)
+        decoder = MWPMDecoder(d, graph=DecodingGraph.from_check_matrix(H, logical))
+        
+        for weight in range(d // 2 + 1):
+            for flipped in itertools.combinations(range(d), weight):
+                error = np.zeros(d, dtype=np.uint8)
+                error[list(flipped)] = 1
+                events = H.dot(error) % 2
+                
+                self.assertEqual(decoder.decode_detection_events(events), int(error[0]))
+                residual = (decoder.correction(events) + error) % 2
+                self.assertFalse(residual.any())
+    
+    def test_disconnected_graph_without_boundary(self):
+        """Defects are only paired within their own component."""
+        graph = DecodingGraph(6)
+        for u, v in [(0, 1), (1, 2), (3, 4), (4, 5)]:
+            graph.add_edge(u, v)
+        decoder = MWPMDecoder(3, graph=graph)
+        
+        self.assertEqual(sorted(decoder.match([0, 3, 2, 5])), [(0, 2), (1, 3)])
+        with self.assertRaises(ValueError):
+            decoder.match([0, 3])
+        with self.assertRaises(ValueError):
+            decoder.match([0, 1, 2, 3])
+    
+    def test_non_graphlike_matrix_rejected(self):
+        """Faults touching more than two checks cannot be matched."""
+        with self.assertRaises(ValueError):
+            DecodingGraph.from_check_matrix(np.ones((3, 2), dtype=np.uint8))
 
 
 class TestUnionFindDecoder(unittest.TestCase):
@@ -101,23 +208,53 @@ class TestUnionFindDecoder(unittest.TestCase):
         self.assertGreaterEqual(len(corrections), 1)
     
     def test_union_find_operations(self):
-        """Test union-find data structure."""
-        syndromes = [
-            Syndrome(position=(0, 0), time=0, parity='Z'),
-            Syndrome(position=(1, 0), time=0, parity='Z')
-        ]
-        
-        self.decoder._initialize_union_find(syndromes)
+        """Adjacent defects fuse into one cluster and peel into one edge."""
+        lattice = self.decoder._lattice(1)
+        a = self.decoder.graph.node_at((1, 1))
+        b = self.decoder.graph.node_at((2, 1))
         
-        # Test find
-        root = self.decoder._find(syndromes[0])
-        self.assertEqual(root, syndromes[0])
+        pairs, edges = self.decoder._cluster_and_peel(lattice, [a, b])
         
-        # Test union
-        self.decoder._union(syndromes[0], syndromes[1])
-        root1 = self.decoder._find(syndromes[0])
-        root2 = self.decoder._find(syndromes[1])
-        self.assertEqual(root1, root2)
+        self.assertEqual(sorted(pairs[0]), [a, b])
+        self.assertEqual(len(edges), 1)
+        self.assertEqual({lattice.edge_u[edges[0]], lattice.edge_v[edges[0]]}, {a, b})
+    
+    def test_corrections_explain_events(self):
+        """Peeled corrections reproduce the detection events over rounds."""
+        lattice = self.decoder._lattice(3)
+        incidence = np.zeros((lattice.boundary + 1, len(lattice.edge_u)), dtype=np.uint8)
+        for e, (u, v) in enumerate(zip(lattice.edge_u, lattice.edge_v)):
+            incidence[u, e] = incidence[v, e] = 1
+        
+        rng = np.random.default_rng(4)
+        for _ in range(100):
+            errors = (rng.random(len(lattice.edge_u)) < 0.04).astype(np.uint8)
+            events = (incidence.dot(errors) % 2)[:-1]
+            _, edges = self.decoder._cluster_and_peel(lattice, np.flatnonzero(events).tolist())
+            
+            correction = np.zeros(len(lattice.edge_u), dtype=np.uint8)
+            correction[edges] = 1
+            np.testing.assert_array_equal((incidence.dot(correction) % 2)[:-1], events)
+    
+    def test_check_matrix_graph(self):
+        """Repetition code: every error of weight <= (d-1)/2 is corrected."""
+        d = 7
+        H, logical = repetition_code(d)
+        decoder = UnionFindDecoder(d, graph=DecodingGraph.from_check_matrix(H, logical))
+        
+        for weight in range(d // 2 + 1):
+            for flipped in itertools.combinations(range(d), weight):
+                error = np.zeros(d, dtype=np.uint8)
+                error[list(flipped)] = 1
+                self.assertEqual(decoder.decode_detection_events(H.dot(error) % 2), int(error[0]))
+    
+    def test_measurement_error_pairs_in_time(self):
+        """A check firing in consecutive rounds is matched through time."""
+        syndromes = [
+            Syndrome(position=(2, 2), time=4, parity='Z'),
+            Syndrome(position=(2, 2), time=5, parity='Z')
+        ]
+        self.assertEqual(self.decoder.decode(syndromes), [((2, 2), (2, 2))])
     
     def test_get_decoder_stats(self):
         """Test getting decoder statistics."""
@@ -168,6 +305,43 @@ class TestBeliefPropagationDecoder(unittest.TestCase):
         self.assertEqual(stats["decoder_type"], "Belief Propagation")
         self.assertEqual(stats["num_qubits"], 5)
         self.assertEqual(stats["num_checks"], 3)
+        self.assertEqual(stats["num_edges"], 9)
+    
+    def test_methods_correct_single_errors(self):
+        """Every update rule corrects single errors on a repetition code."""
+        H, _ = repetition_code(7)
+        for method in BeliefPropagationDecoder.METHODS:
+            decoder = BeliefPropagationDecoder.from_check_matrix(H, method=method)
+            for qubit in range(7):
+                error = np.zeros(7, dtype=np.uint8)
+                error[qubit] = 1
+                decoded = decoder.decode(H.dot(error) % 2, channel_probs=0.05)
+                np.testing.assert_array_equal(decoded, error, err_msg=method)
+    
+    def test_decode_batch(self):
+        """A batch decode agrees with shot-by-shot decoding."""
+        H, _ = repetition_code(9)
+        rng = np.random.default_rng(11)
+        errors = (rng.random((40, 9)) < 0.1).astype(np.uint8)
+        syndromes = errors.dot(H.T) % 2
+        
+        decoder = BeliefPropagationDecoder.from_check_matrix(H, method="normalized_min_sum")
+        result = decoder.decode_batch(syndromes, channel_probs=0.1)
+        
+        self.assertEqual(result.errors.shape, (40, 9))
+        for shot in range(40):
+            np.testing.assert_array_equal(
+                result.errors[shot], decoder.decode(syndromes[shot], channel_probs=0.1)
+            )
+        # Converged shots reproduce their syndrome
+        explained = (result.errors.dot(H.T) % 2 == syndromes).all(axis=1)
+        np.testing.assert_array_equal(explained[result.converged], True)
+        self.assertTrue(np.all(result.iterations[~syndromes.any(axis=1)] == 0))
+    
+    def test_unknown_method(self):
+        """Unknown update rules are rejected."""
+        with self.assertRaises(ValueError):
+            BeliefPropagationDecoder([ParityCheck([0, 1], 'Z')], method="max_product")
 
 
 class TestSyndromeExtractor(unittest.TestCase):
@@ -223,6 +397,176 @@ class TestSyndromeExtractor(unittest.TestCase):
         
         stats = self.extractor.get_syndrome_statistics()
         self.assertEqual(stats["total_rounds"], 0)
+    
+    def test_seeded_extraction(self):
+        """Test that a seed makes extraction reproducible."""
+        rounds = [
+            SyndromeExtractor(code_distance=5, measurement_error_rate=0.3, seed=4)
+            .extract_multiple_rounds([(1, 1)], num_rounds=5)
+            for _ in range(2)
+        ]
+        
+        self.assertEqual(
+            [[(s.position, s.parity) for s in r.syndromes] for r in rounds[0]],
+            [[(s.position, s.parity) for s in r.syndromes] for r in rounds[1]]
+        )
+
+
+class TestSurfaceCodeSampler(unittest.TestCase):
+    """Test surface code layouts and the vectorized sampler."""
+    
+    def test_code_properties(self):
+        """Test check counts, commutation and logicals."""
+        for kind, num_data in [("rotated", 25), ("unrotated", 41)]:
+            code = make_surface_code(5, kind)
+            hx = code.hx.toarray().astype(int)
+            hz = code.hz.toarray().astype(int)
+            
+            self.assertEqual(code.num_data, num_data)
+            self.assertEqual(len(hx) + len(hz), num_data - 1)
+            self.assertFalse(np.any(hx @ hz.T % 2))
+            self.assertFalse(np.any(hx @ code.lz % 2))
+            self.assertFalse(np.any(hz @ code.lx % 2))
+            self.assertEqual(int(code.lx @ code.lz) % 2, 1)
+            self.assertEqual(int(code.lz.sum()), 5)
+    
+    def test_noiseless_sampling(self):
+        """Test that detectors and observables are deterministic without noise."""
+        for kind in ("rotated", "unrotated"):
+            for basis in "ZX":
+                sampler = SurfaceCodeSampler(3, 0.0, kind=kind, basis=basis, seed=0)
+                result = sampler.sample(20)
+                
+                self.assertEqual(result.detection_events.shape, (20, sampler.num_detectors))
+                self.assertFalse(result.detection_events.any())
+                self.assertFalse(result.observable_flips.any())
+    
+    def test_seeded_sampling(self):
+        """Test that equal seeds give equal samples."""
+        a = SurfaceCodeSampler(3, 0.01, seed=11).sample(50)
+        b = SurfaceCodeSampler(3, 0.01, seed=11).sample(50)
+        
+        np.testing.assert_array_equal(a.detection_events, b.detection_events)
+        np.testing.assert_array_equal(a.observable_flips, b.observable_flips)
+    
+    def test_decode_sampled_events(self):
+        """Test that sampled events decode well below threshold."""
+        for noise in SurfaceCodeSampler.NOISE_MODELS:
+            sampler = SurfaceCodeSampler(3, 0.001, noise=noise, seed=2)
+            result = sampler.sample(500)
+            graph = sampler.decoding_graph()
+            
+            self.assertEqual(graph.num_nodes, sampler.num_checks)
+            for decoder in (MWPMDecoder(3, graph=graph), UnionFindDecoder(3, graph=graph)):
+                flips = decoder.decode_batch(result.detection_events)
+                failures = np.mean(flips != result.observable_flips)
+                self.assertLess(failures, 0.02)
+    
+    def test_invalid_noise_model(self):
+        """Test that unknown noise models are rejected."""
+        with self.assertRaises(ValueError):
+            SurfaceCodeSampler(3, 0.01, noise="biased")
+
+
+class TestThresholdSweep(unittest.TestCase):
+    """Test Monte-Carlo logical error rate estimation."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.settings = dict(
+            noise="phenomenological",
+            shard_shots=200,
+            max_shots=1000,
+            min_failures=5,
+            seed=9
+        )
+    
+    def test_wilson_interval(self):
+        """Test interval bounds."""
+        low, high = wilson_interval(10, 1000)
+        
+        self.assertLess(low, 0.01)
+        self.assertGreater(high, 0.01)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        self.assertEqual(wilson_interval(0, 100)[0], 0.0)
+    
+    def test_run_grid(self):
+        """Test grid order, shard budget and early stopping."""
+        points = ThresholdSweep(**self.settings).run([3, 5], [0.01, 0.08])
+        
+        self.assertEqual(
+            [(p.distance, p.physical_error_rate, p.rounds) for p in points],
+            [(3, 0.01, 3), (3, 0.08, 3), (5, 0.01, 5), (5, 0.08, 5)]
+        )
+        for point in points:
+            self.assertEqual(point.shots % 200, 0)
+            self.assertLessEqual(point.shots, 1000)
+        # Far above threshold the interval tightens after one shard
+        self.assertEqual(points[3].shots, 200)
+        self.assertGreater(points[3].logical_error_rate, points[2].logical_error_rate)
+    
+    def test_deterministic_shards(self):
+        """Test that results do not depend on the worker count."""
+        inline = ThresholdSweep(**self.settings).run([3], [0.03])
+        pooled = ThresholdSweep(workers=2, **self.settings).run([3], [0.03])
+        
+        self.assertEqual(
+            [(p.shots, p.failures) for p in inline],
+            [(p.shots, p.failures) for p in pooled]
+        )
+    
+    def test_pool_never_forks(self):
+        """Test that shard workers start with forkserver or spawn."""
+        from kernel.qec import threshold_sweep
+        contexts = []
+        real_pool = threshold_sweep.ProcessPoolExecutor
+        
+        def recording_pool(*args, **kwargs):
+            contexts.append(kwargs.get("mp_context"))
+            return real_pool(*args, **kwargs)
+        
+        with mock.patch.object(threshold_sweep, "ProcessPoolExecutor", recording_pool):
+            ThresholdSweep(workers=2, **self.settings).run([3], [0.03])
+        
+        self.assertEqual(len(contexts), 1)
+        self.assertIn(contexts[0].get_start_method(), ("forkserver", "spawn"))
+    
+    def test_disk_cache(self):
+        """Test that cached points are not resampled."""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = ThresholdSweep(cache_dir=cache_dir, **self.settings).run([3], [0.03], rounds=[2])
+            sweep = ThresholdSweep(cache_dir=cache_dir, **self.settings)
+            second = sweep.run([3], [0.03], rounds=[2])
+            
+            self.assertEqual(first[0].failures, second[0].failures)
+            self.assertEqual(sweep.get_stats()["cached_points"], 1)
+            self.assertEqual(sweep.get_stats()["shots"], 0)
+            
+            # Different settings must not hit the cache
+            other = ThresholdSweep(cache_dir=cache_dir, **dict(self.settings, seed=10))
+            other.run([3], [0.03], rounds=[2])
+            self.assertEqual(other.get_stats()["cached_points"], 0)
+    
+    def test_fit_logical_error_model(self):
+        """Test fitting recovers a known curve."""
+        truth = LogicalErrorModel(prefactor=0.08, threshold=0.03)
+        points = [
+            SweepPoint(d, p, d, shots=10 ** 7, failures=round(truth.predict(d, p) * 10 ** 7))
+            for d in (3, 5, 7) for p in (0.003, 0.006, 0.01)
+        ]
+        
+        model = LogicalErrorModel.fit(points)
+        
+        self.assertAlmostEqual(model.threshold, 0.03, delta=0.001)
+        self.assertAlmostEqual(model.prefactor, 0.08, delta=0.005)
+        self.assertAlmostEqual(
+            MWPMDecoder(5).estimate_logical_error_probability(0.005, num_rounds=5, model=model),
+            model.predict(5, 0.005)
+        )
+        with self.assertRaises(ValueError):
+            LogicalErrorModel.fit(points[:3])
 
 
 class TestDecoderManager(unittest.TestCase):
@@ -285,6 +629,103 @@ class TestDecoderManager(unittest.TestCase):
         
         self.assertEqual(info["decoder_type"], "MWPM")
         self.assertEqual(info["distance"], 5)
+    
+    def _repetition_shots(self, d=7, shots=200, p=0.08):
+        H, logical = repetition_code(d)
+        rng = np.random.default_rng(5)
+        errors = (rng.random((shots, d)) < p).astype(np.uint8)
+        return H, logical, errors, errors.dot(H.T) % 2
+    
+    def test_pack_roundtrip(self):
+        """Packed bit arrays round-trip with 8 detectors per byte."""
+        bits = (np.random.default_rng(0).random((5, 13)) < 0.5).astype(np.uint8)
+        packed = pack_bits(bits)
+        self.assertEqual(packed.shape, (5, 2))
+        np.testing.assert_array_equal(unpack_bits(packed, 13), bits)
+    
+    def test_decode_batch_observables(self):
+        """Batch MWPM decoding matches shot-by-shot decoding."""
+        H, logical, errors, events = self._repetition_shots()
+        decoder = MWPMDecoder(7, graph=DecodingGraph.from_check_matrix(H, logical))
+        self.manager.register_decoder("rep", decoder)
+        
+        flips = unpack_bits(self.manager.decode_batch("rep", pack_bits(events), 6, chunk_size=64), 1)
+        
+        expected = [decoder.decode_detection_events(shot) for shot in events]
+        np.testing.assert_array_equal(flips[:, 0], expected)
+        # Failures only where the error was heavier than half the code
+        failed = flips[:, 0] != errors[:, 0]
+        self.assertTrue(np.all(errors[failed].sum(axis=1) > 3))
+    
+    def test_decode_batch_bp_with_logicals(self):
+        """BP corrections are projected onto logicals when given."""
+        H, logical, errors, events = self._repetition_shots()
+        bp = BeliefPropagationDecoder.from_check_matrix(H, method="min_sum")
+        self.manager.register_decoder("bp", bp)
+        
+        with self.assertRaises(ValueError):
+            self.manager.decode_batch("bp", pack_bits(events), 6)
+        
+        packed = self.manager.decode_batch(
+            "bp", pack_bits(events), 6, logicals=logical, channel_probs=0.08
+        )
+        corrections = bp.decode_batch(events, channel_probs=0.08).errors
+        np.testing.assert_array_equal(unpack_bits(packed, 1)[:, 0], corrections[:, 0])
+    
+    def test_decode_batch_rejects_wrong_width(self):
+        """Events must carry exactly the decoder's detectors per shot."""
+        H, logical, _, events = self._repetition_shots()
+        self.manager.register_decoder("bp", BeliefPropagationDecoder.from_check_matrix(H))
+        
+        # Eight bits fit the same packed width but reflow into other shots
+        with self.assertRaises(ValueError):
+            self.manager.decode_batch("bp", pack_bits(events), 8, logicals=logical)
+        with self.assertRaises(ValueError):
+            self.manager.decode_batch("bp", pack_bits(events), 12, logicals=logical)
+        with self.assertRaises(ValueError):
+            self.manager.decode_batch("bp", pack_bits(events).reshape(-1), 6, logicals=logical)
+    
+    def test_decode_batch_corrections(self):
+        """Lattice decoders return corrections that explain the events."""
+        graph = self.manager.decoders["mwpm"].graph
+        rng = np.random.default_rng(9)
+        faults = (rng.random((50, graph.num_faults)) < 0.02).astype(np.uint8)
+        incidence = np.zeros((graph.num_nodes, graph.num_faults), dtype=np.uint8)
+        for edge in graph.edges:
+            incidence[edge.u, edge.fault] = 1
+            if edge.v != BOUNDARY:
+                incidence[edge.v, edge.fault] = 1
+        events = faults.dot(incidence.T) % 2
+        
+        for name in ("mwpm", "union_find"):
+            packed = self.manager.decode_batch(
+                name, pack_bits(events), graph.num_nodes, output="corrections"
+            )
+            corrections = unpack_bits(packed, graph.num_faults)
+            np.testing.assert_array_equal(corrections.dot(incidence.T) % 2, events, err_msg=name)
+    
+    def test_batch_stats(self):
+        """Throughput and latency percentiles are reported per decoder."""
+        H, logical, _, events = self._repetition_shots()
+        self.manager.register_decoder(
+            "rep", MWPMDecoder(7, graph=DecodingGraph.from_check_matrix(H, logical))
+        )
+        self.manager.decode_batch("rep", pack_bits(events), 6)
+        
+        stats = self.manager.get_batch_stats()["rep"]
+        self.assertEqual(stats["shots"], 200)
+        self.assertGreater(stats["shots_per_sec"], 0)
+        self.assertLessEqual(stats["latency_us"]["p50"], stats["latency_us"]["p99"])
+        self.assertLessEqual(stats["latency_us"]["p99"], stats["latency_us"]["max"])
+        
+        self.manager.clear_stats()
+        self.assertEqual(self.manager.get_batch_stats()["rep"]["shots"], 0)
+    
+    def test_decode_batch_requires_batch_decoder(self):
+        """Decoders without a batch path are rejected."""
+        self.manager.register_decoder("legacy", object())
+        with self.assertRaises(TypeError):
+            self.manager.decode_batch("legacy", pack_bits(np.zeros((1, 8))), 8)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,11 @@ Unit tests for Audit Logger
 """
 
 import unittest
+import tempfile
 import time
+import json
 from kernel.security.audit_logger import AuditLogger, AuditEventType, AuditSeverity
+from kernel.security.audit_log_store import AuditLogStore
 
 
 class TestAuditLogger(unittest.TestCase):
@@ -133,6 +136,105 @@ class TestAuditLogger(unittest.TestCase):
         events = self.logger.query_events()
         self.assertEqual(len(events), 1)
         self.assertEqual(events[0].tenant_id, "tenant_2")
+    
+    def test_indexed_query_after_eviction(self):
+        """Test that indexes drop evicted events and combine filters."""
+        logger = AuditLogger(max_events=10)
+        for i in range(35):
+            logger.log_event(
+                AuditEventType.JOB_SUBMITTED if i % 2 else AuditEventType.JOB_COMPLETED,
+                f"tenant_{i % 3}",
+                session_id="sess_1" if i % 5 == 0 else None
+            )
+        
+        events = logger.query_events(tenant_id="tenant_1", event_type=AuditEventType.JOB_SUBMITTED)
+        self.assertEqual([e.event_id for e in events], ["audit_31", "audit_25"])
+        self.assertEqual(
+            [e.event_id for e in logger.query_events(session_id="sess_1")],
+            ["audit_30", "audit_25"]
+        )
+        self.assertEqual(logger.query_events(tenant_id="tenant_9"), [])
+        
+        # Clearing out of order rebuilds the indexes
+        logger.clear_events(tenant_id="tenant_1")
+        self.assertEqual(logger.query_events(tenant_id="tenant_1"), [])
+        self.assertEqual(len(logger.query_events(tenant_id="tenant_2")), 3)
+        
+        # Eviction keeps working on the rebuilt buffer
+        for i in range(12):
+            logger.log_event(AuditEventType.JOB_SUBMITTED, "tenant_1")
+        self.assertEqual(len(logger.events), 10)
+        self.assertEqual(logger.events[0].event_id, "audit_37")
+        self.assertEqual(logger.query_events(tenant_id="tenant_2"), [])
+        self.assertEqual(len(logger.query_events(tenant_id="tenant_1", limit=20)), 10)
+        
+        # Compaction drops the evicted prefix of the buffer
+        for i in range(30):
+            logger.log_event(AuditEventType.JOB_SUBMITTED, "tenant_1")
+        self.assertLessEqual(len(logger._buffer), 2 * logger.max_events + 1)
+        self.assertEqual([e.event_id for e in logger.events], [f"audit_{i}" for i in range(67, 77)])
+        self.assertEqual(logger.query_events(limit=1)[0].event_id, "audit_76")
+    
+    def test_store_chains_oversized_events(self):
+        """Test that events larger than a store record span several records."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = AuditLogStore(tmp.name, record_size=512, segment_records=8)
+        logger = AuditLogger(store=store)
+        
+        small = logger.log_event(AuditEventType.JOB_SUBMITTED, "tenant_1")
+        large = logger.log_event(AuditEventType.JOB_COMPLETED, "tenant_1",
+                                 details={"output": "x" * 2000})
+        last = logger.log_event(AuditEventType.JOB_SUBMITTED, "tenant_2")
+        
+        self.assertGreater(len(large.to_json()), store.record_size)
+        self.assertEqual((small.event_id, large.event_id), ("audit_0", "audit_1"))
+        self.assertEqual(last.event_id, f"audit_{store.size() - 1}")
+        self.assertEqual(
+            [e.to_dict() for e in logger.iter_stored_events()],
+            [small.to_dict(), large.to_dict(), last.to_dict()]
+        )
+        self.assertEqual([e.event_id for e in logger.iter_stored_events(2)], [last.event_id])
+        store.close()
+        
+        resumed = AuditLogger(store=AuditLogStore(tmp.name, record_size=512, segment_records=8))
+        self.addCleanup(resumed.store.close)
+        self.assertEqual(resumed.log_event(AuditEventType.JOB_FAILED, "tenant_1").event_id,
+                         f"audit_{store.size()}")
+        self.assertEqual(len(list(resumed.iter_stored_events())), 4)
+    
+    def test_iter_events_streams_matches(self):
+        """Test streaming iteration over matching events."""
+        for i in range(20):
+            self.logger.log_event(AuditEventType.JOB_SUBMITTED, f"tenant_{i % 2}")
+        
+        stream = self.logger.iter_events(tenant_id="tenant_0")
+        first = next(stream)
+        self.assertEqual(first.event_id, "audit_18")
+        self.assertEqual(len(list(stream)), 9)
+        
+        # Events logged after the iterator was created are not included
+        stream = self.logger.iter_events(tenant_id="tenant_0")
+        self.logger.log_event(AuditEventType.JOB_SUBMITTED, "tenant_0")
+        self.assertEqual(len(list(stream)), 10)
+    
+    def test_iter_export_matches_export(self):
+        """Test that streamed export chunks form the full export."""
+        for i in range(5):
+            self.logger.log_event(AuditEventType.SESSION_CREATED, "tenant_1", details={"i": i})
+        
+        chunks = list(self.logger.iter_export(format="json", tenant_id="tenant_1"))
+        self.assertEqual(len(chunks), 6)
+        exported = "".join(chunks)
+        self.assertEqual(exported, self.logger.export_events(format="json", tenant_id="tenant_1"))
+        self.assertEqual(
+            exported,
+            json.dumps([e.to_dict() for e in self.logger.query_events(tenant_id="tenant_1")], indent=2)
+        )
+        self.assertEqual(self.logger.export_events(tenant_id="tenant_2"), "[]")
+        
+        with self.assertRaises(ValueError):
+            self.logger.iter_export(format="xml")
 
 
 if __name__ == "__main__":
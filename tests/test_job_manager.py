@@ -4,7 +4,22 @@ Unit tests for JobManager
 
 import unittest
 import time
-from kernel.core.job_manager import JobManager, JobState, JobPolicy
+import threading
+from kernel.core.job_manager import JobManager, JobState, JobPolicy, QueueFullError
+
+
+class RecordingExecutor:
+    """Executor that records job order and can be held at a gate."""
+    
+    def __init__(self, log, gate=None):
+        self.log = log
+        self.gate = gate
+    
+    def execute(self, graph):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.log.append((graph["name"], id(self), threading.get_ident()))
+        return {"events": {"name": graph["name"]}}
 
 
 class TestJobManager(unittest.TestCase):
@@ -316,5 +331,312 @@ class TestJobManager(unittest.TestCase):
             self.manager.wait_for_job(job_id, "sess_2")
 
 
+
+class TestJobScheduler(unittest.TestCase):
+    """Test the worker pool, priority queue and admission control."""
+    
+    def setUp(self):
+        """Set up the execution log and worker gate."""
+        self.log = []
+        self.gate = threading.Event()
+    
+    def _manager(self, gated=True, **kwargs):
+        """Create a manager whose workers record into self.log."""
+        gate = self.gate if gated else None
+        manager = JobManager(
+            executor_factory=lambda: RecordingExecutor(self.log, gate),
+            **kwargs
+        )
+        # Cleanups run last-in first-out: open the gate, then stop workers
+        self.addCleanup(manager.shutdown)
+        self.addCleanup(self.gate.set)
+        return manager
+    
+    def _wait_running(self, manager):
+        """Wait until a worker has claimed a job."""
+        deadline = time.time() + 5
+        while manager.get_queue_stats()["running"] == 0 and time.time() < deadline:
+            time.sleep(0.001)
+    
+    def _graph(self, name):
+        return {"name": name, "nodes": [], "edges": []}
+    
+    def _wait_all(self, manager, job_ids):
+        return [manager.wait_for_job(j, "sess_1", timeout_ms=5000) for j in job_ids]
+    
+    def test_priority_then_deadline_order(self):
+        """Queued jobs run by priority, then earliest deadline, then FIFO."""
+        manager = self._manager(num_workers=1)
+        
+        # The first job occupies the only worker while the rest queue up
+        ids = [manager.submit_job("sess_1", self._graph("blocker"))["job_id"]]
+        self._wait_running(manager)
+        for name, policy in [
+            ("low", {"priority": 1}),
+            ("high_late", {"priority": 50, "deadline_epochs": 100}),
+            ("high_soon", {"priority": 50, "deadline_epochs": 10}),
+            ("mid", {"priority": 10}),
+        ]:
+            ids.append(manager.submit_job("sess_1", self._graph(name), policy)["job_id"])
+        
+        self.gate.set()
+        self._wait_all(manager, ids)
+        
+        order = [name for name, _, _ in self.log]
+        self.assertEqual(order, ["blocker", "high_soon", "high_late", "mid", "low"])
+    
+    def test_workers_own_executors(self):
+        """Each worker thread runs jobs on its own executor instance."""
+        manager = self._manager(gated=False, num_workers=3)
+        
+        ids = [manager.submit_job("sess_1", self._graph(f"j{i}"))["job_id"] for i in range(30)]
+        statuses = self._wait_all(manager, ids)
+        
+        self.assertTrue(all(s["state"] == "COMPLETED" for s in statuses))
+        executors_by_thread = {}
+        for _, executor_id, thread_id in self.log:
+            executors_by_thread.setdefault(thread_id, set()).add(executor_id)
+        self.assertLessEqual(len(executors_by_thread), 3)
+        self.assertTrue(all(len(e) == 1 for e in executors_by_thread.values()))
+        self.assertEqual(manager.get_queue_stats()["workers"], 3)
+    
+    def test_admission_control(self):
+        """Submissions beyond max_queue_size are rejected."""
+        manager = self._manager(num_workers=1, max_queue_size=2)
+        
+        manager.submit_job("sess_1", self._graph("running"))
+        self._wait_running(manager)
+        
+        manager.submit_job("sess_1", self._graph("q1"))
+        manager.submit_job("sess_1", self._graph("q2"))
+        with self.assertRaises(QueueFullError):
+            manager.submit_job("sess_1", self._graph("q3"))
+        
+        stats = manager.get_queue_stats()
+        self.assertEqual(stats["queued"], 2)
+        self.assertEqual(stats["jobs_rejected"], 1)
+    
+    def test_cancelled_queued_job_never_runs(self):
+        """Cancelling a queued job frees its slot and skips execution."""
+        manager = self._manager(num_workers=1)
+        
+        first = manager.submit_job("sess_1", self._graph("first"))["job_id"]
+        second = manager.submit_job("sess_1", self._graph("second"))["job_id"]
+        manager.cancel_job(second, "sess_1")
+        
+        self.gate.set()
+        manager.wait_for_job(first, "sess_1", timeout_ms=5000)
+        
+        self.assertEqual([name for name, _, _ in self.log], ["first"])
+        self.assertEqual(manager.get_queue_stats()["queued"], 0)
+    
+    def test_deadline_expiry(self):
+        """Jobs not dispatched within their deadline fail."""
+        manager = self._manager(num_workers=1)
+        
+        ids = [manager.submit_job("sess_1", self._graph(f"b{i}"), {"priority": 20})["job_id"]
+               for i in range(3)]
+        late = manager.submit_job("sess_1", self._graph("late"), {"deadline_epochs": 1})["job_id"]
+        
+        self.gate.set()
+        self._wait_all(manager, ids)
+        status = manager.wait_for_job(late, "sess_1", timeout_ms=5000)
+        
+        self.assertEqual(status["state"], "FAILED")
+        self.assertEqual(status["error"]["type"], "DeadlineExceeded")
+    
+    def test_done_callbacks(self):
+        """Completion callbacks fire once, or immediately for finished jobs."""
+        manager = self._manager(num_workers=1)
+        seen = []
+        
+        job_id = manager.submit_job("sess_1", self._graph("a"))["job_id"]
+        manager.add_done_callback(job_id, "sess_1", seen.append)
+        self.assertEqual(seen, [])
+        
+        self.gate.set()
+        manager.wait_for_job(job_id, "sess_1", timeout_ms=5000)
+        manager.add_done_callback(job_id, "sess_1", seen.append)
+        
+        self.assertEqual([s["state"] for s in seen], ["COMPLETED", "COMPLETED"])
+        with self.assertRaises(PermissionError):
+            manager.add_done_callback(job_id, "sess_2", seen.append)
+    
+    def test_remove_done_callback(self):
+        """A removed callback never fires and leaves nothing behind."""
+        manager = self._manager(num_workers=1)
+        kept, dropped = [], []
+        
+        job_id = manager.submit_job("sess_1", self._graph("a"))["job_id"]
+        manager.add_done_callback(job_id, "sess_1", kept.append)
+        manager.add_done_callback(job_id, "sess_1", dropped.append)
+        self.assertTrue(manager.remove_done_callback(job_id, dropped.append))
+        self.assertFalse(manager.remove_done_callback(job_id, dropped.append))
+        
+        self.gate.set()
+        manager.wait_for_job(job_id, "sess_1", timeout_ms=5000)
+        self.assertEqual(len(kept), 1)
+        self.assertEqual(dropped, [])
+        self.assertFalse(manager.remove_done_callback(job_id, kept.append))
+        self.assertEqual(manager._done_callbacks, {})
+    
+    def test_done_callback_on_cancel(self):
+        """Cancelling a job fires its completion callbacks."""
+        manager = self._manager(num_workers=1)
+        seen = []
+        
+        manager.submit_job("sess_1", self._graph("blocker"))
+        queued = manager.submit_job("sess_1", self._graph("queued"))["job_id"]
+        manager.add_done_callback(queued, "sess_1", seen.append)
+        manager.cancel_job(queued, "sess_1")
+        
+        self.assertEqual([s["state"] for s in seen], ["CANCELLED"])
+    
+    def test_subscribe_streams_progress_and_events(self):
+        """Subscribers see transitions, progress and each new event once."""
+        gate = self.gate
+        
+        class StreamingExecutor:
+            progress_callback = None
+            
+            def execute(self, graph):
+                gate.wait(5)
+                self.progress_callback(
+                    {"current_epoch": 1, "total_epochs": 2, "nodes_executed": 1, "nodes_total": 2},
+                    {"m0": 1}
+                )
+                return {"events": {"m0": 1, "m1": 0}}
+        
+        manager = JobManager(executor_factory=StreamingExecutor, num_workers=1)
+        self.addCleanup(manager.shutdown)
+        self.addCleanup(self.gate.set)
+        messages = []
+        
+        job_id = manager.submit_job("sess_1", self._graph("a"))["job_id"]
+        subscription_id = manager.subscribe(job_id, "sess_1", messages.append)
+        self.gate.set()
+        manager.wait_for_job(job_id, "sess_1", timeout_ms=5000)
+        
+        states = [m["state"] for m in messages if m["type"] == "state"]
+        self.assertIn(states[0], ("QUEUED", "VALIDATING", "RUNNING"))
+        self.assertEqual(states[-2:], ["RUNNING", "COMPLETED"])
+        self.assertTrue(messages[-1]["final"])
+        self.assertEqual([m["events"] for m in messages if m["type"] == "events"],
+                         [{"m0": 1}, {"m1": 0}])
+        progress = [m["progress"] for m in messages if m["type"] == "progress"]
+        self.assertEqual(progress[0]["current_epoch"], 1)
+        self.assertTrue(all(m["job_id"] == job_id for m in messages))
+        self.assertFalse(manager.unsubscribe(subscription_id, "sess_1"))
+    
+    def test_subscribe_streams_epochs_in_order(self):
+        """Epoch progress interleaves with events and survives completion."""
+        from tests.test_helpers import create_test_executor
+        from tests.unit.test_execution_plan import two_epoch_graph
+        
+        gate = self.gate
+        executor = create_test_executor(seed=3)
+        run = executor.execute
+        executor.execute = lambda graph: gate.wait(5) and run(graph)
+        manager = JobManager(executor_factory=lambda: executor, num_workers=1)
+        self.addCleanup(manager.shutdown)
+        self.addCleanup(self.gate.set)
+        messages = []
+        
+        job_id = manager.submit_job("sess_1", two_epoch_graph())["job_id"]
+        manager.subscribe(job_id, "sess_1", messages.append)
+        self.gate.set()
+        status = manager.wait_for_job(job_id, "sess_1", timeout_ms=5000)
+        self.assertEqual(status["state"], "COMPLETED")
+        
+        stream = [sorted(m["events"]) if m["type"] == "events" else m["progress"]["current_epoch"]
+                  for m in messages if m["type"] != "state"]
+        self.assertEqual(stream, [["e0"], 0, 1, ["e1"], 2])
+        final = messages[-1]
+        self.assertTrue(final["final"])
+        self.assertEqual(final["progress"], {"current_epoch": 2, "total_epochs": 2,
+                                             "nodes_executed": 6, "nodes_total": 6})
+    
+    def test_subscribe_to_finished_job(self):
+        """A finished job replays its events and final state, then stops."""
+        manager = self._manager(gated=False, num_workers=1)
+        job_id = manager.submit_job("sess_1", self._graph("a"))["job_id"]
+        manager.wait_for_job(job_id, "sess_1", timeout_ms=5000)
+        messages = []
+        
+        manager.subscribe(job_id, "sess_1", messages.append)
+        
+        self.assertEqual([m["type"] for m in messages], ["events", "state"])
+        self.assertEqual(messages[-1]["state"], "COMPLETED")
+        with self.assertRaises(PermissionError):
+            manager.subscribe(job_id, "sess_2", messages.append)
+    
+    def test_unsubscribe(self):
+        """Unsubscribed listeners receive nothing further."""
+        manager = self._manager(num_workers=1)
+        messages = []
+        
+        job_id = manager.submit_job("sess_1", self._graph("a"))["job_id"]
+        subscription_id = manager.subscribe(job_id, "sess_1", messages.append)
+        with self.assertRaises(PermissionError):
+            manager.unsubscribe(subscription_id, "sess_2")
+        self.assertTrue(manager.unsubscribe(subscription_id, "sess_1"))
+        count = len(messages)
+        
+        self.gate.set()
+        manager.wait_for_job(job_id, "sess_1", timeout_ms=5000)
+        self.assertEqual(len(messages), count)
+    
+    def test_batch_results_stream_in_completion_order(self):
+        """wait_for_batch pages through results with a cursor."""
+        manager = self._manager(num_workers=1)
+        
+        batch = manager.submit_batch(
+            "sess_1", [self._graph(f"b{i}") for i in range(4)], {"priority": 5}
+        )
+        self.assertEqual(len(batch["job_ids"]), 4)
+        self.assertEqual(manager.wait_for_batch(batch["batch_id"], "sess_1", timeout_ms=0)["results"], [])
+        
+        self.gate.set()
+        seen, cursor = [], 0
+        while True:
+            page = manager.wait_for_batch(batch["batch_id"], "sess_1", cursor, timeout_ms=5000)
+            seen.extend(page["results"])
+            cursor = page["cursor"]
+            if page["done"]:
+                break
+        
+        self.assertEqual([s["job_id"] for s in seen], batch["job_ids"])
+        self.assertTrue(all(s["batch_id"] == batch["batch_id"] for s in seen))
+        self.assertEqual((page["completed"], page["total"]), (4, 4))
+        with self.assertRaises(PermissionError):
+            manager.wait_for_batch(batch["batch_id"], "sess_2")
+    
+    def test_batch_admission_is_all_or_nothing(self):
+        """A batch that does not fit in the queue is rejected whole."""
+        manager = self._manager(num_workers=1, max_queue_size=3)
+        
+        manager.submit_job("sess_1", self._graph("running"))
+        self._wait_running(manager)
+        manager.submit_job("sess_1", self._graph("q1"))
+        with self.assertRaises(QueueFullError):
+            manager.submit_batch("sess_1", [self._graph(f"b{i}") for i in range(3)])
+        
+        self.assertEqual(len(manager.jobs), 2)
+        self.assertEqual(manager.batches, {})
+    
+    def test_shared_executor_is_serialized(self):
+        """A single shared executor is served by one worker."""
+        manager = JobManager(executor=RecordingExecutor(self.log), num_workers=8)
+        self.addCleanup(manager.shutdown)
+        self.assertEqual(manager.num_workers, 1)
+    
+    def test_shutdown_rejects_new_jobs(self):
+        """A shut-down manager refuses submissions."""
+        manager = JobManager(executor_factory=lambda: RecordingExecutor(self.log))
+        manager.shutdown()
+        with self.assertRaises(RuntimeError):
+            manager.submit_job("sess_1", self._graph("x"))
+
+
 if __name__ == "__main__":
     unittest.main()
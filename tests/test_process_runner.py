@@ -0,0 +1,289 @@
+"""
+Unit tests for ProcessPoolJobRunner
+"""
+
+import os
+import threading
+import time
+import unittest
+
+from kernel.core.job_manager import JobManager
+from kernel.core.process_runner import (
+    ProcessPoolJobRunner,
+    JobCancelledError,
+    RemoteExecutionError,
+    encode_graph,
+    decode_graph,
+)
+
+
+class DetailedError(Exception):
+    """Exception whose __init__ takes extra arguments, so it does not unpickle."""
+
+    def __init__(self, message, error_type, details):
+        super().__init__(message)
+        self.error_type = error_type
+        self.details = details
+
+
+class PidExecutor:
+    """Executor reporting the process it ran in."""
+
+    def execute(self, graph):
+        if graph.get("sleep"):
+            time.sleep(graph["sleep"])
+        if graph.get("fail"):
+            raise ValueError("boom")
+        if graph.get("fail_detailed"):
+            raise DetailedError("rejected", "invalid_graph", {"node": "n1"})
+        return {"events": {"name": graph["name"], "pid": os.getpid()},
+                "telemetry": {"nodes": len(graph.get("nodes", []))}}
+
+
+class TestProcessPoolJobRunner(unittest.TestCase):
+    """Test job execution in worker processes."""
+
+    def setUp(self):
+        """Start a small pool."""
+        self.runner = ProcessPoolJobRunner(num_workers=2, executor_factory=PidExecutor)
+        self.addCleanup(self.runner.shutdown)
+
+    def _graph(self, name, **extra):
+        graph = {"name": name, "nodes": [{"id": "n1", "op": "ALLOC_LQ"}], "edges": []}
+        graph.update(extra)
+        return graph
+
+    def test_graph_blob_roundtrip(self):
+        """Graphs survive compact serialization."""
+        graph = self._graph("g", nodes=[{"id": f"n{i}", "op": "APPLY_H"} for i in range(50)])
+        blob = encode_graph(graph)
+        self.assertEqual(decode_graph(blob), graph)
+        self.assertLess(len(blob), len(repr(graph)))
+
+    def test_runs_in_worker_process(self):
+        """Results come back from a different process."""
+        result = self.runner.execute(self._graph("a"), job_id="job_a")
+        self.assertEqual(result["events"]["name"], "a")
+        self.assertNotEqual(result["events"]["pid"], os.getpid())
+        self.assertIn(result["events"]["pid"], self.runner.get_stats()["worker_pids"])
+        self.assertEqual(result["telemetry"]["nodes"], 1)
+
+    def test_executor_errors_propagate(self):
+        """Exceptions raised by the executor are re-raised with their type."""
+        with self.assertRaises(ValueError):
+            self.runner.execute(self._graph("bad", fail=True))
+        # The worker stays usable
+        self.assertEqual(self.runner.execute(self._graph("ok"))["events"]["name"], "ok")
+
+    def test_unpicklable_errors_keep_worker(self):
+        """Exceptions that cannot be unpickled come back as RemoteExecutionError."""
+        runner = ProcessPoolJobRunner(num_workers=1, executor_factory=PidExecutor)
+        self.addCleanup(runner.shutdown)
+
+        with self.assertRaises(RemoteExecutionError) as ctx:
+            runner.execute(self._graph("bad", fail_detailed=True))
+        self.assertEqual(ctx.exception.remote_type, "DetailedError")
+        self.assertEqual(str(ctx.exception), "rejected")
+        self.assertEqual(ctx.exception.details, {"node": "n1"})
+
+        # The only worker is back in the pool
+        self.assertEqual(runner.execute(self._graph("ok"))["events"]["name"], "ok")
+        self.assertEqual(runner.get_stats()["workers_restarted"], 0)
+
+    def test_cancel_unknown_job_not_recorded(self):
+        """Cancelling a finished or unknown job leaves no state behind."""
+        self.runner.execute(self._graph("done"), job_id="job_done")
+        self.assertFalse(self.runner.cancel("job_done"))
+        self.assertFalse(self.runner.cancel("job_unknown"))
+        self.assertEqual(self.runner._cancelled, set())
+        self.assertEqual(self.runner._pending, set())
+
+    def test_cancel_reserved_job(self):
+        """A cancel between reserve() and execute() keeps the job from running."""
+        self.runner.reserve("job_reserved")
+        self.assertFalse(self.runner.cancel("job_reserved"))
+        with self.assertRaises(JobCancelledError):
+            self.runner.execute(self._graph("reserved"), job_id="job_reserved")
+        self.assertEqual(self.runner._cancelled, set())
+        self.assertEqual(self.runner.get_stats()["jobs_completed"], 0)
+
+    def test_cancel_restarts_worker(self):
+        """Cancelling a running job kills its process and starts a replacement."""
+        errors = []
+
+        def run():
+            try:
+                self.runner.execute(self._graph("slow", sleep=30), job_id="job_slow")
+            except JobCancelledError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        deadline = time.time() + 5
+        while not self.runner.get_stats()["busy_workers"] and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.runner.cancel("job_slow"))
+        thread.join(5)
+
+        self.assertEqual(len(errors), 1)
+        stats = self.runner.get_stats()
+        self.assertEqual(stats["workers_restarted"], 1)
+        self.assertEqual(stats["busy_workers"], 0)
+        self.assertFalse(self.runner.cancel("job_slow"))
+        self.assertEqual(self.runner.execute(self._graph("next"))["events"]["name"], "next")
+
+    def test_cancel_after_reply_respawns_worker(self):
+        """A worker terminated after replying is replaced, not reused."""
+        runner = self.runner
+
+        class CancelOnReply:
+            def __init__(self, conn):
+                self.conn = conn
+
+            def send_bytes(self, blob):
+                self.conn.send_bytes(blob)
+
+            def recv(self):
+                reply = self.conn.recv()
+                runner.cancel("job_raced")
+                return reply
+
+            def close(self):
+                self.conn.close()
+
+        for worker in runner._workers:
+            worker.conn = CancelOnReply(worker.conn)
+
+        with self.assertRaises(JobCancelledError):
+            runner.execute(self._graph("raced"), job_id="job_raced")
+        self.assertEqual(runner.get_stats()["workers_restarted"], 1)
+
+        # Both workers (one of them fresh) still run jobs
+        for name in ("next1", "next2", "next3"):
+            self.assertEqual(runner.execute(self._graph(name))["events"]["name"], name)
+
+    def test_cancel_while_waiting_for_worker(self):
+        """A job cancelled before it gets a worker is never sent."""
+        blockers = [
+            threading.Thread(target=self.runner.execute, args=(self._graph(f"b{i}", sleep=0.5),))
+            for i in range(2)
+        ]
+        for thread in blockers:
+            thread.start()
+        deadline = time.time() + 5
+        while self.runner._idle.qsize() and time.time() < deadline:
+            time.sleep(0.01)
+
+        errors = []
+
+        def run():
+            try:
+                self.runner.execute(self._graph("waiting"), job_id="job_waiting")
+            except JobCancelledError as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=run)
+        waiter.start()
+        time.sleep(0.05)
+        self.assertFalse(self.runner.cancel("job_waiting"))
+        waiter.join(5)
+        for thread in blockers:
+            thread.join(5)
+
+        self.assertEqual(len(errors), 1)
+        stats = self.runner.get_stats()
+        self.assertEqual(stats["jobs_cancelled"], 1)
+        self.assertEqual(stats["workers_restarted"], 0)
+        self.assertEqual(stats["jobs_completed"], 2)
+
+    def test_fork_start_method_rejected(self):
+        """Workers are never forked from the threaded server."""
+        with self.assertRaises(ValueError):
+            ProcessPoolJobRunner(num_workers=1, executor_factory=PidExecutor, start_method="fork")
+        self.assertNotEqual(self.runner._context.get_start_method(), "fork")
+
+    def test_shutdown(self):
+        """A shut-down runner stops its processes and rejects work."""
+        self.runner.shutdown()
+        for worker in self.runner._workers:
+            self.assertFalse(worker.process.is_alive())
+        with self.assertRaises(RuntimeError):
+            self.runner.execute(self._graph("late"))
+
+
+class TestJobManagerWithRunner(unittest.TestCase):
+    """Test JobManager dispatching to worker processes."""
+
+    def setUp(self):
+        """Create a manager backed by a process pool."""
+        self.runner = ProcessPoolJobRunner(num_workers=2, executor_factory=PidExecutor)
+        self.manager = JobManager(runner=self.runner)
+        self.addCleanup(self.runner.shutdown)
+        self.addCleanup(self.manager.shutdown)
+
+    def test_jobs_complete(self):
+        """Jobs run to completion in worker processes."""
+        ids = [self.manager.submit_job("sess_1", {"name": f"j{i}", "nodes": []})["job_id"]
+               for i in range(6)]
+        statuses = [self.manager.wait_for_job(j, "sess_1", timeout_ms=10000) for j in ids]
+
+        self.assertTrue(all(s["state"] == "COMPLETED" for s in statuses))
+        self.assertEqual(self.manager.num_workers, 2)
+        pids = {s["events"]["pid"] for s in statuses}
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_cancel_running_job(self):
+        """q_cancel on a running job interrupts its worker process."""
+        job_id = self.manager.submit_job("sess_1", {"name": "slow", "sleep": 30})["job_id"]
+        deadline = time.time() + 5
+        while (self.runner.get_stats()["busy_workers"] == 0
+               and time.time() < deadline):
+            time.sleep(0.01)
+
+        result = self.manager.cancel_job(job_id, "sess_1")
+        self.assertEqual(result["state"], "CANCELLED")
+
+        # The dispatch thread is freed promptly and the job stays cancelled
+        follow_up = self.manager.submit_job("sess_1", {"name": "after"})["job_id"]
+        status = self.manager.wait_for_job(follow_up, "sess_1", timeout_ms=10000)
+        self.assertEqual(status["state"], "COMPLETED")
+        self.assertEqual(
+            self.manager.get_job_status(job_id, "sess_1")["state"], "CANCELLED"
+        )
+        self.assertEqual(self.runner.get_stats()["jobs_cancelled"], 1)
+
+    def test_session_cleanup_stops_running_jobs(self):
+        """Closing a session interrupts its jobs' worker processes."""
+        self.manager.submit_job("sess_1", {"name": "slow", "sleep": 30})
+        deadline = time.time() + 5
+        while (self.runner.get_stats()["busy_workers"] == 0
+               and time.time() < deadline):
+            time.sleep(0.01)
+
+        self.manager.cleanup_session_jobs("sess_1")
+        while (self.runner.get_stats()["workers_restarted"] == 0
+               and time.time() < deadline):
+            time.sleep(0.01)
+
+        stats = self.runner.get_stats()
+        self.assertEqual(stats["jobs_cancelled"], 1)
+        self.assertEqual(stats["workers_restarted"], 1)
+
+    def test_failures_reported(self):
+        """Executor exceptions in the worker mark the job FAILED."""
+        job_id = self.manager.submit_job("sess_1", {"name": "bad", "fail": True})["job_id"]
+        status = self.manager.wait_for_job(job_id, "sess_1", timeout_ms=10000)
+        self.assertEqual(status["state"], "FAILED")
+        self.assertEqual(status["error"]["type"], "ValueError")
+
+    def test_unpicklable_failures_reported(self):
+        """A failure whose exception cannot be rebuilt keeps its class name."""
+        job_id = self.manager.submit_job("sess_1", {"name": "bad", "fail_detailed": True})["job_id"]
+        status = self.manager.wait_for_job(job_id, "sess_1", timeout_ms=10000)
+        self.assertEqual(status["state"], "FAILED")
+        self.assertEqual(status["error"]["type"], "DetailedError")
+        self.assertEqual(status["error"]["message"], "rejected")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,8 +6,18 @@ Tests the complete flow from client to kernel.
 
 import unittest
 import json
-from kernel.core.qmk_server import QMKServer
-from runtime.client import QSyscallClient
+import os
+import socket
+import asyncio
+import tempfile
+import threading
+import time
+from kernel.core.qmk_server import QMKServer, AsyncQMKServer
+from kernel.core.rpc_server import RPCServer
+from kernel.rpc_server import RPCServer as UnframedRPCServer
+from kernel.abi.framing import FRAME_MAGIC, FRAME_HEADER, MAX_FRAME_SIZE, read_frame
+from runtime.client import QSyscallClient, AsyncQSyscallClient, FramingUnsupportedError
+from runtime.client.qsyscall_client import QSyscallError
 
 
 class TestQSyscallIntegration(unittest.TestCase):
@@ -18,6 +28,18 @@ class TestQSyscallIntegration(unittest.TestCase):
         self.server = QMKServer(socket_path="/tmp/qmk_test.sock")
         self.client = QSyscallClient(socket_path="/tmp/qmk_test.sock")
     
+    def _hold_jobs(self):
+        """Make workers block in execute() until the test finishes."""
+        release = threading.Event()
+        
+        class BlockingExecutor:
+            def execute(self, graph):
+                release.wait(5)
+                return {}
+        
+        self.server.job_manager.executor_factory = BlockingExecutor
+        self.addCleanup(release.set)
+    
     def test_negotiate_capabilities(self):
         """Test capability negotiation via RPC."""
         result = self.server.rpc_server.call_local(
@@ -86,6 +108,9 @@ class TestQSyscallIntegration(unittest.TestCase):
     
     def test_cancel_job(self):
         """Test job cancellation via RPC."""
+        # Job must still be in flight when cancelled
+        self._hold_jobs()
+        
         # Negotiate and submit
         caps_result = self.server.rpc_server.call_local(
             "q_negotiate_caps",
@@ -171,6 +196,9 @@ class TestQSyscallIntegration(unittest.TestCase):
         custom_quota = SessionQuota(max_jobs=1)
         self.server.session_manager.default_quota = custom_quota
         
+        # Keep the first job running so it holds its quota slot
+        self._hold_jobs()
+        
         caps_result = self.server.rpc_server.call_local(
             "q_negotiate_caps",
             {"requested": ["CAP_ALLOC"]}
@@ -194,6 +222,87 @@ class TestQSyscallIntegration(unittest.TestCase):
         
         self.assertIn("quota", str(ctx.exception).lower())
     
+    def test_submit_batch(self):
+        """Test template batch submission and result streaming via RPC."""
+        caps_result = self.server.rpc_server.call_local(
+            "q_negotiate_caps",
+            {"requested": ["CAP_ALLOC", "CAP_COMPUTE", "CAP_MEASURE"]}
+        )
+        session_id = caps_result["session_id"]
+        
+        template = {
+            "version": "0.1",
+            "program": {"nodes": [
+                {"id": "alloc", "op": "ALLOC_LQ", "args": {"n": 1}, "vqs": ["q0"]},
+                {"id": "ry", "op": "APPLY_RY", "args": {"theta": {"param": "theta1"}}, "vqs": ["q0"]},
+                {"id": "m0", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["m0"]},
+            ]},
+            "resources": {"vqs": ["q0"], "chs": [], "events": ["m0"]},
+            "caps": ["CAP_ALLOC", "CAP_COMPUTE", "CAP_MEASURE"]
+        }
+        
+        result = self.server.rpc_server.call_local(
+            "q_submit_batch",
+            {
+                "template": template,
+                "parameters": [{"theta1": 0.0}, {"theta1": 3.14159}, {"theta1": 1.0}],
+                "session_id": session_id
+            }
+        )
+        self.assertEqual(result["parameters"], ["theta1"])
+        self.assertEqual(len(result["job_ids"]), 3)
+        
+        statuses, cursor = [], 0
+        while True:
+            page = self.server.rpc_server.call_local(
+                "q_wait_batch",
+                {"batch_id": result["batch_id"], "session_id": session_id,
+                 "cursor": cursor, "timeout_ms": 10000}
+            )
+            statuses.extend(page["results"])
+            cursor = page["cursor"]
+            if page["done"]:
+                break
+        
+        self.assertEqual(sorted(s["job_id"] for s in statuses), sorted(result["job_ids"]))
+        self.assertTrue(all(s["state"] == "COMPLETED" for s in statuses), statuses)
+        self.assertTrue(all("m0" in s["events"] for s in statuses))
+    
+    def test_submit_batch_is_atomic(self):
+        """Test that invalid rows and quota overruns queue no jobs."""
+        from kernel.core.session_manager import SessionQuota
+        
+        self.server.session_manager.default_quota = SessionQuota(max_jobs=2)
+        self._hold_jobs()
+        
+        caps_result = self.server.rpc_server.call_local(
+            "q_negotiate_caps",
+            {"requested": ["CAP_ALLOC"]}
+        )
+        session_id = caps_result["session_id"]
+        template = {"nodes": [
+            {"id": "n1", "op": "APPLY_RZ", "args": {"theta": {"param": "t"}}}
+        ], "edges": []}
+        
+        with self.assertRaises(ValueError):
+            self.server.rpc_server.call_local(
+                "q_submit_batch",
+                {"template": template, "parameters": [{"t": 0.1}, {"t": "x"}],
+                 "session_id": session_id}
+            )
+        
+        with self.assertRaises(RuntimeError) as ctx:
+            self.server.rpc_server.call_local(
+                "q_submit_batch",
+                {"template": template, "parameters": [{"t": 0.1}] * 3,
+                 "session_id": session_id}
+            )
+        self.assertIn("quota", str(ctx.exception).lower())
+        
+        self.assertEqual(self.server.job_manager.jobs, {})
+        session = self.server.session_manager.get_session(session_id)
+        self.assertEqual(session.active_jobs, set())
+    
     def test_open_channel(self):
         """Test opening an entanglement channel."""
         # Negotiate with CAP_LINK
@@ -239,5 +348,414 @@ class TestQSyscallIntegration(unittest.TestCase):
         self.assertIn("qubits", telemetry)
 
 
+class TestRPCTransport(unittest.TestCase):
+    """Socket-level tests for the framed and legacy transports."""
+    
+    def setUp(self):
+        """Start an RPC server with test handlers on a private socket."""
+        tmpdir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(tmpdir, "qmk.sock")
+        self.server = RPCServer(self.socket_path)
+        self.server.register_handler("echo", lambda params: params)
+        self.server.register_handler("sleep", self._sleep)
+        self.server.register_handler("fail", self._fail)
+        self.addCleanup(os.rmdir, tmpdir)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+    
+    @staticmethod
+    def _sleep(params):
+        time.sleep(params["seconds"])
+        return {"slept": params["seconds"]}
+    
+    @staticmethod
+    def _fail(params):
+        raise PermissionError("denied")
+    
+    def _client(self, **kwargs):
+        client = QSyscallClient(socket_path=self.socket_path, **kwargs)
+        self.addCleanup(client.close)
+        return client
+    
+    def test_oversized_frame_rejected(self):
+        """A frame header above MAX_FRAME_SIZE gets an error and a close."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        self.addCleanup(sock.close)
+        sock.sendall(FRAME_MAGIC + FRAME_HEADER.pack(MAX_FRAME_SIZE + 1))
+        
+        reader = sock.makefile("rb")
+        self.assertEqual(reader.read(len(FRAME_MAGIC)), FRAME_MAGIC)
+        response = json.loads(read_frame(reader).decode())
+        reader.close()
+        self.assertEqual(response["error"]["code"], -32600)
+    
+    def test_requests_share_bounded_pool(self):
+        """Framed requests from all connections run on a bounded pool."""
+        server = RPCServer(self.socket_path + "2", max_workers=2)
+        lock = threading.Lock()
+        active = []
+        peak = []
+        
+        def track(params):
+            with lock:
+                active.append(threading.current_thread().name)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(threading.current_thread().name)
+            return {}
+        
+        server.register_handler("track", track)
+        server.start()
+        self.addCleanup(server.stop)
+        
+        clients = []
+        for _ in range(3):
+            client = QSyscallClient(socket_path=server.socket_path)
+            self.addCleanup(client.close)
+            clients.append(client)
+        futures = [client.call_async("track", {}) for client in clients for _ in range(4)]
+        for future in futures:
+            future.result(timeout=5)
+        
+        self.assertEqual(max(peak), 2)
+    
+    def test_blocking_handlers_do_not_starve_pool(self):
+        """Clients parked in a blocking handler do not delay other clients."""
+        server = RPCServer(self.socket_path + "2", max_workers=1)
+        release = threading.Event()
+        server.register_handler("park", lambda params: release.wait(10) and {}, blocking=True)
+        server.register_handler("echo", lambda params: params)
+        server.start()
+        self.addCleanup(server.stop)
+        self.addCleanup(release.set)
+        
+        parked = []
+        for _ in range(3):
+            client = QSyscallClient(socket_path=server.socket_path)
+            self.addCleanup(client.close)
+            parked.append(client.call_async("park", {}))
+        
+        other = QSyscallClient(socket_path=server.socket_path)
+        self.addCleanup(other.close)
+        start = time.time()
+        self.assertEqual(other._call("echo", {"v": 1}), {"v": 1})
+        self.assertLess(time.time() - start, 1.0)
+        self.assertFalse(any(future.done() for future in parked))
+        
+        release.set()
+        for future in parked:
+            self.assertEqual(future.result(timeout=5), {})
+    
+    def test_falls_back_without_framing(self):
+        """Against a server without framing the client switches to one-shot calls."""
+        server = UnframedRPCServer(self.socket_path + "3")
+        server.register_handler("echo", lambda params: params)
+        server.start()
+        self.addCleanup(server.stop)
+        
+        client = QSyscallClient(socket_path=server.socket_path, handshake_timeout=0.2)
+        self.addCleanup(client.close)
+        self.assertEqual(client._call("echo", {"v": 1}), {"v": 1})
+        self.assertFalse(client.persistent)
+        self.assertEqual(client._call("echo", {"v": 2}), {"v": 2})
+        
+        with self.assertRaises(FramingUnsupportedError):
+            QSyscallClient(socket_path=server.socket_path, handshake_timeout=0.2).call_async("echo", {})
+    
+    def test_slow_handshake_does_not_downgrade(self):
+        """A handshake timeout sends that call one-shot and keeps pipelining."""
+        delays = [0.3]
+        
+        class SlowServer(RPCServer):
+            def _handle_framed(self, client_socket):
+                if delays:
+                    time.sleep(delays.pop())
+                super()._handle_framed(client_socket)
+        
+        server = SlowServer(self.socket_path + "4")
+        server.register_handler("echo", lambda params: params)
+        server.start()
+        self.addCleanup(server.stop)
+        
+        client = QSyscallClient(socket_path=server.socket_path, handshake_timeout=0.05)
+        self.addCleanup(client.close)
+        self.assertEqual(client._call("echo", {"v": 1}), {"v": 1})
+        self.assertTrue(client.persistent)
+        self.assertIsNone(client._sock)
+        
+        self.assertEqual(client._call("echo", {"v": 2}), {"v": 2})
+        self.assertIsNotNone(client._sock)
+    
+    def test_persistent_connection_reused(self):
+        """Consecutive calls share one connection."""
+        client = self._client()
+        self.assertEqual(client._call("echo", {"a": 1}), {"a": 1})
+        sock = client._sock
+        self.assertEqual(client._call("echo", {"a": 2}), {"a": 2})
+        self.assertIs(client._sock, sock)
+    
+    def test_pipelined_responses_out_of_order(self):
+        """A slow request does not block later requests on the connection."""
+        client = self._client()
+        slow = client.call_async("sleep", {"seconds": 0.5})
+        fast = client.call_async("echo", {"x": 1})
+        
+        self.assertEqual(fast.result(timeout=5), {"x": 1})
+        self.assertFalse(slow.done())
+        self.assertEqual(slow.result(timeout=5), {"slept": 0.5})
+    
+    def test_call_pipelined(self):
+        """Many requests in flight resolve to their own results."""
+        client = self._client()
+        results = client.call_pipelined([("echo", {"i": i}) for i in range(200)])
+        self.assertEqual(results, [{"i": i} for i in range(200)])
+    
+    def test_large_message(self):
+        """Multi-megabyte payloads round-trip in both transports."""
+        graph = {"nodes": [{"id": f"n{i}", "op": "APPLY_H", "vqs": ["q0"]}
+                           for i in range(50000)]}
+        for persistent in (True, False):
+            client = self._client(persistent=persistent)
+            self.assertEqual(client._call("echo", graph), graph)
+    
+    def test_errors(self):
+        """Handler errors surface as QSyscallError in both transports."""
+        for persistent in (True, False):
+            client = self._client(persistent=persistent)
+            with self.assertRaises(QSyscallError) as ctx:
+                client._call("fail", {})
+            self.assertEqual(ctx.exception.code, -32301)
+    
+    def test_legacy_client(self):
+        """Unframed one-shot requests are still served."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        sock.sendall(json.dumps({"jsonrpc": "2.0", "method": "echo",
+                                 "params": {"v": 7}, "id": 1}).encode())
+        response = json.loads(sock.recv(4096).decode())
+        sock.close()
+        self.assertEqual(response["result"], {"v": 7})
+    
+    def test_reconnect_after_close(self):
+        """Closing fails pending calls; the next call reconnects."""
+        client = self._client()
+        pending = client.call_async("sleep", {"seconds": 0.5})
+        client.close()
+        with self.assertRaises(ConnectionError):
+            pending.result(timeout=5)
+        self.assertEqual(client._call("echo", {"again": True}), {"again": True})
+
+
+class GatedExecutor:
+    """Executor that blocks every job until a shared gate opens."""
+    
+    gate = None
+    
+    def execute(self, graph):
+        GatedExecutor.gate.wait(10)
+        return {"events": {"done": 1}}
+
+
+class TestAsyncServer(unittest.TestCase):
+    """Tests for AsyncQMKServer and AsyncQSyscallClient."""
+    
+    def setUp(self):
+        """Start an asyncio server whose jobs wait for a gate."""
+        tmpdir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(tmpdir, "qmk.sock")
+        self.addCleanup(os.rmdir, tmpdir)
+        
+        self.gate = threading.Event()
+        GatedExecutor.gate = self.gate
+        self.server = AsyncQMKServer(socket_path=self.socket_path)
+        self.server.job_manager.executor_factory = GatedExecutor
+        self.server.rpc_server.start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(self.gate.set)
+    
+    def _run(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, 20))
+    
+    def test_sync_client_compatible(self):
+        """Threaded and legacy clients work against the asyncio server."""
+        self.gate.set()
+        for persistent in (True, False):
+            client = QSyscallClient(socket_path=self.socket_path, persistent=persistent)
+            self.addCleanup(client.close)
+            client.negotiate_capabilities(["CAP_ALLOC"])
+            result = client.submit_and_wait({"nodes": [], "edges": []}, timeout_ms=5000)
+            self.assertEqual(result["state"], "COMPLETED")
+    
+    def test_wait_driven_by_notification(self):
+        """wait_for_job resolves from the pushed q_job_done notification."""
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                job_id = await client.submit_job({"nodes": [], "edges": []})
+                waiter = asyncio.ensure_future(client.wait_for_job(job_id, timeout_ms=10000))
+                await asyncio.sleep(0.1)
+                self.assertFalse(waiter.done())
+                self.gate.set()
+                return await waiter
+        
+        status = self._run(scenario())
+        self.assertEqual(status["state"], "COMPLETED")
+        self.assertEqual(status["events"], {"done": 1})
+    
+    def test_batch_results_stream(self):
+        """iter_batch_results yields every job of a batch."""
+        template = {"nodes": [
+            {"id": "n1", "op": "APPLY_RZ", "args": {"theta": {"param": "t"}}}
+        ], "edges": []}
+        
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                batch = await client.submit_batch(template, [{"t": 0.1 * i} for i in range(5)])
+                self.gate.set()
+                statuses = [s async for s in client.iter_batch_results(batch["batch_id"],
+                                                                       timeout_ms=10000)]
+                return batch, statuses
+        
+        batch, statuses = self._run(scenario())
+        self.assertEqual(sorted(s["job_id"] for s in statuses), sorted(batch["job_ids"]))
+        self.assertTrue(all(s["state"] == "COMPLETED" for s in statuses))
+    
+    def test_subscribe_streams_job_events(self):
+        """q_subscribe pushes state transitions and events to async and threaded clients."""
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                job_id = await client.submit_job({"nodes": [], "edges": []})
+                messages = []
+                async for message in client.subscribe(job_id, timeout_ms=10000):
+                    messages.append(message)
+                    if message.get("state") == "RUNNING":
+                        self.gate.set()
+                return messages
+        
+        messages = self._run(scenario())
+        self.assertEqual([m["state"] for m in messages if m["type"] == "state"][-2:],
+                         ["RUNNING", "COMPLETED"])
+        self.assertIn({"done": 1}, [m.get("events") for m in messages])
+        self.assertTrue(messages[-1]["final"])
+        
+        client = QSyscallClient(socket_path=self.socket_path)
+        self.addCleanup(client.close)
+        client.negotiate_capabilities(["CAP_ALLOC"])
+        job_id = client.submit_job({"nodes": [], "edges": []})
+        messages = list(client.subscribe(job_id, types=["events"], timeout_ms=10000))
+        self.assertEqual([m["type"] for m in messages], ["events", "state"])
+        self.assertEqual(messages[-1]["state"], "COMPLETED")
+    
+    def test_subscription_dropped_with_connection(self):
+        """Closing the connection removes its job event streams."""
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                job_id = await client.submit_job({"nodes": [], "edges": []})
+                stream = client.subscribe(job_id)
+                await stream.__anext__()
+                await stream.aclose()
+                streams_open = len(self.server.job_manager._subscriptions)
+                await client.subscribe(job_id).__anext__()
+            return streams_open
+        
+        self.assertEqual(self._run(scenario()), 0)
+        deadline = time.time() + 5
+        while self.server.job_manager._subscriptions and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.server.job_manager._subscriptions, {})
+    
+    def test_watch_dropped_with_connection(self):
+        """Closing the connection removes its q_watch completion callbacks."""
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                job_id = await client.submit_job({"nodes": [], "edges": []})
+                for _ in range(2):
+                    await client.call("q_watch", {"job_id": job_id, "session_id": client.session_id})
+                watching = len(self.server.job_manager._done_callbacks.get(job_id, []))
+            return job_id, watching
+        
+        job_id, watching = self._run(scenario())
+        self.assertEqual(watching, 2)
+        deadline = time.time() + 5
+        while job_id in self.server.job_manager._done_callbacks and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertNotIn(job_id, self.server.job_manager._done_callbacks)
+    
+    def test_many_waiters_do_not_hold_threads(self):
+        """Hundreds of concurrent waits neither park threads nor block the loop."""
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                self.server.session_manager.get_session(client.session_id).quota.max_jobs = 1000
+                job_ids = await asyncio.gather(*[
+                    client.submit_job({"nodes": [], "edges": []}) for _ in range(200)
+                ])
+                waiters = [asyncio.ensure_future(client.wait_for_job(j, timeout_ms=15000))
+                           for j in job_ids]
+                await asyncio.sleep(0.2)
+                threads_while_waiting = threading.active_count()
+                
+                # The server keeps answering other requests meanwhile
+                status = await client.get_job_status(job_ids[-1])
+                self.assertEqual(status["state"], "QUEUED")
+                
+                self.gate.set()
+                return threads_while_waiting, await asyncio.gather(*waiters)
+        
+        threads, statuses = self._run(scenario())
+        self.assertLess(threads, 50)
+        self.assertTrue(all(s["state"] == "COMPLETED" for s in statuses))
+    
+    def test_wait_timeout(self):
+        """An unfinished job times out with TimeoutError."""
+        async def scenario():
+            async with AsyncQSyscallClient(self.socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                job_id = await client.submit_job({"nodes": [], "edges": []})
+                await client.wait_for_job(job_id, timeout_ms=100)
+        
+        with self.assertRaises(TimeoutError):
+            self._run(scenario())
+    
+    def test_server_side_wait_timeout(self):
+        """q_wait on the event loop reports timeouts as TIMEOUT errors."""
+        client = QSyscallClient(socket_path=self.socket_path)
+        self.addCleanup(client.close)
+        client.negotiate_capabilities(["CAP_ALLOC"])
+        job_id = client.submit_job({"nodes": [], "edges": []})
+        with self.assertRaises(QSyscallError) as ctx:
+            client.wait_for_job(job_id, timeout_ms=100)
+        self.assertEqual(ctx.exception.code, -32302)
+        
+        # Each timed-out poll unregisters its completion callback
+        for _ in range(3):
+            with self.assertRaises(QSyscallError):
+                client.wait_for_job(job_id, timeout_ms=20)
+        self.assertNotIn(job_id, self.server.job_manager._done_callbacks)
+    
+    def test_async_client_falls_back_to_q_wait(self):
+        """Against the threaded server, wait_for_job uses q_wait."""
+        tmpdir = tempfile.mkdtemp()
+        socket_path = os.path.join(tmpdir, "threaded.sock")
+        self.addCleanup(os.rmdir, tmpdir)
+        server = QMKServer(socket_path=socket_path)
+        server.rpc_server.start()
+        self.addCleanup(server.stop)
+        
+        async def scenario():
+            async with AsyncQSyscallClient(socket_path) as client:
+                await client.negotiate_capabilities(["CAP_ALLOC"])
+                return await client.submit_and_wait({"nodes": [], "edges": []}, timeout_ms=5000)
+        
+        status = self._run(scenario())
+        self.assertIn(status["state"], ("COMPLETED", "FAILED"))
+
+
 if __name__ == "__main__":
     unittest.main()
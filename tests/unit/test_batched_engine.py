@@ -0,0 +1,204 @@
+"""
+Unit tests for the batched statevector kernel and multi-shot engine
+"""
+
+import unittest
+import sys
+import os
+import math
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from kernel.simulator import statevector
+from kernel.simulator.statevector import BatchedStatevector, SINGLE_QUBIT_GATES
+from kernel.simulator.batched_engine import BatchedShotEngine, EVENT_NOT_PRODUCED
+from kernel.simulator.scheduler import topo_schedule
+
+
+class TestBatchedStatevector(unittest.TestCase):
+    """Test in-place strided gate application."""
+
+    def test_initial_state(self):
+        """All shots start in |0...0⟩."""
+        sv = BatchedStatevector(3, shots=4)
+        probs = sv.probabilities()
+        self.assertEqual(probs.shape, (4, 8))
+        np.testing.assert_allclose(probs[:, 0], 1.0)
+
+    def test_x_flips_little_endian_bit(self):
+        """X on qubit 1 moves amplitude to basis index 2."""
+        sv = BatchedStatevector(2)
+        sv.apply_gate("X", 1)
+        np.testing.assert_allclose(sv.probabilities()[0], [0, 0, 1, 0])
+
+    def test_bell_state(self):
+        """H + CNOT produces (|00⟩ + |11⟩)/√2."""
+        sv = BatchedStatevector(2)
+        sv.apply_gate("H", 0)
+        sv.apply_cnot(0, 1)
+        np.testing.assert_allclose(sv.probabilities()[0], [0.5, 0, 0, 0.5], atol=1e-12)
+
+    def test_cnot_control_above_target(self):
+        """CNOT works when the control index is higher than the target."""
+        sv = BatchedStatevector(3)
+        sv.apply_gate("X", 2)
+        sv.apply_cnot(2, 0)
+        np.testing.assert_allclose(sv.probabilities()[0][0b101], 1.0)
+
+    def test_swap_and_cz(self):
+        """SWAP exchanges qubits and CZ adds a phase on |11⟩."""
+        sv = BatchedStatevector(2)
+        sv.apply_gate("X", 0)
+        sv.apply_swap(0, 1)
+        np.testing.assert_allclose(sv.probabilities()[0], [0, 0, 1, 0])
+
+        sv = BatchedStatevector(2)
+        sv.apply_gate("X", 0)
+        sv.apply_gate("X", 1)
+        sv.apply_cz(0, 1)
+        self.assertAlmostEqual(sv.state[0, 3], -1.0)
+
+    def test_rotation(self):
+        """RY(π) maps |0⟩ to |1⟩."""
+        sv = BatchedStatevector(1)
+        sv.apply_gate("RY", 0, theta=math.pi)
+        np.testing.assert_allclose(sv.probabilities()[0], [0, 1], atol=1e-12)
+
+    def test_masked_gate(self):
+        """Masked gates only touch selected shots."""
+        sv = BatchedStatevector(1, shots=3)
+        sv.apply_single(0, SINGLE_QUBIT_GATES["X"], np.array([True, False, True]))
+        np.testing.assert_allclose(sv.probabilities()[:, 1], [1, 0, 1])
+
+    def test_masked_ops_in_bounded_groups(self):
+        """Masked gates match per-shot unmasked runs, grouped or row by row."""
+        mask = np.array([True, False, True, True, False, True, True])
+        for scratch in (16, 8, 4):
+            with mock.patch.object(statevector, "SCRATCH_AMPLITUDES", scratch):
+                sv = BatchedStatevector(3, shots=7)
+                sv.apply_gate("H", 0)
+                sv.apply_gate("RY", 2, theta=0.3, mask=mask)
+                sv.apply_cnot(0, 1, mask=mask)
+                sv.apply_swap(1, 2, mask=mask)
+                sv.apply_gate("X", 0)
+                sv.apply_cz(0, 2, mask=mask)
+
+                for shot in range(7):
+                    ref = BatchedStatevector(3)
+                    ref.apply_gate("H", 0)
+                    if mask[shot]:
+                        ref.apply_gate("RY", 2, theta=0.3)
+                        ref.apply_cnot(0, 1)
+                        ref.apply_swap(1, 2)
+                    ref.apply_gate("X", 0)
+                    if mask[shot]:
+                        ref.apply_cz(0, 2)
+                    np.testing.assert_allclose(sv.state[shot], ref.state[0], atol=1e-12)
+
+    def test_measurement_collapse(self):
+        """Measurement collapses and renormalizes each shot."""
+        sv = BatchedStatevector(2, shots=200, rng=np.random.default_rng(1))
+        sv.apply_gate("H", 0)
+        sv.apply_cnot(0, 1)
+        first = sv.measure(0)
+        second = sv.measure(1)
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_allclose(np.linalg.norm(sv.state, axis=1), 1.0)
+        self.assertTrue(0 < first.sum() < 200)
+
+    def test_reset(self):
+        """Reset returns qubits to |0⟩."""
+        sv = BatchedStatevector(1, shots=50, rng=np.random.default_rng(2))
+        sv.apply_gate("H", 0)
+        sv.reset(0)
+        np.testing.assert_allclose(sv.probabilities()[:, 0], 1.0)
+
+
+class TestBatchedShotEngine(unittest.TestCase):
+    """Test multi-shot execution of scheduled nodes."""
+
+    def test_ghz_correlations(self):
+        """GHZ outcomes are perfectly correlated across shots."""
+        nodes = [
+            {"id": "a", "op": "ALLOC_LQ", "vqs": ["q0", "q1", "q2"]},
+            {"id": "h", "op": "APPLY_H", "vqs": ["q0"]},
+            {"id": "c1", "op": "APPLY_CNOT", "vqs": ["q0", "q1"]},
+            {"id": "c2", "op": "APPLY_CNOT", "vqs": ["q1", "q2"]},
+            {"id": "m0", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["e0"]},
+            {"id": "m1", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["e1"]},
+            {"id": "m2", "op": "MEASURE_Z", "vqs": ["q2"], "produces": ["e2"]},
+        ]
+        events = BatchedShotEngine(1000, seed=5).run(nodes)
+
+        self.assertEqual(events["e0"].shape, (1000,))
+        np.testing.assert_array_equal(events["e0"], events["e1"])
+        np.testing.assert_array_equal(events["e1"], events["e2"])
+        self.assertTrue(300 < events["e0"].sum() < 700)
+
+    def test_guard_and_feed_forward(self):
+        """Guarded nodes and COND_PAULI follow each shot's own outcome."""
+        nodes = [
+            {"id": "a", "op": "ALLOC_LQ", "vqs": ["q0", "q1", "q2"]},
+            {"id": "h", "op": "APPLY_H", "vqs": ["q0"]},
+            {"id": "m0", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["e0"]},
+            {"id": "fix", "op": "COND_PAULI", "args": {"mask": "X"},
+             "vqs": ["q1"], "inputs": ["e0"]},
+            {"id": "m1", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["e1"]},
+            {"id": "m2", "op": "MEASURE_Z", "vqs": ["q2"], "produces": ["e2"],
+             "guard": {"event": "e0", "equals": 1}},
+        ]
+        events = BatchedShotEngine(500, seed=9).run(nodes)
+
+        np.testing.assert_array_equal(events["e0"], events["e1"])
+        skipped = events["e0"] == 0
+        self.assertTrue(np.all(events["e2"][skipped] == EVENT_NOT_PRODUCED))
+        self.assertTrue(np.all(events["e2"][~skipped] == 0))
+
+    def test_chunking_preserves_shot_count(self):
+        """Small amplitude budgets split shots into several chunks."""
+        nodes = [
+            {"id": "a", "op": "ALLOC_LQ", "vqs": ["q0", "q1"]},
+            {"id": "x", "op": "APPLY_X", "vqs": ["q1"]},
+            {"id": "m", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["e"]},
+        ]
+        engine = BatchedShotEngine(103, seed=1, max_amplitudes=16)
+        self.assertEqual(engine.chunk_size(2), 4)
+
+        events = engine.run(nodes)
+        self.assertEqual(events["e"].shape, (103,))
+        self.assertTrue(np.all(events["e"] == 1))
+
+    def test_deterministic_with_seed(self):
+        """Same seed gives identical outcome arrays."""
+        nodes = [
+            {"id": "a", "op": "ALLOC_LQ", "vqs": ["q0"]},
+            {"id": "h", "op": "APPLY_H", "vqs": ["q0"]},
+            {"id": "m", "op": "MEASURE_X", "vqs": ["q0"], "produces": ["e"]},
+        ]
+        first = BatchedShotEngine(64, seed=3).run(nodes)["e"]
+        second = BatchedShotEngine(64, seed=3).run(nodes)["e"]
+        np.testing.assert_array_equal(first, second)
+        # |+⟩ measured in X is deterministic
+        self.assertTrue(np.all(first == 0))
+
+
+class TestHandleFlowScheduling(unittest.TestCase):
+    """Test that scheduling respects per-qubit program order."""
+
+    def test_measurement_waits_for_correction(self):
+        """A measurement listed after COND_PAULI stays after it."""
+        nodes = [
+            {"id": "m0", "op": "MEASURE_Z", "vqs": ["a"], "produces": ["e"]},
+            {"id": "fix", "op": "COND_PAULI", "vqs": ["b"], "inputs": ["e"]},
+            {"id": "m1", "op": "MEASURE_Z", "vqs": ["b"], "produces": ["f"]},
+        ]
+        order = [n["id"] for n in topo_schedule(nodes)]
+        self.assertEqual(order, ["m0", "fix", "m1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
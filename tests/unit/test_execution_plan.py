@@ -0,0 +1,194 @@
+"""
+Unit tests for compiled execution plans and the plan cache
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from kernel.executor.execution_plan import (
+    ExecutionPlanCache,
+    compile_guard,
+    compile_plan,
+    graph_content_hash,
+    plan_cache_key,
+    OP_ALLOC,
+    OP_FENCE,
+    OP_GATE,
+    OP_MEASURE,
+)
+from tests.test_helpers import create_test_executor
+from tests.unit.test_statevector_backend import ghz_graph
+
+
+class TestCompilePlan(unittest.TestCase):
+    """Test graph compilation."""
+
+    def test_opcodes_and_gates(self):
+        """Steps carry integer opcodes and gate names."""
+        plan = compile_plan(ghz_graph(3), key="k")
+        self.assertEqual([s.opcode for s in plan.steps[:3]], [OP_ALLOC, OP_GATE, OP_GATE])
+        self.assertEqual(plan.steps[-1].opcode, OP_MEASURE)
+        self.assertEqual(plan.steps[1].gate, "H")
+        self.assertEqual(plan.key, "k")
+
+    def test_unknown_operation(self):
+        """Unknown operations fail at compile time."""
+        graph = {"program": {"nodes": [{"id": "x", "op": "WARP"}]}}
+        with self.assertRaises(RuntimeError):
+            compile_plan(graph)
+
+    def test_plan_isolated_from_graph_mutation(self):
+        """Mutating the submitted graph does not change the plan."""
+        graph = ghz_graph(2)
+        plan = compile_plan(graph)
+        graph["program"]["nodes"][1]["op"] = "APPLY_X"
+        self.assertEqual(plan.steps[1].node["op"], "APPLY_H")
+
+    def test_guards(self):
+        """Compiled guards match simple, and/or semantics."""
+        simple = compile_guard({"event": "a", "equals": 1})
+        self.assertTrue(simple({"a": 1}))
+        self.assertFalse(simple({"a": 0}))
+        self.assertFalse(simple({}))
+
+        both = compile_guard({"type": "and", "conditions": [
+            {"event": "a", "equals": 1}, {"event": "b", "equals": 0}]})
+        either = compile_guard({"type": "or", "conditions": [
+            {"event": "a", "equals": 1}, {"event": "b", "equals": 1}]})
+        self.assertTrue(both({"a": 1, "b": 0}))
+        self.assertFalse(both({"a": 1, "b": 1}))
+        self.assertTrue(either({"a": 0, "b": 1}))
+        self.assertFalse(either({"a": 0, "b": 0}))
+        self.assertIsNone(compile_guard(None))
+
+
+class TestExecutionPlanCache(unittest.TestCase):
+    """Test LRU behaviour and keys."""
+
+    def test_content_hash_ignores_key_order(self):
+        """Canonical hashing is independent of dictionary order."""
+        self.assertEqual(graph_content_hash({"a": 1, "b": [1, 2]}),
+                         graph_content_hash({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(plan_cache_key({"a": 1}, ("tok1",)),
+                            plan_cache_key({"a": 1}, ("tok2",)))
+
+    def test_lru_eviction(self):
+        """Least recently used plans are evicted first."""
+        cache = ExecutionPlanCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.put(compile_plan(ghz_graph(2), key=key))
+        cache.get("a")
+        cache.put(compile_plan(ghz_graph(2), key="c"))
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_disabled(self):
+        """A zero-sized cache stores nothing."""
+        cache = ExecutionPlanCache(max_entries=0)
+        cache.put(compile_plan(ghz_graph(2), key="a"))
+        self.assertEqual(len(cache), 0)
+
+
+class TestExecutorPlanReuse(unittest.TestCase):
+    """Test EnhancedExecutor plan caching."""
+
+    def test_resubmission_skips_verification(self):
+        """Only the first submission of a graph is certified."""
+        executor = create_test_executor(seed=3)
+        graph = ghz_graph(3)
+
+        with mock.patch.object(executor.static_verifier, "certify_graph",
+                               wraps=executor.static_verifier.certify_graph) as certify:
+            first = executor.execute(graph)
+            second = executor.execute(ghz_graph(3))
+
+        self.assertEqual(certify.call_count, 1)
+        self.assertEqual(set(first["events"]), set(second["events"]))
+        self.assertEqual(executor.plan_cache.get_stats()["hits"], 1)
+
+    def test_capability_change_invalidates(self):
+        """Changing declared capabilities forces recompilation."""
+        executor = create_test_executor(seed=3)
+        graph = ghz_graph(2)
+        executor.execute(graph)
+
+        executor.caps["CAP_MEASURE"] = False
+        graph["caps"] = ["CAP_ALLOC"]
+        with self.assertRaises(RuntimeError):
+            executor.execute(graph)
+        self.assertEqual(executor.plan_cache.get_stats()["misses"], 2)
+
+    def test_cached_plan_still_checks_capabilities(self):
+        """Capability errors are reported on every run of a cached plan."""
+        executor = create_test_executor(seed=3, caps={"CAP_MEASURE": False},
+                                        require_certification=False)
+        graph = ghz_graph(2)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                executor.execute(graph)
+
+
+    def test_progress_callback(self):
+        """Progress is reported at fences and measurements, ending with the last step."""
+        executor = create_test_executor(seed=3)
+        graph = ghz_graph(2)
+        graph["program"]["nodes"].insert(3, {"id": "fence", "op": "FENCE_EPOCH"})
+        reports = []
+        executor.progress_callback = lambda progress, events: reports.append((progress, events))
+
+        result = executor.execute(graph)
+
+        self.assertEqual(len(reports), 3)
+        streamed = {}
+        for _, events in reports:
+            streamed.update(events)
+        self.assertEqual(streamed, result["events"])
+        final = reports[-1][0]
+        self.assertEqual(final, {"current_epoch": 2, "total_epochs": 2,
+                                 "nodes_executed": 6, "nodes_total": 6})
+    def test_fences_close_their_epoch(self):
+        """Fences run after their epoch's nodes, so progress interleaves with events."""
+        executor = create_test_executor(seed=3)
+        graph = two_epoch_graph()
+        reports = []
+        executor.progress_callback = lambda progress, events: reports.append((progress, events))
+
+        plan = compile_plan(graph, key="k")
+        self.assertEqual([s.node_id for s in plan.steps],
+                         ["alloc", "h0", "m0", "fence", "h1", "m1"])
+        self.assertEqual(plan.steps[3].opcode, OP_FENCE)
+
+        executor.execute(graph)
+
+        self.assertEqual([(p["current_epoch"], sorted(e)) for p, e in reports],
+                         [(0, ["e0"]), (1, []), (2, ["e1"])])
+        self.assertEqual(reports[-1][0]["nodes_executed"], 6)
+
+
+def two_epoch_graph() -> dict:
+    """Build a graph measuring q0 in the first epoch and q1 in the second."""
+    nodes = [
+        {"id": "alloc", "op": "ALLOC_LQ", "args": {"n": 2, "profile": "logical:surface_code(d=3)"},
+         "vqs": ["q0", "q1"], "caps": ["CAP_ALLOC"]},
+        {"id": "h0", "op": "APPLY_H", "vqs": ["q0"]},
+        {"id": "m0", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["e0"]},
+        {"id": "fence", "op": "FENCE_EPOCH"},
+        {"id": "h1", "op": "APPLY_H", "vqs": ["q1"]},
+        {"id": "m1", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["e1"]},
+    ]
+    return {
+        "version": "0.1",
+        "program": {"nodes": nodes},
+        "resources": {"vqs": ["q0", "q1"], "chs": [], "events": ["e0", "e1"]},
+        "caps": ["CAP_ALLOC"]
+    }
+
+
+if __name__ == "__main__":
+    unittest.main()
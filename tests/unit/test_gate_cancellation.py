@@ -130,6 +130,52 @@ class TestGateCancellation(unittest.TestCase):
         
         self.assertEqual(result.get_gate_count(), 2)  # No cancellation
     
+    def test_cancellation_across_other_qubits(self):
+        """Test that gates on other qubits in between don't block cancellation."""
+        circuit = QIRCircuit()
+        q0 = circuit.add_qubit('q0')
+        q1 = circuit.add_qubit('q1')
+        
+        # S(q0) → X(q1) → S†(q0): adjacent on q0's wire
+        circuit.add_instruction(QIRInstruction(InstructionType.H, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.S, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.X, [q1]))
+        circuit.add_instruction(QIRInstruction(InstructionType.SDG, [q0]))
+        
+        opt_pass = GateCancellationPass()
+        result = opt_pass.run(circuit)
+        
+        self.assertEqual(
+            [inst.inst_type for inst in result.instructions],
+            [InstructionType.H, InstructionType.X]
+        )
+    
+    def test_cancellation_across_commuting_gates(self):
+        """Test that gates both partners commute with don't block cancellation."""
+        circuit = QIRCircuit()
+        q0 = circuit.add_qubit('q0')
+        q1 = circuit.add_qubit('q1')
+        q2 = circuit.add_qubit('q2')
+        
+        for q in (q0, q1, q2):
+            circuit.add_instruction(QIRInstruction(InstructionType.H, [q]))
+        # Z → S → Z on q0 leaves S; CNOTs sharing a control commute
+        circuit.add_instruction(QIRInstruction(InstructionType.Z, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.S, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.Z, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q1]))
+        circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q2]))
+        circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q1]))
+        
+        opt_pass = GateCancellationPass()
+        result = opt_pass.run(circuit)
+        
+        self.assertEqual(
+            [(inst.inst_type, inst.qubits) for inst in result.instructions[3:]],
+            [(InstructionType.S, [q0]), (InstructionType.CNOT, [q0, q2])]
+        )
+        self.assertEqual(opt_pass.metrics.cnot_removed, 2)
+    
     def test_multiple_cancellations(self):
         """Test multiple cancellations in one circuit."""
         circuit = QIRCircuit()
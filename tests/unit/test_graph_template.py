@@ -0,0 +1,120 @@
+"""
+Unit tests for parameterized graph templates and shared certification
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from kernel.executor.graph_template import GraphTemplate, template_structure
+from tests.test_helpers import create_test_executor
+
+
+def ansatz_template():
+    """Two-qubit VQE-style template with three angle parameters."""
+    return {
+        "version": "0.1",
+        "program": {"nodes": [
+            {"id": "alloc", "op": "ALLOC_LQ", "args": {"n": 2}, "vqs": ["q0", "q1"]},
+            {"id": "h0", "op": "APPLY_H", "vqs": ["q0"]},
+            {"id": "rz0", "op": "APPLY_RZ", "args": {"theta": {"param": "theta1"}}, "vqs": ["q0"]},
+            {"id": "rz1", "op": "APPLY_RZ", "args": {"theta": {"param": "theta2"}}, "vqs": ["q1"]},
+            {"id": "cnot", "op": "APPLY_CNOT", "vqs": ["q0", "q1"]},
+            {"id": "rz2", "op": "APPLY_RZ", "args": {"theta": {"param": "theta1"}}, "vqs": ["q0"]},
+            {"id": "m0", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["m0"]},
+            {"id": "m1", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["m1"]},
+        ]},
+        "resources": {"vqs": ["q0", "q1"], "chs": [], "events": ["m0", "m1"]},
+        "caps": ["CAP_ALLOC", "CAP_COMPUTE", "CAP_MEASURE"],
+    }
+
+
+class TestGraphTemplate(unittest.TestCase):
+    """Test template parsing and binding."""
+
+    def test_bind(self):
+        """Rows fill every slot and leave the template untouched."""
+        template = GraphTemplate(ansatz_template())
+        self.assertEqual(template.parameters, ["theta1", "theta2"])
+
+        bound = template.bind({"theta1": 0.5, "theta2": 1})
+        nodes = bound["program"]["nodes"]
+        self.assertEqual(nodes[2]["args"]["theta"], 0.5)
+        self.assertEqual(nodes[3]["args"]["theta"], 1.0)
+        self.assertEqual(nodes[5]["args"]["theta"], 0.5)
+        # Unchanged nodes are shared, changed ones are copies
+        self.assertIs(nodes[1], template.graph["program"]["nodes"][1])
+        self.assertEqual(template.graph["program"]["nodes"][2]["args"]["theta"],
+                         {"param": "theta1"})
+
+    def test_bad_rows(self):
+        """Missing, unknown and non-numeric values are rejected."""
+        template = GraphTemplate(ansatz_template())
+        for row in ({"theta1": 0.1}, {"theta1": 0.1, "theta2": 0.2, "x": 1},
+                    {"theta1": "0.1", "theta2": 0.2}, {"theta1": True, "theta2": 0.2}):
+            with self.assertRaises(ValueError):
+                template.bind(row)
+
+    def test_placeholder_only_in_angles(self):
+        """Non-angle arguments cannot be parameters."""
+        graph = ansatz_template()
+        graph["program"]["nodes"][0]["args"]["n"] = {"param": "n"}
+        with self.assertRaises(ValueError):
+            GraphTemplate(graph)
+
+    def test_structure_recovery(self):
+        """Bindings map back to the template; tampering breaks the match."""
+        template = GraphTemplate(ansatz_template())
+        bound = template.bind({"theta1": 0.5, "theta2": 0.25})
+        self.assertEqual(template_structure(bound), template.graph)
+        self.assertIsNone(template_structure(ansatz_template()))
+
+        tampered = template.bind({"theta1": 0.5, "theta2": 0.25})
+        tampered["program"]["nodes"][0] = dict(tampered["program"]["nodes"][0], op="FREE_LQ")
+        self.assertIsNone(template_structure(tampered))
+
+        renamed = template.bind({"theta1": 0.5, "theta2": 0.25})
+        renamed["template"]["slots"].append(["alloc", "n", "n"])
+        self.assertIsNone(template_structure(renamed))
+
+
+class TestSharedCertification(unittest.TestCase):
+    """Test that bindings of one template are certified once."""
+
+    def test_bindings_certified_once(self):
+        """Only the first binding runs static verification."""
+        executor = create_test_executor(seed=1)
+        template = GraphTemplate(ansatz_template())
+
+        with mock.patch.object(executor.static_verifier, "certify_graph",
+                               wraps=executor.static_verifier.certify_graph) as certify:
+            for k in range(5):
+                result = executor.execute(template.bind({"theta1": 0.1 * k, "theta2": 0.3}))
+                self.assertEqual(set(result["events"]), {"m0", "m1"})
+
+        self.assertEqual(certify.call_count, 1)
+        self.assertEqual(executor.plan_cache.get_stats()["template_hits"], 4)
+
+    def test_rejected_template_not_cached(self):
+        """A binding that fails verification is re-verified every time."""
+        executor = create_test_executor(seed=1)
+        graph = ansatz_template()
+        # Use q1 after freeing it: a linearity violation
+        graph["program"]["nodes"].insert(5, {"id": "free", "op": "FREE_LQ", "vqs": ["q1"]})
+        template = GraphTemplate(graph)
+
+        with mock.patch.object(executor.static_verifier, "certify_graph",
+                               wraps=executor.static_verifier.certify_graph) as certify:
+            for _ in range(2):
+                with self.assertRaises(Exception):
+                    executor.execute(template.bind({"theta1": 0.1, "theta2": 0.2}))
+
+        self.assertEqual(certify.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
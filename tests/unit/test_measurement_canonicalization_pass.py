@@ -209,6 +209,28 @@ class TestMeasurementCanonicalizationPass(unittest.TestCase):
         
         # Should detect potential for canonicalization
         self.assertGreater(benefit, 0)
+    
+    def test_estimate_benefit_follows_wires(self):
+        """Gates on other qubits do not hide a pattern."""
+        q0 = QIRQubit("q0", 0)
+        q1 = QIRQubit("q1", 1)
+        
+        circuit = QIRCircuit()
+        circuit.add_qubit(q0)
+        circuit.add_qubit(q1)
+        circuit.add_instruction(QIRInstruction(InstructionType.SDG, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.X, [q1]))
+        circuit.add_instruction(QIRInstruction(InstructionType.H, [q0]))
+        circuit.add_instruction(QIRInstruction(InstructionType.X, [q1]))
+        circuit.add_instruction(QIRInstruction(
+            InstructionType.MEASURE,
+            [q0],
+            params={'basis': 'Z'},
+            result='m0'
+        ))
+        
+        pass_obj = MeasurementCanonicalizationPass()
+        self.assertEqual(pass_obj.estimate_benefit(circuit), 2.5)
 
 
 if __name__ == '__main__':
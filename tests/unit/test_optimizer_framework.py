@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Tests for optimization framework."""
 
+import random
 import unittest
 import sys
 from pathlib import Path
@@ -11,8 +12,10 @@ sys.path.insert(0, str(ROOT))
 from qir.optimizer import (
     QIRCircuit, QIRInstruction, QIRQubit,
     InstructionType, OptimizationPass, PassManager,
-    OptimizationMetrics
+    OptimizationMetrics, CircuitDAG, run_pass
 )
+from qir.optimizer.passes import GateCancellationPass, GateFusionPass
+from qir.optimizer_integration import OptimizedExecutor, OptimizationLevel
 
 
 class TestQIRCircuit(unittest.TestCase):
@@ -81,6 +84,218 @@ class TestQIRCircuit(unittest.TestCase):
         self.assertIsNot(cloned, circuit)
 
 
+class TestInstructionNodes(unittest.TestCase):
+    """Test the linked instruction store and per-qubit wires."""
+    
+    def setUp(self):
+        self.circuit = QIRCircuit()
+        self.q0 = self.circuit.add_qubit('q0')
+        self.q1 = self.circuit.add_qubit('q1')
+    
+    def _add(self, inst_type, *qubits, result=None):
+        return self.circuit.append(QIRInstruction(inst_type, list(qubits), result=result))
+    
+    def _types(self):
+        return [inst.inst_type for inst in self.circuit.instructions]
+    
+    def test_wire_neighbours(self):
+        """next_on/prev_on skip instructions on other qubits."""
+        h = self._add(InstructionType.H, self.q0)
+        x = self._add(InstructionType.X, self.q1)
+        cnot = self._add(InstructionType.CNOT, self.q0, self.q1)
+        
+        self.assertIs(h.next_on(self.q0), cnot)
+        self.assertIs(x.next_on(self.q1), cnot)
+        self.assertIs(cnot.prev_on(self.q0), h)
+        self.assertIsNone(cnot.wire_predecessor())
+        self.assertIs(h.wire_successor(), cnot)
+        self.assertIs(self.circuit.first_on(self.q1), x)
+        self.assertIs(self.circuit.last_on(self.q0), cnot)
+        self.assertEqual(list(self.circuit.wire(self.q0)), [h, cnot])
+    
+    def test_remove_relinks_wires(self):
+        """Removing a node joins its wire neighbours."""
+        h1 = self._add(InstructionType.H, self.q0)
+        x = self._add(InstructionType.X, self.q0)
+        h2 = self._add(InstructionType.H, self.q0)
+        
+        self.circuit.remove(x)
+        
+        self.assertIs(h1.wire_successor(), h2)
+        self.assertEqual(self._types(), [InstructionType.H, InstructionType.H])
+        self.assertEqual(self.circuit.get_instruction_count(), 2)
+        with self.assertRaises(ValueError):
+            self.circuit.remove(x)
+    
+    def test_insert_between_uses(self):
+        """Inserted nodes find their wire neighbours."""
+        h = self._add(InstructionType.H, self.q0)
+        y = self._add(InstructionType.Y, self.q1)
+        m = self._add(InstructionType.MEASURE, self.q0, result='m0')
+        
+        z = self.circuit.insert_after(y, QIRInstruction(InstructionType.Z, [self.q0]))
+        
+        self.assertIs(h.next_on(self.q0), z)
+        self.assertIs(z.next_on(self.q0), m)
+        self.assertEqual(self._types(), [InstructionType.H, InstructionType.Y,
+                                         InstructionType.Z, InstructionType.MEASURE])
+        self.assertLess(y.order, z.order)
+        self.assertLess(z.order, m.order)
+    
+    def test_order_labels_renumber(self):
+        """Repeated insertion at one spot keeps labels ordered."""
+        last = self._add(InstructionType.H, self.q0)
+        first = self.circuit.insert_before(last, QIRInstruction(InstructionType.X, [self.q0]))
+        for _ in range(40):
+            self.circuit.insert_after(first, QIRInstruction(InstructionType.Z, [self.q0]))
+        
+        nodes = list(self.circuit.nodes())
+        orders = [node.order for node in nodes]
+        self.assertEqual(orders, sorted(set(orders)))
+        self.assertEqual(list(self.circuit.wire(self.q0)), nodes)
+    
+    def test_remove_while_iterating(self):
+        """Passes can remove nodes while walking the circuit."""
+        for _ in range(3):
+            self._add(InstructionType.H, self.q0)
+            self._add(InstructionType.X, self.q1)
+        
+        for node in self.circuit.nodes():
+            if node.instruction.inst_type == InstructionType.H:
+                self.circuit.remove(node)
+        
+        self.assertEqual(self._types(), [InstructionType.X] * 3)
+        self.assertIsNone(self.circuit.first_on(self.q0))
+    
+    def test_result_refcounts(self):
+        """Result registers stay listed while any instruction writes them."""
+        m1 = self._add(InstructionType.MEASURE, self.q0, result='m')
+        m2 = self._add(InstructionType.MEASURE, self.q1, result='m')
+        
+        self.circuit.remove(m1)
+        self.assertIn('m', self.circuit.results)
+        self.circuit.remove(m2)
+        self.assertNotIn('m', self.circuit.results)
+    
+    def test_index_api_compatibility(self):
+        """Index-based editing still works on top of the node store."""
+        self._add(InstructionType.H, self.q0)
+        self._add(InstructionType.CNOT, self.q0, self.q1)
+        self.circuit.insert_instruction(1, QIRInstruction(InstructionType.X, [self.q1]))
+        self.circuit.remove_instruction(0)
+        
+        self.assertEqual(self._types(), [InstructionType.X, InstructionType.CNOT])
+        self.assertEqual(self.circuit.get_qubit_uses(self.q1), [0, 1])
+        self.assertEqual(self.circuit.get_qubit_last_use(self.q0), 1)
+        
+        self.circuit.instructions = [QIRInstruction(InstructionType.Z, [self.q0])]
+        self.assertEqual(self._types(), [InstructionType.Z])
+        self.assertIsNone(self.circuit.first_on(self.q1))
+
+
+class TestCircuitDAG(unittest.TestCase):
+    """Test the commutation-aware DAG view."""
+    
+    def setUp(self):
+        self.circuit = QIRCircuit()
+        self.q0 = self.circuit.add_qubit('q0')
+        self.q1 = self.circuit.add_qubit('q1')
+        self.q2 = self.circuit.add_qubit('q2')
+    
+    def _add(self, inst_type, *qubits):
+        return self.circuit.append(QIRInstruction(inst_type, list(qubits)))
+    
+    def _partition(self, dag, qubit):
+        return [(group.kind, sorted(node.order for node in group.nodes))
+                for group in dag.commutation_groups(qubit)]
+    
+    def test_commutation_groups(self):
+        """Runs of same-basis uses share a group on each wire."""
+        z = self._add(InstructionType.Z, self.q0)
+        s = self._add(InstructionType.S, self.q0)
+        h = self._add(InstructionType.H, self.q0)
+        x = self._add(InstructionType.X, self.q1)
+        cnot = self._add(InstructionType.CNOT, self.q0, self.q1)
+        t = self._add(InstructionType.T, self.q0)
+        dag = self.circuit.dag()
+        
+        self.assertIs(dag.group(z, self.q0), dag.group(s, self.q0))
+        self.assertFalse(dag.commute_on(s, h, self.q0))
+        self.assertTrue(dag.commute_on(cnot, t, self.q0))
+        self.assertTrue(dag.commute_on(x, cnot, self.q1))
+        self.assertEqual([g.kind for g in dag.commutation_groups(self.q0)], ['Z', None, 'Z'])
+        self.assertEqual(dag.two_qubit_gate_count(self.q1), 1)
+    
+    def test_front_layer_and_layers(self):
+        """Front layer follows removals; layers are ASAP levels."""
+        h = self._add(InstructionType.H, self.q0)
+        x = self._add(InstructionType.X, self.q1)
+        cnot = self._add(InstructionType.CNOT, self.q0, self.q1)
+        dag = self.circuit.dag()
+        
+        self.assertEqual(dag.front_layer(), [h, x])
+        self.assertEqual(dag.layers(), [[h, x], [cnot]])
+        self.circuit.remove(h)
+        self.circuit.remove(x)
+        self.assertEqual(dag.front_layer(), [cnot])
+        self.assertEqual(dag.predecessors(cnot), [])
+    
+    def test_mates_skip_commuting_gates(self):
+        """Partners are found across gates they commute with, not past others."""
+        z1 = self._add(InstructionType.Z, self.q0)
+        self._add(InstructionType.CZ, self.q0, self.q1)
+        z2 = self._add(InstructionType.Z, self.q0)
+        self._add(InstructionType.H, self.q0)
+        self._add(InstructionType.Z, self.q0)
+        dag = self.circuit.dag()
+        
+        self.assertIn(z2, list(dag.mates(z1)))
+        self.assertEqual(list(dag.mates(z2))[-1].instruction.inst_type, InstructionType.H)
+    
+    def test_incremental_updates_match_rebuild(self):
+        """Groups kept up to date by edits equal a fresh build."""
+        rng = random.Random(7)
+        gate_types = [InstructionType.Z, InstructionType.T, InstructionType.X,
+                      InstructionType.H, InstructionType.RZ]
+        dag = self.circuit.dag()
+        qubits = [self.q0, self.q1, self.q2]
+        
+        for _ in range(300):
+            nodes = list(self.circuit.nodes())
+            if nodes and rng.random() < 0.35:
+                self.circuit.remove(rng.choice(nodes))
+                continue
+            if rng.random() < 0.4:
+                a, b = rng.sample(qubits, 2)
+                inst = QIRInstruction(rng.choice([InstructionType.CNOT, InstructionType.CZ]), [a, b])
+            else:
+                inst = QIRInstruction(rng.choice(gate_types), [rng.choice(qubits)])
+            if nodes:
+                self.circuit.insert_before(rng.choice(nodes), inst)
+            else:
+                self.circuit.append(inst)
+        
+        fresh = CircuitDAG(self.circuit)
+        for qubit in qubits:
+            self.assertEqual(self._partition(dag, qubit), self._partition(fresh, qubit))
+            self.assertEqual(dag.two_qubit_gate_count(qubit), fresh.two_qubit_gate_count(qubit))
+        self.assertEqual(dag.front_layer(), fresh.front_layer())
+    
+    def test_run_pass_releases_dag(self):
+        """run_pass drops the view; a bare run leaves it for the next pass."""
+        self._add(InstructionType.Z, self.q0)
+        self._add(InstructionType.S, self.q0)
+        self._add(InstructionType.Z, self.q0)
+        
+        run_pass(GateCancellationPass(), self.circuit)
+        self.assertEqual(self.circuit.get_gate_count(), 1)
+        self.assertFalse(self.circuit.has_dag)
+        
+        dag = self.circuit.dag()
+        GateCancellationPass().run(self.circuit)
+        self.assertIs(self.circuit.dag(), dag)
+
+
 class TestQIRInstruction(unittest.TestCase):
     """Test IR instruction representation."""
     
@@ -137,6 +352,24 @@ class DummyPass(OptimizationPass):
         return circuit
 
 
+class PeelPass(OptimizationPass):
+    """Removes the first X on q1 per run and records its scope."""
+    
+    incremental = True
+    
+    def __init__(self):
+        super().__init__("PeelPass")
+        self.scopes = []
+    
+    def run(self, circuit: QIRCircuit) -> QIRCircuit:
+        self.scopes.append(None if self.scope is None else {q.id for q in self.scope})
+        for node in self.scope_nodes(circuit, self.scope):
+            if node.instruction.inst_type == InstructionType.X:
+                circuit.remove(node)
+                break
+        return circuit
+
+
 class TestPassManager(unittest.TestCase):
     """Test pass manager."""
     
@@ -174,6 +407,65 @@ class TestPassManager(unittest.TestCase):
         manager.run(circuit)
         
         self.assertEqual(pass1.run_count, 0)  # Should not run
+    
+    def test_fixed_point_reruns_until_converged(self):
+        """Passes re-run while another pass keeps exposing work."""
+        def build():
+            circuit = QIRCircuit()
+            q0 = circuit.add_qubit('q0')
+            for inst_type in (InstructionType.H, InstructionType.T,
+                              InstructionType.T, InstructionType.SDG):
+                circuit.add_instruction(QIRInstruction(inst_type, [q0]))
+            return circuit
+        
+        # T·T fuses into S, which only then cancels against S†
+        once = PassManager([GateCancellationPass(), GateFusionPass()]).run(build())
+        self.assertEqual(once.get_gate_count(), 3)
+        
+        manager = PassManager([GateCancellationPass(), GateFusionPass()], fixed_point=True)
+        result = manager.run(build())
+        self.assertEqual([inst.inst_type for inst in result.instructions], [InstructionType.H])
+        
+        summary = manager.get_summary()
+        self.assertTrue(summary['converged'])
+        self.assertGreater(summary['passes'][0]['runs'], 1)
+        self.assertGreater(summary['passes'][1]['skipped'], 0)
+        self.assertGreaterEqual(summary['passes'][0]['time_ms'], 0.0)
+    
+    def test_fixed_point_restricts_to_changed_wires(self):
+        """Incremental passes are re-run on the wires that changed."""
+        circuit = QIRCircuit()
+        q0 = circuit.add_qubit('q0')
+        q1 = circuit.add_qubit('q1')
+        circuit.add_instruction(QIRInstruction(InstructionType.H, [q0]))
+        for _ in range(2):
+            circuit.add_instruction(QIRInstruction(InstructionType.X, [q1]))
+        
+        peel = PeelPass()
+        manager = PassManager([peel], fixed_point=True)
+        manager.run(circuit)
+        
+        self.assertEqual(peel.scopes, [None, {'q1'}, {'q1'}])
+        self.assertEqual(circuit.get_gate_count(), 1)
+        self.assertIsNone(peel.scope)
+    
+    def test_time_budget(self):
+        """No pass starts once the time budget is spent."""
+        pass1 = DummyPass()
+        manager = PassManager([pass1], fixed_point=True, time_budget_ms=0)
+        manager.run(QIRCircuit())
+        
+        self.assertEqual(pass1.run_count, 0)
+        self.assertFalse(manager.get_summary()['converged'])
+    
+    def test_aggressive_level_passes(self):
+        """AGGRESSIVE runs the STANDARD passes to a fixed point."""
+        standard = OptimizedExecutor(None, OptimizationLevel.STANDARD).pass_manager
+        aggressive = OptimizedExecutor(None, OptimizationLevel.AGGRESSIVE).pass_manager
+        
+        self.assertTrue(aggressive.fixed_point)
+        self.assertFalse(standard.fixed_point)
+        self.assertEqual([type(p) for p in aggressive.passes], [type(p) for p in standard.passes])
 
 
 class TestOptimizationMetrics(unittest.TestCase):
@@ -17,7 +17,9 @@ from kernel.simulator.qec_profiles import (
     bacon_shor_code,
     parse_profile_string,
     get_profile,
+    register_logical_error_model,
 )
+from kernel.qec import LogicalErrorModel
 
 
 class TestQECProfile(unittest.TestCase):
@@ -51,6 +53,21 @@ class TestQECProfile(unittest.TestCase):
         self.assertLess(error_rate, 1e-3)
         self.assertGreater(error_rate, 0)
     
+    def test_fitted_logical_error_model(self):
+        """Test that a fitted model replaces the threshold formula."""
+        model = LogicalErrorModel(prefactor=0.1, threshold=0.01)
+        expected = model.predict(9, 1e-3)
+        
+        profile = surface_code(distance=9, gate_error=1e-3, logical_error_model=model)
+        self.assertAlmostEqual(profile.logical_error_rate(), expected)
+        
+        register_logical_error_model("surface_code", model)
+        try:
+            self.assertAlmostEqual(surface_code(9, 1e-3).logical_error_rate(), expected)
+        finally:
+            register_logical_error_model("surface_code", None)
+        self.assertAlmostEqual(surface_code(9, 1e-3).logical_error_rate(), (0.1) ** 5)
+    
     def test_to_dict(self):
         """Test conversion to dictionary."""
         profile = surface_code(distance=7)
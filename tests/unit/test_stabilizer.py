@@ -0,0 +1,203 @@
+"""
+Unit tests for the stabilizer tableau, its backend and auto-selection
+"""
+
+import unittest
+import sys
+import os
+import math
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from kernel.simulator.stabilizer import StabilizerTableau, is_clifford_graph
+from kernel.simulator.statevector import BatchedStatevector
+from kernel.simulator.batched_engine import BatchedShotEngine
+from kernel.executor.stabilizer_backend import StabilizerBackend
+from kernel.executor.statevector_backend import StatevectorBackend
+from tests.test_helpers import create_test_executor
+from tests.unit.test_statevector_backend import ghz_graph
+
+
+TELEPORT_NODES = [
+    {"id": "a", "op": "ALLOC_LQ", "vqs": ["msg", "alice", "bob"]},
+    {"id": "prep", "op": "APPLY_X", "vqs": ["msg"]},
+    {"id": "h", "op": "APPLY_H", "vqs": ["alice"]},
+    {"id": "c", "op": "APPLY_CNOT", "vqs": ["alice", "bob"]},
+    {"id": "bc", "op": "APPLY_CNOT", "vqs": ["msg", "alice"]},
+    {"id": "bh", "op": "APPLY_H", "vqs": ["msg"]},
+    {"id": "m1", "op": "MEASURE_Z", "vqs": ["msg"], "produces": ["m_msg"]},
+    {"id": "m2", "op": "MEASURE_Z", "vqs": ["alice"], "produces": ["m_alice"]},
+    {"id": "fx", "op": "COND_PAULI", "args": {"mask": "X"}, "vqs": ["bob"], "inputs": ["m_alice"]},
+    {"id": "fz", "op": "COND_PAULI", "args": {"mask": "Z"}, "vqs": ["bob"], "inputs": ["m_msg"]},
+    {"id": "v", "op": "MEASURE_Z", "vqs": ["bob"], "produces": ["m_bob"]},
+]
+
+
+class TestStabilizerTableau(unittest.TestCase):
+    """Test tableau gate and measurement updates."""
+
+    def test_initial_state_measures_zero(self):
+        """|0...0⟩ measures 0 deterministically."""
+        tab = StabilizerTableau(3, shots=8)
+        for q in range(3):
+            np.testing.assert_array_equal(tab.measure(q), 0)
+
+    def test_bell_correlations(self):
+        """H + CNOT gives random but correlated outcomes per shot."""
+        tab = StabilizerTableau(2, shots=500, rng=np.random.default_rng(3))
+        tab.apply_gate("H", 0)
+        tab.apply_cnot(0, 1)
+        first = tab.measure(0)
+        second = tab.measure(1)
+        np.testing.assert_array_equal(first, second)
+        self.assertTrue(150 < first.sum() < 350)
+
+    def test_phase_gates(self):
+        """H S S H = X and S SDG = I."""
+        tab = StabilizerTableau(2)
+        for gate in ("H", "S", "S", "H"):
+            tab.apply_gate(gate, 0)
+        tab.apply_gate("S", 1)
+        tab.apply_gate("SDG", 1)
+        self.assertEqual(tab.measure(0)[0], 1)
+        self.assertEqual(tab.measure(1)[0], 0)
+
+    def test_masked_pauli(self):
+        """Pauli gates may target a subset of shots."""
+        tab = StabilizerTableau(1, shots=4)
+        tab.apply_gate("X", 0, mask=np.array([True, False, False, True]))
+        np.testing.assert_array_equal(tab.measure(0), [1, 0, 0, 1])
+
+    def test_masked_clifford_rejected(self):
+        """Non-Pauli gates cannot split the shared tableau."""
+        tab = StabilizerTableau(2, shots=2)
+        with self.assertRaises(ValueError):
+            tab.apply_gate("H", 0, mask=np.array([True, False]))
+        with self.assertRaises(ValueError):
+            tab.apply_gate("T", 0)
+
+    def test_matches_statevector(self):
+        """Random Clifford circuits agree with the statevector on every outcome."""
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            n = int(rng.integers(1, 5))
+            sv = BatchedStatevector(n)
+            tab = StabilizerTableau(n, rng=rng)
+            for _ in range(20):
+                kind = rng.integers(4)
+                if kind == 3 or n == 1:
+                    q = int(rng.integers(n))
+                    outcome = int(tab.measure(q)[0])
+                    # The tableau outcome must be possible; collapse the statevector onto it
+                    selected = ((np.arange(1 << n) >> q) & 1) == outcome
+                    prob = float(np.sum(np.abs(sv.state[0, selected]) ** 2))
+                    self.assertGreater(prob, 1e-9)
+                    sv.state[0, ~selected] = 0
+                    sv.state[0] /= math.sqrt(prob)
+                elif kind == 2:
+                    gate = str(rng.choice(["H", "S", "SDG", "X", "Y", "Z"]))
+                    q = int(rng.integers(n))
+                    sv.apply_gate(gate, q)
+                    tab.apply_gate(gate, q)
+                else:
+                    gate = str(rng.choice(["CNOT", "CZ", "SWAP"]))
+                    a, b = (int(x) for x in rng.choice(n, size=2, replace=False))
+                    sv.apply_two_qubit(gate, a, b)
+                    tab.apply_two_qubit(gate, a, b)
+
+    def test_wide_register(self):
+        """Registers spanning several words keep GHZ correlations."""
+        n = 130
+        tab = StabilizerTableau(n, shots=70, rng=np.random.default_rng(1))
+        tab.apply_gate("H", 0)
+        for q in range(n - 1):
+            tab.apply_cnot(q, q + 1)
+        outcomes = np.stack([tab.measure(q) for q in range(n)])
+        self.assertTrue(np.all(outcomes == outcomes[0]))
+
+
+class TestCliffordDetection(unittest.TestCase):
+    """Test is_clifford_graph."""
+
+    def test_clifford_graphs(self):
+        """GHZ and teleportation graphs are Clifford."""
+        self.assertTrue(is_clifford_graph(ghz_graph(4)["program"]["nodes"]))
+        self.assertTrue(is_clifford_graph(TELEPORT_NODES))
+
+    def test_non_clifford_graphs(self):
+        """T, rotations, MEASURE_ANGLE and guarded H are rejected."""
+        cases = [
+            {"id": "t", "op": "APPLY_T", "vqs": ["q"]},
+            {"id": "r", "op": "APPLY_RZ", "vqs": ["q"], "args": {"theta": 0.1}},
+            {"id": "m", "op": "MEASURE_ANGLE", "vqs": ["q"], "args": {"angle": 0.3}},
+            {"id": "h", "op": "APPLY_H", "vqs": ["q"], "guard": {"event": "e", "equals": 1}},
+        ]
+        for node in cases:
+            self.assertFalse(is_clifford_graph([node]), node["op"])
+
+    def test_guarded_pauli_allowed(self):
+        """Guarded Pauli gates only flip signs and stay Clifford."""
+        node = {"id": "x", "op": "APPLY_X", "vqs": ["q"], "guard": {"event": "e", "equals": 1}}
+        self.assertTrue(is_clifford_graph([node]))
+
+
+class TestStabilizerBackend(unittest.TestCase):
+    """Test StabilizerBackend execution."""
+
+    def test_teleportation(self):
+        """Teleporting |1⟩ with feed-forward always yields 1."""
+        events = StabilizerBackend(seed=4).run_shots({"nodes": TELEPORT_NODES}, 500)
+        self.assertTrue(np.all(events["m_bob"] == 1))
+        self.assertTrue(0 < events["m_alice"].sum() < 500)
+
+    def test_large_ghz(self):
+        """GHZ on hundreds of qubits stays correlated."""
+        result = StabilizerBackend(seed=2).execute_graph(ghz_graph(300))
+        self.assertEqual(len(set(result["events"].values())), 1)
+        self.assertEqual(result["telemetry"]["backend"], "stabilizer")
+
+    def test_rejects_non_clifford(self):
+        """Non-Clifford graphs raise before simulation."""
+        graph = {"nodes": [{"id": "t", "op": "T", "qubits": ["q0"]}]}
+        with self.assertRaises(RuntimeError):
+            StabilizerBackend().execute_graph(graph)
+
+    def test_engine_method_validated(self):
+        """Unknown simulation methods are rejected."""
+        with self.assertRaises(ValueError):
+            BatchedShotEngine(1, method="tensor")
+
+
+class TestAutoSelection(unittest.TestCase):
+    """Test EnhancedExecutor simulator selection."""
+
+    def test_execute_shots_uses_stabilizer_for_clifford(self):
+        """Clifford graphs run on the tableau, others on the statevector."""
+        executor = create_test_executor(seed=7)
+        result = executor.execute_shots(ghz_graph(40), shots=100)
+        self.assertEqual(result["telemetry"]["simulation_method"], "stabilizer")
+
+        graph = ghz_graph(2)
+        graph["program"]["nodes"].insert(2, {"id": "t", "op": "APPLY_T", "vqs": ["q0"]})
+        result = executor.execute_shots(graph, shots=100)
+        self.assertEqual(result["telemetry"]["simulation_method"], "statevector")
+
+    def test_auto_backend(self):
+        """backend='auto' picks a backend per graph."""
+        executor = create_test_executor(seed=7, backend="auto")
+        self.assertIsInstance(executor._select_backend(ghz_graph(3)), StabilizerBackend)
+
+        graph = ghz_graph(2)
+        graph["program"]["nodes"].insert(2, {"id": "t", "op": "APPLY_T", "vqs": ["q0"]})
+        self.assertIsInstance(executor._select_backend(graph), StatevectorBackend)
+
+        result = executor.execute(ghz_graph(50))
+        self.assertEqual(result["status"], "COMPLETED")
+        self.assertEqual(len(set(result["events"].values())), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Unit tests for the native statevector backend
+"""
+
+import unittest
+import sys
+import os
+import math
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from kernel.executor.statevector_backend import StatevectorBackend
+from kernel.simulator import statevector
+from kernel.simulator.statevector import BatchedStatevector
+from tests.test_helpers import create_test_executor
+
+try:
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+    HAS_QISKIT = True
+except ImportError:
+    HAS_QISKIT = False
+
+
+def ghz_graph(n: int) -> dict:
+    """Build an n-qubit GHZ graph measuring every qubit."""
+    vqs = [f"q{i}" for i in range(n)]
+    nodes = [
+        {"id": "alloc", "op": "ALLOC_LQ", "args": {"n": n, "profile": "logical:surface_code(d=3)"},
+         "vqs": vqs, "caps": ["CAP_ALLOC"]},
+        {"id": "h", "op": "APPLY_H", "vqs": ["q0"]},
+    ]
+    nodes += [{"id": f"c{i}", "op": "APPLY_CNOT", "vqs": [vqs[i], vqs[i + 1]]} for i in range(n - 1)]
+    nodes += [{"id": f"m{i}", "op": "MEASURE_Z", "vqs": [vqs[i]], "produces": [f"e{i}"]} for i in range(n)]
+    return {
+        "version": "0.1",
+        "program": {"nodes": nodes},
+        "resources": {"vqs": vqs, "chs": [], "events": [f"e{i}" for i in range(n)]},
+        "caps": ["CAP_ALLOC"]
+    }
+
+
+class TestStatevectorBackend(unittest.TestCase):
+    """Test StatevectorBackend execution."""
+
+    def test_ghz_outcomes_always_correlated(self):
+        """GHZ states never produce mixed outcomes (KNOWN_ISSUES regression)."""
+        backend = StatevectorBackend(seed=11)
+        graph = ghz_graph(5)
+        for _ in range(50):
+            outcomes = set(backend.execute_graph(graph)["events"].values())
+            self.assertEqual(len(outcomes), 1)
+
+    def test_teleportation_feed_forward(self):
+        """Teleporting |1⟩ with COND_PAULI corrections always yields 1."""
+        graph = {"program": {"nodes": [
+            {"id": "a", "op": "ALLOC_LQ", "vqs": ["msg", "alice", "bob"]},
+            {"id": "prep", "op": "APPLY_X", "vqs": ["msg"]},
+            {"id": "h", "op": "APPLY_H", "vqs": ["alice"]},
+            {"id": "c", "op": "APPLY_CNOT", "vqs": ["alice", "bob"]},
+            {"id": "bc", "op": "APPLY_CNOT", "vqs": ["msg", "alice"]},
+            {"id": "bh", "op": "APPLY_H", "vqs": ["msg"]},
+            {"id": "m1", "op": "MEASURE_Z", "vqs": ["msg"], "produces": ["m_msg"]},
+            {"id": "m2", "op": "MEASURE_Z", "vqs": ["alice"], "produces": ["m_alice"]},
+            {"id": "fx", "op": "COND_PAULI", "args": {"mask": "X"}, "vqs": ["bob"], "inputs": ["m_alice"]},
+            {"id": "fz", "op": "COND_PAULI", "args": {"mask": "Z"}, "vqs": ["bob"], "inputs": ["m_msg"]},
+            {"id": "v", "op": "MEASURE_Z", "vqs": ["bob"], "produces": ["m_bob"]},
+        ]}}
+        events = StatevectorBackend(seed=4).run_shots(graph, 500)
+        self.assertTrue(np.all(events["m_bob"] == 1))
+        self.assertTrue(0 < events["m_alice"].sum() < 500)
+
+    def test_bare_gate_nodes(self):
+        """Nodes using qubits/params and bare gate names are accepted."""
+        graph = {"nodes": [
+            {"id": "r", "op": "RY", "qubits": ["q0"], "params": {"theta": math.pi}},
+            {"id": "m", "op": "MEASURE", "qubits": ["q0"], "produces": ["e"]},
+        ]}
+        result = StatevectorBackend(seed=1).execute_graph(graph)
+        self.assertEqual(result["events"], {"e": 1})
+        self.assertEqual(result["telemetry"]["backend"], "statevector")
+
+    def test_guard_skipped_event_omitted(self):
+        """Events from guarded-out measurements are not reported."""
+        graph = {"program": {"nodes": [
+            {"id": "a", "op": "ALLOC_LQ", "vqs": ["q0", "q1"]},
+            {"id": "m0", "op": "MEASURE_Z", "vqs": ["q0"], "produces": ["e0"]},
+            {"id": "m1", "op": "MEASURE_Z", "vqs": ["q1"], "produces": ["e1"],
+             "guard": {"event": "e0", "equals": 1}},
+        ]}}
+        events = StatevectorBackend(seed=1).execute_graph(graph)["events"]
+        self.assertEqual(events, {"e0": 0})
+
+    def test_qubit_limit(self):
+        """Registers above max_qubits are rejected before allocation."""
+        backend = StatevectorBackend(max_qubits=4)
+        with self.assertRaises(RuntimeError):
+            backend.execute_graph(ghz_graph(5))
+
+    def test_single_precision(self):
+        """Single precision halves memory and still simulates correctly."""
+        backend = StatevectorBackend(seed=2, precision="single")
+        info = backend.get_backend_info()
+        self.assertEqual(info["max_memory_bytes"], (1 << 28) * 8)
+        events = backend.execute_graph(ghz_graph(3))["events"]
+        self.assertEqual(len(set(events.values())), 1)
+
+    def test_invalid_precision(self):
+        """Unknown precisions are rejected."""
+        with self.assertRaises(ValueError):
+            StatevectorBackend(precision="half")
+
+    def test_executor_execute_shots_uses_backend(self):
+        """EnhancedExecutor.execute_shots batches through the backend."""
+        executor = create_test_executor(seed=5, backend=StatevectorBackend(seed=5))
+        result = executor.execute_shots(ghz_graph(3), shots=400)
+        self.assertEqual(set(result["counts"]), {"000", "111"})
+
+
+class TestBlockedKernel(unittest.TestCase):
+    """Test bounded-scratch in-place application."""
+
+    @unittest.skipUnless(HAS_QISKIT, "Qiskit not installed")
+    def test_matches_qiskit_statevector(self):
+        """Blocked application matches Qiskit amplitudes exactly."""
+        rng = np.random.default_rng(0)
+        n = 6
+        qc = QuantumCircuit(n)
+
+        with mock.patch.object(statevector, "SCRATCH_AMPLITUDES", 4):
+            sv = BatchedStatevector(n)
+            for _ in range(60):
+                kind = rng.integers(4)
+                a, b = (int(x) for x in rng.choice(n, size=2, replace=False))
+                theta = float(rng.uniform(0, 2 * math.pi))
+                if kind == 0:
+                    sv.apply_gate("H", a)
+                    qc.h(a)
+                elif kind == 1:
+                    sv.apply_gate("RX", a, theta)
+                    qc.rx(theta, a)
+                elif kind == 2:
+                    sv.apply_cnot(a, b)
+                    qc.cx(a, b)
+                else:
+                    sv.apply_swap(a, b)
+                    qc.swap(a, b)
+
+        expected = Statevector.from_instruction(qc).data
+        np.testing.assert_allclose(sv.state[0], expected, atol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
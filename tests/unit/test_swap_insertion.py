@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Tests for SWAP insertion."""
 
+import random
 import unittest
 import sys
 from pathlib import Path
@@ -67,6 +68,47 @@ class TestHardwareTopology(unittest.TestCase):
         
         path = topo.find_path(2, 2)
         self.assertEqual(path, [2])
+    
+    def test_distance_tables(self):
+        """Test cached distance, next-hop and bitset tables."""
+        topo = HardwareTopology.grid(3, 4)
+        
+        for q1 in range(12):
+            r1, c1 = divmod(q1, 4)
+            for q2 in range(12):
+                r2, c2 = divmod(q2, 4)
+                hops = abs(r1 - r2) + abs(c1 - c2)
+                self.assertEqual(topo.distance_matrix[q1, q2], hops)
+                
+                path = topo.find_path(q1, q2)
+                self.assertEqual(len(path), hops + 1)
+                for a, b in zip(path, path[1:]):
+                    self.assertTrue(topo.are_connected(a, b))
+        
+        self.assertEqual(topo.adjacency_bitsets[5], (1 << 1) | (1 << 4) | (1 << 6) | (1 << 9))
+        self.assertEqual(topo.get_neighbors(0), {1, 4})
+    
+    def test_disconnected_qubits(self):
+        """Test unreachable qubits and tables rebuilt after edge changes."""
+        topo = HardwareTopology(4, {(0, 1), (2, 3)})
+        
+        self.assertEqual(topo.get_distance(0, 3), float('inf'))
+        self.assertIsNone(topo.find_path(0, 3))
+        self.assertEqual(topo.next_hop_matrix[0, 3], -1)
+        
+        topo.add_edge(2, 1)
+        self.assertIn((1, 2), topo.edges)
+        self.assertEqual(topo.get_distance(0, 3), 2)
+        self.assertEqual(topo.find_path(0, 3), [0, 1, 2, 3])
+        
+        # Same-size edits and reassignment are noticed too
+        topo.remove_edge(1, 2)
+        topo.add_edge(0, 3)
+        self.assertEqual(topo.edges, {(0, 1), (1, 0), (2, 3), (3, 2), (0, 3), (3, 0)})
+        self.assertEqual(topo.find_path(0, 2), [0, 3, 2])
+        topo.edges = {(0, 2)}
+        self.assertEqual(topo.distance_matrix[0, 2], 1)
+        self.assertEqual(topo.get_neighbors(3), set())
 
 
 class TestSWAPInsertion(unittest.TestCase):
@@ -99,7 +141,7 @@ class TestSWAPInsertion(unittest.TestCase):
         circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q2]))
         
         topo = HardwareTopology.linear(3)  # 0-1-2
-        opt_pass = SWAPInsertionPass(topo)
+        opt_pass = SWAPInsertionPass(topo, initial_layout="identity")
         result = opt_pass.run(circuit)
         
         # Should add SWAPs
@@ -134,7 +176,7 @@ class TestSWAPInsertion(unittest.TestCase):
         circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q3]))  # Not adjacent
         
         topo = HardwareTopology.linear(4)
-        opt_pass = SWAPInsertionPass(topo)
+        opt_pass = SWAPInsertionPass(topo, initial_layout="identity")
         result = opt_pass.run(circuit)
         
         # Should add SWAPs for second CNOT
@@ -172,11 +214,103 @@ class TestSWAPInsertion(unittest.TestCase):
         circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q3]))
         
         topo = HardwareTopology.grid(2, 2)
-        opt_pass = SWAPInsertionPass(topo)
+        opt_pass = SWAPInsertionPass(topo, initial_layout="identity")
         result = opt_pass.run(circuit)
         
         # Should add SWAPs (diagonal not connected)
         self.assertGreater(opt_pass.metrics.swap_gates_added, 0)
+    
+    
+    def test_layout_refinement_avoids_swaps(self):
+        """Test that layout refinement places a single interaction adjacently."""
+        circuit = QIRCircuit()
+        q0 = circuit.add_qubit('q0')
+        circuit.add_qubit('q1')
+        q2 = circuit.add_qubit('q2')
+        circuit.add_instruction(QIRInstruction(InstructionType.CNOT, [q0, q2]))
+        
+        opt_pass = SWAPInsertionPass(HardwareTopology.linear(3))
+        opt_pass.run(circuit)
+        
+        self.assertEqual(opt_pass.metrics.swap_gates_added, 0)
+        mapping = circuit.metadata['qubit_mapping']
+        self.assertTrue(HardwareTopology.linear(3).are_connected(mapping[q0], mapping[q2]))
+    
+    def test_routed_circuit_is_equivalent(self):
+        """Test that routed gates act on adjacent qubits holding the right states."""
+        rng = random.Random(3)
+        circuit = QIRCircuit()
+        qubits = [circuit.add_qubit(f'q{i}') for i in range(10)]
+        original = []
+        for _ in range(200):
+            if rng.random() < 0.3:
+                inst = QIRInstruction(InstructionType.H, [rng.choice(qubits)])
+            else:
+                inst = QIRInstruction(InstructionType.CNOT, rng.sample(qubits, 2))
+            original.append(inst)
+            circuit.add_instruction(inst)
+        
+        topo = HardwareTopology.grid(3, 4)
+        opt_pass = SWAPInsertionPass(topo)
+        result = opt_pass.run(circuit)
+        
+        # Replay SWAPs on slots and check each gate sees its original qubits
+        layout = result.metadata['qubit_mapping']
+        physical = {q: p for q, p in layout.items()}
+        holder = {p: q for q, p in layout.items()}
+        gates = []
+        for inst in result.instructions:
+            positions = [physical.get(q) for q in inst.qubits]
+            if inst.inst_type == InstructionType.SWAP:
+                if None in positions:
+                    # Ancilla slots stand for unused physical qubits
+                    free = sorted(set(range(12)) - set(physical.values()))
+                    for q in inst.qubits:
+                        if q not in physical:
+                            physical[q] = free.pop(0)
+                    positions = [physical[q] for q in inst.qubits]
+                self.assertTrue(topo.are_connected(*positions))
+                a, b = (holder.get(p) for p in positions)
+                holder[positions[0]], holder[positions[1]] = b, a
+                continue
+            if inst.is_two_qubit_gate():
+                self.assertTrue(topo.are_connected(*positions))
+            gates.append((inst.inst_type, [holder[p] for p in positions]))
+        
+        # Per-qubit order is preserved
+        for qubit in qubits:
+            self.assertEqual(
+                [(i.inst_type, i.qubits) for i in original if qubit in i.qubits],
+                [g for g in gates if qubit in g[1]]
+            )
+        
+        final = result.metadata['final_qubit_mapping']
+        self.assertEqual({holder[p]: p for p in final.values()}, {q: p for q, p in final.items()})
+    
+    def test_fewer_swaps_than_identity_walk(self):
+        """Test that lookahead routing beats walking each gate independently."""
+        rng = random.Random(5)
+        circuit = QIRCircuit()
+        qubits = [circuit.add_qubit(f'q{i:02d}') for i in range(16)]
+        for _ in range(300):
+            circuit.add_instruction(QIRInstruction(InstructionType.CNOT, rng.sample(qubits, 2)))
+        
+        topo = HardwareTopology.grid(4, 4)
+        walk_swaps = 0
+        position = {q: i for i, q in enumerate(qubits)}
+        occupant = dict(enumerate(qubits))
+        for inst in circuit.instructions:
+            path = topo.find_path(position[inst.qubits[0]], position[inst.qubits[1]])
+            for p1, p2 in zip(path[:-2], path[1:-1]):
+                a, b = occupant[p1], occupant[p2]
+                occupant[p1], occupant[p2] = b, a
+                position[a], position[b] = p2, p1
+                walk_swaps += 1
+        
+        opt_pass = SWAPInsertionPass(topo)
+        opt_pass.run(circuit)
+        
+        self.assertLess(opt_pass.metrics.swap_gates_added, 0.8 * walk_swaps)
 
 
 if __name__ == '__main__':